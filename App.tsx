@@ -2,7 +2,8 @@ import React, { useState, useMemo, useEffect } from 'react';
 import { onAuthStateChanged, signOut, User } from 'firebase/auth';
 import { auth } from './services/firebaseService';
 import { fetchProducts } from './services/productService';
-import { fetchSiteContent } from './services/contentService';
+import { trackEvent } from './services/analyticsService';
+import { fetchSiteContent, subscribeToContentUpdates } from './services/contentService';
 import Header from './components/Header';
 import ProductCard from './components/ProductCard';
 import CartDrawer from './components/CartDrawer';
@@ -131,7 +132,18 @@ export default function App() {
       .catch(() => {
         // Fallback already set as default state
       });
-    return () => { cancelled = true; };
+
+    // Re-fetch only when the bot API reports a content change
+    const unsubscribe = subscribeToContentUpdates((content) => {
+      if (!cancelled) {
+        setSiteContent(content);
+      }
+    });
+
+    return () => {
+      cancelled = true;
+      unsubscribe();
+    };
   }, []);
 
   // Trending toys — products marked as popular
@@ -184,6 +196,7 @@ export default function App() {
       }
       return [...prev, { ...toy, quantity: 1 }];
     });
+    trackEvent('click', 'product', toy.id);
     showToast(`${toy.name} savatga qo'shildi`, 'cart');
   };
 
@@ -219,6 +232,7 @@ export default function App() {
   };
 
   const openProductDetail = (toy: Toy) => {
+    trackEvent('view', 'product', toy.id);
     setSelectedToy(toy);
     setCurrentView('product-detail');
     window.scrollTo({ top: 0, behavior: 'smooth' });
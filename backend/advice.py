@@ -0,0 +1,230 @@
+"""
+Advice — Aqlli Yordamchi maslahatlari (LLM) uchun proxy va kesh.
+
+Savollar maydoni kichik va ko'p takrorlanadi, shuning uchun:
+
+  - so'rov normallanadi: yosh — oraliqqa (3-5 yosh), budjet — diapazonga,
+    qiziqishlar — tartiblangan so'zlar to'plamiga. Kalit — shu normallangan
+    so'rovning sha256 i; LLM ga ham aynan shu oraliqlar beriladi, shuning
+    uchun javob butun oraliq uchun to'g'ri
+  - javob avval xotiradagi LRU dan, keyin SQLite dagi advice_cache dan
+    (TTL + LRU, database.py) olinadi
+  - bir xil kalit bilan bir vaqtda kelgan so'rovlar bitta provayder
+    chaqiruvini kutadi
+  - provayder almashtiriladi: gemini (REST, kalit faqat serverda) yoki
+    stub — tarmoqsiz, deterministik (test va dev uchun)
+
+Provayder xatosi keshlanmaydi — keyingi so'rov qayta urinadi.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+
+from config import (
+    ADVICE_CACHE_MAX_ENTRIES,
+    ADVICE_CACHE_TTL_HOURS,
+    ADVICE_MEMORY_ENTRIES,
+    ADVICE_PROVIDER,
+    ADVICE_TIMEOUT,
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+)
+from database import get_cached_advice, put_cached_advice
+from recommender import parse_age, parse_budget, tokenize
+
+# (yuqori chegara, yorliq) — qiymat chegaradan kichik bo'lsa shu oraliq
+AGE_BUCKETS = [(1, "0-1 yosh"), (3, "1-3 yosh"), (5, "3-5 yosh"), (8, "5-8 yosh"), (12, "8-12 yosh"), (math.inf, "12+ yosh")]
+BUDGET_BANDS = [
+    (100_000, "100 ming so'mgacha"),
+    (200_000, "100-200 ming so'm"),
+    (400_000, "200-400 ming so'm"),
+    (800_000, "400-800 ming so'm"),
+    (math.inf, "800 ming so'mdan yuqori"),
+]
+MAX_INTEREST_WORDS = 6
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+
+
+def _bucket(value: "float | None", buckets: list) -> "str | None":
+    if value is None:
+        return None
+    return next(label for upper, label in buckets if value < upper)
+
+
+def normalize_request(age: str, interest: str, budget: str) -> dict:
+    """Kesh kaliti va prompt uchun normallangan so'rov."""
+    words = sorted({token for token in tokenize(interest) if not token.endswith("~")})
+    return {
+        "age": _bucket(parse_age(age), AGE_BUCKETS),
+        "interest": " ".join(words[:MAX_INTEREST_WORDS]),
+        "budget": _bucket(parse_budget(budget), BUDGET_BANDS),
+    }
+
+
+def cache_key(request: dict) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def build_prompt(request: dict) -> str:
+    return (
+        "Siz ToyMix do'konining aqlli yordamchisiz. Ota-onaga quyidagi ma'lumotlar asosida "
+        "farzandi uchun o'yinchoq tanlashda yordam bering:\n"
+        f"  - Bolaning yoshi: {request['age'] or 'aytilmagan'}\n"
+        f"  - Qiziqishlari: {request['interest'] or 'aytilmagan'}\n"
+        f"  - Budjet (taxminan): {request['budget'] or 'aytilmagan'}\n\n"
+        "Iltimos, o'yinchoq turini, uning foydali jihatlarini va nega aynan shu yoshga mosligini "
+        "tushuntirib bering. Javobni o'zbek tilida, do'stona va bolalarga g'amxo'rlik ruhida yozing. "
+        "Faqat matnli maslahat bering, narxlarni aniq aytishingiz shart emas."
+    )
+
+
+# ─── Providers ───────────────────────────────────────────────────────────────
+
+class AdviceProvider(ABC):
+    name: str
+
+    @abstractmethod
+    async def generate(self, request: dict) -> str: ...
+
+    async def close(self):
+        pass
+
+
+class GeminiProvider(AdviceProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, model: str = GEMINI_MODEL, timeout: float = ADVICE_TIMEOUT):
+        if not api_key:
+            raise ValueError("ADVICE_PROVIDER=gemini uchun GEMINI_API_KEY kerak")
+        self.model = model
+        self._client = httpx.AsyncClient(timeout=timeout, headers={"x-goog-api-key": api_key})
+
+    async def generate(self, request: dict) -> str:
+        response = await self._client.post(
+            GEMINI_URL.format(model=self.model),
+            json={
+                "contents": [{"parts": [{"text": build_prompt(request)}]}],
+                "generationConfig": {"temperature": 0.7, "topP": 0.9},
+            },
+        )
+        response.raise_for_status()
+        candidates = response.json().get("candidates") or []
+        parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+        text = "".join(part.get("text", "") for part in parts).strip()
+        if not text:
+            raise ValueError("Gemini bo'sh javob qaytardi")
+        return text
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class StubProvider(AdviceProvider):
+    """Tarmoqsiz, deterministik javob — bir xil so'rovga doim bir xil matn."""
+
+    name = "stub"
+
+    async def generate(self, request: dict) -> str:
+        age = request["age"] or "har qanday yoshdagi"
+        interest = request["interest"] or "o'yin"
+        budget = f" {request['budget']} atrofidagi" if request["budget"] else ""
+        return (
+            f"{age} bola uchun \"{interest}\" mavzusidagi{budget} o'yinchoqlarni tavsiya qilamiz. "
+            "Bunday o'yinchoqlar qiziqishni rivojlantiradi, diqqat va tasavvurni mustahkamlaydi. "
+            "Katalogimizda shu yoshga mos mahsulotlarni ko'rib chiqing!"
+        )
+
+
+def create_provider(name: str = ADVICE_PROVIDER) -> AdviceProvider:
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "stub":
+        return StubProvider()
+    raise ValueError(f"Noma'lum ADVICE_PROVIDER: {name}")
+
+
+# ─── Service ─────────────────────────────────────────────────────────────────
+
+class AdviceService:
+    def __init__(self, provider: Optional[AdviceProvider] = None):
+        self._provider = provider
+        # key -> (muddati, javob, provayder)
+        self._memory: "OrderedDict[str, tuple[float, str, str]]" = OrderedDict()
+        self._inflight: "dict[str, asyncio.Task]" = {}
+        self.ttl_seconds = int(ADVICE_CACHE_TTL_HOURS * 3600)
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.collapsed = 0
+
+    @property
+    def provider(self) -> AdviceProvider:
+        if self._provider is None:
+            self._provider = create_provider()
+        return self._provider
+
+    async def get_advice(self, age: str, interest: str, budget: str) -> dict:
+        """{"advice", "provider", "cached"} — provayder xatosi yuqoriga chiqadi."""
+        request = normalize_request(age, interest, budget)
+        key = cache_key(request)
+
+        entry = self._memory.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return {"advice": entry[1], "provider": entry[2], "cached": True}
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.collapsed += 1
+        # Bitta mijoz uzilsa ham, boshqalar kutayotgan chaqiruv bekor bo'lmaydi
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, request: dict) -> dict:
+        row = await get_cached_advice(key)
+        if row:
+            self.db_hits += 1
+            self._remember(key, row["advice"], row["provider"])
+            return {"advice": row["advice"], "provider": row["provider"], "cached": True}
+
+        self.misses += 1
+        provider = self.provider
+        advice = await provider.generate(request)
+        await put_cached_advice(key, request, advice, provider.name, self.ttl_seconds, ADVICE_CACHE_MAX_ENTRIES)
+        self._remember(key, advice, provider.name)
+        return {"advice": advice, "provider": provider.name, "cached": False}
+
+    def _remember(self, key: str, advice: str, provider: str):
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, advice, provider)
+        self._memory.move_to_end(key)
+        while len(self._memory) > ADVICE_MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "collapsed": self.collapsed,
+            "memory_entries": len(self._memory),
+        }
+
+    async def close(self):
+        if self._provider is not None:
+            await self._provider.close()
+
+
+advice_service = AdviceService()
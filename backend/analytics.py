@@ -0,0 +1,197 @@
+"""
+Analytics — mahsulot va blog post ko'rishlari/bosishlarini arzon yig'ish.
+
+Har bir ko'rish uchun bazaga qator yozilsa, SQLite ning yagona yozuvchisi
+buyurtmalar bilan talashadi. Shuning uchun:
+
+  - POST /api/analytics/events hodisalarni faqat xotiradagi agregatga
+    qo'shadi: (entity_type, entity_id, kun) → ko'rishlar, bosishlar va
+    noyob tashrif buyuruvchilar HyperLogLog sketchi (hyperloglog.py)
+  - fon task har ANALYTICS_FLUSH_INTERVAL soniyada (va to'xtashda) hamma
+    agregatni storage.flush_analytics() orqali bitta tranzaksiyada yozadi
+  - faqat katalogdagi mahsulotlar va e'lon qilingan postlar hisoblanadi
+    (sync_entities); boshqa id lar tashlanadi (unknown) — soxta id lar
+    buferni to'ldira olmaydi
+  - yozish xato bo'lsa: baza ishlamayotgan bo'lsa (bo'sh yozish ham
+    o'tmasa), agregat xotiraga qaytariladi va keyingi safar yoziladi;
+    aks holda partiya bo'lib-bo'lib yoziladi va xato qatorlar chetga
+    olinadi (failed_rows) — bitta buzuq qator qolganlarini to'xtatmaydi
+  - kalitlar soni ANALYTICS_MAX_PENDING dan oshsa, yangi kalitlar
+    tashlanadi (dropped)
+
+Natijani bot /stats komandasi ko'rsatadi; yozilgan mahsulot hodisalari
+"ommabop" reytingiga ham qo'shiladi (rankings.py).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from config import ANALYTICS_FLUSH_INTERVAL, ANALYTICS_MAX_PENDING, ANALYTICS_RETENTION_DAYS
+from hyperloglog import add as hll_add, merge as hll_merge, new_sketch
+from rankings import rankings
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+class Analytics:
+    def __init__(self, interval: float = ANALYTICS_FLUSH_INTERVAL, max_pending: int = ANALYTICS_MAX_PENDING):
+        self.interval = interval
+        self.max_pending = max_pending
+        # (entity_type, entity_id, kun) -> [views, clicks, sketch]
+        self._pending: "dict[tuple[str, int, str], list]" = {}
+        # entity_type -> (manba ro'yxat, id lar to'plami); ro'yxat o'zgarsa qayta quriladi
+        self._known: "dict[str, tuple[list, set[int]]]" = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.dropped = 0
+        self.unknown = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+
+    def sync_entities(self, entity_type: str, items: list):
+        """Hisoblanadigan id lar (katalog / e'lon qilingan postlar). Ro'yxat o'sha obyekt bo'lsa — hech narsa qilinmaydi."""
+        known = self._known.get(entity_type)
+        if known is None or known[0] is not items:
+            self._known[entity_type] = (items, {int(item["id"]) for item in items})
+
+    def record(self, visitor: str, events: "list[tuple[str, str, int]]"):
+        """events: (type, entity_type, entity_id) — type "view" yoki "click"."""
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        for kind, entity_type, entity_id in events:
+            known = self._known.get(entity_type)
+            if known is None or entity_id not in known[1]:
+                self.unknown += 1
+                continue
+            key = (entity_type, entity_id, day)
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                entry = self._pending[key] = [0, 0, new_sketch()]
+            entry[0 if kind == "view" else 1] += 1
+            hll_add(entry[2], visitor)
+            self.events += 1
+        if len(self._pending) >= self.max_pending // 2:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Xotiradagi agregatlarni yozish. Yozilgan qatorlar soni."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = [
+            {
+                "entity_type": entity_type, "entity_id": entity_id, "day": day,
+                "views": views, "clicks": clicks, "visitors": bytes(sketch),
+            }
+            for (entity_type, entity_id, day), (views, clicks, sketch) in pending.items()
+        ]
+        written: "list[dict]" = []
+        try:
+            try:
+                await storage.flush_analytics(rows, ANALYTICS_RETENTION_DAYS)
+                written = rows
+            except Exception:
+                # Bo'sh yozish ham o'tmasa — baza ishlamayapti: hammasi keyingi safar
+                await storage.flush_analytics([], ANALYTICS_RETENTION_DAYS)
+                middle = len(rows) // 2
+                for part in (rows[:middle], rows[middle:]):
+                    await self._write_isolating(part, written)
+        except BaseException:
+            done = {(row["entity_type"], row["entity_id"], row["day"]) for row in written}
+            self._restore({key: entry for key, entry in pending.items() if key not in done})
+            raise
+        rankings.record(written)
+        self.flushes += 1
+        self.flushed_rows += len(written)
+        return len(written)
+
+    async def _write_isolating(self, rows: "list[dict]", written: "list[dict]"):
+        """Partiyani yozish; xato bo'lsa ikkiga bo'lib qayta — yakka xato qator chetga olinadi."""
+        if not rows:
+            return
+        try:
+            await storage.flush_analytics(rows, ANALYTICS_RETENTION_DAYS)
+            written.extend(rows)
+            return
+        except Exception as e:
+            if len(rows) == 1:
+                row = rows[0]
+                self.failed_rows += 1
+                logger.error(
+                    "Statistika qatori yozilmadi, chetga olindi: %s #%s (%s) — %s",
+                    row["entity_type"], row["entity_id"], row["day"], e,
+                    extra={
+                        "event": "analytics.row_failed",
+                        "entity_type": row["entity_type"],
+                        "entity_id": row["entity_id"],
+                        "day": row["day"],
+                    },
+                )
+                return
+        middle = len(rows) // 2
+        await self._write_isolating(rows[:middle], written)
+        await self._write_isolating(rows[middle:], written)
+
+    def _restore(self, pending: dict):
+        """Yozilmagan agregatni flush davomida kelgan yangi hodisalar bilan birlashtirish."""
+        for key, (views, clicks, sketch) in pending.items():
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [views, clicks, sketch]
+            else:
+                entry[0] += views
+                entry[1] += clicks
+                entry[2] = bytearray(hll_merge(entry[2], sketch))
+
+    def stats(self) -> dict:
+        return {
+            "events": self.events,
+            "pending_keys": len(self._pending),
+            "dropped": self.dropped,
+            "unknown": self.unknown,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Fon taskni to'xtatib, qolgan agregatni yozish."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.exception("Statistikani yozishda xato (to'xtashda): %s", e, extra={"event": "analytics.error"})
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Statistikani yozishda xato: %s", e, extra={"event": "analytics.error"})
+
+
+analytics = Analytics()
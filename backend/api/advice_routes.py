@@ -0,0 +1,35 @@
+"""
+Advice API Routes — Aqlli Yordamchi (AIAdvisor.tsx) uchun LLM proxy.
+
+POST /api/advice — PUBLIC. {age, interest, budget} → {advice, provider, cached}
+
+LLM kaliti faqat serverda. Javoblar normallangan so'rov bo'yicha keshlanadi
+(advice.py) — ko'p so'rovlar millisekundlarda qaytadi.
+"""
+
+import logging
+
+import httpx
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from advice import advice_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["advice"])
+
+
+class AdviceRequest(BaseModel):
+    age: str = Field(default="", max_length=50)
+    interest: str = Field(default="", max_length=300)
+    budget: str = Field(default="", max_length=50)
+
+
+@router.post("/advice")
+async def get_advice(body: AdviceRequest):
+    try:
+        return await advice_service.get_advice(body.age, body.interest, body.budget)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Maslahat provayderi xatosi: %s", e, extra={"event": "advice.provider_error"})
+        raise HTTPException(status_code=503, detail="Maslahat xizmati vaqtincha ishlamayapti")
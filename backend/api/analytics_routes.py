@@ -0,0 +1,62 @@
+"""
+Analytics API Routes — sayt ko'rish/bosish hodisalari.
+
+POST /api/analytics/events — PUBLIC, 204. Hodisalar faqat xotiradagi
+agregatga qo'shiladi (analytics.py), bazaga davriy ravishda yoziladi.
+
+    {"visitor_id": "...", "events": [{"type": "view", "entity": "product", "id": 12}]}
+
+navigator.sendBeacon uchun text/plain tanasi ham qabul qilinadi.
+visitor_id bo'lmasa — IP va User-Agent dan hash (faqat noyob sanash uchun).
+Katalogda yo'q mahsulot va e'lon qilinmagan post id lari hisoblanmaydi.
+"""
+
+import hashlib
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, Field, ValidationError
+
+from analytics import analytics
+from api.catalog_routes import catalog_products
+from api.content_routes import blog_posts
+
+router = APIRouter(prefix="/api", tags=["analytics"])
+
+MAX_EVENTS = 50
+# id lar bazada BIGINT
+MAX_ID = 2**63 - 1
+
+
+class AnalyticsEvent(BaseModel):
+    type: Literal["view", "click"]
+    entity: Literal["product", "post"]
+    id: int = Field(ge=1, le=MAX_ID)
+
+
+class AnalyticsBatch(BaseModel):
+    visitor_id: Optional[str] = Field(default=None, max_length=64)
+    events: "list[AnalyticsEvent]" = Field(min_length=1, max_length=MAX_EVENTS)
+
+
+def _visitor(request: Request, visitor_id: Optional[str]) -> str:
+    if visitor_id:
+        return visitor_id
+    client = request.client.host if request.client else ""
+    return hashlib.sha256(f"{client}|{request.headers.get('user-agent', '')}".encode()).hexdigest()
+
+
+@router.post("/analytics/events", status_code=204)
+async def ingest_events(request: Request):
+    try:
+        batch = AnalyticsBatch.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    analytics.sync_entities("product", await catalog_products())
+    analytics.sync_entities("post", await blog_posts())
+    analytics.record(
+        _visitor(request, batch.visitor_id),
+        [(event.type, event.entity, event.id) for event in batch.events],
+    )
+    return Response(status_code=204)
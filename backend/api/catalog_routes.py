@@ -0,0 +1,240 @@
+"""
+Catalog API Routes — mahsulotlar va kategoriyalar (productService.ts).
+
+GET /api/products?sort=new|popular|price_asc|price_desc&cursor=&page=&page_size=
+                 &category_id=&min_price=&max_price=&q=&lang=&base_url=
+GET /api/products/{id}?lang=&base_url=
+GET /api/categories
+GET /api/recommendations?age=&interest=&budget=&limit=&lang= — Aqlli Yordamchi uchun
+
+Mahsulotlar ro'yxati content_cache da saqlanadi ("catalog" bo'limi).
+Qoldiq (stock / available / in_stock) keshga kirmaydi — u har bir javobda
+inventory.availability() dan qo'shiladi, shuning uchun buyurtma yoki bron
+katalog keshini tozalamaydi.
+
+Tartib (yangi / ommabop) va cursor sahifalash rankings.py dan — so'rov
+vaqtida saralash yo'q. next_cursor ni keyingi so'rovga berish kerak;
+page parametri eski mijozlar uchun qoldirilgan. Narx/matn filtri yoki narx
+bo'yicha tartib bo'lsa so'rov ustunli katalogda (catalog_columns.py)
+bajariladi.
+
+lang — sarlavha va tavsif tarjimasi (locales.py). Tartib, reyting va
+tavsiyalar tilga bog'liq emas — ular asosiy katalogda hisoblanadi, javobga
+esa shu tildagi mahsulot (id bo'yicha) qo'yiladi.
+"""
+
+import math
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from catalog_columns import columns_for, query_list
+from config import CATALOG_COLUMNS, DEFAULT_LOCALE, SNAPSHOT_MEDIA_BASE_URL
+from content_cache import cache_generation, get_cached, set_cached
+from inventory import inventory
+from locales import apply_translations, cache_key, cache_sections, normalize_locale, translation_chain
+from rankings import decode_cursor, encode_cursor, rankings
+from recommender import make_query, recommender
+from storage import storage
+
+router = APIRouter(prefix="/api", tags=["catalog"])
+
+
+def _media_url(base_url: str, file_id: str) -> str:
+    return f"{base_url.rstrip('/')}/api/media/{file_id}"
+
+
+def format_product(
+    product: dict,
+    base_url: str = SNAPSHOT_MEDIA_BASE_URL,
+    availability: "dict[int, int | None] | None" = None,
+) -> dict:
+    """Mahsulotni frontend formatiga o'girish (productService.ts dagi ApiProduct)."""
+    media = [
+        {
+            "id": item["id"],
+            "file_id": item["file_id"],
+            "media_type": item["media_type"],
+            "sort_order": item["sort_order"],
+            "image_url": _media_url(base_url, item["file_id"]),
+        }
+        for item in product["media"]
+    ]
+    images = [item["image_url"] for item in media if item["media_type"] == "photo"]
+    # available None — qoldiq kuzatilmaydi (yoki snapshot kabi qoldiqsiz javob)
+    available = availability.get(product["id"]) if availability is not None else None
+    return {
+        "id": product["id"],
+        "title": product["title"],
+        "price": product["price"],
+        "description": product.get("description") or "",
+        "category_id": product["category_id"],
+        "category_name": product["category_name"],
+        "is_active": bool(product["is_active"]),
+        "created_at": product["created_at"],
+        "updated_at": product["updated_at"],
+        "image": images[0] if images else "",
+        "images": images,
+        "media": media,
+        "available": available,
+        "in_stock": available is None or available > 0,
+    }
+
+
+async def _cached_catalog(locale: str = DEFAULT_LOCALE) -> list:
+    key = cache_key("catalog", locale)
+    products = get_cached(key)
+    if products is None:
+        generation = cache_generation()
+        if locale == DEFAULT_LOCALE:
+            products = await storage.get_catalog_products()
+        else:
+            # Tarjimasiz mahsulotlar asosiy katalogdagi obyektning o'zi (nusxa olinmaydi)
+            products = await _cached_catalog()
+            translations = await storage.get_translations("products", translation_chain(locale))
+            products = [apply_translations(p, translations.get(str(p["id"])), locale) for p in products]
+        set_cached(key, products, sections=cache_sections("catalog", locale), generation=generation)
+    return products
+
+
+async def catalog_products(locale: str = DEFAULT_LOCALE) -> list:
+    """Katalog (til keshidan) — boshqa routerlar uchun (masalan, statistika id tekshiruvi)."""
+    return await _cached_catalog(locale)
+
+
+async def warm_catalog():
+    """Ishga tushganda (main.py): asosiy tildagi katalog keshga olinadi."""
+    await _cached_catalog()
+
+
+# locale -> (katalog ro'yxati, id -> mahsulot); ro'yxat o'zgarsa qayta quriladi
+_catalog_index: "dict[str, tuple[list, dict[int, dict]]]" = {}
+
+
+async def _catalog_by_id(locale: str) -> "dict[int, dict]":
+    products = await _cached_catalog(locale)
+    entry = _catalog_index.get(locale)
+    if entry is None or entry[0] is not products:
+        entry = _catalog_index[locale] = (products, {p["id"]: p for p in products})
+    return entry[1]
+
+
+def _base_url(request: Request, base_url: Optional[str]) -> str:
+    return base_url or SNAPSHOT_MEDIA_BASE_URL or str(request.base_url)
+
+
+@router.get("/products")
+async def list_products(
+    request: Request,
+    sort: Literal["new", "popular", "price_asc", "price_desc"] = Query("new"),
+    cursor: Optional[str] = Query(None, max_length=500),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    category_id: Optional[int] = Query(None),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    q: str = Query("", max_length=100),
+    lang: Optional[str] = Query(None, max_length=20),
+    base_url: Optional[str] = Query(None),
+):
+    """Faol mahsulotlar: filtr va tartib bo'yicha, sahifalab."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort, category_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    locale = normalize_locale(lang)
+    rankings.sync_catalog(await _cached_catalog())
+    offset = (page - 1) * page_size
+    q = q.strip()
+    if min_price is None and max_price is None and not q and sort in ("new", "popular"):
+        # Bosh sahifa va kategoriya ro'yxatlari — tayyor reytinglardan
+        products, next_cursor = rankings.page(sort, category_id, page_size, after=after, offset=offset)
+        total = rankings.count(category_id)
+        if locale != DEFAULT_LOCALE:
+            by_id = await _catalog_by_id(locale)
+            products = [by_id.get(p["id"], p) for p in products]
+    else:
+        catalog = await _cached_catalog(locale)
+        filters = {"category_id": category_id, "min_price": min_price, "max_price": max_price, "text": q}
+        if CATALOG_COLUMNS:
+            columns = columns_for(locale)
+            await columns.ensure(catalog)
+            products, next_key, total = columns.query(
+                sort, page_size, after=after, offset=offset, scores=rankings.scores_for, **filters,
+            )
+        else:
+            products, next_key, total = query_list(
+                catalog, sort, page_size, after=after, offset=offset, score=rankings.score, **filters,
+            )
+        next_cursor = encode_cursor(sort, category_id, next_key) if next_key else None
+
+    availability = await inventory.availability()
+    media_base = _base_url(request, base_url)
+    return {
+        "products": [format_product(p, media_base, availability) for p in products],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": max(1, math.ceil(total / page_size)),
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/products/{product_id}")
+async def get_product(
+    request: Request,
+    product_id: int,
+    lang: Optional[str] = Query(None, max_length=20),
+    base_url: Optional[str] = Query(None),
+):
+    product = (await _catalog_by_id(normalize_locale(lang))).get(product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Mahsulot topilmadi")
+    return format_product(product, _base_url(request, base_url), await inventory.availability())
+
+
+@router.get("/categories")
+async def list_categories():
+    categories = get_cached("categories")
+    if categories is None:
+        generation = cache_generation()
+        categories = await storage.get_categories_with_counts()
+        set_cached("categories", categories, sections={"catalog"}, generation=generation)
+    return {"categories": categories}
+
+
+@router.get("/recommendations")
+async def get_recommendations(
+    request: Request,
+    age: str = Query("", max_length=50),
+    interest: str = Query("", max_length=300),
+    budget: str = Query("", max_length=50),
+    limit: int = Query(4, ge=1, le=12),
+    lang: Optional[str] = Query(None, max_length=20),
+    base_url: Optional[str] = Query(None),
+):
+    """
+    Katalogdan mos mahsulotlar (LLM siz). matched=False — savol so'zlari hech bir
+    mahsulotga mos kelmadi, natija faqat yosh va budjet bo'yicha.
+    """
+    await recommender.ensure_index(await _cached_catalog())
+    query = make_query(age, interest, budget)
+    availability = await inventory.availability()
+    (ranked,) = recommender.recommend([query], limit, availability)
+
+    by_id = await _catalog_by_id(normalize_locale(lang))
+    media_base = _base_url(request, base_url)
+    return {
+        # Til keshi indeksdan eskiroq bo'lishi mumkin (yangi mahsulot) — yo'qlari o'tkazib yuboriladi
+        "products": [
+            {**format_product(by_id[product_id], media_base, availability), "score": score}
+            for product_id, score, _ in ranked
+            if product_id in by_id
+        ],
+        "matched": any(matched for _, _, matched in ranked),
+        "age": query.age,
+        "budget": query.budget,
+    }
@@ -3,93 +3,256 @@ Content API Routes — sayt kontentini frontend ga berish.
 
 GET endpointlar — PUBLIC (hamma uchun ochiq, sayt foydalanadi)
 POST/PUT/DELETE — faqat API_SECRET_KEY bilan (ichki ishlatish uchun)
+
+GET javoblar content_cache da saqlanadi — bot orqali o'zgartirilganda
+(yoki rejalashtirilgan job bajarilganda) kesh darhol tozalanadi.
+
+GET /api/content/stream — Server-Sent Events: kontent o'zgarganda hodisa keladi.
+GET /api/content/changes?since=<versiya> — faqat o'zgargan elementlar (delta sync).
+
+Barcha GET larda ?lang=ru — tarjima (topilmagan maydonlar asosiy tilda,
+locales.py). Har bir til javobi keshda alohida saqlanadi.
 """
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional
 
-from database import (
-    get_site_settings,
-    get_page_content,
-    get_blog_posts,
+from storage import storage
+from config import API_SECRET_KEY, DEFAULT_LOCALE
+from content_cache import cache_generation, content_version, get_cached, set_cached
+from content_events import content_events
+from database import normalize_site_settings
+from locales import (
+    apply_translations,
+    cache_key,
+    cache_sections,
+    normalize_locale,
+    split_version_key,
+    translation_chain,
 )
-from config import API_SECRET_KEY
+from shutdown import shutdown_manager
 
 router = APIRouter(prefix="/api", tags=["content"])
 
 
 # ─── Public GET Endpoints (sayt frontend uchun) ─────────────────────────────
 
+def _format_blog_post(post: dict) -> dict:
+    """Blog postni frontend formatiga o'girish."""
+    return {
+        "id": str(post["id"]),
+        "title": post["title"],
+        "excerpt": post.get("excerpt", ""),
+        "content": post.get("content", ""),
+        "image": post.get("image", ""),
+        "date": post.get("created_at", ""),
+        "author": post.get("author", ""),
+    }
+
+
+async def _cached_settings(locale: str) -> dict:
+    key = cache_key("settings", locale)
+    settings = get_cached(key)
+    if settings is None:
+        generation = cache_generation()
+        settings = await storage.get_site_settings() or {}
+        chain = translation_chain(locale)
+        if chain:
+            for setting_key, by_locale in (await storage.get_translations("settings", chain)).items():
+                if setting_key in settings:
+                    settings[setting_key] = apply_translations({"value": settings[setting_key]}, by_locale, locale)["value"]
+        set_cached(key, settings, sections=cache_sections("settings", locale), generation=generation)
+    return settings
+
+
+async def site_settings(locale: str = DEFAULT_LOCALE) -> dict:
+    """Sayt sozlamalari (til keshidan) — boshqa routerlar uchun (masalan, bepul yetkazish chegarasi)."""
+    return await _cached_settings(locale)
+
+
+async def _cached_page(page_name: str, locale: str) -> dict:
+    key = cache_key(f"page:{page_name}", locale)
+    content = get_cached(key)
+    if content is None:
+        generation = cache_generation()
+        content = await storage.get_page_content(page_name) or {}
+        chain = translation_chain(locale)
+        if chain:
+            translations = await storage.get_translations("pages", chain, [page_name])
+            content = apply_translations(content, translations.get(page_name), locale, decode=True)
+        set_cached(key, content, sections=cache_sections(page_name, locale), generation=generation)
+    return content
+
+
+async def _localized_posts(posts: list, locale: str) -> list:
+    chain = translation_chain(locale)
+    if not chain or not posts:
+        return posts
+    translations = await storage.get_translations("blog_posts", chain, [post["id"] for post in posts])
+    return [apply_translations(post, translations.get(str(post["id"])), locale) for post in posts]
+
+
+async def _cached_blog_posts(locale: str) -> list:
+    key = cache_key("blog", locale)
+    posts = get_cached(key)
+    if posts is None:
+        generation = cache_generation()
+        posts_raw = await _localized_posts(await storage.get_blog_posts(published_only=True), locale)
+        posts = [_format_blog_post(post) for post in posts_raw]
+        set_cached(key, posts, sections=cache_sections("blog", locale), generation=generation)
+    return posts
+
+
+async def blog_posts(locale: str = DEFAULT_LOCALE) -> list:
+    """E'lon qilingan postlar (til keshidan) — boshqa routerlar uchun."""
+    return await _cached_blog_posts(locale)
+
+
+async def content_payload(locale: str) -> dict:
+    """
+    Barcha sayt kontenti (bitta til). version — keyingi /api/content/changes?since=
+    uchun (o'qishdan oldin olinadi, shunda o'qish paytidagi yozish keyingi
+    deltada albatta keladi).
+    """
+    version = content_version()
+    return {
+        "version": version,
+        "locale": locale,
+        "settings": await _cached_settings(locale),
+        "about": await _cached_page("about", locale),
+        "delivery": await _cached_page("delivery", locale),
+        "blog_posts": await _cached_blog_posts(locale),
+    }
+
+
 @router.get("/content")
-async def get_all_content():
+async def get_all_content(lang: Optional[str] = Query(None, max_length=20)):
     """
     Barcha sayt kontentini bir so'rovda qaytarish.
     Frontend buni ishlatadi — contentService.ts dagi fetchSiteContent().
     """
-    settings = await get_site_settings()
-    about = await get_page_content("about")
-    delivery = await get_page_content("delivery")
-    blog_posts_raw = await get_blog_posts(published_only=True)
-
-    # Blog postlarni frontend formatiga o'girish
-    blog_posts = []
-    for post in blog_posts_raw:
-        blog_posts.append({
-            "id": str(post["id"]),
-            "title": post["title"],
-            "excerpt": post.get("excerpt", ""),
-            "content": post.get("content", ""),
-            "image": post.get("image", ""),
-            "date": post.get("created_at", ""),
-            "author": post.get("author", ""),
-        })
+    return await content_payload(normalize_locale(lang))
+
+
+@router.get("/content/changes")
+async def get_content_changes_since(
+    since: int = Query(0, ge=0),
+    lang: Optional[str] = Query(None, max_length=20),
+):
+    """
+    since versiyasidan keyin o'zgargan kontent.
+
+    Javob:
+        {"version": 57, "full": false,
+         "settings": {...faqat o'zgargan kalitlar},
+         "pages": {"about": {...}},
+         "blog_posts": [...yangi yoki o'zgargan],
+         "deleted": {"blog_posts": ["12"]},
+         "versions": {"settings": 55, "pages": 40, "blog_posts": 57}}
+
+    since=0 yoki bazadagidan katta versiya (masalan, baza tiklangan) — to'liq kontent, "full": true.
+    Boshqa tillarning tarjima o'zgarishlari (lang zanjirida bo'lmagan) qaytarilmaydi.
+    """
+    locale = normalize_locale(lang)
+    chain = translation_chain(locale)
+    version = content_version()
+    if since == 0 or since > version:
+        payload = await content_payload(locale)
+        payload["full"] = True
+        payload["versions"] = await storage.get_section_versions()
+        return payload
+
+    changes = await storage.get_content_changes(since)
+    setting_keys = []
+    page_names = []
+    post_ids = []
+    deleted_posts = []
+    for change in changes:
+        version = max(version, change["version"])
+        item_key, item_locale = split_version_key(change["item_key"])
+        if item_locale is not None and item_locale not in chain:
+            continue
+        if change["section"] == "settings":
+            setting_keys.append(item_key)
+        elif change["section"] == "pages":
+            page_names.append(item_key)
+        elif change["section"] == "blog_posts":
+            if change["deleted"]:
+                deleted_posts.append(item_key)
+            else:
+                post_ids.append(int(item_key))
+
+    post_ids = list(dict.fromkeys(post_ids))
+    posts = await _localized_posts(await storage.get_blog_posts_by_ids(post_ids, published_only=True), locale)
+    # Nashrdan olingan (yoki o'qish paytida o'chirilgan) postlar ham mijoz uchun tombstone
+    found_ids = {post["id"] for post in posts}
+    deleted_posts.extend(str(post_id) for post_id in post_ids if post_id not in found_ids)
 
     return {
-        "settings": settings or {},
-        "about": about or {},
-        "delivery": delivery or {},
-        "blog_posts": blog_posts,
+        "version": version,
+        "full": False,
+        "settings": await _changed_settings(setting_keys, locale),
+        "pages": {name: await _cached_page(name, locale) for name in dict.fromkeys(page_names)},
+        "blog_posts": [_format_blog_post(post) for post in posts],
+        "deleted": {"blog_posts": deleted_posts},
+        "versions": await storage.get_section_versions(),
     }
 
 
+async def _changed_settings(keys: "list[str]", locale: str) -> dict:
+    if not keys:
+        return {}
+    if not translation_chain(locale):
+        # /api/content dagi get_site_settings bilan bir xil turlar (delta keshga qo'shiladi)
+        return normalize_site_settings(await storage.get_site_settings_for_keys(keys))
+    # Tarjima qo'llangan qiymatlar — til keshidan (bir xil natija, qo'shimcha so'rovsiz)
+    settings = await _cached_settings(locale)
+    return {key: settings[key] for key in keys if key in settings}
+
+
 @router.get("/settings")
-async def get_settings():
+async def get_settings(lang: Optional[str] = Query(None, max_length=20)):
     """Sayt sozlamalarini olish (telefon, email, social linklar, promo banner)."""
-    settings = await get_site_settings()
-    return settings
+    return await _cached_settings(normalize_locale(lang))
 
 
 @router.get("/content/about")
-async def get_about_content():
+async def get_about_content(lang: Optional[str] = Query(None, max_length=20)):
     """'Biz haqimizda' sahifasi kontentini olish."""
-    content = await get_page_content("about")
-    if not content:
-        return {}
-    return content
+    return await _cached_page("about", normalize_locale(lang))
 
 
 @router.get("/content/delivery")
-async def get_delivery_content():
+async def get_delivery_content(lang: Optional[str] = Query(None, max_length=20)):
     """Yetkazish sahifasi kontentini olish."""
-    content = await get_page_content("delivery")
-    if not content:
-        return {}
-    return content
+    return await _cached_page("delivery", normalize_locale(lang))
 
 
 @router.get("/blog")
-async def get_blog():
+async def get_blog(lang: Optional[str] = Query(None, max_length=20)):
     """Blog postlarni olish."""
-    posts_raw = await get_blog_posts(published_only=True)
-    posts = []
-    for post in posts_raw:
-        posts.append({
-            "id": str(post["id"]),
-            "title": post["title"],
-            "excerpt": post.get("excerpt", ""),
-            "content": post.get("content", ""),
-            "image": post.get("image", ""),
-            "date": post.get("created_at", ""),
-            "author": post.get("author", ""),
-        })
-    return {"posts": posts}
+    return {"posts": await _cached_blog_posts(normalize_locale(lang))}
+
+
+@router.get("/content/stream")
+async def content_stream(request: Request):
+    """
+    Kontent o'zgarishlari oqimi (SSE).
+    Frontend EventSource bilan ulanadi va "content" hodisasi kelgandagina qayta yuklaydi.
+    """
+    if content_events.is_full():
+        raise HTTPException(status_code=503, detail="Too many stream clients")
+    if shutdown_manager.draining:
+        raise HTTPException(status_code=503, detail="Shutting down")
+
+    queue = content_events.subscribe()
+    return StreamingResponse(
+        content_events.stream(queue, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Proxy (nginx, Railway edge) buferlamasin
+            "X-Accel-Buffering": "no",
+        },
+    )
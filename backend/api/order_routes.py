@@ -0,0 +1,188 @@
+"""
+Order API Routes — sayt checkout sahifasidan buyurtma qabul qilish.
+
+POST /api/orders — PUBLIC. Narxlar mijozdan olinmaydi: savatdagi barcha
+mahsulotlar bitta so'rovda bazadan o'qiladi va summa serverda hisoblanadi.
+
+Idempotency-Key sarlavhasi (ixtiyoriy, tavsiya etiladi): tarmoq uzilib,
+mijoz so'rovni qayta yuborsa, ikkinchi buyurtma ochilmaydi — birinchisi
+qaytariladi (200, Idempotent-Replayed: true). Xuddi shu kalit boshqa
+tarkibdagi buyurtma bilan kelsa — 409.
+
+Ombor qoldig'i:
+  POST   /api/reservations        — checkout ochilganda savatni bron qilish
+  DELETE /api/reservations/{id}   — checkout dan chiqilganda bronni bo'shatish
+Buyurtma reservation_id bilan kelsa, bron qilingan miqdor buyurtmaga
+o'tadi; bronsiz (yoki muddati o'tgan) bo'lsa qoldiq shu yerda yechiladi.
+Qoldiq yetmasa — 409 va yetmagan product_ids.
+"""
+
+import hashlib
+import json
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+
+from api.content_routes import site_settings
+from config import ORDER_DELIVERY_FEE, ORDER_MAX_ITEMS, ORDER_MAX_QUANTITY, RESERVATION_TTL_MINUTES
+from inventory import inventory
+from orders import order_writer, parse_price
+from storage import storage
+
+router = APIRouter(prefix="/api", tags=["orders"])
+
+
+class OrderLine(BaseModel):
+    product_id: int
+    quantity: int = Field(ge=1, le=ORDER_MAX_QUANTITY)
+
+
+class OrderRequest(BaseModel):
+    full_name: str = Field(min_length=2, max_length=100)
+    phone: str = Field(min_length=7, max_length=32)
+    city: str = Field(default="", max_length=50)
+    address: str = Field(min_length=3, max_length=300)
+    payment_method: Literal["cash", "card", "online"] = "cash"
+    comment: str = Field(default="", max_length=1000)
+    items: "list[OrderLine]" = Field(min_length=1, max_length=ORDER_MAX_ITEMS)
+    reservation_id: Optional[str] = Field(default=None, max_length=64)
+
+
+class ReservationRequest(BaseModel):
+    items: "list[OrderLine]" = Field(min_length=1, max_length=ORDER_MAX_ITEMS)
+
+
+def _merge_lines(lines: "list[OrderLine]") -> "dict[int, int]":
+    """Bir mahsulot savatda ikki qatorda kelsa — birlashtiramiz."""
+    quantities: "dict[int, int]" = {}
+    for line in lines:
+        quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+    return quantities
+
+
+def _out_of_stock(product_ids: "list[int]") -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Ba'zi mahsulotlar omborda yetarli emas", "product_ids": product_ids},
+    )
+
+
+def _request_hash(body: OrderRequest) -> str:
+    # reservation_id tarkibga kirmaydi — qayta urinishda bron yangilangan bo'lishi mumkin
+    payload = json.dumps(body.model_dump(exclude={"reservation_id"}), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _format_order(order: dict) -> dict:
+    """Buyurtmani frontend formatiga o'girish."""
+    return {
+        "id": order["id"],
+        "status": order.get("status", "pending"),
+        "subtotal": order["subtotal"],
+        "delivery_fee": order["delivery_fee"],
+        "total": order["total"],
+        "items": [
+            {
+                "product_id": item["product_id"],
+                "title": item["title"],
+                "unit_price": item["unit_price"],
+                "quantity": item["quantity"],
+            }
+            for item in order["items"]
+        ],
+    }
+
+
+async def _replay(key: str, request_hash: str, response: Response) -> dict:
+    """Shu kalit bilan yozilgan buyurtmani qaytarish."""
+    existing = await storage.get_order_by_idempotency_key(key)
+    if existing["request_hash"] != request_hash:
+        raise HTTPException(status_code=409, detail="Idempotency-Key boshqa buyurtma uchun ishlatilgan")
+    response.status_code = 200
+    response.headers["Idempotent-Replayed"] = "true"
+    return {"order": _format_order(existing)}
+
+
+@router.post("/orders", status_code=201)
+async def create_order(
+    body: OrderRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=128),
+):
+    """Yangi buyurtma."""
+    request_hash = _request_hash(body)
+    if idempotency_key and await storage.get_order_by_idempotency_key(idempotency_key):
+        return await _replay(idempotency_key, request_hash, response)
+
+    quantities = _merge_lines(body.items)
+    products = {p["id"]: p for p in await storage.get_products_by_ids(list(quantities))}
+    missing = [product_id for product_id in quantities if product_id not in products]
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Ba'zi mahsulotlar mavjud emas yoki sotuvda yo'q", "product_ids": missing},
+        )
+
+    items = [
+        {
+            "product_id": product_id,
+            "title": products[product_id]["title"],
+            "unit_price": parse_price(products[product_id]["price"]),
+            "quantity": quantity,
+        }
+        for product_id, quantity in quantities.items()
+    ]
+    subtotal = sum(item["unit_price"] * item["quantity"] for item in items)
+    threshold = (await site_settings()).get("free_delivery_threshold", 300000)
+    delivery_fee = 0 if subtotal >= threshold else ORDER_DELIVERY_FEE
+
+    order = {
+        "idempotency_key": idempotency_key,
+        "request_hash": request_hash,
+        "customer_name": body.full_name.strip(),
+        "phone": body.phone.strip(),
+        "city": body.city.strip(),
+        "address": body.address.strip(),
+        "payment_method": body.payment_method,
+        "comment": body.comment.strip(),
+        "subtotal": subtotal,
+        "delivery_fee": delivery_fee,
+        "total": subtotal + delivery_fee,
+        "items": items,
+        "reservation_id": body.reservation_id,
+    }
+    result = await order_writer.submit(order)
+    if result["out_of_stock"]:
+        raise _out_of_stock(result["out_of_stock"])
+    if not result["created"]:
+        # Parallel qayta so'rov (yoki boshqa node) bizdan oldin yozib ulgurdi
+        return await _replay(idempotency_key, request_hash, response)
+
+    return {"order": _format_order({**order, "id": result["id"]})}
+
+
+@router.post("/reservations", status_code=201)
+async def create_reservation(body: ReservationRequest, reservation_id: Optional[str] = Query(None, max_length=64)):
+    """
+    Savatni RESERVATION_TTL_MINUTES daqiqaga bron qilish (hammasi yoki hech narsa).
+    ?reservation_id= berilsa — shu bron yangi savat bilan almashtiriladi.
+    """
+    token = reservation_id or secrets.token_urlsafe(16)
+    ttl_seconds = RESERVATION_TTL_MINUTES * 60
+    short = await storage.reserve_stock(token, list(_merge_lines(body.items).items()), ttl_seconds)
+    if short:
+        raise _out_of_stock(short)
+    inventory.invalidate()
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+    return {"reservation_id": token, "expires_at": expires_at.isoformat(timespec="seconds")}
+
+
+@router.delete("/reservations/{reservation_id}")
+async def delete_reservation(reservation_id: str):
+    released = await storage.release_reservation(reservation_id)
+    if released:
+        inventory.invalidate()
+    return {"released": released}
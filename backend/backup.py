@@ -0,0 +1,275 @@
+"""
+Backup — SQLite bazasining onlayn zaxira nusxalari va tiklash.
+
+WAL rejimida ishlayotgan bazani oddiy fayl nusxalash xavfli (toymix.db va
+toymix.db-wal alohida fayllar). Bu yerda SQLite backup API ishlatiladi:
+
+  1. baza kichik qadamlar bilan (BACKUP_PAGES_PER_STEP sahifa) vaqtinchalik
+     faylga ko'chiriladi, qadamlar orasida qisqa pauza — yozuvchilar to'xtamaydi
+  2. nusxa PRAGMA quick_check bilan tekshiriladi
+  3. gzip bilan siqilib, backups/toymix-20261019-120000.db.gz ga yoziladi
+  4. BACKUP_KEEP tadan eskilari o'chiriladi
+
+Hamma og'ir ish thread da bajariladi — event loop (API, bot) bloklanmaydi.
+
+Backup davomida boshqa ulanish yozsa, SQLite nusxalashni boshidan boshlaydi.
+Yozuvlar juda ko'p bo'lsa (MAX_RESTARTS marta qayta boshlansa), nusxa bitta
+qadamda olinadi — WAL rejimida bu ham yozuvchilarni bloklamaydi.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from config import (
+    BACKUP_DIR,
+    BACKUP_INTERVAL_HOURS,
+    BACKUP_KEEP,
+    BACKUP_PAGES_PER_STEP,
+    BACKUP_STEP_SLEEP,
+    DATABASE_PATH,
+)
+from content_cache import all_sections, notify_content_changed, set_content_version
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+BACKUP_SUFFIX = ".db.gz"
+MAX_RESTARTS = 3
+
+
+class _BackupRestarted(Exception):
+    """Nusxalash davomida baza o'zgardi va backup qayta boshlandi."""
+
+
+def _backup_prefix() -> str:
+    return os.path.splitext(os.path.basename(DATABASE_PATH))[0]
+
+
+def _copy_database(source_path: str, target_path: str) -> dict:
+    """Bazani backup API orqali nusxalash (sinxron, thread da ishlaydi)."""
+    stats = {"steps": 0, "restarts": 0, "pages": 0, "single_step": False}
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        stats["steps"] += 1
+        stats["pages"] = total
+        if last_remaining is not None and remaining > last_remaining:
+            stats["restarts"] += 1
+            if stats["restarts"] >= MAX_RESTARTS:
+                raise _BackupRestarted()
+        last_remaining = remaining
+        # Qadamlar orasida source bazadagi o'qish qulfi bo'shaydi
+        time.sleep(BACKUP_STEP_SLEEP)
+
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+            except _BackupRestarted:
+                stats["single_step"] = True
+                source.backup(target, pages=-1)
+        finally:
+            target.close()
+    finally:
+        source.close()
+    return stats
+
+
+def _check_database(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise RuntimeError(f"Backup tekshiruvdan o'tmadi: {result}")
+
+
+def _compress(source_path: str, target_path: str):
+    tmp_path = f"{target_path}.tmp"
+    with open(source_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+    os.replace(tmp_path, target_path)
+
+
+def _rotate(keep: int) -> int:
+    backups = list_backups()
+    removed = 0
+    for entry in backups[keep:]:
+        try:
+            os.remove(os.path.join(BACKUP_DIR, entry["name"]))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def create_backup_sync(label: str = "") -> dict:
+    """Backup yaratish: nusxa → tekshiruv → gzip → rotatsiya."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    started = time.monotonic()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    suffix = f"-{label}" if label else ""
+    name = f"{_backup_prefix()}-{stamp}{suffix}{BACKUP_SUFFIX}"
+    raw_path = os.path.join(BACKUP_DIR, f".{name}.partial")
+
+    try:
+        stats = _copy_database(DATABASE_PATH, raw_path)
+        _check_database(raw_path)
+        raw_size = os.path.getsize(raw_path)
+        _compress(raw_path, os.path.join(BACKUP_DIR, name))
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    stats.update(
+        name=name,
+        raw_size=raw_size,
+        size=os.path.getsize(os.path.join(BACKUP_DIR, name)),
+        removed=_rotate(BACKUP_KEEP),
+        duration_ms=round((time.monotonic() - started) * 1000),
+    )
+    return stats
+
+
+def list_backups() -> "list[dict]":
+    """Mavjud backuplar (eng yangisi birinchi)."""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    prefix = f"{_backup_prefix()}-"
+    backups = []
+    for name in os.listdir(BACKUP_DIR):
+        if name.startswith(prefix) and name.endswith(BACKUP_SUFFIX):
+            path = os.path.join(BACKUP_DIR, name)
+            backups.append({"name": name, "size": os.path.getsize(path), "mtime": os.path.getmtime(path)})
+    backups.sort(key=lambda entry: entry["mtime"], reverse=True)
+    return backups
+
+
+def restore_backup_sync(name: str) -> dict:
+    """
+    Backupdan tiklash. Avval joriy baza "pre-restore" backup sifatida saqlanadi,
+    keyin nusxa backup API orqali jonli bazaga yoziladi — boshqa ulanishlar
+    keyingi so'rovdan boshlab tiklangan ma'lumotni ko'radi.
+    """
+    if os.path.basename(name) != name or not name.endswith(BACKUP_SUFFIX):
+        raise ValueError("Noto'g'ri backup nomi")
+    path = os.path.join(BACKUP_DIR, name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(name)
+
+    started = time.monotonic()
+    raw_path = os.path.join(BACKUP_DIR, f".{name}.restore")
+    try:
+        with gzip.open(path, "rb") as src, open(raw_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        _check_database(raw_path)
+
+        safety = create_backup_sync(label="pre-restore")
+
+        source = sqlite3.connect(raw_path)
+        try:
+            target = sqlite3.connect(DATABASE_PATH, timeout=30)
+            try:
+                source.backup(target, pages=-1)
+            finally:
+                target.close()
+        finally:
+            source.close()
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    return {
+        "name": name,
+        "safety_backup": safety["name"],
+        "duration_ms": round((time.monotonic() - started) * 1000),
+    }
+
+
+async def create_backup(label: str = "") -> dict:
+    return await asyncio.to_thread(create_backup_sync, label)
+
+
+async def restore_backup(name: str) -> dict:
+    """Tiklash va kontent keshlarini yangilash."""
+    result = await asyncio.to_thread(restore_backup_sync, name)
+    # Tiklangan baza versiyasi oldingisidan kichik bo'lishi mumkin —
+    # bunday mijozlar /api/content/changes dan to'liq kontent oladi
+    version = await storage.get_content_version()
+    set_content_version(version, reset=True)
+    notify_content_changed(*all_sections(), version=version)
+    return result
+
+
+class BackupScheduler:
+    """BACKUP_INTERVAL_HOURS da bir marta backup oladigan fon task."""
+
+    def __init__(self, interval_hours: float = BACKUP_INTERVAL_HOURS):
+        self.interval = interval_hours * 3600
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_result: Optional[dict] = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def backup_now(self, label: str = "") -> dict:
+        """Bir vaqtda faqat bitta backup."""
+        async with self._lock:
+            self.last_result = await create_backup(label)
+            return self.last_result
+
+    async def restore(self, name: str) -> dict:
+        """Tiklash ham shu lock ostida — parallel backup bilan to'qnashmaydi."""
+        async with self._lock:
+            return await restore_backup(name)
+
+    def _initial_delay(self) -> float:
+        # Restartdan keyin darhol yangi backup olmaslik uchun oxirgisining vaqtidan hisoblaymiz
+        backups = list_backups()
+        if not backups:
+            return 60
+        age = time.time() - backups[0]["mtime"]
+        return max(60, self.interval - age)
+
+    async def _run(self):
+        delay = self._initial_delay()
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.interval
+            try:
+                result = await self.backup_now()
+                logger.info(
+                    "Backup tayyor: %s (%.0f KB, %s ms)", result["name"], result["size"] / 1024, result["duration_ms"],
+                    extra={"event": "backup.done", "backup": result["name"], "bytes": result["size"], "duration_ms": result["duration_ms"]},
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Backup xatosi: %s", e, extra={"event": "backup.error"})
+                delay = min(self.interval, 600)
+
+
+backup_scheduler = BackupScheduler()
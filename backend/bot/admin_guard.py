@@ -15,13 +15,16 @@ Ishlatish:
         ...
 """
 
+import logging
 from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from database import is_admin
+from storage import storage
 from config import SUPER_ADMIN_IDS
 
+logger = logging.getLogger(__name__)
+
 
 def admin_only(func):
     """
@@ -34,8 +37,8 @@ def admin_only(func):
         if not user:
             return
 
-        if not await is_admin(user.id):
-            await update.message.reply_text(
+        if not await storage.is_admin(user.id):
+            await update.effective_message.reply_text(
                 "⛔ Sizda bu komandani ishlatish uchun ruxsat yo'q.\n"
                 "Faqat adminlar bu amalni bajara oladi."
             )
@@ -59,7 +62,7 @@ def super_admin_only(func):
             return
 
         if user.id not in SUPER_ADMIN_IDS:
-            await update.message.reply_text(
+            await update.effective_message.reply_text(
                 "⛔ Bu komanda faqat bosh admin uchun.\n"
                 "Sizda bu amalni bajarish huquqi yo'q."
             )
@@ -73,6 +76,7 @@ def super_admin_only(func):
 async def notify_admin_action(update: Update, action: str):
     """Admin bajargan amalni log qilish uchun yordamchi funksiya."""
     user = update.effective_user
-    print(
-        f"[ADMIN ACTION] {user.full_name} (@{user.username}, ID:{user.id}) — {action}"
+    logger.info(
+        "%s (@%s, ID:%s) — %s", user.full_name, user.username, user.id, action,
+        extra={"event": "bot.admin_action", "user_id": user.id, "username": user.username, "action": action},
     )
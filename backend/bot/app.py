@@ -0,0 +1,262 @@
+"""
+Bot Application — Telegram botni yaratish, ishga tushirish va to'xtatish.
+
+Bu modul (va u orqali butun telegram.ext steki) faqat RUN_MODE bot yoki all
+bo'lganda main.py lifespan ichida import qilinadi — API replikalari
+Telegram kutubxonalarini umuman yuklamaydi.
+"""
+
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler, TypeHandler
+
+from config import BOT_TOKEN, HEALTH_MAX_SATURATION
+from health import saturation
+from shutdown import DRAIN_POLL_INTERVAL
+
+from bot.handlers_admin import (
+    myid_command,
+    add_admin_command,
+    remove_admin_command,
+    list_admins_command,
+)
+from bot.handlers_content import (
+    view_settings_command,
+    edit_settings_command,
+    edit_promo_command,
+    view_about_command,
+    edit_about_command,
+    view_delivery_command,
+    edit_delivery_command,
+    list_blogs_command,
+    edit_blog_command,
+    delete_blog_command,
+    admin_help_command,
+    get_blog_conversation_handler,
+    schedule_blog_command,
+    schedule_promo_command,
+    schedule_setting_command,
+    scheduled_command,
+    cancel_scheduled_command,
+    translate_product_command,
+)
+from bot.handlers_broadcast import broadcast_command, broadcast_status_command
+from bot.pagination import PAGINATION_PATTERN, paginated_view_callback
+from bot.handlers_subscribers import subscribers_command, export_subscribers_command
+from bot.handlers_system import (
+    publish_snapshot_command,
+    backups_command,
+    backup_now_command,
+    restore_backup_command,
+    db_stats_command,
+)
+from bot.handlers_analytics import stats_command
+from bot.handlers_inventory import stock_command
+from bot.persistence import SQLitePersistence
+from bot.send_queue import start_send_queue, stop_send_queue
+from bot.update_processor import BackpressureQueue, ChatOrderedUpdateProcessor
+from bot.subscribers import subscriber_tracker, track_subscriber
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Telegram Bot Setup ─────────────────────────────────────────────────────
+
+bot_app = None
+
+
+def create_bot():
+    """Telegram bot ni yaratish va handlerlarni ro'yxatdan o'tkazish."""
+    global bot_app
+
+    if not BOT_TOKEN:
+        logger.warning(
+            "BOT_TOKEN topilmadi. Bot ishga tushmaydi (.env faylga BOT_TOKEN=your_token qo'shing)",
+            extra={"event": "bot.no_token"},
+        )
+        return None
+
+    # Updatelar parallel, lekin har bir chat ichida tartib bilan bajariladi
+    processor = ChatOrderedUpdateProcessor()
+    builder = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        # Bot holati (masalan /add_blog qoralamasi) restart/deploy dan keyin ham saqlanadi
+        .persistence(SQLitePersistence())
+        .concurrent_updates(processor)
+        .update_queue(BackpressureQueue(processor))
+    )
+    bot_app = builder.build()
+
+    # ── Obunachilarni qayd etish (har bir update, boshqa handlerlardan oldin) ──
+    bot_app.add_handler(TypeHandler(Update, track_subscriber), group=-1)
+
+    # ── Umumiy komandalar (hammaga ochiq) ──
+    bot_app.add_handler(CommandHandler("myid", myid_command))
+    bot_app.add_handler(CommandHandler("start", start_command))
+    bot_app.add_handler(CommandHandler("help", help_command))
+
+    # ── Admin boshqaruv komandlari (super admin only) ──
+    bot_app.add_handler(CommandHandler("add_admin", add_admin_command))
+    bot_app.add_handler(CommandHandler("remove_admin", remove_admin_command))
+
+    # ── Admin komandalar (admin only) ──
+    bot_app.add_handler(CommandHandler("admins", list_admins_command))
+    bot_app.add_handler(CommandHandler("admin_help", admin_help_command))
+
+    # ── Sayt sozlamalari (admin only) ──
+    bot_app.add_handler(CommandHandler("settings", view_settings_command))
+    bot_app.add_handler(CommandHandler("edit_settings", edit_settings_command))
+    bot_app.add_handler(CommandHandler("edit_promo", edit_promo_command))
+
+    # ── About sahifasi (admin only) ──
+    bot_app.add_handler(CommandHandler("view_about", view_about_command))
+    bot_app.add_handler(CommandHandler("edit_about", edit_about_command))
+
+    # ── Delivery sahifasi (admin only) ──
+    bot_app.add_handler(CommandHandler("view_delivery", view_delivery_command))
+    bot_app.add_handler(CommandHandler("edit_delivery", edit_delivery_command))
+
+    # ── Blog (admin only, conversation handler) ──
+    bot_app.add_handler(get_blog_conversation_handler())
+    bot_app.add_handler(CommandHandler("blogs", list_blogs_command))
+    bot_app.add_handler(CommandHandler("edit_blog", edit_blog_command))
+    bot_app.add_handler(CommandHandler("delete_blog", delete_blog_command))
+
+    # ── Rejalashtirish (admin only) ──
+    bot_app.add_handler(CommandHandler("schedule_blog", schedule_blog_command))
+    bot_app.add_handler(CommandHandler("schedule_promo", schedule_promo_command))
+    bot_app.add_handler(CommandHandler("schedule_setting", schedule_setting_command))
+    bot_app.add_handler(CommandHandler("scheduled", scheduled_command))
+    bot_app.add_handler(CommandHandler("cancel_scheduled", cancel_scheduled_command))
+
+    # ── Sahifalangan ro'yxatlar (◀️ / ▶️ tugmalari) ──
+    bot_app.add_handler(CallbackQueryHandler(paginated_view_callback, pattern=PAGINATION_PATTERN))
+
+    # ── Broadcast (admin only) ──
+    bot_app.add_handler(CommandHandler("broadcast", broadcast_command))
+    bot_app.add_handler(CommandHandler("broadcast_status", broadcast_status_command))
+    bot_app.add_handler(CommandHandler("subscribers", subscribers_command))
+    bot_app.add_handler(CommandHandler("export_subscribers", export_subscribers_command))
+
+    # ── Ombor (admin only) ──
+    bot_app.add_handler(CommandHandler("stock", stock_command))
+
+    # ── Tarjimalar (admin only) ──
+    bot_app.add_handler(CommandHandler("translate_product", translate_product_command))
+
+    # ── Statistika (admin only) ──
+    bot_app.add_handler(CommandHandler("stats", stats_command))
+
+    # ── Tizim (admin only) ──
+    bot_app.add_handler(CommandHandler("publish_snapshot", publish_snapshot_command))
+    bot_app.add_handler(CommandHandler("backups", backups_command))
+    bot_app.add_handler(CommandHandler("backup_now", backup_now_command))
+    bot_app.add_handler(CommandHandler("restore_backup", restore_backup_command))
+    bot_app.add_handler(CommandHandler("db_stats", db_stats_command))
+
+    return bot_app
+
+
+async def start_command(update, context):
+    """Bot /start komandasi."""
+    user = update.effective_user
+    from storage import storage
+    is_adm = await storage.is_admin(user.id)
+
+    if is_adm:
+        await update.message.reply_text(
+            f"👋 Salom, {user.first_name}!\n\n"
+            f"🔧 Siz <b>admin</b> sifatida kirdingiz.\n"
+            f"Barcha komandalar: /admin_help\n\n"
+            f"Sayt sozlamalari: /settings\n"
+            f"Blog boshqaruvi: /blogs\n"
+            f"Biz haqimizda: /view_about\n"
+            f"Yetkazish: /view_delivery",
+            parse_mode="HTML",
+        )
+    else:
+        await update.message.reply_text(
+            f"👋 Salom, {user.first_name}!\n\n"
+            f"🧸 ToyMix — bolalar o'yinchoqlari do'koni botiga xush kelibsiz!\n\n"
+            f"📱 Saytimiz: toymix-14889.web.app\n"
+            f"📞 Bog'lanish uchun: /myid"
+        )
+
+
+async def help_command(update, context):
+    """Bot /help komandasi."""
+    user = update.effective_user
+    from storage import storage
+    is_adm = await storage.is_admin(user.id)
+
+    text = "🧸 <b>ToyMix Bot</b>\n\n"
+    text += "/start — Botni boshlash\n"
+    text += "/myid — Telegram ID ni ko'rish\n"
+    text += "/help — Yordam\n"
+
+    if is_adm:
+        text += "\n🔧 <b>Admin komandalar:</b>\n"
+        text += "/admin_help — to'liq admin yordam\n"
+
+    await update.message.reply_text(text, parse_mode="HTML")
+
+
+async def start_bot() -> bool:
+    """Botni yaratib, polling va bot fon xizmatlarini ishga tushirish."""
+    bot = create_bot()
+    if not bot:
+        return False
+
+    await bot.initialize()
+    await bot.start()
+    await bot.updater.start_polling(drop_pending_updates=True)
+    start_send_queue(bot.bot)
+    subscriber_tracker.start()
+    return True
+
+
+def bot_health() -> dict:
+    """Sog'liq tekshiruvi (health.py): updater ishlayaptimi, update navbati to'lmaganmi."""
+    if bot_app is None:
+        return {"ok": False, "error": "bot yaratilmagan"}
+    updater_running = bot_app.updater is not None and bot_app.updater.running
+    stats = bot_app.update_processor.stats()
+    pending_saturation = saturation(stats["pending"], stats["max_pending"])
+    return {
+        "ok": bot_app.running and updater_running and pending_saturation < HEALTH_MAX_SATURATION,
+        "running": bot_app.running,
+        "updater_running": updater_running,
+        "update_queue": bot_app.update_queue.qsize(),
+        "pending": stats["pending"],
+        "saturation": pending_saturation,
+    }
+
+
+async def drain_bot():
+    """
+    To'xtashning birinchi bosqichi: polling to'xtaydi (yangi update olinmaydi),
+    navbatdagi va bajarilayotgan updatelar tugaguncha kutiladi — admin
+    tahriri yarim yo'lda uzilmaydi. Muddatni chaqiruvchi belgilaydi (shutdown.py).
+    """
+    if not bot_app:
+        return
+    if bot_app.updater.running:
+        await bot_app.updater.stop()
+    while bot_app.update_queue.qsize() or bot_app.update_processor.pending:
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+
+async def stop_bot():
+    """Application (persistence flush), send queue va obunachilar buferini to'xtatish."""
+    if not bot_app:
+        return
+    if bot_app.updater.running:
+        await bot_app.updater.stop()
+    await bot_app.stop()
+    await bot_app.shutdown()
+    # Handlerlar tugagandan keyin — navbatga oxirgi xabarlar ham yozilgan bo'ladi
+    await stop_send_queue()
+    await subscriber_tracker.stop()
@@ -8,11 +8,14 @@ Komandalar (faqat super admin):
     /myid — o'zining Telegram ID sini ko'rish (hammaga ochiq)
 """
 
+import html
+
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from bot.admin_guard import super_admin_only, admin_only, notify_admin_action
-from database import add_admin, remove_admin, get_all_admins
+from bot.pagination import PaginatedView
+from storage import storage
 from config import SUPER_ADMIN_IDS
 
 
@@ -68,7 +71,7 @@ async def add_admin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    success = await add_admin(target_id, target_username, target_fullname, user.id)
+    success = await storage.add_admin(target_id, target_username, target_fullname, user.id)
 
     if success:
         await notify_admin_action(update, f"Admin qo'shdi: {target_id} ({target_fullname})")
@@ -112,7 +115,7 @@ async def remove_admin_command(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.message.reply_text("⛔ Super adminni o'chirib bo'lmaydi!")
         return
 
-    success = await remove_admin(target_id)
+    success = await storage.remove_admin(target_id)
     if success:
         await notify_admin_action(update, f"Adminni o'chirdi: {target_id}")
         await update.message.reply_text(
@@ -123,24 +126,28 @@ async def remove_admin_command(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.message.reply_text("❌ Adminni o'chirishda xatolik yuz berdi.")
 
 
-@admin_only
-async def list_admins_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Barcha adminlar ro'yxatini ko'rsatish."""
-    admins = await get_all_admins()
+def _render_admin(admin: dict) -> str:
+    badge = "👑" if admin["is_super"] else "🔧"
+    name = html.escape(admin["full_name"] or "Noma'lum", quote=False)
+    username = f"@{admin['username']}" if admin["username"] else ""
+    return (
+        f"{badge} <b>{name}</b> {username}\n"
+        f"   ID: <code>{admin['telegram_id']}</code>"
+    )
 
-    if not admins:
-        await update.message.reply_text("Hozircha hech qanday admin yo'q.")
-        return
 
-    text = "👥 <b>Adminlar ro'yxati:</b>\n\n"
-    for i, admin in enumerate(admins, 1):
-        badge = "👑" if admin["is_super"] else "🔧"
-        name = admin["full_name"] or "Noma'lum"
-        username = f"@{admin['username']}" if admin["username"] else ""
-        text += (
-            f"{i}. {badge} <b>{name}</b> {username}\n"
-            f"   ID: <code>{admin['telegram_id']}</code>\n"
-        )
+ADMINS_VIEW = PaginatedView(
+    name="admins",
+    count=storage.count_admins,
+    fetch=storage.get_admins_page,
+    render_item=_render_admin,
+    header="👥 <b>Adminlar ro'yxati</b>",
+    empty_text="Hozircha hech qanday admin yo'q.",
+    page_size=15,
+)
+
 
-    text += f"\nJami: {len(admins)} ta admin"
-    await update.message.reply_text(text, parse_mode="HTML")
+@admin_only
+async def list_admins_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Barcha adminlar ro'yxatini sahifalab ko'rsatish."""
+    await ADMINS_VIEW.send(update)
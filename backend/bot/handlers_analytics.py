@@ -0,0 +1,55 @@
+"""
+Analytics Handlers — sayt statistikasi (eng ko'p ko'rilgan mahsulot va postlar).
+
+Komandalar (faqat admin):
+    /stats — oxirgi 7 kun
+    /stats 30 — oxirgi 30 kun
+
+Ma'lumot API dan har ANALYTICS_FLUSH_INTERVAL soniyada yoziladi, shuning
+uchun eng oxirgi ko'rishlar biroz kechikib ko'rinadi.
+"""
+
+import html
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from bot.admin_guard import admin_only
+from bot.pagination import fit_message
+from config import ANALYTICS_RETENTION_DAYS, STATS_TOP_N
+from storage import storage
+
+DEFAULT_DAYS = 7
+
+
+def _format_top(title: str, rows: "list[dict]") -> "list[str]":
+    lines = [f"<b>{title}</b>"]
+    if not rows:
+        lines.append("— hali ma'lumot yo'q")
+    for position, row in enumerate(rows, 1):
+        lines.append(
+            f"{position}. <code>{row['entity_id']}</code> {html.escape(row['title'])} — "
+            f"👁 {row['views']} · 👆 {row['clicks']} · 👤 ~{row['visitors']}"
+        )
+    return lines
+
+
+@admin_only
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Eng ko'p ko'rilgan mahsulotlar va blog postlar."""
+    days = DEFAULT_DAYS
+    if context.args:
+        if not context.args[0].isdigit():
+            await update.message.reply_text("❌ Format: /stats [kunlar soni]")
+            return
+        days = min(max(int(context.args[0]), 1), ANALYTICS_RETENTION_DAYS)
+
+    products = await storage.get_top_entities("product", days, STATS_TOP_N)
+    posts = await storage.get_top_entities("post", days, STATS_TOP_N)
+
+    lines = [f"📊 <b>Sayt statistikasi</b> (oxirgi {days} kun)\n"]
+    lines += _format_top("🧸 Mahsulotlar:", products)
+    lines.append("")
+    lines += _format_top("📝 Blog postlar:", posts)
+    lines.append("\n👁 ko'rish · 👆 bosish (savatga / batafsil) · 👤 noyob tashrif (taxminiy)")
+    await update.message.reply_text(fit_message("\n".join(lines)), parse_mode="HTML")
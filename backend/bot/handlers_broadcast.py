@@ -0,0 +1,72 @@
+"""
+Broadcast Handlers — bot foydalanuvchilariga ommaviy xabar yuborish.
+
+Komandalar (faqat admin):
+    /broadcast <matn> — xabarni navbat orqali barcha obunachilarga yuborish
+    /broadcast (xabarga reply) — reply qilingan xabar matnini yuborish
+    /broadcast_status — navbat holati
+"""
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from bot.admin_guard import admin_only, notify_admin_action
+from bot.send_queue import enqueue_broadcast
+from bot.subscribers import subscriber_tracker
+from database import get_broadcast_recipients, get_outbound_queue_stats
+
+
+@admin_only
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Xabarni botni bloklamagan barcha obunachilarga yuborish.
+    Ishlatish: /broadcast <matn>
+    Yoki biror xabarga reply qilib /broadcast yozish.
+
+    Xabarlar darhol yuborilmaydi — navbatga qo'shiladi va Telegram
+    limitlariga rioya qilgan holda fon rejimida yuboriladi.
+    """
+    message = update.message
+    if message.reply_to_message and message.reply_to_message.text:
+        text = message.reply_to_message.text_html
+    else:
+        # Komanda nomini olib tashlaymiz, formatlash (bold, link) saqlanadi
+        parts = (message.text_html or "").split(None, 1)
+        text = parts[1].strip() if len(parts) > 1 else ""
+
+    if not text:
+        await message.reply_text(
+            "📋 Ishlatish: /broadcast <matn>\n"
+            "Yoki biror xabarga reply qilib /broadcast yozing.\n\n"
+            "Navbat holati: /broadcast_status"
+        )
+        return
+
+    # Hali yozilmagan yangi obunachilar ham ro'yxatga tushsin
+    await subscriber_tracker.flush()
+    recipients = await get_broadcast_recipients()
+    if not recipients:
+        await message.reply_text("ℹ️ Xabar yuborish uchun qabul qiluvchilar yo'q.")
+        return
+
+    count = await enqueue_broadcast(recipients, text, parse_mode="HTML")
+    await notify_admin_action(update, f"Broadcast navbatga qo'shildi: {count} ta qabul qiluvchi")
+    await message.reply_text(
+        f"📣 Xabar navbatga qo'shildi!\n\n"
+        f"👥 Qabul qiluvchilar: {count} ta\n"
+        f"⏳ Telegram limitlari tufayli asta-sekin yuboriladi.\n\n"
+        f"Holat: /broadcast_status"
+    )
+
+
+@admin_only
+async def broadcast_status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Outbound navbat holatini ko'rsatish."""
+    stats = await get_outbound_queue_stats()
+    await update.message.reply_text(
+        f"📬 <b>Xabarlar navbati:</b>\n\n"
+        f"⏳ Kutilmoqda: {stats['pending']}\n"
+        f"✅ Yuborildi: {stats['sent']}\n"
+        f"❌ Xato: {stats['failed']}",
+        parse_mode="HTML",
+    )
@@ -15,8 +15,20 @@ Komandalar:
     /delete_blog <id> — blog postni o'chirish
     /blogs — barcha blog postlar ro'yxati
     /edit_promo <text> — promo banner matnini o'zgartirish
+    /schedule_blog <id> publish|unpublish <sana> <vaqt> — postni vaqtga belgilash
+    /schedule_promo <sana> <vaqt> <matn> — promo bannerni vaqtga belgilash
+    /schedule_setting <sana> <vaqt> <key> <value> — sozlamani vaqtga belgilash
+    /scheduled — kutilayotgan joblar
+    /cancel_scheduled <id> — sozlama jobini bekor qilish
+    /translate_product <til> <id> title|description <matn> — mahsulot tarjimasi
+
+Tahrirlash va ko'rish komandalari birinchi argument sifatida tilni qabul
+qiladi: /edit_settings ru address ..., /edit_about ru hero_title ...,
+/edit_blog ru 12 title ..., /view_about ru. Til ko'rsatilmasa — asosiy til.
+Tarjimada "-" qiymati tarjimani o'chiradi (asosiy matnga qaytadi).
 """
 
+import html
 import json
 from telegram import Update
 from telegram.ext import (
@@ -28,16 +40,59 @@ from telegram.ext import (
 )
 
 from bot.admin_guard import admin_only, notify_admin_action
-from database import (
-    get_site_settings,
-    update_site_setting,
-    get_page_content,
-    update_page_content,
-    get_blog_posts,
-    add_blog_post,
-    update_blog_post,
-    delete_blog_post,
-)
+from bot.pagination import PaginatedView, fit_message
+from config import DEFAULT_LOCALE
+from locales import TRANSLATABLE_FIELDS, TRANSLATABLE_SETTINGS, apply_translations, parse_locale
+from storage import storage
+from scheduler import content_scheduler, parse_local_time, format_local_time
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOCALES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Tarjimani o'chirish (asosiy tilga qaytarish) qiymati
+CLEAR_TRANSLATION = "-"
+
+
+def _split_locale(args: "list[str] | None") -> "tuple[str | None, list[str]]":
+    """Birinchi argument til kodi bo'lsa — (tarjima tili, qolgan argumentlar). Asosiy til — None."""
+    args = list(args or [])
+    locale = parse_locale(args[0]) if args else None
+    if locale is None:
+        return None, args
+    return (None if locale == DEFAULT_LOCALE else locale), args[1:]
+
+
+def _locale_label(locale: "str | None") -> str:
+    return f" [{locale}]" if locale else ""
+
+
+async def _load_page(page_name: str, locale: "str | None") -> dict:
+    """Sahifa kontenti — tarjima tilida bo'lsa, shu til tarjimasi qo'llangan holda."""
+    content = await storage.get_page_content(page_name) or {}
+    if locale:
+        translations = await storage.get_translations("pages", [locale], [page_name])
+        content = apply_translations(content, translations.get(page_name), locale, decode=True)
+    return content
+
+
+async def _save_page(page_name: str, locale: "str | None", content: dict) -> bool:
+    """Tarjima tilida faqat asosiy kontentdan farq qiladigan maydonlar saqlanadi."""
+    if locale is None:
+        return await storage.update_page_content(page_name, content)
+    base = await storage.get_page_content(page_name) or {}
+    current = (await storage.get_translations("pages", [locale], [page_name])).get(page_name, {}).get(locale, {})
+    fields = {
+        key: None if value == CLEAR_TRANSLATION else json.dumps(value, ensure_ascii=False)
+        for key, value in content.items()
+        if value != base.get(key)
+    }
+    # Asosiy matnga teng bo'lib qolgan maydonlar tarjimadan o'chiriladi
+    fields.update({key: None for key in current if key not in fields})
+    if not fields:
+        return True
+    return await storage.set_translations("pages", page_name, locale, fields)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -58,43 +113,63 @@ EDITABLE_SETTINGS = {
 }
 
 
-@admin_only
-async def view_settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Hozirgi sayt sozlamalarini ko'rsatish."""
-    settings = await get_site_settings()
+async def _count_settings() -> int:
+    return len(EDITABLE_SETTINGS)
+
+
+async def _get_settings_page(limit: int, offset: int) -> "list[dict]":
+    keys = list(EDITABLE_SETTINGS)[offset:offset + limit]
+    settings = await storage.get_site_settings_for_keys(keys)
+    return [{"key": key, "value": settings.get(key, "—")} for key in keys]
+
+
+def _render_setting(item: dict) -> str:
+    return f"{EDITABLE_SETTINGS[item['key']]}:\n<code>{html.escape(str(item['value']), quote=False)}</code>\n"
 
-    text = "⚙️ <b>Sayt sozlamalari:</b>\n\n"
-    for key, label in EDITABLE_SETTINGS.items():
-        value = settings.get(key, "—")
-        text += f"{label}:\n<code>{value}</code>\n\n"
 
-    text += (
+SETTINGS_VIEW = PaginatedView(
+    name="settings",
+    count=_count_settings,
+    fetch=_get_settings_page,
+    render_item=_render_setting,
+    header="⚙️ <b>Sayt sozlamalari</b>",
+    footer=(
         "✏️ O'zgartirish uchun:\n"
         "<code>/edit_settings phone +998 99 888 77 66</code>"
-    )
-    await update.message.reply_text(text, parse_mode="HTML")
+    ),
+    page_size=5,
+)
+
+
+@admin_only
+async def view_settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Hozirgi sayt sozlamalarini ko'rsatish."""
+    await SETTINGS_VIEW.send(update)
 
 
 @admin_only
 async def edit_settings_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Sayt sozlamasini o'zgartirish.
-    Ishlatish: /edit_settings <key> <value>
+    Ishlatish: /edit_settings [til] <key> <value>
     """
-    if not context.args or len(context.args) < 2:
+    locale, args = _split_locale(context.args)
+    if len(args) < 2:
         keys_text = "\n".join(f"  • <code>{k}</code> — {v}" for k, v in EDITABLE_SETTINGS.items())
         await update.message.reply_text(
             f"📋 <b>Ishlatish:</b>\n"
             f"<code>/edit_settings &lt;key&gt; &lt;value&gt;</code>\n\n"
             f"<b>Mavjud kalitlar:</b>\n{keys_text}\n\n"
             f"<b>Misol:</b>\n"
-            f"<code>/edit_settings phone +998 99 888 77 66</code>",
+            f"<code>/edit_settings phone +998 99 888 77 66</code>\n"
+            f"<code>/edit_settings ru address Ташкент, Чиланзар</code>\n\n"
+            f"<b>Tarjima qilinadigan:</b> {', '.join(sorted(TRANSLATABLE_SETTINGS))}",
             parse_mode="HTML",
         )
         return
 
-    key = context.args[0].lower()
-    value = " ".join(context.args[1:])
+    key = args[0].lower()
+    value = " ".join(args[1:])
 
     if key not in EDITABLE_SETTINGS:
         await update.message.reply_text(
@@ -104,11 +179,23 @@ async def edit_settings_command(update: Update, context: ContextTypes.DEFAULT_TY
         )
         return
 
-    success = await update_site_setting(key, value)
+    if locale:
+        if key not in TRANSLATABLE_SETTINGS:
+            await update.message.reply_text(
+                f"❌ <code>{key}</code> tarjima qilinmaydi.\n"
+                f"Tarjima qilinadigan: {', '.join(sorted(TRANSLATABLE_SETTINGS))}",
+                parse_mode="HTML",
+            )
+            return
+        success = await storage.set_translations(
+            "settings", key, locale, {"value": None if value == CLEAR_TRANSLATION else value},
+        )
+    else:
+        success = await storage.update_site_setting(key, value)
     if success:
-        await notify_admin_action(update, f"Sozlama o'zgartirildi: {key} = {value}")
+        await notify_admin_action(update, f"Sozlama o'zgartirildi{_locale_label(locale)}: {key} = {value}")
         await update.message.reply_text(
-            f"✅ <b>{EDITABLE_SETTINGS[key]}</b> yangilandi!\n\n"
+            f"✅ <b>{EDITABLE_SETTINGS[key]}</b>{_locale_label(locale)} yangilandi!\n\n"
             f"Yangi qiymat: <code>{value}</code>\n\n"
             f"💡 Saytda 5 daqiqa ichida yangilanadi.",
             parse_mode="HTML",
@@ -119,20 +206,27 @@ async def edit_settings_command(update: Update, context: ContextTypes.DEFAULT_TY
 
 @admin_only
 async def edit_promo_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Promo banner matnini tez o'zgartirish. /edit_promo <matn>"""
-    if not context.args:
+    """Promo banner matnini tez o'zgartirish. /edit_promo [til] <matn>"""
+    locale, args = _split_locale(context.args)
+    if not args:
         await update.message.reply_text(
-            "📋 Ishlatish: /edit_promo <yangi matn>\n"
-            "Misol: /edit_promo 50% chegirma barcha o'yinchoqlarga! 🎉"
+            "📋 Ishlatish: /edit_promo [til] <yangi matn>\n"
+            "Misol: /edit_promo 50% chegirma barcha o'yinchoqlarga! 🎉\n"
+            "Tarjima: /edit_promo ru Скидка 50% на все игрушки! 🎉"
         )
         return
 
-    value = " ".join(context.args)
-    success = await update_site_setting("promo_banner_text", value)
+    value = " ".join(args)
+    if locale:
+        success = await storage.set_translations(
+            "settings", "promo_banner_text", locale, {"value": None if value == CLEAR_TRANSLATION else value},
+        )
+    else:
+        success = await storage.update_site_setting("promo_banner_text", value)
     if success:
-        await notify_admin_action(update, f"Promo banner o'zgartirildi: {value}")
+        await notify_admin_action(update, f"Promo banner o'zgartirildi{_locale_label(locale)}: {value}")
         await update.message.reply_text(
-            f"✅ Promo banner yangilandi!\n\n"
+            f"✅ Promo banner{_locale_label(locale)} yangilandi!\n\n"
             f"🎯 <code>{value}</code>",
             parse_mode="HTML",
         )
@@ -153,8 +247,9 @@ ABOUT_FIELDS = {
 
 @admin_only
 async def view_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Hozirgi 'Biz haqimizda' kontentini ko'rsatish."""
-    content = await get_page_content("about")
+    """Hozirgi 'Biz haqimizda' kontentini ko'rsatish. /view_about [til]"""
+    locale, _ = _split_locale(context.args)
+    content = await _load_page("about", locale)
 
     if not content:
         await update.message.reply_text(
@@ -164,7 +259,7 @@ async def view_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return
 
-    text = "📄 <b>'Biz haqimizda' sahifasi:</b>\n\n"
+    text = f"📄 <b>'Biz haqimizda' sahifasi{_locale_label(locale)}:</b>\n\n"
     for key, label in ABOUT_FIELDS.items():
         value = content.get(key, "—")
         text += f"<b>{label}:</b>\n{value}\n\n"
@@ -191,7 +286,7 @@ async def view_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     'Biz haqimizda' sahifasini tahrirlash.
-    Ishlatish: /edit_about <field> <value>
+    Ishlatish: /edit_about [til] <field> <value>
     
     Mavjud fieldlar: hero_title, hero_description, mission_text
     
@@ -202,7 +297,8 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     Jamoa a'zosi qo'shish:
     /edit_about team <ism> | <lavozim> | <rasm_url>
     """
-    if not context.args:
+    locale, args = _split_locale(context.args)
+    if not args:
         fields_text = "\n".join(f"  • <code>{k}</code> — {v}" for k, v in ABOUT_FIELDS.items())
         await update.message.reply_text(
             f"📋 <b>'Biz haqimizda' sahifasini tahrirlash:</b>\n\n"
@@ -215,21 +311,23 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
             f"<b>Jamoa a'zosi qo'shish:</b>\n"
             f"<code>/edit_about team Ism Familiya | Lavozim | rasm_url</code>\n\n"
             f"<b>Jamoani tozalash:</b>\n"
-            f"<code>/edit_about clear_team</code>",
+            f"<code>/edit_about clear_team</code>\n\n"
+            f"<b>Tarjima</b> (til birinchi argument):\n"
+            f"<code>/edit_about ru hero_title О нас</code>",
             parse_mode="HTML",
         )
         return
 
-    field = context.args[0].lower()
-    value = " ".join(context.args[1:])
+    field = args[0].lower()
+    value = " ".join(args[1:])
 
     # Hozirgi kontentni olish yoki yangi yaratish
-    content = await get_page_content("about") or {}
+    content = await _load_page("about", locale) or {}
 
     # Oddiy matn fieldlari
     if field in ABOUT_FIELDS:
         content[field] = value
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await notify_admin_action(update, f"About {field} o'zgartirildi")
         await update.message.reply_text(
             f"✅ <b>{ABOUT_FIELDS[field]}</b> yangilandi!\n\n{value}",
@@ -239,15 +337,15 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     # Statistika qo'shish
     if field == "stat":
-        if len(context.args) < 3:
+        if len(args) < 3:
             await update.message.reply_text("Ishlatish: /edit_about stat <raqam> <label>")
             return
-        stat_number = context.args[1]
-        stat_label = " ".join(context.args[2:])
+        stat_number = args[1]
+        stat_label = " ".join(args[2:])
         stats = content.get("stats", [])
         stats.append({"number": stat_number, "label": stat_label})
         content["stats"] = stats
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await update.message.reply_text(
             f"✅ Statistika qo'shildi: <b>{stat_number}</b> — {stat_label}",
             parse_mode="HTML",
@@ -256,7 +354,7 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     if field == "clear_stats":
         content["stats"] = []
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await update.message.reply_text("✅ Barcha statistika tozalandi.")
         return
 
@@ -274,7 +372,7 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         team = content.get("team_members", [])
         team.append({"name": name, "role": role, "image": image})
         content["team_members"] = team
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await update.message.reply_text(
             f"✅ Jamoa a'zosi qo'shildi: <b>{name}</b> — {role}",
             parse_mode="HTML",
@@ -283,7 +381,7 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     if field == "clear_team":
         content["team_members"] = []
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await update.message.reply_text("✅ Jamoa ro'yxati tozalandi.")
         return
 
@@ -302,7 +400,7 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         values = content.get("values", [])
         values.append({"title": title, "description": desc, "icon_name": icon})
         content["values"] = values
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await update.message.reply_text(
             f"✅ Qadriyat qo'shildi: <b>{title}</b>",
             parse_mode="HTML",
@@ -311,7 +409,7 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     if field == "clear_values":
         content["values"] = []
-        await update_page_content("about", content)
+        await _save_page("about", locale, content)
         await update.message.reply_text("✅ Qadriyatlar tozalandi.")
         return
 
@@ -324,8 +422,9 @@ async def edit_about_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 @admin_only
 async def view_delivery_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Hozirgi yetkazish sahifasi kontentini ko'rsatish."""
-    content = await get_page_content("delivery")
+    """Hozirgi yetkazish sahifasi kontentini ko'rsatish. /view_delivery [til]"""
+    locale, _ = _split_locale(context.args)
+    content = await _load_page("delivery", locale)
 
     if not content:
         await update.message.reply_text(
@@ -334,7 +433,7 @@ async def view_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
         )
         return
 
-    text = "🚚 <b>Yetkazish sahifasi:</b>\n\n"
+    text = f"🚚 <b>Yetkazish sahifasi{_locale_label(locale)}:</b>\n\n"
     text += f"<b>Sarlavha:</b> {content.get('hero_title', '—')}\n"
     text += f"<b>Tavsif:</b> {content.get('hero_description', '—')}\n\n"
 
@@ -365,8 +464,10 @@ async def edit_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
     /edit_delivery hero_description <tavsif>
     /edit_delivery faq <savol> | <javob>
     /edit_delivery clear_faq
+    Tarjima: /edit_delivery ru hero_title <sarlavha>
     """
-    if not context.args:
+    locale, args = _split_locale(context.args)
+    if not args:
         await update.message.reply_text(
             "📋 <b>Yetkazish sahifasini tahrirlash:</b>\n\n"
             "<code>/edit_delivery hero_title &lt;sarlavha&gt;</code>\n"
@@ -376,18 +477,20 @@ async def edit_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
             "<code>/edit_delivery step &lt;raqam&gt; &lt;sarlavha&gt; | &lt;tavsif&gt;</code>\n"
             "<code>/edit_delivery clear_steps</code>\n"
             "<code>/edit_delivery payment &lt;nomi&gt; | &lt;tavsif&gt; | &lt;icon&gt;</code>\n"
-            "<code>/edit_delivery clear_payments</code>",
+            "<code>/edit_delivery clear_payments</code>\n\n"
+            "Tarjima (til birinchi argument):\n"
+            "<code>/edit_delivery ru hero_title Доставка</code>",
             parse_mode="HTML",
         )
         return
 
-    field = context.args[0].lower()
-    value = " ".join(context.args[1:])
-    content = await get_page_content("delivery") or {}
+    field = args[0].lower()
+    value = " ".join(args[1:])
+    content = await _load_page("delivery", locale) or {}
 
     if field in ("hero_title", "hero_description"):
         content[field] = value
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text(f"✅ {field} yangilandi!\n\n{value}")
         return
 
@@ -399,13 +502,13 @@ async def edit_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
         faq = content.get("faq", [])
         faq.append({"question": parts[0].strip(), "answer": parts[1].strip()})
         content["faq"] = faq
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text(f"✅ FAQ qo'shildi: {parts[0].strip()}")
         return
 
     if field == "clear_faq":
         content["faq"] = []
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text("✅ FAQ tozalandi.")
         return
 
@@ -421,13 +524,13 @@ async def edit_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
         steps = content.get("steps", [])
         steps.append({"step": step_num, "title": step_title, "description": step_desc})
         content["steps"] = steps
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text(f"✅ Qadam qo'shildi: {step_num}. {step_title}")
         return
 
     if field == "clear_steps":
         content["steps"] = []
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text("✅ Qadamlar tozalandi.")
         return
 
@@ -445,13 +548,13 @@ async def edit_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
         payments = content.get("payment_methods", [])
         payments.append({"title": title, "description": desc, "icon_name": icon})
         content["payment_methods"] = payments
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text(f"✅ To'lov usuli qo'shildi: {title}")
         return
 
     if field == "clear_payments":
         content["payment_methods"] = []
-        await update_page_content("delivery", content)
+        await _save_page("delivery", locale, content)
         await update.message.reply_text("✅ To'lov usullari tozalandi.")
         return
 
@@ -462,32 +565,36 @@ async def edit_delivery_command(update: Update, context: ContextTypes.DEFAULT_TY
 # BLOG POSTS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@admin_only
-async def list_blogs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Barcha blog postlarni ko'rsatish."""
-    posts = await get_blog_posts(published_only=False)
-
-    if not posts:
-        await update.message.reply_text(
-            "📝 Hozircha blog postlar yo'q.\n"
-            "Yangi post qo'shish: /add_blog"
-        )
-        return
+def _render_blog_summary(post: dict) -> str:
+    status = "✅" if post.get("is_published", 1) else "📝"
+    return (
+        f"{status} <b>#{post['id']}</b> — {html.escape(post['title'], quote=False)}\n"
+        f"   ✍️ {html.escape(post.get('author') or '—', quote=False)} | {post.get('created_at', '')}\n"
+    )
 
-    text = "📝 <b>Blog postlar:</b>\n\n"
-    for post in posts:
-        status = "✅" if post.get("is_published", 1) else "📝"
-        text += (
-            f"{status} <b>#{post['id']}</b> — {post['title']}\n"
-            f"   ✍️ {post.get('author', '—')} | {post.get('created_at', '')}\n\n"
-        )
 
-    text += (
-        "✏️ Tahrirlash: /edit_blog <id> <field> <value>\n"
-        "🗑 O'chirish: /delete_blog <id>\n"
+BLOGS_VIEW = PaginatedView(
+    name="blogs",
+    count=storage.count_blog_posts,
+    fetch=storage.get_blog_post_summaries,
+    render_item=_render_blog_summary,
+    header="📝 <b>Blog postlar</b>",
+    footer=(
+        "✏️ Tahrirlash: /edit_blog &lt;id&gt; &lt;field&gt; &lt;value&gt;\n"
+        "🗑 O'chirish: /delete_blog &lt;id&gt;\n"
         "➕ Yangi: /add_blog"
-    )
-    await update.message.reply_text(text, parse_mode="HTML")
+    ),
+    empty_text=(
+        "📝 Hozircha blog postlar yo'q.\n"
+        "Yangi post qo'shish: /add_blog"
+    ),
+)
+
+
+@admin_only
+async def list_blogs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Barcha blog postlarni sahifalab ko'rsatish (faqat qisqa ma'lumot)."""
+    await BLOGS_VIEW.send(update)
 
 
 # ─── Add Blog Post (conversation) ────────────────────────────────────────────
@@ -543,7 +650,7 @@ async def blog_author_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     author = update.message.text
     data = context.user_data
 
-    post_id = await add_blog_post(
+    post_id = await storage.add_blog_post(
         title=data.get("blog_title", ""),
         excerpt=data.get("blog_excerpt", ""),
         content=data.get("blog_content", ""),
@@ -564,21 +671,28 @@ async def blog_author_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     else:
         await update.message.reply_text("❌ Blog post saqlashda xatolik yuz berdi.")
 
-    # Clean up user data
+    _clear_blog_draft(context)
+    return ConversationHandler.END
+
+
+def _clear_blog_draft(context: ContextTypes.DEFAULT_TYPE):
+    """Qoralamani user_data dan tozalash (persistence da ham o'chadi)."""
     for key in ["blog_title", "blog_excerpt", "blog_content", "blog_image"]:
         context.user_data.pop(key, None)
 
-    return ConversationHandler.END
-
 
 async def blog_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Blog yaratishni bekor qilish."""
+    _clear_blog_draft(context)
     await update.message.reply_text("❌ Blog post yaratish bekor qilindi.")
     return ConversationHandler.END
 
 
 def get_blog_conversation_handler() -> ConversationHandler:
-    """Blog post qo'shish uchun ConversationHandler."""
+    """
+    Blog post qo'shish uchun ConversationHandler.
+    persistent=True — qoralama holati bot restart bo'lganda ham saqlanadi.
+    """
     return ConversationHandler(
         entry_points=[CommandHandler("add_blog", add_blog_start)],
         states={
@@ -595,6 +709,8 @@ def get_blog_conversation_handler() -> ConversationHandler:
             BLOG_AUTHOR: [MessageHandler(filters.TEXT & ~filters.COMMAND, blog_author_handler)],
         },
         fallbacks=[CommandHandler("cancel", blog_cancel)],
+        name="add_blog",
+        persistent=True,
     )
 
 
@@ -602,41 +718,54 @@ def get_blog_conversation_handler() -> ConversationHandler:
 async def edit_blog_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Blog postni tahrirlash.
-    Ishlatish: /edit_blog <id> <field> <value>
-    Fieldlar: title, excerpt, content, image, author
+    Ishlatish: /edit_blog [til] <id> <field> <value>
+    Fieldlar: title, excerpt, content, image, author (tarjimada: title, excerpt, content)
     Yashirish/ko'rsatish: /edit_blog <id> publish / /edit_blog <id> unpublish
     """
-    if not context.args or len(context.args) < 2:
+    locale, args = _split_locale(context.args)
+    if len(args) < 2:
         await update.message.reply_text(
             "📋 Ishlatish: /edit_blog <id> <field> <value>\n\n"
             "Fieldlar: title, excerpt, content, image, author\n"
             "Yashirish: /edit_blog <id> unpublish\n"
-            "Ko'rsatish: /edit_blog <id> publish"
+            "Ko'rsatish: /edit_blog <id> publish\n\n"
+            "Tarjima: /edit_blog ru <id> title|excerpt|content <matn>"
         )
         return
 
     try:
-        post_id = int(context.args[0])
+        post_id = int(args[0])
     except ValueError:
         await update.message.reply_text("❌ ID raqam bo'lishi kerak.")
         return
 
-    field = context.args[1].lower()
+    field = args[1].lower()
 
-    if field == "publish":
-        success = await update_blog_post(post_id, is_published=1)
+    if locale:
+        if field not in TRANSLATABLE_FIELDS["blog_posts"] or len(args) < 3:
+            await update.message.reply_text("❌ Tarjima: /edit_blog ru <id> title|excerpt|content <matn>")
+            return
+        if not await storage.get_blog_posts_by_ids([post_id], published_only=False):
+            await update.message.reply_text(f"❌ Blog post #{post_id} topilmadi.")
+            return
+        value = " ".join(args[2:])
+        success = await storage.set_translations(
+            "blog_posts", post_id, locale, {field: None if value == CLEAR_TRANSLATION else value},
+        )
+    elif field == "publish":
+        success = await storage.update_blog_post(post_id, is_published=1)
     elif field == "unpublish":
-        success = await update_blog_post(post_id, is_published=0)
+        success = await storage.update_blog_post(post_id, is_published=0)
     else:
-        if len(context.args) < 3:
+        if len(args) < 3:
             await update.message.reply_text("❌ Qiymat kiritilmagan.")
             return
-        value = " ".join(context.args[2:])
-        success = await update_blog_post(post_id, **{field: value})
+        value = " ".join(args[2:])
+        success = await storage.update_blog_post(post_id, **{field: value})
 
     if success:
-        await notify_admin_action(update, f"Blog #{post_id} tahrirlandi: {field}")
-        await update.message.reply_text(f"✅ Blog post #{post_id} yangilandi!")
+        await notify_admin_action(update, f"Blog #{post_id} tahrirlandi{_locale_label(locale)}: {field}")
+        await update.message.reply_text(f"✅ Blog post #{post_id}{_locale_label(locale)} yangilandi!")
     else:
         await update.message.reply_text("❌ Tahrirlashda xatolik. Fieldni tekshiring.")
 
@@ -654,7 +783,7 @@ async def delete_blog_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         await update.message.reply_text("❌ ID raqam bo'lishi kerak.")
         return
 
-    success = await delete_blog_post(post_id)
+    success = await storage.delete_blog_post(post_id)
     if success:
         await notify_admin_action(update, f"Blog #{post_id} o'chirildi")
         await update.message.reply_text(f"✅ Blog post #{post_id} o'chirildi!")
@@ -662,6 +791,209 @@ async def delete_blog_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         await update.message.reply_text("❌ O'chirishda xatolik yuz berdi.")
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# PRODUCT TRANSLATIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@admin_only
+async def translate_product_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Mahsulot sarlavhasi yoki tavsifi tarjimasi.
+    Ishlatish: /translate_product <til> <id> title|description <matn>
+    """
+    locale, args = _split_locale(context.args)
+    fields = TRANSLATABLE_FIELDS["products"]
+    if not locale or len(args) < 3 or args[1].lower() not in fields or not args[0].isdigit():
+        await update.message.reply_text(
+            "📋 Ishlatish: /translate_product <til> <id> title|description <matn>\n"
+            "Misol: /translate_product ru 12 title Радиоуправляемая машина\n"
+            f"Tarjimani o'chirish: /translate_product ru 12 title {CLEAR_TRANSLATION}"
+        )
+        return
+
+    product_id = int(args[0])
+    field = args[1].lower()
+    value = " ".join(args[2:])
+    if not await storage.get_products_by_ids([product_id]):
+        await update.message.reply_text(f"❌ Faol mahsulot #{product_id} topilmadi.")
+        return
+
+    success = await storage.set_translations(
+        "products", product_id, locale, {field: None if value == CLEAR_TRANSLATION else value},
+    )
+    if success:
+        await notify_admin_action(update, f"Mahsulot #{product_id} tarjimasi{_locale_label(locale)}: {field}")
+        await update.message.reply_text(f"✅ Mahsulot #{product_id}{_locale_label(locale)} {field} yangilandi!")
+    else:
+        await update.message.reply_text("❌ Tarjimani saqlashda xatolik yuz berdi.")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCHEDULING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SCHEDULE_TIME_HINT = "Sana va vaqt formati: <code>2026-11-01 00:00</code> (Toshkent vaqti)"
+
+
+@admin_only
+async def schedule_blog_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Blog postni vaqtga belgilash.
+    /schedule_blog <id> publish <sana> <vaqt>
+    /schedule_blog <id> unpublish <sana> <vaqt>
+    /schedule_blog <id> clear
+    """
+    args = context.args or []
+    if len(args) < 2 or args[1].lower() not in ("publish", "unpublish", "clear"):
+        await update.message.reply_text(
+            "📋 <b>Blog postni vaqtga belgilash:</b>\n\n"
+            "<code>/schedule_blog &lt;id&gt; publish 2026-11-01 00:00</code>\n"
+            "<code>/schedule_blog &lt;id&gt; unpublish 2026-11-30 23:59</code>\n"
+            "<code>/schedule_blog &lt;id&gt; clear</code>\n\n"
+            f"{SCHEDULE_TIME_HINT}",
+            parse_mode="HTML",
+        )
+        return
+
+    try:
+        post_id = int(args[0])
+    except ValueError:
+        await update.message.reply_text("❌ ID raqam bo'lishi kerak.")
+        return
+
+    action = args[1].lower()
+    if action == "clear":
+        success = await storage.schedule_blog_post(post_id, clear=True)
+        run_at = None
+    else:
+        if len(args) < 4:
+            await update.message.reply_text(f"❌ Sana va vaqt kiritilmagan.\n{SCHEDULE_TIME_HINT}", parse_mode="HTML")
+            return
+        try:
+            run_at = parse_local_time(args[2], args[3])
+        except ValueError:
+            await update.message.reply_text(f"❌ Noto'g'ri sana/vaqt.\n{SCHEDULE_TIME_HINT}", parse_mode="HTML")
+            return
+        if action == "publish":
+            success = await storage.schedule_blog_post(post_id, publish_at=run_at)
+        else:
+            success = await storage.schedule_blog_post(post_id, unpublish_at=run_at)
+
+    if not success:
+        await update.message.reply_text(f"❌ Blog post #{post_id} topilmadi.")
+        return
+
+    content_scheduler.wakeup()
+    await notify_admin_action(update, f"Blog #{post_id} rejalashtirildi: {action} {run_at or ''}")
+    if run_at:
+        await update.message.reply_text(
+            f"⏰ Blog post #{post_id}: <b>{action}</b> — {format_local_time(run_at)}",
+            parse_mode="HTML",
+        )
+    else:
+        await update.message.reply_text(f"✅ Blog post #{post_id} jadvali tozalandi.")
+
+
+async def _schedule_setting(update: Update, key: str, value: str, date_str: str, time_str: str):
+    try:
+        run_at = parse_local_time(date_str, time_str)
+    except ValueError:
+        await update.message.reply_text(f"❌ Noto'g'ri sana/vaqt.\n{SCHEDULE_TIME_HINT}", parse_mode="HTML")
+        return
+
+    job_id = await storage.schedule_site_setting(key, value, run_at, update.effective_user.id)
+    content_scheduler.wakeup()
+    await notify_admin_action(update, f"Sozlama rejalashtirildi #{job_id}: {key} @ {run_at}")
+    await update.message.reply_text(
+        f"⏰ <b>{EDITABLE_SETTINGS[key]}</b> — {format_local_time(run_at)} da o'zgaradi.\n\n"
+        f"Yangi qiymat: <code>{html.escape(value, quote=False)}</code>\n"
+        f"Bekor qilish: /cancel_scheduled {job_id}",
+        parse_mode="HTML",
+    )
+
+
+@admin_only
+async def schedule_promo_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Promo bannerni vaqtga belgilash. /schedule_promo <sana> <vaqt> <matn>"""
+    args = context.args or []
+    if len(args) < 3:
+        await update.message.reply_text(
+            "📋 Ishlatish: <code>/schedule_promo 2026-11-01 00:00 50% chegirma! 🎉</code>\n\n"
+            f"{SCHEDULE_TIME_HINT}",
+            parse_mode="HTML",
+        )
+        return
+
+    await _schedule_setting(update, "promo_banner_text", " ".join(args[2:]), args[0], args[1])
+
+
+@admin_only
+async def schedule_setting_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Sozlamani vaqtga belgilash. /schedule_setting <sana> <vaqt> <key> <value>"""
+    args = context.args or []
+    if len(args) < 4:
+        await update.message.reply_text(
+            "📋 Ishlatish: <code>/schedule_setting 2026-11-01 00:00 free_delivery_threshold 200000</code>\n\n"
+            f"{SCHEDULE_TIME_HINT}",
+            parse_mode="HTML",
+        )
+        return
+
+    key = args[2].lower()
+    if key not in EDITABLE_SETTINGS:
+        await update.message.reply_text(
+            f"❌ Noto'g'ri kalit: <code>{key}</code>\n"
+            f"Mavjud kalitlar: {', '.join(EDITABLE_SETTINGS.keys())}",
+            parse_mode="HTML",
+        )
+        return
+
+    await _schedule_setting(update, key, " ".join(args[3:]), args[0], args[1])
+
+
+@admin_only
+async def scheduled_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Kutilayotgan barcha rejalashtirilgan joblar."""
+    jobs = await storage.get_scheduled_jobs()
+    if not jobs:
+        await update.message.reply_text("⏰ Rejalashtirilgan joblar yo'q.")
+        return
+
+    labels = {"publish": "📢 Nashr", "unpublish": "🙈 Yashirish", "setting": "⚙️ Sozlama"}
+    text = "⏰ <b>Rejalashtirilgan joblar:</b>\n\n"
+    for job in jobs:
+        ref = f"blog #{job['id']}" if job["kind"] != "setting" else f"job #{job['id']}"
+        text += (
+            f"{labels[job['kind']]} ({ref}) — {format_local_time(job['run_at'])}\n"
+            f"   {html.escape(job['label'], quote=False)}\n"
+        )
+    await update.message.reply_text(fit_message(text), parse_mode="HTML")
+
+
+@admin_only
+async def cancel_scheduled_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Rejalashtirilgan sozlama o'zgarishini bekor qilish. /cancel_scheduled <id>"""
+    if not context.args:
+        await update.message.reply_text(
+            "Ishlatish: /cancel_scheduled <job_id>\n"
+            "Blog post uchun: /schedule_blog <id> clear"
+        )
+        return
+
+    try:
+        job_id = int(context.args[0])
+    except ValueError:
+        await update.message.reply_text("❌ ID raqam bo'lishi kerak.")
+        return
+
+    if await storage.cancel_scheduled_setting(job_id):
+        content_scheduler.wakeup()
+        await notify_admin_action(update, f"Rejalashtirilgan job #{job_id} bekor qilindi")
+        await update.message.reply_text(f"✅ Job #{job_id} bekor qilindi.")
+    else:
+        await update.message.reply_text(f"❌ Job #{job_id} topilmadi yoki allaqachon bajarilgan.")
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # HELP COMMAND
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -691,6 +1023,33 @@ async def admin_help_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         "/add_blog — yangi post qo'shish\n"
         "/edit_blog — postni tahrirlash\n"
         "/delete_blog — postni o'chirish\n\n"
+        "<b>⏰ Rejalashtirish:</b>\n"
+        "/schedule_blog — postni vaqtga belgilash\n"
+        "/schedule_promo — promo bannerni vaqtga belgilash\n"
+        "/schedule_setting — sozlamani vaqtga belgilash\n"
+        "/scheduled — kutilayotgan joblar\n"
+        "/cancel_scheduled — jobni bekor qilish\n\n"
+        "<b>📣 Broadcast:</b>\n"
+        "/broadcast — hammaga xabar yuborish\n"
+        "/broadcast_status — navbat holati\n"
+        "/subscribers — obunachilar statistikasi\n"
+        "/export_subscribers — obunachilarni CSV ga eksport\n\n"
+        "<b>📦 Ombor:</b>\n"
+        "/stock — qoldiq hisoboti\n"
+        "/stock &lt;id&gt; &lt;son|+son|-son|off&gt; — qoldiqni o'zgartirish (har qator — bitta mahsulot)\n\n"
+        "<b>📊 Statistika:</b>\n"
+        "/stats [kunlar] — eng ko'p ko'rilgan mahsulot va postlar\n\n"
+        "<b>🌐 Tarjimalar:</b>\n"
+        "/edit_settings, /edit_promo, /edit_about, /edit_delivery, /edit_blog, "
+        "/view_about, /view_delivery — birinchi argument til: <code>/edit_about ru hero_title ...</code>\n"
+        "/translate_product &lt;til&gt; &lt;id&gt; title|description &lt;matn&gt; — mahsulot tarjimasi\n"
+        "<code>-</code> qiymati tarjimani o'chiradi\n\n"
+        "<b>🛠 Tizim:</b>\n"
+        "/publish_snapshot — kontentni statik fayllarga nashr qilish\n"
+        "/backups — zaxira nusxalar\n"
+        "/backup_now — hoziroq zaxira nusxa olish\n"
+        "/restore_backup — bazani tiklash (bosh admin)\n"
+        "/db_stats — baza holati va texnik xizmat\n\n"
         "<b>ℹ️ Boshqa:</b>\n"
         "/admin_help — shu yordam\n",
         parse_mode="HTML",
@@ -0,0 +1,105 @@
+"""
+Inventory Handlers — ombor qoldig'ini bot orqali boshqarish.
+
+Komandalar (faqat admin):
+    /stock — qoldiq hisoboti (eng kami birinchi)
+    /stock <qatorlar> — ko'plab mahsulot qoldig'ini bitta tranzaksiyada o'zgartirish
+
+Qator formati (har biri yangi qatorda yoki ; bilan):
+    12 50     — qoldiqni 50 ga o'rnatish
+    15 +10    — 10 ta qo'shish
+    18 -2     — 2 ta ayirish (0 dan pastga tushmaydi)
+    20 off    — qoldiqni kuzatmaslik (cheklanmagan)
+"""
+
+import html
+import re
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from bot.admin_guard import admin_only, notify_admin_action
+from bot.pagination import fit_message
+from config import LOW_STOCK_THRESHOLD
+from inventory import available_quantity, inventory
+from storage import storage
+
+STOCK_LINE = re.compile(r"^#?(\d+)\s+([+-]?\d+|off|-)$", re.IGNORECASE)
+STOCK_REPORT_LIMIT = 40
+
+
+def parse_stock_changes(text: str) -> "tuple[list[tuple[int, int | None, bool]], list[str]]":
+    """Komanda matnidan (product_id, qiymat, nisbiy) ro'yxati va tushunilmagan qatorlar."""
+    changes = []
+    invalid = []
+    for raw in re.split(r"[\n;]", text):
+        line = raw.strip()
+        if not line:
+            continue
+        match = STOCK_LINE.match(line)
+        if not match:
+            invalid.append(line)
+            continue
+        product_id, value = int(match.group(1)), match.group(2).lower()
+        if value in ("off", "-"):
+            changes.append((product_id, None, False))
+        elif value[0] in "+-":
+            changes.append((product_id, int(value), True))
+        else:
+            changes.append((product_id, int(value), False))
+    return changes, invalid
+
+
+async def _stock_report(update: Update):
+    rows = await storage.get_stock_report(STOCK_REPORT_LIMIT)
+    if not rows:
+        await update.message.reply_text(
+            "📦 Hech bir mahsulot qoldig'i kuzatilmayapti.\n\n"
+            "Qoldiq kiritish: <code>/stock 12 50</code>",
+            parse_mode="HTML",
+        )
+        return
+
+    lines = [f"📦 <b>Ombor qoldig'i</b> (eng kami birinchi, {len(rows)} ta):\n"]
+    for row in rows:
+        available = available_quantity(row["stock"], row["reserved"])
+        mark = "🔴" if available == 0 else "🟡" if available <= LOW_STOCK_THRESHOLD else "🟢"
+        reserved = f", bron: {row['reserved']}" if row["reserved"] else ""
+        lines.append(
+            f"{mark} <code>{row['id']}</code> {html.escape(row['title'])} — "
+            f"<b>{available}</b> ta (omborda: {row['stock']}{reserved})"
+        )
+    lines.append("\nO'zgartirish: <code>/stock 12 50</code>, <code>/stock 15 +10</code> (har qator alohida)")
+    await update.message.reply_text(fit_message("\n".join(lines)), parse_mode="HTML")
+
+
+@admin_only
+async def stock_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Qoldiq hisoboti yoki ko'plab o'zgartirish."""
+    # Komandadan keyingi hamma narsa (qatorlar bilan birga)
+    parts = update.message.text.split(None, 1)
+    text = parts[1] if len(parts) > 1 else ""
+    if not text.strip():
+        await _stock_report(update)
+        return
+
+    changes, invalid = parse_stock_changes(text)
+    if not changes:
+        await update.message.reply_text(
+            "❌ Format: <code>/stock &lt;id&gt; &lt;son | +son | -son | off&gt;</code>\n"
+            "Bir nechta mahsulot — har biri yangi qatorda.",
+            parse_mode="HTML",
+        )
+        return
+
+    updated = set(await storage.apply_stock_changes(changes))
+    inventory.invalidate()
+    missing = sorted({product_id for product_id, _, _ in changes} - updated)
+
+    lines = [f"✅ Qoldiq yangilandi: {len(updated)} ta mahsulot"]
+    if missing:
+        lines.append(f"⚠️ Topilmadi: {', '.join(map(str, missing))}")
+    if invalid:
+        lines.append("⚠️ Tushunilmagan qatorlar:\n" + "\n".join(f"<code>{html.escape(line)}</code>" for line in invalid))
+    await notify_admin_action(update, f"Qoldiq o'zgartirildi: {len(updated)} ta mahsulot")
+    await update.message.reply_text(fit_message("\n".join(lines)), parse_mode="HTML")
@@ -0,0 +1,84 @@
+"""
+Subscriber Handlers — bot obunachilari statistikasi va eksporti.
+
+Komandalar (faqat admin):
+    /subscribers — obunachilar soni va faollik
+    /export_subscribers [segment] — segmentni CSV fayl sifatida yuklab olish
+"""
+
+import csv
+import html
+import io
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from bot.admin_guard import admin_only, notify_admin_action
+from bot.subscribers import subscriber_tracker
+from database import SUBSCRIBER_SEGMENTS, get_subscriber_stats, get_subscribers_segment
+
+
+SEGMENT_LABELS = {
+    "all": "Barcha faol obunachilar",
+    "active_7d": "Oxirgi 7 kunda faol",
+    "active_30d": "Oxirgi 30 kunda faol",
+    "inactive_30d": "30 kundan beri faol emas",
+    "new_7d": "Oxirgi 7 kunda qo'shilgan",
+    "blocked": "Botni bloklaganlar",
+}
+
+
+@admin_only
+async def subscribers_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Obunachilar statistikasini ko'rsatish."""
+    # Xotiradagi o'zgarishlarni avval yozamiz — raqamlar aniq bo'lsin
+    await subscriber_tracker.flush()
+    stats = await get_subscriber_stats()
+
+    await update.message.reply_text(
+        f"👥 <b>Bot obunachilari:</b>\n\n"
+        f"Jami: <b>{stats['total']}</b>\n"
+        f"🚫 Bloklagan: {stats['blocked']}\n\n"
+        f"🟢 24 soatda faol: {stats['active_1d']}\n"
+        f"📅 7 kunda faol: {stats['active_7d']}\n"
+        f"🗓 30 kunda faol: {stats['active_30d']}\n"
+        f"🆕 7 kunda yangi: {stats['new_7d']}\n\n"
+        f"Eksport: /export_subscribers [segment]",
+        parse_mode="HTML",
+    )
+
+
+@admin_only
+async def export_subscribers_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Obunachilar segmentini CSV sifatida yuborish.
+    Ishlatish: /export_subscribers [segment]
+    Segmentlar: all, active_7d, active_30d, inactive_30d, new_7d, blocked
+    """
+    segment = context.args[0].lower() if context.args else "all"
+    if segment not in SUBSCRIBER_SEGMENTS:
+        segments_text = "\n".join(f"  • <code>{k}</code> — {v}" for k, v in SEGMENT_LABELS.items())
+        await update.message.reply_text(
+            f"❌ Noma'lum segment: <code>{html.escape(segment)}</code>\n\n"
+            f"<b>Mavjud segmentlar:</b>\n{segments_text}",
+            parse_mode="HTML",
+        )
+        return
+
+    await subscriber_tracker.flush()
+    rows = await get_subscribers_segment(segment)
+    if not rows:
+        await update.message.reply_text(f"ℹ️ '{SEGMENT_LABELS[segment]}' segmentida hech kim yo'q.")
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+    writer.writeheader()
+    writer.writerows(rows)
+
+    await notify_admin_action(update, f"Obunachilar eksport qilindi: {segment} ({len(rows)} ta)")
+    await update.message.reply_document(
+        document=buffer.getvalue().encode("utf-8"),
+        filename=f"subscribers_{segment}.csv",
+        caption=f"👥 {SEGMENT_LABELS[segment]}: {len(rows)} ta",
+    )
@@ -0,0 +1,175 @@
+"""
+System Handlers — saytni yetkazish va server holati bilan bog'liq admin komandalar.
+
+Komandalar (faqat admin):
+    /publish_snapshot — kontentni statik JSON fayllarga hoziroq nashr qilish
+    /backups — mavjud zaxira nusxalar
+    /backup_now — hoziroq zaxira nusxa olish
+    /db_stats — baza hajmi, WAL va texnik xizmat holati
+
+Komandalar (faqat super admin):
+    /restore_backup <fayl> — bazani zaxira nusxadan tiklash
+"""
+
+from datetime import datetime
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from backup import backup_scheduler, list_backups
+from bot.admin_guard import admin_only, super_admin_only, notify_admin_action
+from maintenance import get_storage_metrics, storage_maintenance
+from snapshot_publisher import snapshot_publisher
+
+
+@admin_only
+async def publish_snapshot_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Statik snapshot ni hoziroq yaratish (CDN ga yuklashga tayyor fayllar)."""
+    await update.message.reply_text("⏳ Snapshot tayyorlanmoqda...")
+    try:
+        result = await snapshot_publisher.publish()
+    except Exception as e:
+        await update.message.reply_text(f"❌ Snapshot yaratishda xato: {e}")
+        return
+
+    manifest = result["manifest"]
+    lines = [
+        f"📦 <b>Snapshot v{manifest['version']} tayyor</b>\n",
+        f"📁 Papka: <code>{snapshot_publisher.output_dir}</code>",
+        f"🆕 Yangi fayllar: {result['written']}",
+        f"🗑 O'chirilgan eski fayllar: {result['removed']}",
+        f"⏱ {result['duration_ms']} ms\n",
+    ]
+    for name, entry in manifest["files"].items():
+        lines.append(f"• {name}: <code>{entry['hash']}</code> ({entry['size'] / 1024:.1f} KB)")
+
+    await notify_admin_action(update, f"Snapshot nashr qilindi: v{manifest['version']}")
+    await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BACKUP
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@admin_only
+async def backups_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Mavjud zaxira nusxalar ro'yxati."""
+    backups = list_backups()
+    if not backups:
+        await update.message.reply_text(
+            "📭 Hali zaxira nusxa yo'q.\n\nHoziroq olish: /backup_now"
+        )
+        return
+
+    lines = [f"💾 <b>Zaxira nusxalar ({len(backups)} ta):</b>\n"]
+    for entry in backups:
+        created = datetime.fromtimestamp(entry["mtime"]).strftime("%Y-%m-%d %H:%M")
+        lines.append(f"• <code>{entry['name']}</code>\n  {created}, {entry['size'] / 1024:.0f} KB")
+    lines.append("\nTiklash: /restore_backup &lt;fayl&gt;")
+    await update.message.reply_text("\n".join(lines), parse_mode="HTML")
+
+
+@admin_only
+async def backup_now_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Hoziroq zaxira nusxa olish (sayt va bot ishlashda davom etadi)."""
+    await update.message.reply_text("⏳ Zaxira nusxa olinmoqda...")
+    try:
+        result = await backup_scheduler.backup_now()
+    except Exception as e:
+        await update.message.reply_text(f"❌ Backup xatosi: {e}")
+        return
+
+    await notify_admin_action(update, f"Backup olindi: {result['name']}")
+    await update.message.reply_text(
+        f"✅ <b>Zaxira nusxa tayyor!</b>\n\n"
+        f"📄 <code>{result['name']}</code>\n"
+        f"📦 {result['raw_size'] / 1024:.0f} KB → {result['size'] / 1024:.0f} KB (gzip)\n"
+        f"⏱ {result['duration_ms']} ms, {result['steps']} qadam\n"
+        f"🗑 O'chirilgan eski nusxalar: {result['removed']}",
+        parse_mode="HTML",
+    )
+
+
+@super_admin_only
+async def restore_backup_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Bazani zaxira nusxadan tiklash.
+    Ishlatish: /restore_backup toymix-20261019-120000.db.gz
+    Tiklashdan oldin joriy baza "pre-restore" nusxa sifatida saqlanadi.
+    """
+    if not context.args:
+        await update.message.reply_text(
+            "📋 Ishlatish: /restore_backup <fayl>\n\nFayllar ro'yxati: /backups"
+        )
+        return
+
+    name = context.args[0]
+    await update.message.reply_text("⏳ Baza tiklanmoqda...")
+    try:
+        result = await backup_scheduler.restore(name)
+    except FileNotFoundError:
+        await update.message.reply_text(f"❌ Backup topilmadi: {name}\n\nRo'yxat: /backups")
+        return
+    except Exception as e:
+        await update.message.reply_text(f"❌ Tiklashda xato: {e}")
+        return
+
+    await notify_admin_action(update, f"Baza tiklandi: {name}")
+    await update.message.reply_text(
+        f"✅ <b>Baza tiklandi!</b>\n\n"
+        f"📄 <code>{result['name']}</code>\n"
+        f"🛟 Oldingi holat saqlandi: <code>{result['safety_backup']}</code>\n"
+        f"⏱ {result['duration_ms']} ms",
+        parse_mode="HTML",
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAZA HOLATI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _format_ago(timestamp) -> str:
+    if not timestamp:
+        return "hali bo'lmagan"
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@admin_only
+async def db_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Baza holati. Ishlatish:
+    /db_stats — ko'rsatkichlar
+    /db_stats run — texnik xizmatni hoziroq bajarish (checkpoint, optimize, vacuum)
+    """
+    if context.args and context.args[0] == "run":
+        await storage_maintenance.run_once()
+        await notify_admin_action(update, "Baza texnik xizmati qo'lda bajarildi")
+
+    m = await get_storage_metrics()
+    checkpoint = m["last_checkpoint"]
+    vacuum = m["last_vacuum"]
+
+    text = (
+        f"🗄 <b>Baza holati:</b>\n\n"
+        f"📦 Hajm: {m['db_size'] / 1024 / 1024:.2f} MB "
+        f"({m['page_count']} sahifa × {m['page_size']} B)\n"
+        f"📝 WAL: {m['wal_size'] / 1024 / 1024:.2f} MB\n"
+        f"🧩 Bo'sh sahifalar: {m['freelist_count']} ({m['free_ratio']:.1%})\n"
+        f"♻️ auto_vacuum: {m['auto_vacuum']}\n\n"
+        f"<b>Texnik xizmat:</b>\n"
+    )
+    if checkpoint:
+        text += (
+            f"• Checkpoint ({checkpoint['mode']}): {_format_ago(checkpoint['at'])}, "
+            f"{checkpoint['checkpointed']}/{checkpoint['log_frames']} frame, "
+            f"{checkpoint['duration_ms']} ms{' (band)' if checkpoint['busy'] else ''}\n"
+        )
+    else:
+        text += "• Checkpoint: hali bo'lmagan\n"
+    text += f"• Optimize: {_format_ago(m['last_optimize_at'])}\n"
+    if vacuum:
+        text += f"• Vacuum: {_format_ago(vacuum['at'])}, {vacuum['freed_pages']} sahifa qaytarildi\n"
+    text += f"• Sikllar: {m['maintenance_runs']}, xatolar: {m['maintenance_errors']}\n\n"
+    text += "Hoziroq bajarish: /db_stats run"
+
+    await update.message.reply_text(text, parse_mode="HTML")
@@ -0,0 +1,128 @@
+"""
+Paginated View — uzun ro'yxatlarni bot da sahifalab ko'rsatish.
+
+Telegram xabari 4096 belgidan oshmasligi kerak. Har bir sahifa uchun bazadan
+faqat shu sahifadagi qisqa qatorlar olinadi, ostida ◀️ / ▶️ tugmalari chiqadi.
+
+Ishlatish:
+    BLOGS_VIEW = PaginatedView(
+        name="blogs",
+        count=count_blog_posts,
+        fetch=get_blog_post_summaries,    # async (limit, offset) -> list
+        render_item=lambda post: f"#{post['id']} — {post['title']}",
+        header="📝 <b>Blog postlar</b>",
+    )
+
+    await BLOGS_VIEW.send(update)      # komanda handlerida
+
+main.py da bitta umumiy callback handler ro'yxatdan o'tkaziladi:
+    CallbackQueryHandler(paginated_view_callback, pattern=PAGINATION_PATTERN)
+"""
+
+from typing import Awaitable, Callable, Optional
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+from bot.admin_guard import admin_only
+
+MESSAGE_LIMIT = 4096
+PAGINATION_PATTERN = r"^page:"
+
+_views: "dict[str, PaginatedView]" = {}
+
+
+def fit_message(text: str, limit: int = MESSAGE_LIMIT) -> str:
+    """Matnni Telegram limitiga sig'dirish (oxirgi to'liq qatorgacha qisqartiriladi)."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit - 2)
+    if cut <= 0:
+        cut = limit - 2
+    return text[:cut] + "\n…"
+
+
+class PaginatedView:
+    """Bitta sahifalangan ro'yxat: hisoblash, sahifani olish va chizish."""
+
+    def __init__(
+        self,
+        name: str,
+        count: Callable[[], Awaitable[int]],
+        fetch: Callable[[int, int], Awaitable[list]],
+        render_item: Callable[[dict], str],
+        header: str,
+        footer: str = "",
+        empty_text: str = "Hozircha hech narsa yo'q.",
+        page_size: int = 10,
+    ):
+        self.name = name
+        self.count = count
+        self.fetch = fetch
+        self.render_item = render_item
+        self.header = header
+        self.footer = footer
+        self.empty_text = empty_text
+        self.page_size = page_size
+        _views[name] = self
+
+    async def render(self, page: int) -> "tuple[str, Optional[InlineKeyboardMarkup]]":
+        """Sahifa matni va tugmalarini tayyorlash. Faqat bitta sahifa o'qiladi."""
+        total = await self.count()
+        if total == 0:
+            return self.empty_text, None
+
+        pages = (total + self.page_size - 1) // self.page_size
+        page = max(0, min(page, pages - 1))
+        items = await self.fetch(self.page_size, page * self.page_size)
+
+        text = f"{self.header} ({total} ta)\n\n"
+        start = page * self.page_size
+        for i, item in enumerate(items, start + 1):
+            text += f"{i}. {self.render_item(item)}\n"
+        if self.footer:
+            text += f"\n{self.footer}"
+
+        return fit_message(text), self._keyboard(page, pages)
+
+    def _keyboard(self, page: int, pages: int) -> Optional[InlineKeyboardMarkup]:
+        if pages <= 1:
+            return None
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton("◀️", callback_data=f"page:{self.name}:{page - 1}"))
+        buttons.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data="page:noop"))
+        if page < pages - 1:
+            buttons.append(InlineKeyboardButton("▶️", callback_data=f"page:{self.name}:{page + 1}"))
+        return InlineKeyboardMarkup([buttons])
+
+    async def send(self, update: Update, page: int = 0):
+        """Birinchi sahifani yangi xabar sifatida yuborish."""
+        text, keyboard = await self.render(page)
+        await update.message.reply_text(text, parse_mode="HTML", reply_markup=keyboard)
+
+
+@admin_only
+async def paginated_view_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """◀️ / ▶️ tugmalari bosilganda xabarni shu joyda yangilash."""
+    query = update.callback_query
+    parts = query.data.split(":")
+    view = _views.get(parts[1]) if len(parts) == 3 else None
+    if view is None:
+        await query.answer()
+        return
+
+    try:
+        page = int(parts[2])
+    except ValueError:
+        await query.answer()
+        return
+
+    text, keyboard = await view.render(page)
+    await query.answer()
+    try:
+        await query.edit_message_text(text, parse_mode="HTML", reply_markup=keyboard)
+    except BadRequest:
+        # "Message is not modified" — ikki marta bosilganda
+        pass
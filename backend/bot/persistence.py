@@ -0,0 +1,161 @@
+"""
+SQLite Persistence — bot holatini (user_data, chat_data, conversation) saqlash.
+
+Railway da har deploy da jarayon qayta ishga tushadi va xotiradagi
+context.user_data yo'qoladi — /add_blog qoralamalari ham. Bu klass holatni
+bot_persistence jadvaliga JSON ko'rinishida yozadi va ishga tushganda tiklaydi.
+
+Yozish har update da emas: Application har update_interval soniyada o'zgargan
+ma'lumotlarni beradi, biz ularni xotirada yig'ib bitta tranzaksiyada yozamiz.
+
+Ishlatish (main.py):
+    builder = ApplicationBuilder().token(BOT_TOKEN).persistence(SQLitePersistence())
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from config import PERSISTENCE_UPDATE_INTERVAL
+from database import get_persistence_rows, save_persistence_rows
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = "user_data"
+CHAT_DATA = "chat_data"
+CONVERSATION_PREFIX = "conversation:"
+
+
+class SQLitePersistence(BasePersistence):
+    """BasePersistence ning SQLite (aiosqlite) realizatsiyasi, batch yozish bilan."""
+
+    def __init__(self, update_interval: float = PERSISTENCE_UPDATE_INTERVAL):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=True, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self._upserts: "dict[tuple[str, str], str]" = {}
+        self._deletes: "set[tuple[str, str]]" = set()
+        self._write_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    # ─── Yuklash (ishga tushganda bir marta) ────────────────────────────────
+
+    @staticmethod
+    async def _load_dict(kind: str) -> "dict[int, dict]":
+        data = {}
+        for key, raw in await get_persistence_rows(kind):
+            data[int(key)] = json.loads(raw)
+        return data
+
+    async def get_user_data(self) -> "dict[int, dict]":
+        return await self._load_dict(USER_DATA)
+
+    async def get_chat_data(self) -> "dict[int, dict]":
+        return await self._load_dict(CHAT_DATA)
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        conversations = {}
+        for key, raw in await get_persistence_rows(CONVERSATION_PREFIX + name):
+            conversations[tuple(json.loads(key))] = json.loads(raw)
+        return conversations
+
+    # ─── O'zgarishlarni yig'ish ──────────────────────────────────────────────
+
+    def _stage(self, kind: str, key: str, data):
+        """O'zgarishni buferga qo'yish va yozishni rejalashtirish."""
+        try:
+            raw = json.dumps(data, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning("Bot holatini saqlab bo'lmadi (%s:%s): %s", kind, key, e, extra={"event": "bot.persistence_error"})
+            return
+        self._deletes.discard((kind, key))
+        self._upserts[(kind, key)] = raw
+        self._schedule_write()
+
+    def _stage_delete(self, kind: str, key: str):
+        self._upserts.pop((kind, key), None)
+        self._deletes.add((kind, key))
+        self._schedule_write()
+
+    def _schedule_write(self):
+        # Application bitta update_persistence da barcha update_* ni birga chaqiradi —
+        # ularni bitta tranzaksiyaga yig'ish uchun yozishni biroz keyinga qoldiramiz
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.create_task(self._write_soon())
+
+    async def _write_soon(self):
+        await asyncio.sleep(0.1)
+        await self._write()
+
+    async def _write(self):
+        async with self._write_lock:
+            if not self._upserts and not self._deletes:
+                return
+            upserts, self._upserts = self._upserts, {}
+            deletes, self._deletes = self._deletes, set()
+            try:
+                await save_persistence_rows(
+                    [(kind, key, raw) for (kind, key), raw in upserts.items()],
+                    list(deletes),
+                )
+            except Exception as e:
+                # Keyingi safar qayta urinamiz (yangiroq o'zgarishlar ustun)
+                for item, raw in upserts.items():
+                    if item not in self._deletes:
+                        self._upserts.setdefault(item, raw)
+                for item in deletes:
+                    if item not in self._upserts:
+                        self._deletes.add(item)
+                logger.exception("Bot holatini yozishda xato: %s", e, extra={"event": "bot.persistence_error"})
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._stage(USER_DATA, str(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        self._stage(CHAT_DATA, str(chat_id), data)
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]) -> None:
+        kind = CONVERSATION_PREFIX + name
+        key_json = json.dumps(list(key))
+        if new_state is None:
+            # Conversation tugadi
+            self._stage_delete(kind, key_json)
+        else:
+            self._stage(kind, key_json, new_state)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._stage_delete(USER_DATA, str(user_id))
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._stage_delete(CHAT_DATA, str(chat_id))
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Bot to'xtaganda qolgan barcha o'zgarishlarni yozish."""
+        if self._write_task is not None and not self._write_task.done():
+            await self._write_task
+        await self._write()
@@ -0,0 +1,248 @@
+"""
+Outbound Send Queue — Telegram Bot API limitlariga rioya qilib xabar yuborish.
+
+Telegram limitlari:
+  - umumiy: ~30 xabar/soniya
+  - bitta chat: ~1 xabar/soniya
+  - oshib ketsa 429 (RetryAfter) qaytaradi
+
+Xabarlar avval SQLite dagi outbound_messages jadvaliga yoziladi, fon worker
+ularni token bucket lar orqali yuboradi. Restart bo'lsa ham navbat saqlanadi.
+
+Ishlatish:
+    from bot.send_queue import enqueue_broadcast
+
+    count = await enqueue_broadcast([123, 456], "Yangi aksiya! 🎉", parse_mode="HTML")
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Optional
+
+from telegram.error import BadRequest, Forbidden, RetryAfter
+
+from config import SEND_GLOBAL_RATE, SEND_PER_CHAT_RATE, SEND_MAX_ATTEMPTS
+from database import (
+    enqueue_outbound_messages,
+    get_due_outbound_messages,
+    finish_outbound_messages,
+    mark_subscribers_blocked,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Oddiy token bucket: soniyasiga `rate` ta token, ko'pi bilan `capacity` ta."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Bitta token bo'shashigacha qancha kutish kerak (soniya). 0 — hozir mumkin."""
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill(time.monotonic())
+        self.tokens -= 1
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class SendQueue:
+    """
+    Fon worker: navbatdan xabarlarni olib, rate limitlarga rioya qilgan holda yuboradi.
+
+    - global bucket: barcha chatlar uchun umumiy tezlik
+    - per-chat bucket: har bir chat uchun alohida (bir chatga xabarlar tartibi saqlanadi)
+    - RetryAfter: butun navbat ko'rsatilgan vaqtgacha to'xtaydi, xabar qayta rejalashtiriladi
+    - Forbidden / BadRequest: qayta urinilmaydi (foydalanuvchi botni bloklagan va h.k.)
+    """
+
+    def __init__(self, bot, batch_size: int = 100, idle_interval: float = 5.0):
+        self.bot = bot
+        self.batch_size = batch_size
+        self.idle_interval = idle_interval
+        self._global = TokenBucket(SEND_GLOBAL_RATE, capacity=SEND_GLOBAL_RATE)
+        self._chats: "dict[int, TokenBucket]" = {}
+        self._paused_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wakeup(self):
+        """Yangi xabar qo'shilganda workerni darhol uyg'otish."""
+        self._wakeup.set()
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(SEND_PER_CHAT_RATE)
+        return bucket
+
+    def _prune_chat_buckets(self):
+        # To'liq bucketlar hech qanday ma'lumot saqlamaydi — xotirani tejash uchun o'chiramiz
+        if len(self._chats) > 10000:
+            self._chats = {cid: b for cid, b in self._chats.items() if not b.is_full()}
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                sent = await self._process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Send queue xatosi: %s", e, extra={"event": "send_queue.error"})
+                sent = None
+
+            if sent is None:
+                await self._sleep(self.idle_interval)
+            elif sent == 0:
+                # Navbatda faqat hali "sovimagan" chatlar qoldi — qisqa kutamiz
+                await self._sleep(1.0 / SEND_PER_CHAT_RATE)
+
+    async def _process_batch(self) -> Optional[int]:
+        """Bitta batchni yuborish. Navbat bo'sh bo'lsa None, aks holda yuborilganlar soni."""
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        messages = await get_due_outbound_messages(self.batch_size)
+        if not messages:
+            return None
+
+        sent_ids: "list[int]" = []
+        failed: "list[tuple[int, str]]" = []
+        retries: "list[tuple[int, float, str]]" = []
+        blocked: "list[int]" = []
+        deferred_chats: "set[int]" = set()
+        tasks = []
+
+        for msg in messages:
+            chat_id = msg["chat_id"]
+            # Bitta chatga xabarlar tartibini buzmaslik uchun keyingilarini ham qoldiramiz
+            if chat_id in deferred_chats:
+                continue
+            bucket = self._chat_bucket(chat_id)
+            if bucket.delay() > 0:
+                deferred_chats.add(chat_id)
+                continue
+
+            wait = self._global.delay()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self._paused_until > time.monotonic():
+                break
+
+            self._global.consume()
+            bucket.consume()
+            deferred_chats.add(chat_id)
+            tasks.append(asyncio.create_task(self._send(msg, sent_ids, failed, retries, blocked)))
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        await finish_outbound_messages(sent_ids, failed, retries)
+        await mark_subscribers_blocked(blocked)
+        self._prune_chat_buckets()
+        return len(sent_ids)
+
+    async def _send(self, msg: dict, sent_ids: list, failed: list, retries: list, blocked: list):
+        try:
+            await self.bot.send_message(
+                chat_id=msg["chat_id"],
+                text=msg["text"],
+                parse_mode=msg["parse_mode"],
+            )
+            sent_ids.append(msg["id"])
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            seconds = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            retries.append((msg["id"], time.time() + seconds, str(e)))
+        except Forbidden as e:
+            # Foydalanuvchi botni bloklagan — keyingi broadcastlarga qo'shilmaydi
+            failed.append((msg["id"], str(e)))
+            blocked.append(msg["chat_id"])
+        except BadRequest as e:
+            failed.append((msg["id"], str(e)))
+        except Exception as e:
+            # NetworkError / TimedOut va boshqalar — backoff bilan qayta urinish
+            self._retry_or_fail(msg, str(e), failed, retries)
+
+    @staticmethod
+    def _retry_or_fail(msg: dict, error: str, failed: list, retries: list):
+        attempts = msg["attempts"] + 1
+        if attempts >= SEND_MAX_ATTEMPTS:
+            failed.append((msg["id"], error))
+        else:
+            backoff = min(300, 5 * 2 ** attempts)
+            retries.append((msg["id"], time.time() + backoff, error))
+
+
+# ─── Module-level queue (bot ishga tushganda yaratiladi) ─────────────────────
+
+send_queue: Optional[SendQueue] = None
+
+
+def start_send_queue(bot) -> SendQueue:
+    """Bot ishga tushgandan keyin worker ni boshlash."""
+    global send_queue
+    send_queue = SendQueue(bot)
+    send_queue.start()
+    return send_queue
+
+
+async def stop_send_queue():
+    """Worker ni to'xtatish. Yuborilmagan xabarlar bazada qoladi."""
+    global send_queue
+    if send_queue is not None:
+        await send_queue.stop()
+        send_queue = None
+
+
+async def enqueue_broadcast(chat_ids: "list[int]", text: str, parse_mode: "str | None" = None) -> int:
+    """
+    Xabarni ko'p chatlarga navbat orqali yuborish.
+    Worker ishlamayotgan bo'lsa ham xabarlar saqlanadi va keyin yuboriladi.
+    """
+    broadcast_id = uuid.uuid4().hex[:12]
+    count = await enqueue_outbound_messages(chat_ids, text, parse_mode, broadcast_id)
+    if send_queue is not None:
+        send_queue.wakeup()
+    return count
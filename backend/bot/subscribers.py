@@ -0,0 +1,113 @@
+"""
+Subscriber Tracker — bot foydalanuvchilarini arzon usulda ro'yxatga olish.
+
+Har bir murojaat (/start, komanda, xabar) alohida commit qilinmaydi:
+o'zgarishlar xotirada foydalanuvchi bo'yicha birlashtiriladi va har
+SUBSCRIBER_FLUSH_INTERVAL soniyada (yoki bufer to'lganda) bitta
+tranzaksiyada bazaga yoziladi.
+
+Ishlatish (main.py):
+    bot_app.add_handler(TypeHandler(Update, track_subscriber), group=-1)
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from config import SUBSCRIBER_FLUSH_INTERVAL, SUBSCRIBER_FLUSH_BATCH
+from database import upsert_subscribers
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_now() -> str:
+    # CURRENT_TIMESTAMP bilan bir xil format (UTC)
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class SubscriberTracker:
+    """Foydalanuvchi murojaatlarini xotirada yig'ib, batch qilib yozadi."""
+
+    def __init__(self, flush_interval: float = SUBSCRIBER_FLUSH_INTERVAL, max_pending: int = SUBSCRIBER_FLUSH_BATCH):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: "dict[int, list]" = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def touch(self, user):
+        """Foydalanuvchi murojaatini qayd etish (DB ga darhol yozilmaydi)."""
+        now = _utc_now()
+        entry = self._pending.get(user.id)
+        if entry is None:
+            self._pending[user.id] = [
+                user.id, user.username, user.full_name, user.language_code, now, now, 1,
+            ]
+        else:
+            entry[1] = user.username
+            entry[2] = user.full_name
+            entry[3] = user.language_code or entry[3]
+            entry[5] = now
+            entry[6] += 1
+
+        if len(self._pending) >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Yig'ilgan o'zgarishlarni bitta tranzaksiyada yozish."""
+        async with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                await upsert_subscribers([tuple(entry) for entry in pending.values()])
+            except Exception as e:
+                # Yozib bo'lmadi — keyingi flush da qayta urinamiz
+                for user_id, entry in pending.items():
+                    if user_id in self._pending:
+                        newer = self._pending[user_id]
+                        newer[4] = entry[4]
+                        newer[6] += entry[6]
+                    else:
+                        self._pending[user_id] = entry
+                logger.exception("Obunachilarni saqlashda xato: %s", e, extra={"event": "bot.subscribers_error"})
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Fon flush ni to'xtatish va qolgan ma'lumotlarni yozish."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+subscriber_tracker = SubscriberTracker()
+
+
+async def track_subscriber(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Har bir update dan foydalanuvchini qayd etish (group=-1, boshqa handlerlarga ta'sir qilmaydi)."""
+    user = update.effective_user
+    if user is None or user.is_bot:
+        return
+    subscriber_tracker.touch(user)
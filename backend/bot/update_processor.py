@@ -0,0 +1,156 @@
+"""
+Chat-Ordered Update Processor — updatelarni parallel, lekin har bir chat ichida tartib bilan bajarish.
+
+Default holatda Application updatelarni birma-bir bajaradi: bitta sekin admin
+komandasi boshqa foydalanuvchilarning /start iga ham to'siq bo'ladi.
+
+Bu yerda:
+  - turli chatlarning updatelari BOT_WORKERS tagacha parallel bajariladi
+  - bitta chat ichida updatelar kelgan tartibda, ketma-ket bajariladi
+    (ConversationHandler, masalan /add_blog, to'g'ri ishlashi uchun)
+  - ishlov kutayotgan updatelar BOT_MAX_PENDING_UPDATES ga yetsa, BackpressureQueue
+    yangi updatelarni olmay turadi — navbat to'lib, polling ham to'xtab turadi
+  - har bir update o'z taskida: update_id contextvar ga yoziladi (handlerlar
+    ichidagi log yozuvlarida korrelyatsiya uchun), oxirida bot.update hodisasi
+
+Ishlatish (main.py):
+    processor = ChatOrderedUpdateProcessor()
+    builder.concurrent_updates(processor).update_queue(BackpressureQueue(processor))
+"""
+
+import asyncio
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from config import BOT_WORKERS, BOT_MAX_PENDING_UPDATES, LOG_SLOW_MS
+from logs import update_id_var
+
+logger = logging.getLogger(__name__)
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Har bir chat uchun FIFO, chatlar orasida parallel."""
+
+    def __init__(self, workers: int = BOT_WORKERS, max_pending: int = BOT_MAX_PENDING_UPDATES):
+        # Bazaviy semaphore umumiy chegarani (kutayotgan + bajarilayotgan) beradi
+        super().__init__(max_concurrent_updates=max_pending)
+        self.workers = workers
+        self.max_pending = max_pending
+        self._worker_slots = asyncio.Semaphore(workers)
+        self._chat_locks: "dict[int, list]" = {}
+        self._pending = 0
+        self._running = 0
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+
+    @property
+    def pending(self) -> int:
+        """Qabul qilingan, lekin hali tugamagan updatelar soni."""
+        return self._pending
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "active_chats": len(self._chat_locks),
+        }
+
+    def reserve(self):
+        """Navbatdan update olinganda chaqiriladi (BackpressureQueue)."""
+        self._pending += 1
+        if self._pending >= self.max_pending:
+            self._capacity.clear()
+
+    def _release(self):
+        self._pending -= 1
+        if self._pending < self.max_pending:
+            self._capacity.set()
+
+    async def wait_for_capacity(self):
+        await self._capacity.wait()
+
+    @staticmethod
+    def _chat_key(update: object):
+        if isinstance(update, Update):
+            if update.effective_chat is not None:
+                return update.effective_chat.id
+            if update.effective_user is not None:
+                return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        counted = isinstance(update, Update)
+        key = self._chat_key(update)
+        token = update_id_var.set(update.update_id if counted else None)
+        started = time.perf_counter()
+        try:
+            if key is None:
+                await self._run(coroutine)
+                return
+
+            entry = self._chat_locks.get(key)
+            if entry is None:
+                entry = self._chat_locks[key] = [asyncio.Lock(), 0]
+            entry[1] += 1
+            try:
+                async with entry[0]:
+                    await self._run(coroutine)
+            finally:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._chat_locks[key]
+        finally:
+            if counted:
+                self._release()
+                duration_ms = round((time.perf_counter() - started) * 1000, 2)
+                logger.info(
+                    "Update %s bajarildi (%.1f ms)", update.update_id, duration_ms,
+                    extra={
+                        "event": "bot.update",
+                        "chat_id": key,
+                        "duration_ms": duration_ms,
+                        "sample": 1 if duration_ms >= LOG_SLOW_MS else None,
+                    },
+                )
+            update_id_var.reset(token)
+
+    async def _run(self, coroutine):
+        async with self._worker_slots:
+            self._running += 1
+            try:
+                await coroutine
+            finally:
+                self._running -= 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
+class BackpressureQueue(asyncio.Queue):
+    """
+    Application.update_queue o'rniga. Processor to'lib qolganda get() kutadi,
+    navbat maxsize ga yetgach Updater ham yangi updatelarni olmay turadi.
+    """
+
+    def __init__(self, processor: ChatOrderedUpdateProcessor):
+        super().__init__(maxsize=processor.max_pending)
+        self._processor = processor
+
+    async def get(self):
+        await self._processor.wait_for_capacity()
+        item = await super().get()
+        if isinstance(item, Update):
+            self._processor.reserve()
+        return item
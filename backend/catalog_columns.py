@@ -0,0 +1,290 @@
+"""
+Catalog Columns — faol katalogning ustunli (NumPy) nusxasi.
+
+/api/products da filtr (kategoriya + narx oralig'i + matn) va tartib
+birga kelganda har so'rov uchun dict ro'yxatini aylanib chiqish o'rniga
+katalog bir marta ustunlarga yig'iladi:
+
+  - ids, prices (so'm, int64), category_ids (-1 — kategoriyasiz),
+    created (epoch soniya) — har biri bitta massiv
+  - sarlavha va kategoriya nomlari — interned satrlar jadvali (kichik
+    harf, UTF-8): qatorlar faqat jadvaldagi raqamni saqlaydi, matn
+    qidiruvi har bir noyob satr uchun bir marta bajariladi
+  - yangi / arzon / qimmat tartiblari oldindan hisoblangan
+    (permutatsiya) — so'rovda faqat mask va shu permutatsiya bo'yicha
+    tanlash; ommabop tartib rankings.py ballari bilan faqat filtrdan
+    o'tganlar ichida saralanadi
+
+Katalog o'zgarganda (content_cache yangi ro'yxat qaytaradi) ustunlar
+yangidan quriladi va bitta havola almashtiriladi (copy-on-write) —
+o'qiyotgan so'rovlar eski nusxada tugaydi. Qurish alohida threadda.
+
+Har bir til uchun alohida nusxa (columns_for) — matn qidiruvi o'sha
+tildagi sarlavhalar bo'yicha.
+
+CATALOG_COLUMNS=false bo'lsa xuddi shu so'rovlarni query_list() oddiy
+Python ro'yxatida bajaradi (natija bir xil).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import numpy as np
+
+from orders import parse_price
+
+logger = logging.getLogger(__name__)
+
+# sort → kamayish tartibidami; teng kalitlarda id doim kamayish tartibida
+DESCENDING = {"new": True, "popular": True, "price_asc": False, "price_desc": True}
+# Har bir nusxada oxirgi qidiruv so'zlari natijasi (keyingi sahifalar uchun)
+TEXT_CACHE_SIZE = 64
+
+
+def created_timestamp(value: "str | None") -> float:
+    """created_at satri ("2024-05-01 10:00:00") → epoch soniya (UTC). Noma'lum — 0."""
+    if not value:
+        return 0.0
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except ValueError:
+        return 0.0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def sort_key(sort: str, product: dict, score: float = 0.0) -> list:
+    """Cursor ga yoziladigan [asosiy kalit, id] (rankings.py bilan bir xil "new" kaliti)."""
+    if sort == "new":
+        return [product["created_at"] or "", product["id"]]
+    if sort == "popular":
+        return [score, product["id"]]
+    return [parse_price(product["price"]), product["id"]]
+
+
+@dataclass(frozen=True)
+class _Columns:
+    products: list             # manba ro'yxat (qator → mahsulot dict)
+    ids: np.ndarray            # (n,) int64
+    prices: np.ndarray         # (n,) int64
+    category_ids: np.ndarray   # (n,) int64, -1 — kategoriyasiz
+    created: np.ndarray        # (n,) float64
+    title_codes: np.ndarray    # (n,) int32 → strings
+    category_codes: np.ndarray
+    strings: np.ndarray        # (m,) bytes — interned, kichik harf
+    orders: "dict[str, np.ndarray]"
+    text_hits: "dict[str, np.ndarray]" = field(default_factory=dict)
+
+    def text_mask(self, text: str) -> np.ndarray:
+        needle = text.lower()
+        hit = self.text_hits.get(needle)
+        if hit is None:
+            hit = np.char.find(self.strings, needle.encode()) >= 0
+            if len(self.text_hits) >= TEXT_CACHE_SIZE:
+                self.text_hits.pop(next(iter(self.text_hits)))
+            self.text_hits[needle] = hit
+        return hit[self.title_codes] | hit[self.category_codes]
+
+    def nbytes(self) -> int:
+        arrays = (
+            self.ids, self.prices, self.category_ids, self.created,
+            self.title_codes, self.category_codes, self.strings, *self.orders.values(),
+        )
+        return sum(array.nbytes for array in arrays)
+
+
+def _build(products: list) -> _Columns:
+    table: "dict[str, int]" = {}
+
+    def intern(text: "str | None") -> int:
+        return table.setdefault((text or "").lower(), len(table))
+
+    n = len(products)
+    ids = np.fromiter((p["id"] for p in products), dtype=np.int64, count=n)
+    prices = np.fromiter((parse_price(p["price"]) for p in products), dtype=np.int64, count=n)
+    category_ids = np.fromiter(
+        (-1 if p["category_id"] is None else p["category_id"] for p in products), dtype=np.int64, count=n,
+    )
+    created = np.fromiter((created_timestamp(p["created_at"]) for p in products), dtype=np.float64, count=n)
+    title_codes = np.fromiter((intern(p["title"]) for p in products), dtype=np.int32, count=n)
+    category_codes = np.fromiter((intern(p.get("category_name")) for p in products), dtype=np.int32, count=n)
+    strings = np.array([text.encode() for text in table], dtype=np.bytes_) if table else np.array([], dtype="S1")
+
+    return _Columns(
+        products=products,
+        ids=ids,
+        prices=prices,
+        category_ids=category_ids,
+        created=created,
+        title_codes=title_codes,
+        category_codes=category_codes,
+        strings=strings,
+        orders={
+            # Katalog allaqachon created_at DESC, id DESC tartibida
+            "new": np.arange(n, dtype=np.int64),
+            "price_asc": np.lexsort((-ids, prices)),
+            "price_desc": np.lexsort((-ids, -prices)),
+        },
+    )
+
+
+class CatalogColumns:
+    def __init__(self, locale: str = ""):
+        self.locale = locale
+        self._columns: Optional[_Columns] = None
+        self._lock = asyncio.Lock()
+        self.builds = 0
+        self.build_ms = 0.0
+
+    async def ensure(self, products: list):
+        """Katalog ro'yxati o'zgargan bo'lsa (yangi obyekt) — ustunlarni qayta qurish."""
+        if self._columns is not None and self._columns.products is products:
+            return
+        async with self._lock:
+            if self._columns is not None and self._columns.products is products:
+                return
+            started = time.perf_counter()
+            columns = await asyncio.to_thread(_build, products)
+            self.build_ms = (time.perf_counter() - started) * 1000
+            self._columns = columns
+            self.builds += 1
+            logger.info(
+                "Katalog ustunlari%s: %d ta mahsulot, %d KB (%.0f ms)",
+                f" ({self.locale})" if self.locale else "", len(products), columns.nbytes() // 1024, self.build_ms,
+                extra={
+                    "event": "catalog.columns_built",
+                    "locale": self.locale or None,
+                    "products": len(products),
+                    "bytes": columns.nbytes(),
+                    "duration_ms": round(self.build_ms, 1),
+                },
+            )
+
+    def query(
+        self,
+        sort: str,
+        limit: int,
+        *,
+        category_id: "int | None" = None,
+        min_price: "int | None" = None,
+        max_price: "int | None" = None,
+        text: str = "",
+        after: "tuple | None" = None,
+        offset: int = 0,
+        scores: "Callable[[np.ndarray], np.ndarray] | None" = None,
+    ) -> "tuple[list[dict], list | None, int]":
+        """(sahifa, keyingi cursor kaliti yoki None, filtrdan o'tganlar soni)."""
+        columns = self._columns
+        if columns is None or not len(columns.ids):
+            return [], None, 0
+
+        mask = np.ones(len(columns.ids), dtype=bool)
+        if category_id is not None:
+            mask &= columns.category_ids == category_id
+        if min_price is not None:
+            mask &= columns.prices >= min_price
+        if max_price is not None:
+            mask &= columns.prices <= max_price
+        if text:
+            mask &= columns.text_mask(text)
+        total = int(np.count_nonzero(mask))
+
+        if sort == "popular":
+            # Ballar o'zgaruvchan — faqat filtrdan o'tganlar uchun olinadi va saralanadi
+            rows = np.flatnonzero(mask)
+            ids = columns.ids[rows]
+            primary = scores(ids) if scores is not None else np.zeros(len(rows))
+            if after is not None:
+                keep = (primary < after[0]) | ((primary == after[0]) & (ids < after[1]))
+                rows, ids, primary = rows[keep], ids[keep], primary[keep]
+                offset = 0
+            position = np.lexsort((-ids, -primary))
+            ordered, ordered_scores = rows[position], primary[position]
+        else:
+            if after is not None:
+                primary = columns.created if sort == "new" else columns.prices
+                value = created_timestamp(after[0]) if sort == "new" else after[0]
+                before = primary < value if DESCENDING[sort] else primary > value
+                mask &= before | ((primary == value) & (columns.ids < after[1]))
+                offset = 0
+            order = columns.orders[sort]
+            ordered, ordered_scores = order[mask[order]], None
+
+        chosen = ordered[offset:offset + limit]
+        products = [columns.products[row] for row in chosen.tolist()]
+        next_key = None
+        if products and offset + limit < len(ordered):
+            score = float(ordered_scores[offset + len(chosen) - 1]) if ordered_scores is not None else 0.0
+            next_key = sort_key(sort, products[-1], score)
+        return products, next_key, total
+
+    def stats(self) -> dict:
+        columns = self._columns
+        return {
+            "products": 0 if columns is None else len(columns.ids),
+            "strings": 0 if columns is None else len(columns.strings),
+            "bytes": 0 if columns is None else columns.nbytes(),
+            "builds": self.builds,
+            "build_ms": round(self.build_ms, 1),
+        }
+
+
+def query_list(
+    products: list,
+    sort: str,
+    limit: int,
+    *,
+    category_id: "int | None" = None,
+    min_price: "int | None" = None,
+    max_price: "int | None" = None,
+    text: str = "",
+    after: "tuple | None" = None,
+    offset: int = 0,
+    score: "Callable[[int], float] | None" = None,
+) -> "tuple[list[dict], list | None, int]":
+    """CatalogColumns.query bilan bir xil natija — oddiy Python ro'yxatida."""
+    needle = text.lower()
+    selected = [
+        p for p in products
+        if (category_id is None or p["category_id"] == category_id)
+        and (min_price is None or parse_price(p["price"]) >= min_price)
+        and (max_price is None or parse_price(p["price"]) <= max_price)
+        and (not needle or needle in p["title"].lower() or needle in (p.get("category_name") or "").lower())
+    ]
+    total = len(selected)
+
+    def key(product: dict) -> tuple:
+        primary = sort_key(sort, product, score(product["id"]) if score else 0.0)[0]
+        if sort == "new":
+            primary = created_timestamp(primary)
+        # Kamayish tartibida saralanadi: o'sish tartibidagi kalit manfiy
+        return (primary if DESCENDING[sort] else -primary, product["id"])
+
+    keyed = sorted(((key(p), p) for p in selected), key=lambda item: item[0], reverse=True)
+    if after is not None:
+        value = created_timestamp(after[0]) if sort == "new" else after[0]
+        boundary = (value if DESCENDING[sort] else -value, after[1])
+        keyed = [item for item in keyed if item[0] < boundary]
+        offset = 0
+
+    chosen = keyed[offset:offset + limit]
+    page = [product for _, product in chosen]
+    next_key = None
+    if page and offset + limit < len(keyed):
+        next_key = sort_key(sort, page[-1], score(page[-1]["id"]) if score else 0.0)
+    return page, next_key, total
+
+
+_by_locale: "dict[str, CatalogColumns]" = {}
+
+
+def columns_for(locale: str) -> CatalogColumns:
+    columns = _by_locale.get(locale)
+    if columns is None:
+        columns = _by_locale[locale] = CatalogColumns(locale)
+    return columns
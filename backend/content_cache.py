@@ -0,0 +1,109 @@
+"""
+Content Cache — sayt kontenti javoblarini xotirada saqlash.
+
+Har bir GET /api/content so'rovi bazadan settings, about, delivery va barcha
+blog postlarni o'qimasligi uchun tayyor javoblar shu yerda saqlanadi.
+
+Bo'limlar (section):
+  - settings, about, delivery, blog — database.py dagi yozish funksiyalari
+    commit dan keyin notify_content_changed(section) ni chaqiradi.
+
+Ishlatish:
+    payload = get_cached("content")
+    if payload is None:
+        generation = cache_generation()
+        payload = await build_payload()
+        set_cached("content", payload, sections={"settings", "blog"}, generation=generation)
+
+generation — bazadan o'qish paytida yozish bo'lsa, eski ma'lumot keshga tushmasligi uchun.
+"""
+
+import logging
+import time
+from typing import Callable
+
+from config import CONTENT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# key -> (expires_at, sections, value)
+_cache: "dict[str, tuple[float, frozenset, object]]" = {}
+_listeners: "list[Callable[[set[str]], None]]" = []
+_generation = 0
+# Asosiy bo'limlar; tillar bo'yicha — "<bo'lim>:<til>" (locales.py)
+CONTENT_SECTIONS = ("settings", "about", "delivery", "blog", "catalog")
+# Bazadagi content_versions ning eng katta qiymati (SSE va /api/content/changes uchun)
+_version = 0
+
+
+def get_cached(key: str):
+    """Keshdagi qiymat yoki None (yo'q yoki muddati o'tgan)."""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, _, value = entry
+    if expires_at < time.monotonic():
+        _cache.pop(key, None)
+        return None
+    return value
+
+
+def set_cached(key: str, value, sections: "set[str]", generation: "int | None" = None):
+    """
+    Qiymatni saqlash. sections — qaysi bo'limlar o'zgarsa bu kalit o'chadi.
+    generation berilsa va o'qish davomida kontent o'zgargan bo'lsa — saqlanmaydi.
+    """
+    if generation is not None and generation != _generation:
+        return
+    _cache[key] = (time.monotonic() + CONTENT_CACHE_TTL, frozenset(sections), value)
+
+
+def cache_generation() -> int:
+    return _generation
+
+
+def content_version() -> int:
+    return _version
+
+
+def set_content_version(version: int, reset: bool = False):
+    """Ishga tushganda (yoki baza tiklanganda, reset=True) bazadagi joriy versiyani o'rnatish."""
+    global _version
+    _version = version if reset else max(_version, version)
+
+
+def all_sections() -> "set[str]":
+    """Baza almashganda (backupdan tiklash): asosiy va keshdagi barcha bo'limlar (til bo'limlari bilan)."""
+    sections = set(CONTENT_SECTIONS)
+    for _, deps, _ in _cache.values():
+        sections |= deps
+    return sections
+
+
+def is_warm(key: str) -> bool:
+    return get_cached(key) is not None
+
+
+def add_change_listener(listener: "Callable[[set[str]], None]"):
+    """Kontent o'zgarganda chaqiriladigan funksiya (sinxron, tez bo'lishi kerak)."""
+    _listeners.append(listener)
+
+
+def notify_content_changed(*sections: str, version: "int | None" = None):
+    """
+    Bo'limlar o'zgardi — tegishli kesh yozuvlarini o'chirish va listenerlarni chaqirish.
+    version — yozish tranzaksiyasida berilgan content_versions qiymati.
+    """
+    global _generation, _version
+    changed = set(sections)
+    _generation += 1
+    if version is not None:
+        _version = max(_version, version)
+    for key in [k for k, (_, deps, _) in _cache.items() if deps & changed]:
+        _cache.pop(key, None)
+
+    for listener in _listeners:
+        try:
+            listener(changed)
+        except Exception as e:
+            logger.exception("Content listener xatosi: %s", e, extra={"event": "content_cache.listener_error"})
@@ -0,0 +1,94 @@
+"""
+Content Events — kontent o'zgarishlarini Server-Sent Events orqali saytga yetkazish.
+
+database.py dagi yozish funksiyalari commit dan keyin notify_content_changed()
+ni chaqiradi, bu hub esa har bir ulangan mijozga qisqa hodisa yuboradi:
+
+    id: 42
+    event: content
+    data: {"version": 42, "sections": ["settings"]}
+
+Mijoz faqat shunday hodisa kelganda /api/content/changes?since=<oldingi versiya>
+orqali faqat o'zgarganlarni yuklaydi — 5 daqiqalik polling kerak emas.
+
+Har bir mijozning buferi cheklangan (CONTENT_EVENTS_BUFFER). Sekin mijoz
+buferni to'ldirsa, eng eski hodisa tashlanadi — hodisalar faqat "o'zgardi"
+signali bo'lgani uchun oxirgisi yetarli.
+
+To'xtash boshlanganda (shutdown.py) close_all() barcha oqimlarni yopadi —
+EventSource retry dan keyin boshqa instance ga ulanadi, uvicorn esa
+tugamaydigan oqimlarni kutib qolmaydi.
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from config import CONTENT_EVENTS_BUFFER, CONTENT_EVENTS_HEARTBEAT, CONTENT_EVENTS_MAX_CLIENTS
+from content_cache import add_change_listener, content_version
+
+
+class ContentEventHub:
+    """Ulangan mijozlar ro'yxati va ularga hodisalarni tarqatish."""
+
+    def __init__(self, buffer_size: int = CONTENT_EVENTS_BUFFER):
+        self.buffer_size = buffer_size
+        self._clients: "set[asyncio.Queue]" = set()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    @property
+    def version(self) -> int:
+        """Bazadagi joriy kontent versiyasi — mijoz /api/content/changes?since= ga beradi."""
+        return content_version()
+
+    def is_full(self) -> bool:
+        return len(self._clients) >= CONTENT_EVENTS_MAX_CLIENTS
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._clients.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._clients.discard(queue)
+
+    def publish(self, sections: "set[str]"):
+        """Barcha mijozlarga hodisa qo'yish (bloklamaydi)."""
+        event = {"version": self.version, "sections": sorted(sections)}
+        for queue in self._clients:
+            if queue.full():
+                # Sekin mijoz — eng eski hodisani tashlab, yangisini qo'yamiz
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def close_all(self):
+        """Barcha oqimlarni yakunlash (None — oqim oxiri belgisi)."""
+        for queue in self._clients:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def stream(self, queue: asyncio.Queue, is_disconnected) -> AsyncIterator[str]:
+        """Bitta mijoz uchun SSE oqimi. Hodisa bo'lmasa har HEARTBEAT soniyada ping."""
+        try:
+            yield f"retry: 5000\nid: {self.version}\nevent: hello\ndata: {json.dumps({'version': self.version})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=CONTENT_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"id: {event['version']}\nevent: content\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(queue)
+
+
+content_events = ContentEventHub()
+add_change_listener(content_events.publish)
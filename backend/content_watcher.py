@@ -0,0 +1,76 @@
+"""
+Content Watcher — boshqa jarayonda qilingan kontent o'zgarishlarini kuzatish.
+
+RUN_MODE=api va RUN_MODE=bot alohida jarayonlarda ishlaganda bot qilgan
+o'zgarish API jarayonining xotiradagi keshini tozalamaydi va SSE hodisasi
+chiqmaydi. Watcher har CONTENT_VERSION_POLL soniyada content_versions dagi
+eng katta versiyani tekshiradi (indeks bo'yicha bitta qiymat) va yangi
+o'zgarishlar bo'lsa notify_content_changed() ni chaqiradi.
+
+Jarayonning o'z yozuvlari allaqachon versiyani oshirgan bo'ladi — ular
+ikki marta e'lon qilinmaydi.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from config import CONTENT_VERSION_POLL
+from content_cache import all_sections, content_version, notify_content_changed, set_content_version
+from locales import changed_cache_section
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+class ContentWatcher:
+    def __init__(self, interval: float = CONTENT_VERSION_POLL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> "set[str]":
+        known = content_version()
+        latest = await storage.get_content_version()
+        if latest == known:
+            return set()
+        if latest < known:
+            # Baza boshqa jarayonda backupdan tiklangan — hamma narsa eskirgan
+            set_content_version(latest, reset=True)
+            sections = all_sections()
+            notify_content_changed(*sections, version=latest)
+            return sections
+
+        # Tarjima o'zgarishi ("about@ru") faqat o'sha tilning keshini tozalaydi
+        sections = {
+            changed_cache_section(change["section"], change["item_key"])
+            for change in await storage.get_content_changes(known)
+        }
+        notify_content_changed(*sections, version=latest)
+        return sections
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Content watcher xatosi: %s", e, extra={"event": "content_watcher.error"})
+
+
+content_watcher = ContentWatcher()
@@ -10,119 +10,86 @@ Jadvallar:
   - site_settings: sayt sozlamalari (key-value)
   - about_content: "Biz haqimizda" sahifasi kontenti (JSON)
   - delivery_content: "Yetkazib berish" sahifasi kontenti (JSON)
+  - outbound_messages: bot yuboradigan xabarlar navbati (broadcast)
+  - subscribers: botdan foydalangan foydalanuvchilar (broadcast auditoriyasi)
+  - bot_persistence: bot holati (user_data, chat_data, conversation) — restartdan keyin tiklanadi
+  - scheduled_settings: vaqtga belgilangan sozlama o'zgarishlari (promo va h.k.)
+  - content_versions: har bir kontent elementining oxirgi o'zgarish versiyasi (delta sync)
+  - orders, order_items: sayt orqali berilgan buyurtmalar
+  - stock_reservations: checkout paytidagi vaqtinchalik bronlar (products.stock / reserved)
+  - advice_cache: Aqlli Yordamchi (LLM) javoblari keshi — TTL va LRU bilan
+  - analytics_daily: mahsulot/post ko'rishlari, bosishlari va noyob tashriflar (kunlik)
 """
 
 import aiosqlite
 import json
-from config import DATABASE_PATH
+import time
+from config import (
+    DATABASE_PATH,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_JOURNAL_SIZE_LIMIT_MB,
+    SQLITE_MMAP_SIZE_MB,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
+)
+from content_cache import notify_content_changed
+from hyperloglog import estimate as hll_estimate, merge as hll_merge
+from locales import entity_cache_section, validate_translation, version_key
+from migrations import apply_migrations
 
 DB_PATH = DATABASE_PATH
 
+# Har bir ulanish uchun sozlamalar — bitta executescript (bitta thread hop)
+CONNECTION_PRAGMAS = f"""
+    PRAGMA journal_mode=WAL;
+    PRAGMA foreign_keys=ON;
+    PRAGMA synchronous={SQLITE_SYNCHRONOUS};
+    PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB};
+    PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024};
+    PRAGMA temp_store={SQLITE_TEMP_STORE};
+    PRAGMA journal_size_limit={SQLITE_JOURNAL_SIZE_LIMIT_MB * 1024 * 1024};
+"""
+
 
 async def get_db() -> aiosqlite.Connection:
     """Get a database connection."""
-    db = await aiosqlite.connect(DB_PATH)
+    db = await aiosqlite.connect(DB_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
     db.row_factory = aiosqlite.Row
-    await db.execute("PRAGMA journal_mode=WAL")
-    await db.execute("PRAGMA foreign_keys=ON")
+    await db.executescript(CONNECTION_PRAGMAS)
     return db
 
 
 async def init_db():
-    """Initialize database tables."""
-    db = await get_db()
-    try:
-        await db.executescript("""
-            -- Admin foydalanuvchilari
-            CREATE TABLE IF NOT EXISTS admins (
-                telegram_id INTEGER PRIMARY KEY,
-                username TEXT,
-                full_name TEXT,
-                added_by INTEGER,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active INTEGER DEFAULT 1
-            );
-
-            -- Kategoriyalar
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            -- Mahsulotlar
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                price TEXT NOT NULL,
-                description TEXT DEFAULT '',
-                category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            -- Mahsulot rasmlari
-            CREATE TABLE IF NOT EXISTS product_media (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                file_id TEXT NOT NULL,
-                media_type TEXT DEFAULT 'photo',
-                sort_order INTEGER DEFAULT 0
-            );
-
-            -- Blog maqolalari
-            CREATE TABLE IF NOT EXISTS blog_posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                excerpt TEXT DEFAULT '',
-                content TEXT DEFAULT '',
-                image TEXT DEFAULT '',
-                author TEXT DEFAULT '',
-                is_published INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            -- Sayt sozlamalari (key-value)
-            CREATE TABLE IF NOT EXISTS site_settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            );
-
-            -- "Biz haqimizda" sahifasi kontenti (bitta qator, JSON formatda)
-            CREATE TABLE IF NOT EXISTS page_content (
-                page_name TEXT PRIMARY KEY,
-                content_json TEXT NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        await db.commit()
-
-        # Default sozlamalarni qo'shish (agar mavjud bo'lmasa)
-        default_settings = {
-            "phone": "+998 90 123 45 67",
-            "email": "info@toymix.uz",
-            "address": "Toshkent sh., Chilonzor t.",
-            "working_hours": "Har kuni 9:00 - 21:00",
-            "instagram_url": "https://instagram.com/toymix.uz",
-            "telegram_url": "https://t.me/toymix_uz",
-            "whatsapp_url": "https://wa.me/998901234567",
-            "promo_banner_text": "300,000 so'mdan yuqori xaridlar uchun yetkazib berish bepul! 🚚",
-            "free_delivery_threshold": "300000",
-            "site_description": "ToyMix — O'zbekistondagi eng yaxshi bolalar o'yinchoqlari onlayn do'koni.",
-        }
-        for key, value in default_settings.items():
-            await db.execute(
-                "INSERT OR IGNORE INTO site_settings (key, value) VALUES (?, ?)",
-                (key, value),
-            )
-        await db.commit()
+    """Bazani oxirgi sxema versiyasiga keltirish (migrations.py)."""
+    db = await get_db()
+    try:
+        await apply_migrations(db)
     finally:
         await db.close()
 
 
+async def _bump_content_version(db: aiosqlite.Connection, section: str, item_key, deleted: bool = False) -> int:
+    """
+    Kontent elementiga yangi versiya berish (yozish tranzaksiyasi ichida chaqiriladi).
+    Versiya bitta statementda olinadi — parallel yozuvchilar bir xil raqam ololmaydi.
+    """
+    await db.execute(
+        """INSERT INTO content_versions (section, item_key, version, deleted)
+           VALUES (?, ?, (SELECT COALESCE(MAX(version), 0) + 1 FROM content_versions), ?)
+           ON CONFLICT(section, item_key) DO UPDATE SET
+               version = excluded.version,
+               deleted = excluded.deleted""",
+        (section, str(item_key), 1 if deleted else 0),
+    )
+    cursor = await db.execute(
+        "SELECT version FROM content_versions WHERE section = ? AND item_key = ?",
+        (section, str(item_key)),
+    )
+    row = await cursor.fetchone()
+    return row[0]
+
+
 # ─── Admin operations ────────────────────────────────────────────────────────
 
 async def is_admin(telegram_id: int) -> bool:
@@ -215,24 +182,113 @@ async def get_all_admins() -> "list[dict]":
         await db.close()
 
 
+async def count_admins() -> int:
+    """Faol adminlar soni (bazada yo'q super adminlar ham hisoblanadi)."""
+    from config import SUPER_ADMIN_IDS
+
+    db = await get_db()
+    try:
+        cursor = await db.execute("SELECT COUNT(*) FROM admins WHERE is_active = 1")
+        row = await cursor.fetchone()
+        extra = await _super_admins_missing_from_db(db, SUPER_ADMIN_IDS)
+        return row[0] + len(extra)
+    finally:
+        await db.close()
+
+
+async def get_admins_page(limit: int, offset: int) -> "list[dict]":
+    """
+    Adminlar ro'yxatining bitta sahifasi.
+    Bazada yo'q super adminlar ro'yxat boshida keladi, keyin bazadagi adminlar.
+    """
+    from config import SUPER_ADMIN_IDS
+
+    db = await get_db()
+    try:
+        extra = await _super_admins_missing_from_db(db, SUPER_ADMIN_IDS)
+        admins = [
+            {
+                "telegram_id": sid,
+                "username": None,
+                "full_name": "Super Admin",
+                "added_at": None,
+                "is_super": True,
+            }
+            for sid in extra[offset:offset + limit]
+        ]
+
+        db_limit = limit - len(admins)
+        if db_limit > 0:
+            db_offset = max(0, offset - len(extra))
+            cursor = await db.execute(
+                """SELECT telegram_id, username, full_name, added_at FROM admins
+                   WHERE is_active = 1 ORDER BY added_at, telegram_id
+                   LIMIT ? OFFSET ?""",
+                (db_limit, db_offset),
+            )
+            for row in await cursor.fetchall():
+                admins.append({
+                    "telegram_id": row["telegram_id"],
+                    "username": row["username"],
+                    "full_name": row["full_name"],
+                    "added_at": row["added_at"],
+                    "is_super": row["telegram_id"] in SUPER_ADMIN_IDS,
+                })
+        return admins
+    finally:
+        await db.close()
+
+
+async def _super_admins_missing_from_db(db: aiosqlite.Connection, super_ids: "set[int]") -> "list[int]":
+    """.env dagi, lekin admins jadvalida faol bo'lmagan super admin ID lar (tartiblangan)."""
+    if not super_ids:
+        return []
+    placeholders = ", ".join("?" for _ in super_ids)
+    cursor = await db.execute(
+        f"SELECT telegram_id FROM admins WHERE is_active = 1 AND telegram_id IN ({placeholders})",
+        tuple(super_ids),
+    )
+    in_db = {row[0] for row in await cursor.fetchall()}
+    return sorted(super_ids - in_db)
+
+
 # ─── Site Settings operations ────────────────────────────────────────────────
 
+def normalize_site_settings(settings: dict) -> dict:
+    """Sayt uchun qiymat turlari (free_delivery_threshold — int). Barcha backendlarda bir xil."""
+    if "free_delivery_threshold" in settings:
+        try:
+            settings["free_delivery_threshold"] = int(settings["free_delivery_threshold"])
+        except (ValueError, TypeError):
+            settings["free_delivery_threshold"] = 300000
+    return settings
+
+
 async def get_site_settings() -> dict:
     """Barcha sayt sozlamalarini olish."""
     db = await get_db()
     try:
         cursor = await db.execute("SELECT key, value FROM site_settings")
         rows = await cursor.fetchall()
-        settings = {}
-        for row in rows:
-            settings[row["key"]] = row["value"]
-        # free_delivery_threshold ni int ga aylantirish
-        if "free_delivery_threshold" in settings:
-            try:
-                settings["free_delivery_threshold"] = int(settings["free_delivery_threshold"])
-            except (ValueError, TypeError):
-                settings["free_delivery_threshold"] = 300000
-        return settings
+        return normalize_site_settings({row["key"]: row["value"] for row in rows})
+    finally:
+        await db.close()
+
+
+async def get_site_settings_for_keys(keys: "list[str]") -> dict:
+    """Faqat berilgan kalitlar bo'yicha sozlamalarni olish."""
+    if not keys:
+        return {}
+
+    db = await get_db()
+    try:
+        placeholders = ", ".join("?" for _ in keys)
+        cursor = await db.execute(
+            f"SELECT key, value FROM site_settings WHERE key IN ({placeholders})",
+            tuple(keys),
+        )
+        rows = await cursor.fetchall()
+        return {row["key"]: row["value"] for row in rows}
     finally:
         await db.close()
 
@@ -245,7 +301,9 @@ async def update_site_setting(key: str, value: str) -> bool:
             "INSERT OR REPLACE INTO site_settings (key, value) VALUES (?, ?)",
             (key, value),
         )
+        version = await _bump_content_version(db, "settings", key)
         await db.commit()
+        notify_content_changed("settings", version=version)
         return True
     except Exception:
         return False
@@ -280,7 +338,9 @@ async def update_page_content(page_name: str, content: dict) -> bool:
                VALUES (?, ?, CURRENT_TIMESTAMP)""",
             (page_name, json.dumps(content, ensure_ascii=False)),
         )
+        version = await _bump_content_version(db, "pages", page_name)
         await db.commit()
+        notify_content_changed(page_name, version=version)
         return True
     except Exception:
         return False
@@ -305,6 +365,35 @@ async def get_blog_posts(published_only: bool = True):
         await db.close()
 
 
+async def count_blog_posts(published_only: bool = False) -> int:
+    """Blog postlar soni."""
+    db = await get_db()
+    try:
+        query = "SELECT COUNT(*) FROM blog_posts"
+        if published_only:
+            query += " WHERE is_published = 1"
+        cursor = await db.execute(query)
+        row = await cursor.fetchone()
+        return row[0]
+    finally:
+        await db.close()
+
+
+async def get_blog_post_summaries(limit: int, offset: int = 0, published_only: bool = False):
+    """Blog postlarning qisqa ro'yxati (content siz) — bot ro'yxatlari uchun."""
+    db = await get_db()
+    try:
+        query = "SELECT id, title, author, is_published, created_at FROM blog_posts"
+        if published_only:
+            query += " WHERE is_published = 1"
+        query += " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+        cursor = await db.execute(query, (limit, offset))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
 async def add_blog_post(title: str, excerpt: str, content: str, image: str, author: str):
     """Yangi blog post qo'shish. Post ID qaytaradi."""
     db = await get_db()
@@ -314,7 +403,9 @@ async def add_blog_post(title: str, excerpt: str, content: str, image: str, auth
                VALUES (?, ?, ?, ?, ?)""",
             (title, excerpt, content, image, author),
         )
+        version = await _bump_content_version(db, "blog_posts", cursor.lastrowid)
         await db.commit()
+        notify_content_changed("blog", version=version)
         return cursor.lastrowid
     except Exception:
         return None
@@ -334,11 +425,17 @@ async def update_blog_post(post_id: int, **kwargs) -> bool:
         set_clause = ", ".join(f"{k} = ?" for k in updates)
         values = list(updates.values())
         values.append(post_id)
-        await db.execute(
+        cursor = await db.execute(
             f"UPDATE blog_posts SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
             values,
         )
+        if cursor.rowcount == 0:
+            # Noto'g'ri ID — versiya oshirilmaydi (mijozlarga soxta o'zgarish bormasin)
+            await db.rollback()
+            return False
+        version = await _bump_content_version(db, "blog_posts", post_id)
         await db.commit()
+        notify_content_changed("blog", version=version)
         return True
     except Exception:
         return False
@@ -350,10 +447,1093 @@ async def delete_blog_post(post_id: int) -> bool:
     """Blog postni o'chirish."""
     db = await get_db()
     try:
-        await db.execute("DELETE FROM blog_posts WHERE id = ?", (post_id,))
+        cursor = await db.execute("DELETE FROM blog_posts WHERE id = ?", (post_id,))
+        if cursor.rowcount == 0:
+            # Post yo'q — tombstone yozilmaydi
+            await db.rollback()
+            return False
+        await db.execute(
+            "DELETE FROM content_translations WHERE entity_type = 'blog_posts' AND entity_key = ?",
+            (str(post_id),),
+        )
+        # Tombstone — keshi bor mijozlar postni o'chirishi uchun
+        version = await _bump_content_version(db, "blog_posts", post_id, deleted=True)
         await db.commit()
+        notify_content_changed("blog", version=version)
         return True
     except Exception:
         return False
     finally:
         await db.close()
+
+
+async def get_blog_posts_by_ids(post_ids: "list[int]", published_only: bool = True) -> "list[dict]":
+    """Berilgan ID lar bo'yicha blog postlar."""
+    if not post_ids:
+        return []
+
+    db = await get_db()
+    try:
+        placeholders = ", ".join("?" for _ in post_ids)
+        query = f"SELECT * FROM blog_posts WHERE id IN ({placeholders})"
+        if published_only:
+            query += " AND is_published = 1"
+        query += " ORDER BY created_at DESC, id DESC"
+        cursor = await db.execute(query, tuple(post_ids))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+# ─── Catalog operations ──────────────────────────────────────────────────────
+
+async def get_catalog_products() -> "list[dict]":
+    """
+    Faol mahsulotlar — kategoriya nomi va rasmlari bilan.
+    Rasmlar bitta qo'shimcha so'rovda olinadi (har bir mahsulot uchun alohida emas).
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT p.*, c.name AS category_name
+               FROM products p
+               LEFT JOIN categories c ON c.id = p.category_id
+               WHERE p.is_active = 1
+               ORDER BY p.created_at DESC, p.id DESC"""
+        )
+        products = [dict(row) for row in await cursor.fetchall()]
+
+        cursor = await db.execute(
+            """SELECT m.id, m.product_id, m.file_id, m.media_type, m.sort_order
+               FROM product_media m
+               JOIN products p ON p.id = m.product_id
+               WHERE p.is_active = 1
+               ORDER BY m.product_id, m.sort_order, m.id"""
+        )
+        media_by_product: "dict[int, list[dict]]" = {}
+        for row in await cursor.fetchall():
+            media_by_product.setdefault(row["product_id"], []).append(dict(row))
+
+        for product in products:
+            product["media"] = media_by_product.get(product["id"], [])
+        return products
+    finally:
+        await db.close()
+
+
+async def get_categories_with_counts() -> "list[dict]":
+    """Kategoriyalar va ulardagi faol mahsulotlar soni."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT c.id, c.name, COUNT(p.id) AS toy_count
+               FROM categories c
+               LEFT JOIN products p ON p.category_id = c.id AND p.is_active = 1
+               GROUP BY c.id
+               ORDER BY c.sort_order, c.name"""
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+# ─── Order operations ────────────────────────────────────────────────────────
+
+ORDER_COLUMNS = (
+    "idempotency_key", "request_hash", "customer_name", "phone", "city", "address",
+    "payment_method", "comment", "subtotal", "delivery_fee", "total",
+)
+
+
+async def get_products_by_ids(product_ids: "list[int]") -> "list[dict]":
+    """Buyurtmani tekshirish uchun faol mahsulotlar — savatdagi barcha qatorlar bitta so'rovda."""
+    if not product_ids:
+        return []
+
+    db = await get_db()
+    try:
+        placeholders = ", ".join("?" for _ in product_ids)
+        cursor = await db.execute(
+            f"SELECT id, title, price FROM products WHERE is_active = 1 AND id IN ({placeholders})",
+            tuple(product_ids),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def _fetch_order(db: aiosqlite.Connection, column: str, value):
+    cursor = await db.execute(f"SELECT * FROM orders WHERE {column} = ?", (value,))
+    row = await cursor.fetchone()
+    if not row:
+        return None
+    order = dict(row)
+    cursor = await db.execute(
+        """SELECT product_id, title, unit_price, quantity FROM order_items
+           WHERE order_id = ? ORDER BY id""",
+        (order["id"],),
+    )
+    order["items"] = [dict(item) for item in await cursor.fetchall()]
+    return order
+
+
+async def get_order(order_id: int):
+    """Buyurtma va uning qatorlari."""
+    db = await get_db()
+    try:
+        return await _fetch_order(db, "id", order_id)
+    finally:
+        await db.close()
+
+
+async def get_order_by_idempotency_key(key: str):
+    db = await get_db()
+    try:
+        return await _fetch_order(db, "idempotency_key", key)
+    finally:
+        await db.close()
+
+
+# Bitta so'rovda tekshirish va yechish: sotuvga tayyor (o'z broni bilan) yetarli bo'lsagina
+STOCK_TAKE_SQL = """
+    UPDATE products SET stock = stock - ?, reserved = MAX(reserved - ?, 0)
+    WHERE id = ? AND (stock IS NULL OR stock - reserved + ? >= ?)
+"""
+
+
+async def _take_stock(db: aiosqlite.Connection, order: dict) -> "list[int]":
+    """Buyurtma qatorlari uchun qoldiqni yechish. Yetmagan mahsulot ID lari qaytariladi."""
+    held: "dict[int, int]" = {}
+    token = order.get("reservation_id")
+    if token:
+        cursor = await db.execute(
+            "SELECT product_id, quantity FROM stock_reservations WHERE token = ?", (token,)
+        )
+        held = {row["product_id"]: row["quantity"] for row in await cursor.fetchall()}
+
+    short = []
+    for item in order["items"]:
+        own = held.pop(item["product_id"], 0)
+        cursor = await db.execute(
+            STOCK_TAKE_SQL, (item["quantity"], own, item["product_id"], own, item["quantity"])
+        )
+        if cursor.rowcount == 0:
+            short.append(item["product_id"])
+
+    # Bron qilingan, lekin buyurtmaga kirmagan mahsulotlar bo'shatiladi
+    for product_id, quantity in held.items():
+        await db.execute(
+            "UPDATE products SET reserved = MAX(reserved - ?, 0) WHERE id = ?", (quantity, product_id)
+        )
+    if token:
+        await db.execute("DELETE FROM stock_reservations WHERE token = ?", (token,))
+    return short
+
+
+async def insert_orders(orders: "list[dict]") -> "list[dict]":
+    """
+    Bir nechta buyurtmani bitta tranzaksiyada yozish (group commit — bitta fsync).
+    Har bir buyurtma uchun {"id", "created", "request_hash", "out_of_stock"} qaytaradi:
+      - created=False, id bor — shu idempotency_key bilan buyurtma allaqachon bor edi
+      - created=False, out_of_stock — qoldiq yetmadi, buyurtma yozilmadi
+    Har bir buyurtma o'z SAVEPOINT ida — bittasi rad etilsa, batchdagi boshqalari yoziladi.
+    """
+    db = await get_db()
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        results = []
+        items = []
+        for order in orders:
+            await db.execute("SAVEPOINT order_write")
+            cursor = await db.execute(
+                f"""INSERT INTO orders ({", ".join(ORDER_COLUMNS)})
+                    VALUES ({", ".join("?" for _ in ORDER_COLUMNS)})
+                    ON CONFLICT (idempotency_key) DO NOTHING
+                    RETURNING id""",
+                tuple(order.get(column) for column in ORDER_COLUMNS),
+            )
+            inserted = await cursor.fetchall()
+            if not inserted:
+                await db.execute("RELEASE order_write")
+                cursor = await db.execute(
+                    "SELECT id, request_hash FROM orders WHERE idempotency_key = ?",
+                    (order["idempotency_key"],),
+                )
+                existing = await cursor.fetchone()
+                results.append({
+                    "id": existing["id"], "created": False,
+                    "request_hash": existing["request_hash"], "out_of_stock": [],
+                })
+                continue
+
+            short = await _take_stock(db, order)
+            if short:
+                await db.execute("ROLLBACK TO order_write")
+                await db.execute("RELEASE order_write")
+                results.append({
+                    "id": None, "created": False,
+                    "request_hash": order.get("request_hash"), "out_of_stock": short,
+                })
+                continue
+
+            await db.execute("RELEASE order_write")
+            order_id = inserted[0]["id"]
+            items.extend(
+                (order_id, item["product_id"], item["title"], item["unit_price"], item["quantity"])
+                for item in order["items"]
+            )
+            results.append({
+                "id": order_id, "created": True,
+                "request_hash": order.get("request_hash"), "out_of_stock": [],
+            })
+
+        await db.executemany(
+            """INSERT INTO order_items (order_id, product_id, title, unit_price, quantity)
+               VALUES (?, ?, ?, ?, ?)""",
+            items,
+        )
+        await db.commit()
+        return results
+    finally:
+        await db.close()
+
+
+# ─── Inventory operations ────────────────────────────────────────────────────
+
+async def get_stock_levels() -> "list[dict]":
+    """Faol mahsulotlarning qoldig'i va bronlari (availability view uchun bitta so'rov)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute("SELECT id, stock, reserved FROM products WHERE is_active = 1")
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def get_stock_report(limit: int) -> "list[dict]":
+    """Qoldig'i kuzatiladigan mahsulotlar — eng kami birinchi."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT id, title, stock, reserved FROM products
+               WHERE is_active = 1 AND stock IS NOT NULL
+               ORDER BY stock - reserved, id LIMIT ?""",
+            (limit,),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def apply_stock_changes(changes: "list[tuple[int, int | None, bool]]") -> "list[int]":
+    """
+    Qoldiqni ko'plab o'zgartirish (bitta tranzaksiya).
+    changes: (product_id, qiymat, nisbiy) — nisbiy bo'lsa qo'shiladi (0 dan pastga tushmaydi),
+    aks holda o'rnatiladi (None — kuzatilmaydi). Topilgan mahsulot ID lari qaytariladi.
+    """
+    db = await get_db()
+    try:
+        updated = []
+        for product_id, value, relative in changes:
+            if relative:
+                cursor = await db.execute(
+                    "UPDATE products SET stock = MAX(COALESCE(stock, 0) + ?, 0) WHERE id = ?",
+                    (value, product_id),
+                )
+            else:
+                cursor = await db.execute(
+                    "UPDATE products SET stock = ? WHERE id = ?", (value, product_id)
+                )
+            if cursor.rowcount:
+                updated.append(product_id)
+        await db.commit()
+        return updated
+    finally:
+        await db.close()
+
+
+async def reserve_stock(token: str, lines: "list[tuple[int, int]]", ttl_seconds: int) -> "list[int]":
+    """
+    Savat uchun bron: hammasi yoki hech narsa. Shu token bilan oldingi bron almashtiriladi.
+    Yetmagan mahsulot ID lari qaytariladi (bo'sh ro'yxat — bron qilindi).
+    """
+    db = await get_db()
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        await _release_reservation(db, token)
+
+        short = []
+        for product_id, quantity in lines:
+            cursor = await db.execute(
+                """UPDATE products SET reserved = reserved + ?
+                   WHERE id = ? AND is_active = 1 AND (stock IS NULL OR stock - reserved >= ?)""",
+                (quantity, product_id, quantity),
+            )
+            if cursor.rowcount == 0:
+                short.append(product_id)
+        if short:
+            await db.rollback()
+            return short
+
+        await db.executemany(
+            """INSERT INTO stock_reservations (token, product_id, quantity, expires_at)
+               VALUES (?, ?, ?, datetime('now', ?))""",
+            [(token, product_id, quantity, f"+{ttl_seconds} seconds") for product_id, quantity in lines],
+        )
+        await db.commit()
+        return []
+    finally:
+        await db.close()
+
+
+async def _release_reservation(db: aiosqlite.Connection, token: str) -> bool:
+    cursor = await db.execute(
+        "SELECT product_id, quantity FROM stock_reservations WHERE token = ?", (token,)
+    )
+    rows = await cursor.fetchall()
+    for row in rows:
+        await db.execute(
+            "UPDATE products SET reserved = MAX(reserved - ?, 0) WHERE id = ?",
+            (row["quantity"], row["product_id"]),
+        )
+    await db.execute("DELETE FROM stock_reservations WHERE token = ?", (token,))
+    return bool(rows)
+
+
+async def release_reservation(token: str) -> bool:
+    """Bronni bekor qilish (mijoz checkout dan chiqdi)."""
+    db = await get_db()
+    try:
+        # SELECT va UPDATE orasida boshqa jarayon shu bronni bo'shatib qo'ymasin
+        await db.execute("BEGIN IMMEDIATE")
+        released = await _release_reservation(db, token)
+        await db.commit()
+        return released
+    finally:
+        await db.close()
+
+
+async def expire_reservations() -> int:
+    """Muddati o'tgan bronlarni qaytarish. Qaytarilgan bron qatorlari soni."""
+    db = await get_db()
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        # Bitta kesish nuqtasi — SELECT va DELETE bir xil qatorlarni ko'rsin
+        cursor = await db.execute("SELECT CURRENT_TIMESTAMP")
+        (now,) = await cursor.fetchone()
+        cursor = await db.execute(
+            """SELECT product_id, SUM(quantity) AS quantity, COUNT(*) AS count
+               FROM stock_reservations WHERE expires_at <= ?
+               GROUP BY product_id""",
+            (now,),
+        )
+        rows = await cursor.fetchall()
+        if not rows:
+            await db.rollback()
+            return 0
+        await db.executemany(
+            "UPDATE products SET reserved = MAX(reserved - ?, 0) WHERE id = ?",
+            [(row["quantity"], row["product_id"]) for row in rows],
+        )
+        await db.execute("DELETE FROM stock_reservations WHERE expires_at <= ?", (now,))
+        await db.commit()
+        return sum(row["count"] for row in rows)
+    finally:
+        await db.close()
+
+
+# ─── Analytics operations ────────────────────────────────────────────────────
+
+# entity_type → sarlavha olinadigan jadval
+ANALYTICS_TABLES = {"product": "products", "post": "blog_posts"}
+# Bitta IN (...) so'rovidagi ID lar soni (SQLite parametrlar chegarasidan ancha past)
+ANALYTICS_CHUNK = 500
+
+
+async def flush_analytics(rows: "list[dict]", retain_days: int):
+    """
+    Xotirada yig'ilgan agregatlarni bitta tranzaksiyada qo'shish.
+    rows: {"entity_type", "entity_id", "day", "views", "clicks", "visitors": bytes}
+    visitors sketchlari bazadagisi bilan birlashtiriladi; retain_days dan eskilari o'chiriladi.
+    """
+    db = await get_db()
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        existing: "dict[tuple, bytes]" = {}
+        groups: "dict[tuple[str, str], list[int]]" = {}
+        for row in rows:
+            groups.setdefault((row["entity_type"], row["day"]), []).append(row["entity_id"])
+        for (entity_type, day), ids in groups.items():
+            for start in range(0, len(ids), ANALYTICS_CHUNK):
+                chunk = ids[start:start + ANALYTICS_CHUNK]
+                cursor = await db.execute(
+                    f"""SELECT entity_id, visitors FROM analytics_daily
+                        WHERE entity_type = ? AND day = ? AND entity_id IN ({", ".join("?" for _ in chunk)})""",
+                    (entity_type, day, *chunk),
+                )
+                for found in await cursor.fetchall():
+                    existing[(entity_type, found["entity_id"], day)] = found["visitors"]
+
+        await db.executemany(
+            """INSERT INTO analytics_daily (entity_type, entity_id, day, views, clicks, visitors)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (entity_type, entity_id, day) DO UPDATE SET
+                   views = views + excluded.views,
+                   clicks = clicks + excluded.clicks,
+                   visitors = excluded.visitors""",
+            [
+                (
+                    row["entity_type"], row["entity_id"], row["day"], row["views"], row["clicks"],
+                    hll_merge(existing.get((row["entity_type"], row["entity_id"], row["day"])), row["visitors"]),
+                )
+                for row in rows
+            ],
+        )
+        await db.execute("DELETE FROM analytics_daily WHERE day < date('now', ?)", (f"-{retain_days} days",))
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def get_top_entities(entity_type: str, days: int, limit: int) -> "list[dict]":
+    """
+    Oxirgi days kun (bugun ham) ichida eng ko'p ko'rilganlar:
+    [{"entity_id", "title", "views", "clicks", "visitors"}] — visitors taxminiy (HyperLogLog).
+    """
+    table = ANALYTICS_TABLES[entity_type]
+    since = f"-{max(days - 1, 0)} days"
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""SELECT a.entity_id, t.title, SUM(a.views) AS views, SUM(a.clicks) AS clicks
+                FROM analytics_daily a
+                JOIN {table} t ON t.id = a.entity_id
+                WHERE a.entity_type = ? AND a.day >= date('now', ?)
+                GROUP BY a.entity_id
+                ORDER BY views DESC, clicks DESC, a.entity_id
+                LIMIT ?""",
+            (entity_type, since, limit),
+        )
+        top = [dict(row) for row in await cursor.fetchall()]
+        if not top:
+            return []
+
+        sketches: "dict[int, list[bytes]]" = {}
+        cursor = await db.execute(
+            f"""SELECT entity_id, visitors FROM analytics_daily
+                WHERE entity_type = ? AND day >= date('now', ?)
+                  AND entity_id IN ({", ".join("?" for _ in top)})""",
+            (entity_type, since, *(row["entity_id"] for row in top)),
+        )
+        for row in await cursor.fetchall():
+            sketches.setdefault(row["entity_id"], []).append(row["visitors"])
+        for row in top:
+            row["visitors"] = hll_estimate(hll_merge(*sketches.get(row["entity_id"], [])))
+        return top
+    finally:
+        await db.close()
+
+
+async def get_daily_counts(entity_type: str, days: int) -> "list[dict]":
+    """Oxirgi days kun (bugun ham) kunlik hisoblari: [{"entity_id", "day", "views", "clicks"}]."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT entity_id, day, views, clicks FROM analytics_daily
+               WHERE entity_type = ? AND day >= date('now', ?)""",
+            (entity_type, f"-{max(days - 1, 0)} days"),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+# ─── Translation operations ──────────────────────────────────────────────────
+
+async def get_translations(
+    entity_type: str,
+    locales: "list[str]",
+    entity_keys: "list | None" = None,
+) -> "dict[str, dict[str, dict[str, str]]]":
+    """Tarjimalar: {entity_key: {locale: {field: value}}}. entity_keys None — hammasi."""
+    if not locales or entity_keys == []:
+        return {}
+
+    db = await get_db()
+    try:
+        query = (
+            "SELECT entity_key, locale, field, value FROM content_translations "
+            f"WHERE entity_type = ? AND locale IN ({', '.join('?' for _ in locales)})"
+        )
+        params = [entity_type, *locales]
+        if entity_keys is not None:
+            query += f" AND entity_key IN ({', '.join('?' for _ in entity_keys)})"
+            params.extend(str(key) for key in entity_keys)
+        cursor = await db.execute(query, params)
+        translations: "dict[str, dict[str, dict[str, str]]]" = {}
+        for row in await cursor.fetchall():
+            translations.setdefault(row["entity_key"], {}).setdefault(row["locale"], {})[row["field"]] = row["value"]
+        return translations
+    finally:
+        await db.close()
+
+
+async def set_translations(entity_type: str, entity_key, locale: str, fields: "dict[str, str | None]") -> bool:
+    """
+    Bitta element tarjimasini yozish. Bo'sh qiymat (yoki None) — maydon tarjimasini
+    o'chirish (asosiy tilga qaytadi). Faqat shu tilning keshi tozalanadi.
+    """
+    validate_translation(entity_type, locale, fields)
+    entity_key = str(entity_key)
+    db = await get_db()
+    try:
+        await db.executemany(
+            """INSERT INTO content_translations (entity_type, entity_key, locale, field, value)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(entity_type, locale, entity_key, field) DO UPDATE SET
+                   value = excluded.value,
+                   updated_at = CURRENT_TIMESTAMP""",
+            [(entity_type, entity_key, locale, field, value) for field, value in fields.items() if value],
+        )
+        await db.executemany(
+            """DELETE FROM content_translations
+               WHERE entity_type = ? AND entity_key = ? AND locale = ? AND field = ?""",
+            [(entity_type, entity_key, locale, field) for field, value in fields.items() if not value],
+        )
+        version = await _bump_content_version(db, entity_type, version_key(entity_key, locale))
+        await db.commit()
+        notify_content_changed(f"{entity_cache_section(entity_type, entity_key)}:{locale}", version=version)
+        return True
+    except Exception:
+        return False
+    finally:
+        await db.close()
+
+
+# ─── Health ──────────────────────────────────────────────────────────────────
+
+async def ping_db() -> dict:
+    """
+    Sog'liq tekshiruvi: ulanish, o'qish va yozish qulfini olish (darhol bekor
+    qilinadi). Boshqa yozuvchi qulfni ushlab qolsa — busy_timeout gacha kutadi.
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM content_versions")
+        await cursor.fetchone()
+        await db.execute("BEGIN IMMEDIATE")
+        await db.rollback()
+        return {}
+    finally:
+        await db.close()
+
+
+# ─── Content version operations (delta sync) ─────────────────────────────────
+
+async def get_content_version() -> int:
+    """Joriy (eng katta) kontent versiyasi."""
+    db = await get_db()
+    try:
+        cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM content_versions")
+        row = await cursor.fetchone()
+        return row[0]
+    finally:
+        await db.close()
+
+
+async def get_section_versions() -> "dict[str, int]":
+    """Har bir bo'limning oxirgi versiyasi: {"settings": 12, "pages": 7, "blog_posts": 15}."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT section, MAX(version) AS version FROM content_versions GROUP BY section"
+        )
+        rows = await cursor.fetchall()
+        return {row["section"]: row["version"] for row in rows}
+    finally:
+        await db.close()
+
+
+async def get_content_changes(since: int) -> "list[dict]":
+    """since dan keyin o'zgargan elementlar: [{"section", "item_key", "version", "deleted"}]."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT section, item_key, version, deleted FROM content_versions
+               WHERE version > ? ORDER BY version""",
+            (since,),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+# ─── Scheduled publishing operations ─────────────────────────────────────────
+# Vaqtlar UTC da, CURRENT_TIMESTAMP formatida saqlanadi: "YYYY-MM-DD HH:MM:SS"
+
+async def schedule_blog_post(
+    post_id: int, publish_at: "str | None" = None, unpublish_at: "str | None" = None, clear: bool = False,
+) -> bool:
+    """
+    Blog postni vaqtga belgilash. Kelajakdagi publish_at berilsa post hozircha yashiriladi.
+    Faqat berilgan vaqt yoziladi (None — o'zgarmaydi); clear=True — jadval tozalanadi.
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """UPDATE blog_posts
+               SET publish_at = CASE WHEN ? THEN NULL ELSE COALESCE(?, publish_at) END,
+                   unpublish_at = CASE WHEN ? THEN NULL ELSE COALESCE(?, unpublish_at) END,
+                   is_published = CASE
+                       WHEN ? IS NOT NULL AND ? > datetime('now') THEN 0
+                       ELSE is_published
+                   END,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            (clear, publish_at, clear, unpublish_at, publish_at, publish_at, post_id),
+        )
+        if cursor.rowcount == 0:
+            await db.rollback()
+            return False
+        version = await _bump_content_version(db, "blog_posts", post_id)
+        await db.commit()
+        notify_content_changed("blog", version=version)
+        return True
+    finally:
+        await db.close()
+
+
+async def schedule_site_setting(key: str, value: str, run_at: str, created_by: "int | None" = None):
+    """Sozlama o'zgarishini vaqtga belgilash. Job ID qaytaradi."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """INSERT INTO scheduled_settings (key, value, run_at, created_by)
+               VALUES (?, ?, ?, ?)""",
+            (key, value, run_at, created_by),
+        )
+        await db.commit()
+        return cursor.lastrowid
+    finally:
+        await db.close()
+
+
+async def cancel_scheduled_setting(job_id: int) -> bool:
+    """Hali bajarilmagan sozlama o'zgarishini bekor qilish."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "DELETE FROM scheduled_settings WHERE id = ? AND applied_at IS NULL",
+            (job_id,),
+        )
+        await db.commit()
+        return cursor.rowcount > 0
+    finally:
+        await db.close()
+
+
+async def get_scheduled_jobs() -> "list[dict]":
+    """Barcha kutilayotgan joblar (vaqt bo'yicha tartiblangan)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT 'publish' AS kind, id, title AS label, publish_at AS run_at
+                   FROM blog_posts WHERE publish_at IS NOT NULL
+               UNION ALL
+               SELECT 'unpublish', id, title, unpublish_at
+                   FROM blog_posts WHERE unpublish_at IS NOT NULL
+               UNION ALL
+               SELECT 'setting', id, key || ' = ' || value, run_at
+                   FROM scheduled_settings WHERE applied_at IS NULL
+               ORDER BY run_at"""
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def get_next_scheduled_time() -> "str | None":
+    """
+    Eng yaqin job vaqti. Har bir MIN() partial index orqali bitta qadamda topiladi —
+    jadvallar to'liq o'qilmaydi.
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT MIN(t) FROM (
+                   SELECT MIN(publish_at) AS t FROM blog_posts WHERE publish_at IS NOT NULL
+                   UNION ALL
+                   SELECT MIN(unpublish_at) FROM blog_posts WHERE unpublish_at IS NOT NULL
+                   UNION ALL
+                   SELECT MIN(run_at) FROM scheduled_settings WHERE applied_at IS NULL
+               )"""
+        )
+        row = await cursor.fetchone()
+        return row[0]
+    finally:
+        await db.close()
+
+
+async def run_due_scheduled_jobs() -> "set[str]":
+    """
+    Vaqti kelgan joblarni bitta tranzaksiyada bajarish.
+    O'zgargan bo'limlar (masalan {"blog", "settings"}) qaytariladi.
+    """
+    changed = set()
+    version = None
+    db = await get_db()
+    try:
+        for column, published in (("publish_at", 1), ("unpublish_at", 0)):
+            cursor = await db.execute(
+                f"""SELECT id FROM blog_posts
+                    WHERE {column} IS NOT NULL AND {column} <= datetime('now')"""
+            )
+            post_ids = [row["id"] for row in await cursor.fetchall()]
+            for post_id in post_ids:
+                await db.execute(
+                    f"""UPDATE blog_posts
+                        SET is_published = ?, {column} = NULL, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ?""",
+                    (published, post_id),
+                )
+                version = await _bump_content_version(db, "blog_posts", post_id)
+                changed.add("blog")
+
+        cursor = await db.execute(
+            """SELECT id, key, value FROM scheduled_settings
+               WHERE applied_at IS NULL AND run_at <= datetime('now')
+               ORDER BY run_at, id"""
+        )
+        jobs = await cursor.fetchall()
+        for job in jobs:
+            await db.execute(
+                "INSERT OR REPLACE INTO site_settings (key, value) VALUES (?, ?)",
+                (job["key"], job["value"]),
+            )
+            await db.execute(
+                "UPDATE scheduled_settings SET applied_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (job["id"],),
+            )
+            version = await _bump_content_version(db, "settings", job["key"])
+            changed.add("settings")
+
+        await db.commit()
+    finally:
+        await db.close()
+
+    if changed:
+        notify_content_changed(*changed, version=version)
+    return changed
+
+
+# ─── Outbound message queue operations ───────────────────────────────────────
+
+async def enqueue_outbound_messages(
+    chat_ids: "list[int]",
+    text: str,
+    parse_mode: "str | None" = None,
+    broadcast_id: "str | None" = None,
+) -> int:
+    """Xabarlarni navbatga qo'shish (bitta tranzaksiyada). Qo'shilganlar sonini qaytaradi."""
+    if not chat_ids:
+        return 0
+
+    db = await get_db()
+    try:
+        await db.executemany(
+            """INSERT INTO outbound_messages (chat_id, text, parse_mode, broadcast_id)
+               VALUES (?, ?, ?, ?)""",
+            [(chat_id, text, parse_mode, broadcast_id) for chat_id in chat_ids],
+        )
+        await db.commit()
+        return len(chat_ids)
+    finally:
+        await db.close()
+
+
+async def get_due_outbound_messages(limit: int = 100) -> "list[dict]":
+    """Yuborish vaqti kelgan xabarlar (eng eskisidan boshlab)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT id, chat_id, text, parse_mode, attempts FROM outbound_messages
+               WHERE status = 'pending' AND not_before <= ?
+               ORDER BY not_before, id
+               LIMIT ?""",
+            (time.time(), limit),
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def finish_outbound_messages(
+    sent_ids: "list[int]",
+    failed: "list[tuple[int, str]]",
+    retries: "list[tuple[int, float, str]]",
+):
+    """
+    Yuborish natijalarini bitta commit bilan saqlash.
+
+    sent_ids — yuborilgan xabarlar
+    failed — (id, xato) — boshqa urinilmaydi
+    retries — (id, not_before, xato) — keyinroq qayta urinish
+    """
+    if not sent_ids and not failed and not retries:
+        return
+
+    db = await get_db()
+    try:
+        await db.executemany(
+            """UPDATE outbound_messages
+               SET status = 'sent', attempts = attempts + 1, sent_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            [(message_id,) for message_id in sent_ids],
+        )
+        await db.executemany(
+            """UPDATE outbound_messages
+               SET status = 'failed', attempts = attempts + 1, last_error = ?
+               WHERE id = ?""",
+            [(error, message_id) for message_id, error in failed],
+        )
+        await db.executemany(
+            """UPDATE outbound_messages
+               SET attempts = attempts + 1, not_before = ?, last_error = ?
+               WHERE id = ?""",
+            [(not_before, error, message_id) for message_id, not_before, error in retries],
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def get_outbound_queue_stats() -> dict:
+    """Navbat holati: pending / sent / failed soni."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT status, COUNT(*) AS cnt FROM outbound_messages GROUP BY status"
+        )
+        rows = await cursor.fetchall()
+        stats = {"pending": 0, "sent": 0, "failed": 0}
+        for row in rows:
+            stats[row["status"]] = row["cnt"]
+        return stats
+    finally:
+        await db.close()
+
+
+# ─── Advice cache operations ─────────────────────────────────────────────────
+
+async def get_cached_advice(key: str) -> "dict | None":
+    """Muddati o'tmagan javob (LRU uchun last_used_at va hits yangilanadi)."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """UPDATE advice_cache SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+               WHERE key = ? AND expires_at > CURRENT_TIMESTAMP
+               RETURNING advice, provider""",
+            (key,),
+        )
+        row = await cursor.fetchone()
+        await db.commit()
+        return dict(row) if row else None
+    finally:
+        await db.close()
+
+
+async def put_cached_advice(key: str, request: dict, advice: str, provider: str, ttl_seconds: int, max_entries: int):
+    """Javobni saqlash; muddati o'tganlar va max_entries dan ortiqlari (eng kam ishlatilgan) o'chiriladi."""
+    db = await get_db()
+    try:
+        await db.execute(
+            """INSERT INTO advice_cache (key, request, advice, provider, expires_at)
+               VALUES (?, ?, ?, ?, datetime('now', ?))
+               ON CONFLICT (key) DO UPDATE SET
+                   advice = excluded.advice, provider = excluded.provider, hits = 0,
+                   created_at = CURRENT_TIMESTAMP, last_used_at = CURRENT_TIMESTAMP,
+                   expires_at = excluded.expires_at""",
+            (key, json.dumps(request, ensure_ascii=False, sort_keys=True), advice, provider, f"+{ttl_seconds} seconds"),
+        )
+        await db.execute("DELETE FROM advice_cache WHERE expires_at <= CURRENT_TIMESTAMP")
+        await db.execute(
+            """DELETE FROM advice_cache WHERE key IN (
+                   SELECT key FROM advice_cache ORDER BY last_used_at DESC, key
+                   LIMIT -1 OFFSET ?
+               )""",
+            (max_entries,),
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def get_advice_cache_stats() -> dict:
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS hits
+               FROM advice_cache WHERE expires_at > CURRENT_TIMESTAMP"""
+        )
+        return dict(await cursor.fetchone())
+    finally:
+        await db.close()
+
+
+# ─── Subscriber operations ───────────────────────────────────────────────────
+
+SUBSCRIBER_SEGMENTS = {
+    "all": "is_blocked = 0",
+    "active_7d": "is_blocked = 0 AND last_seen >= datetime('now', '-7 days')",
+    "active_30d": "is_blocked = 0 AND last_seen >= datetime('now', '-30 days')",
+    "inactive_30d": "is_blocked = 0 AND last_seen < datetime('now', '-30 days')",
+    "new_7d": "is_blocked = 0 AND first_seen >= datetime('now', '-7 days')",
+    "blocked": "is_blocked = 1",
+}
+
+
+async def upsert_subscribers(rows: "list[tuple]"):
+    """
+    Foydalanuvchilarni bitta tranzaksiyada qo'shish/yangilash.
+    rows: (telegram_id, username, full_name, language_code, first_seen, last_seen, interactions)
+    """
+    if not rows:
+        return
+
+    db = await get_db()
+    try:
+        await db.executemany(
+            """INSERT INTO subscribers
+                   (telegram_id, username, full_name, language_code,
+                    first_seen, last_seen, interactions, is_blocked)
+               VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+               ON CONFLICT(telegram_id) DO UPDATE SET
+                   username = excluded.username,
+                   full_name = excluded.full_name,
+                   language_code = COALESCE(excluded.language_code, language_code),
+                   last_seen = MAX(last_seen, excluded.last_seen),
+                   interactions = interactions + excluded.interactions,
+                   is_blocked = 0""",
+            rows,
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def mark_subscribers_blocked(telegram_ids: "list[int]"):
+    """Botni bloklagan foydalanuvchilarni belgilash (broadcast dan chiqariladi)."""
+    if not telegram_ids:
+        return
+
+    db = await get_db()
+    try:
+        await db.executemany(
+            "UPDATE subscribers SET is_blocked = 1 WHERE telegram_id = ?",
+            [(telegram_id,) for telegram_id in telegram_ids],
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def get_subscriber_stats() -> dict:
+    """Obunachilar statistikasi."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            """SELECT
+                   COUNT(*) AS total,
+                   COALESCE(SUM(is_blocked), 0) AS blocked,
+                   COALESCE(SUM(is_blocked = 0 AND last_seen >= datetime('now', '-1 day')), 0) AS active_1d,
+                   COALESCE(SUM(is_blocked = 0 AND last_seen >= datetime('now', '-7 days')), 0) AS active_7d,
+                   COALESCE(SUM(is_blocked = 0 AND last_seen >= datetime('now', '-30 days')), 0) AS active_30d,
+                   COALESCE(SUM(first_seen >= datetime('now', '-7 days')), 0) AS new_7d
+               FROM subscribers"""
+        )
+        row = await cursor.fetchone()
+        return dict(row)
+    finally:
+        await db.close()
+
+
+async def get_subscribers_segment(segment: str = "all") -> "list[dict]":
+    """Segment bo'yicha obunachilar ro'yxati (eksport uchun)."""
+    where = SUBSCRIBER_SEGMENTS[segment]
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            f"""SELECT telegram_id, username, full_name, language_code,
+                       first_seen, last_seen, interactions, is_blocked
+                FROM subscribers WHERE {where}
+                ORDER BY last_seen DESC"""
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        await db.close()
+
+
+async def get_broadcast_recipients() -> "list[int]":
+    """Broadcast qabul qiluvchilar — botni bloklamagan barcha obunachilar."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT telegram_id FROM subscribers WHERE is_blocked = 0 ORDER BY telegram_id"
+        )
+        rows = await cursor.fetchall()
+        return [row["telegram_id"] for row in rows]
+    finally:
+        await db.close()
+
+
+# ─── Bot persistence operations ──────────────────────────────────────────────
+
+async def get_persistence_rows(kind: str) -> "list[tuple[str, str]]":
+    """Bir turdagi saqlangan bot holati: (key, data_json) ro'yxati."""
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT key, data FROM bot_persistence WHERE kind = ?",
+            (kind,),
+        )
+        rows = await cursor.fetchall()
+        return [(row["key"], row["data"]) for row in rows]
+    finally:
+        await db.close()
+
+
+async def save_persistence_rows(
+    upserts: "list[tuple[str, str, str]]",
+    deletes: "list[tuple[str, str]]",
+):
+    """
+    Bot holatidagi o'zgarishlarni bitta tranzaksiyada yozish.
+    upserts: (kind, key, data_json), deletes: (kind, key)
+    """
+    if not upserts and not deletes:
+        return
+
+    db = await get_db()
+    try:
+        await db.executemany(
+            """INSERT OR REPLACE INTO bot_persistence (kind, key, data, updated_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)""",
+            upserts,
+        )
+        await db.executemany(
+            "DELETE FROM bot_persistence WHERE kind = ? AND key = ?",
+            deletes,
+        )
+        await db.commit()
+    finally:
+        await db.close()
@@ -0,0 +1,247 @@
+"""
+Health — liveness va readiness probe lari uchun fon tekshiruvlari.
+
+/health/ready load balancer uchun: bu instance ga trafik yuborish mumkinmi.
+Probe so'rovlari hech narsani o'lchamaydi — fon task har HEALTH_CHECK_INTERVAL
+soniyada tekshiruvlarni bajarib, natijani saqlaydi, endpoint shuni qaytaradi:
+
+  - storage: baza probe (SQLite — o'qish + yozish qulfi, PostgreSQL —
+    SELECT 1) kechikishi, HEALTH_DB_TIMEOUT_MS dan oshsa xato. Probe osilib
+    qolsa keyingisi boshlanmaydi — osilgan probe ham xato hisoblanadi.
+    PostgreSQL pool bandligi HEALTH_MAX_SATURATION dan oshsa — xato
+  - loop: event loop kechikishi — alohida task har LAG_TICK da uxlaydi,
+    kechikib uyg'onishi o'lchanadi (oraliqdagi eng kattasi)
+  - queues: buyurtmalar navbati to'lishi
+  - analytics: statistika buferi to'lishi (faqat ma'lumot — bufer public
+    POST lar bilan to'ladi, readiness ga ta'sir qilmaydi)
+  - cache: asosiy kontent va katalog keshlari isitilganmi (faqat ma'lumot,
+    readiness ga ta'sir qilmaydi)
+  - bot: updater ishlayaptimi, update navbati to'lishi
+
+storage va loop doim; queues, analytics va cache — API rejimida, bot — bot ishga
+tushgan bo'lsa (main.py qo'shadi).
+
+To'xtash boshlansa (set_draining) readiness darhol 503 "draining" —
+load balancer instance ni ro'yxatdan chiqaradi, liveness esa 200 qoladi.
+
+/health/live — jarayon tirikmi: fon tekshiruvlar to'xtamagan bo'lsa 200.
+Event loop butunlay qotib qolsa endpoint javob bermaydi — bu ham signal.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Union
+
+from analytics import analytics
+from config import (
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_DB_TIMEOUT_MS,
+    HEALTH_MAX_LOOP_LAG_MS,
+    HEALTH_MAX_ORDER_QUEUE,
+    HEALTH_MAX_SATURATION,
+    HEALTH_STALE_AFTER,
+)
+from content_cache import is_warm
+from orders import order_writer
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+# Event loop kechikishini o'lchash qadami (soniya)
+LAG_TICK = 0.1
+# Isitilgan bo'lishi kerak kalitlar (asosiy til)
+WARM_KEYS = ("settings", "page:about", "page:delivery", "blog", "catalog")
+
+CheckResult = dict
+Check = Callable[[], Union[CheckResult, Awaitable[CheckResult]]]
+
+
+def saturation(used: int, capacity: int) -> float:
+    return round(used / capacity, 3) if capacity else 0.0
+
+
+# ─── Checks ──────────────────────────────────────────────────────────────────
+
+class StorageCheck:
+    """Baza probe — alohida taskda; osilib qolsa keyingi tekshiruvlar uni kutmaydi."""
+
+    def __init__(self, timeout_ms: float = HEALTH_DB_TIMEOUT_MS):
+        self.timeout = timeout_ms / 1000
+        self._probe: Optional[asyncio.Task] = None
+        self._probe_started = 0.0
+
+    async def __call__(self) -> CheckResult:
+        if self._probe is not None and not self._probe.done():
+            stuck_ms = round((time.perf_counter() - self._probe_started) * 1000)
+            return {"ok": False, "error": f"oldingi probe {stuck_ms} ms dan beri tugamagan"}
+
+        self._probe_started = time.perf_counter()
+        self._probe = asyncio.create_task(storage.ping())
+        # Kechikib tugagan probe xatosi keyinroq o'qilmaydi — "never retrieved" ogohlantirishisiz
+        self._probe.add_done_callback(lambda task: task.cancelled() or task.exception())
+        done, _ = await asyncio.wait({self._probe}, timeout=self.timeout)
+        latency_ms = round((time.perf_counter() - self._probe_started) * 1000, 2)
+        if not done:
+            return {"ok": False, "backend": storage.name, "latency_ms": latency_ms, "error": "timeout"}
+
+        info = self._probe.result()
+        result = {"ok": True, "backend": storage.name, "latency_ms": latency_ms}
+        pool = info.get("pool")
+        if pool:
+            used = pool["size"] - pool["idle"]
+            result["pool"] = {**pool, "saturation": saturation(used, pool["max"])}
+            if result["pool"]["saturation"] >= HEALTH_MAX_SATURATION:
+                result["ok"] = False
+                result["error"] = "pool band"
+        return result
+
+
+def check_queues() -> CheckResult:
+    orders_queued = order_writer.stats()["queued"]
+    return {"ok": orders_queued < HEALTH_MAX_ORDER_QUEUE, "orders_queued": orders_queued}
+
+
+def check_analytics() -> CheckResult:
+    pending = analytics.stats()["pending_keys"]
+    analytics_saturation = saturation(pending, analytics.max_pending)
+    return {"ok": analytics_saturation < HEALTH_MAX_SATURATION, "pending": pending, "saturation": analytics_saturation}
+
+
+def check_cache() -> CheckResult:
+    warm = [key for key in WARM_KEYS if is_warm(key)]
+    return {"ok": True, "warm": len(warm), "total": len(WARM_KEYS), "cold": [key for key in WARM_KEYS if key not in warm]}
+
+
+# ─── Monitor ─────────────────────────────────────────────────────────────────
+
+class HealthMonitor:
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL):
+        self.interval = interval
+        # nom → (tekshiruv, readiness ga ta'sir qiladimi)
+        self._checks: "dict[str, tuple[Check, bool]]" = {}
+        self._report: Optional[dict] = None
+        self._checked_at = 0.0
+        self._started_at = time.monotonic()
+        self._ready: Optional[bool] = None
+        self._draining = False
+        self._max_lag = 0.0
+        self._last_tick = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def add_check(self, name: str, check: Check, required: bool = True):
+        self._checks[name] = (check, required)
+
+    def remove_check(self, name: str):
+        self._checks.pop(name, None)
+
+    # ── Background ──
+
+    async def check_now(self) -> dict:
+        """Barcha tekshiruvlarni bajarib, natijani saqlash."""
+        lag_ms = round(self._max_lag * 1000, 1)
+        self._max_lag = 0.0
+        names = list(self._checks)
+        results = await asyncio.gather(*(self._run_check(self._checks[name][0]) for name in names))
+        checks = dict(zip(names, results))
+        checks["loop"] = {"ok": lag_ms < HEALTH_MAX_LOOP_LAG_MS, "lag_ms": lag_ms}
+
+        failing = sorted(
+            name for name, result in checks.items()
+            if not result["ok"] and self._checks.get(name, (None, True))[1]
+        )
+        self._report = {"ready": not failing, "failing": failing, "checks": checks}
+        self._checked_at = time.monotonic()
+
+        if self._ready is not None and self._ready != (not failing):
+            if failing:
+                logger.warning(
+                    "Instance tayyor emas: %s", ", ".join(failing),
+                    extra={"event": "health.not_ready", "failing": failing, "checks": checks},
+                )
+            else:
+                logger.info("Instance yana tayyor", extra={"event": "health.ready"})
+        self._ready = not failing
+        return self._report
+
+    @staticmethod
+    async def _run_check(check: Check) -> CheckResult:
+        try:
+            result = check()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+
+    # ── Probes ──
+
+    def liveness(self) -> "tuple[bool, dict]":
+        age = time.monotonic() - self._last_tick
+        alive = self._lag_task is None or (not self._lag_task.done() and age < HEALTH_STALE_AFTER)
+        return alive, {
+            "status": "alive" if alive else "stalled",
+            "uptime_s": round(time.monotonic() - self._started_at),
+            "last_tick_s": round(age, 2),
+        }
+
+    def set_draining(self):
+        """To'xtash boshlandi — readiness endi doim "draining" (stop() dan keyin ham)."""
+        self._draining = True
+
+    def readiness(self) -> "tuple[bool, dict]":
+        if self._draining:
+            return False, {"status": "draining"}
+        if self._report is None:
+            return False, {"status": "starting"}
+        age = time.monotonic() - self._checked_at
+        ready = self._report["ready"] and age < HEALTH_STALE_AFTER
+        status = "ready" if ready else ("stale" if self._report["ready"] else "not_ready")
+        return ready, {"status": status, "age_s": round(age, 2), **self._report}
+
+    # ── Lifecycle ──
+
+    def start(self):
+        if self._task is None:
+            self._draining = False
+            self._last_tick = time.monotonic()
+            self._lag_task = asyncio.create_task(self._measure_lag())
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._lag_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._lag_task = None
+        self._report = None
+        self._ready = None
+
+    async def _measure_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_TICK)
+            self._max_lag = max(self._max_lag, loop.time() - started - LAG_TICK)
+            self._last_tick = time.monotonic()
+
+    async def _run(self):
+        # Birinchi natija — start() dan oldin main.py da (check_now)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_now()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Sog'liq tekshiruvi xatosi: %s", e, extra={"event": "health.error"})
+
+
+health_monitor = HealthMonitor()
+health_monitor.add_check("storage", StorageCheck())
@@ -0,0 +1,51 @@
+"""
+HyperLogLog — noyob tashrif buyuruvchilarni taxminiy sanash.
+
+Har bir (mahsulot/post, kun) uchun 2^HLL_PRECISION baytlik registrlar
+saqlanadi (1 KB, xato ~3%). Ikki sketch ni birlashtirish — registrlarning
+elementma-element maksimumi, shuning uchun bir necha kun yoki bir necha
+API node ning sketchlari yo'qotishsiz qo'shiladi.
+"""
+
+import hashlib
+
+import numpy as np
+
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+_WIDTH = 64 - HLL_PRECISION
+
+
+def new_sketch() -> bytearray:
+    return bytearray(HLL_REGISTERS)
+
+
+def add(sketch: bytearray, value: str):
+    digest = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+    index = digest >> _WIDTH
+    rest = digest & ((1 << _WIDTH) - 1)
+    # Birinchi 1 bitning o'rni (rest = 0 bo'lsa — eng katta qiymat)
+    rank = _WIDTH - rest.bit_length() + 1
+    if rank > sketch[index]:
+        sketch[index] = rank
+
+
+def merge(*sketches: "bytes | bytearray | None") -> bytes:
+    registers = np.zeros(HLL_REGISTERS, dtype=np.uint8)
+    for sketch in sketches:
+        if sketch:
+            np.maximum(registers, np.frombuffer(sketch, dtype=np.uint8), out=registers)
+    return registers.tobytes()
+
+
+def estimate(sketch: "bytes | bytearray | None") -> int:
+    if not sketch:
+        return 0
+    registers = np.frombuffer(sketch, dtype=np.uint8)
+    raw = _ALPHA * HLL_REGISTERS ** 2 / np.sum(np.ldexp(1.0, -registers.astype(np.int32)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * HLL_REGISTERS and zeros:
+        # Kichik sonlar uchun linear counting aniqroq
+        return round(HLL_REGISTERS * np.log(HLL_REGISTERS / zeros))
+    return round(float(raw))
@@ -0,0 +1,107 @@
+"""
+Inventory — ombor qoldig'i: xotiradagi ko'rinish va bronlarni tozalash.
+
+Yozish tomoni (storage):
+  - buyurtma: STOCK_TAKE_SQL — tekshirish va yechish bitta UPDATE da
+    (WHERE stock - reserved >= miqdor), o'qib-keyin-yozish poygasi yo'q
+  - checkout broni: reserved oshiriladi, stock_reservations da muddati bilan
+  - bot: /stock — ko'plab mahsulot qoldig'ini bir tranzaksiyada o'zgartirish
+
+O'qish tomoni (bu modul):
+  - inventory.availability() — {product_id: sotuvga tayyor yoki None}
+    bitta SELECT bilan olinadi va INVENTORY_CACHE_TTL soniya saqlanadi.
+    Shu jarayondagi yozishlardan keyin invalidate() — darhol yangilanadi.
+    Bir vaqtda kelgan so'rovlar bitta yangilanishni kutadi (stampede yo'q).
+  - fon task har RESERVATION_SWEEP_INTERVAL soniyada muddati o'tgan
+    bronlarni qaytaradi (storage.expire_reservations).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from config import INVENTORY_CACHE_TTL, RESERVATION_SWEEP_INTERVAL
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+def available_quantity(stock: "int | None", reserved: int) -> "int | None":
+    """Sotuvga tayyor miqdor. None — qoldiq kuzatilmaydi (cheklanmagan)."""
+    if stock is None:
+        return None
+    return max(stock - reserved, 0)
+
+
+class Inventory:
+    def __init__(self, ttl: float = INVENTORY_CACHE_TTL):
+        self.ttl = ttl
+        self._view: "dict[int, int | None]" = {}
+        self._loaded_at = float("-inf")
+        self._generation = 0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self.expired_total = 0
+
+    # ── Availability view ──
+
+    async def availability(self) -> "dict[int, int | None]":
+        if time.monotonic() - self._loaded_at < self.ttl:
+            return self._view
+        if self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._refresh())
+        return await asyncio.shield(self._refreshing)
+
+    async def _refresh(self) -> "dict[int, int | None]":
+        generation = self._generation
+        try:
+            rows = await storage.get_stock_levels()
+            self._view = {row["id"]: available_quantity(row["stock"], row["reserved"]) for row in rows}
+            # O'qish davomida shu jarayonda yozish bo'lgan bo'lsa — keyingi so'rov qayta o'qiydi
+            if generation == self._generation:
+                self._loaded_at = time.monotonic()
+            return self._view
+        finally:
+            self._refreshing = None
+
+    def invalidate(self):
+        """Qoldiq o'zgardi (buyurtma, bron, /stock)."""
+        self._generation += 1
+        self._loaded_at = float("-inf")
+
+    # ── Reservation sweeper ──
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def sweep(self) -> int:
+        expired = await storage.expire_reservations()
+        if expired:
+            self.expired_total += expired
+            self.invalidate()
+        return expired
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Bronlarni tozalashda xato: %s", e, extra={"event": "inventory.error"})
+            await asyncio.sleep(RESERVATION_SWEEP_INTERVAL)
+
+
+inventory = Inventory()
@@ -0,0 +1,125 @@
+"""
+Locales — kontent tarjimalari: til tanlash, qaytish zanjiri va qo'llash.
+
+Asosiy til (DEFAULT_LOCALE) matnlari bazadagi asosiy ustunlarda qoladi;
+boshqa tillar content_translations jadvalida maydon bo'yicha saqlanadi:
+(entity_type, entity_key, locale, field) → value. Javob qurilganda har
+bir maydon uchun zanjirdagi birinchi mavjud tarjima olinadi, topilmasa —
+asosiy qiymat (ru → uz; LOCALE_FALLBACKS bilan en → ru → uz).
+
+Kesh va versiyalar tillar bo'yicha alohida:
+  - content_cache kaliti "<kalit>:<til>" (asosiy tilda eski kalit), bog'liq
+    bo'limlari — asosiy bo'lim va zanjirdagi har bir "<bo'lim>:<til>".
+    ru tarjimasi o'zgarsa faqat ru (va zanjirida ru bor tillar) javoblari
+    qayta quriladi; asosiy matn o'zgarsa — hammasi
+  - content_versions da tarjima elementi "<kalit>@<til>" — delta sync
+    (/api/content/changes?lang=) boshqa tillarning o'zgarishlarini o'tkazib
+    yuboradi
+"""
+
+import json
+
+from config import DEFAULT_LOCALE, LOCALE_FALLBACKS, SUPPORTED_LOCALES
+
+# entity_type → tarjima qilinadigan maydonlar (None — har qanday: sahifa JSON kalitlari)
+TRANSLATABLE_FIELDS: "dict[str, set[str] | None]" = {
+    "settings": {"value"},
+    "pages": None,
+    "blog_posts": {"title", "excerpt", "content"},
+    "products": {"title", "description"},
+}
+# Tarjimasi bor sozlamalar (telefon, linklar va raqamlar tilga bog'liq emas)
+TRANSLATABLE_SETTINGS = {"address", "working_hours", "promo_banner_text", "site_description"}
+
+
+def normalize_locale(lang: "str | None") -> str:
+    """"ru", "ru-RU", "RU_ru" → "ru". Qo'llab-quvvatlanmagan yoki bo'sh — DEFAULT_LOCALE."""
+    if not lang:
+        return DEFAULT_LOCALE
+    code = lang.strip().lower().replace("_", "-").split("-")[0]
+    return code if code in SUPPORTED_LOCALES else DEFAULT_LOCALE
+
+
+def parse_locale(token: "str | None") -> "str | None":
+    """Bot argumenti tilmi? Faqat aniq kod ("ru") — aks holda None."""
+    code = (token or "").strip().lower()
+    return code if code in SUPPORTED_LOCALES else None
+
+
+def locale_chain(locale: str) -> "list[str]":
+    """Qidirish tartibi: til, uning LOCALE_FALLBACKS lari, oxirida DEFAULT_LOCALE."""
+    chain = []
+    for code in (locale, *LOCALE_FALLBACKS.get(locale, []), DEFAULT_LOCALE):
+        if code in SUPPORTED_LOCALES and code not in chain:
+            chain.append(code)
+    return chain
+
+
+def translation_chain(locale: str) -> "list[str]":
+    """Zanjirning tarjimalar jadvalidan o'qiladigan qismi (asosiy tilsiz)."""
+    return [code for code in locale_chain(locale) if code != DEFAULT_LOCALE]
+
+
+def cache_key(key: str, locale: str) -> str:
+    return key if locale == DEFAULT_LOCALE else f"{key}:{locale}"
+
+
+def cache_sections(section: str, locale: str) -> "set[str]":
+    """Shu tildagi javob qaysi bo'limlar o'zgarsa eskiradi."""
+    return {section} | {f"{section}:{code}" for code in translation_chain(locale)}
+
+
+def entity_cache_section(entity_type: str, entity_key: str) -> str:
+    """content_cache bo'limi (pages uchun sahifa nomi — content_watcher bilan bir xil)."""
+    if entity_type == "pages":
+        return entity_key
+    return {"settings": "settings", "blog_posts": "blog", "products": "catalog"}.get(entity_type, entity_type)
+
+
+def version_key(entity_key, locale: str) -> str:
+    return f"{entity_key}@{locale}"
+
+
+def split_version_key(item_key: str) -> "tuple[str, str | None]":
+    """content_versions.item_key → (kalit, til yoki None — asosiy matn)."""
+    key, _, locale = item_key.partition("@")
+    return key, locale or None
+
+
+def changed_cache_section(section: str, item_key: str) -> str:
+    """content_versions yozuvi → tozalanadigan content_cache bo'limi."""
+    key, locale = split_version_key(item_key)
+    cache_section = entity_cache_section(section, key)
+    return f"{cache_section}:{locale}" if locale else cache_section
+
+
+def apply_translations(item: dict, by_locale: "dict[str, dict[str, str]] | None", locale: str, decode: bool = False) -> dict:
+    """
+    Element nusxasi — har maydon zanjirdagi birinchi tarjimadan.
+    Tarjima yo'q bo'lsa o'sha obyekt qaytadi (nusxa olinmaydi).
+    decode — qiymatlar JSON (sahifa maydonlari).
+    """
+    if not by_locale:
+        return item
+    localized = None
+    for code in reversed(translation_chain(locale)):
+        fields = by_locale.get(code)
+        if not fields:
+            continue
+        if localized is None:
+            localized = dict(item)
+        for field, value in fields.items():
+            localized[field] = json.loads(value) if decode else value
+    return item if localized is None else localized
+
+
+def validate_translation(entity_type: str, locale: str, fields: "dict[str, str | None]"):
+    """Storage yozishdan oldin: noto'g'ri til yoki maydon — ValueError."""
+    if locale not in SUPPORTED_LOCALES or locale == DEFAULT_LOCALE:
+        raise ValueError(f"Tarjima tili emas: {locale}")
+    if entity_type not in TRANSLATABLE_FIELDS:
+        raise ValueError(f"Noma'lum tarjima turi: {entity_type}")
+    allowed = TRANSLATABLE_FIELDS[entity_type]
+    unknown = [field for field in fields if allowed is not None and field not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"Tarjima qilinmaydigan maydon: {', '.join(unknown) or '—'}")
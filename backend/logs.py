@@ -0,0 +1,257 @@
+"""
+Logs — strukturalangan (JSON) loglar, alohida threadda yoziladi.
+
+print() sekin stdout pipe da event loop ni to'xtatib qo'yadi va natijani
+so'rab (grep/jq) bo'lmaydi. Bu yerda:
+
+  - har bir yozuv — bitta qator JSON: ts, level, logger, msg, event va
+    extra={...} bilan berilgan maydonlar (LOG_FORMAT=text — lokal o'qish uchun)
+  - root logger da faqat QueueHandler: chaqiruvchi faqat yozuvni navbatga
+    qo'yadi (formatlash va yozish — QueueListener threadida). Navbat
+    LOG_QUEUE_SIZE ga yetsa yozuv tashlanadi va sanaladi — log hech qachon
+    so'rovni kutdirmaydi
+  - korrelyatsiya: HTTP so'rov (request_id, X-Request-ID sarlavhasi) va bot
+    update (update_id) contextvars da — shu so'rov/update ichidagi har bir
+    log yozuviga avtomatik qo'shiladi
+  - sampling: ko'p takrorlanadigan hodisalar (LOG_SAMPLE_RATES, masalan
+    http.request) ulush bo'yicha yoziladi, yozuvda sample_rate bor.
+    WARNING va undan yuqori, extra={"sample": 1} bilan berilganlar doim yoziladi
+
+Modullar oddiy logging ishlatadi:
+    logger = logging.getLogger(__name__)
+    logger.info("Buyurtma yozildi", extra={"event": "order.saved", "order_id": 12})
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from config import CONFIG_WARNINGS, LOG_FORMAT, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES, LOG_SLOW_MS
+
+request_id_var: "contextvars.ContextVar[str | None]" = contextvars.ContextVar("request_id", default=None)
+update_id_var: "contextvars.ContextVar[int | None]" = contextvars.ContextVar("update_id", default=None)
+
+# Shovqinli kutubxonalar (httpx har bir getUpdates ni INFO da yozadi)
+QUIET_LOGGERS = {"httpx": logging.WARNING, "httpcore": logging.WARNING, "telegram.ext": logging.INFO}
+# Mijoz yuborgan X-Request-ID faqat shu ko'rinishda qabul qilinadi
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_RESERVED = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName", "sample"}
+_CORRELATION = ("request_id", "update_id")
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("http")
+
+
+# ─── Records ─────────────────────────────────────────────────────────────────
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        tags = " ".join(f"{key}={getattr(record, key)}" for key in _CORRELATION if getattr(record, key, None))
+        return f"{line} [{tags}]" if tags else line
+
+
+class ContextFilter(logging.Filter):
+    """Chaqiruvchi kontekstida: korrelyatsiya ID lari va sampling."""
+
+    def __init__(self, rates: "dict[str, float]"):
+        super().__init__()
+        self.rates = rates
+        self._counters: "dict[str, itertools.count]" = {}
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rate = getattr(record, "sample", None)
+        if rate is None and event is not None:
+            rate = self.rates.get(event)
+        if rate is not None and rate < 1 and record.levelno < logging.WARNING:
+            # Deterministik: har round(1/rate) tadan bittasi (tasodifiy emas — takrorlanadigan)
+            counter = self._counters.get(event)
+            if counter is None:
+                counter = self._counters[event] = itertools.count()
+            if rate <= 0 or next(counter) % max(1, round(1 / rate)):
+                self.sampled_out += 1
+                return False
+            record.sample_rate = rate
+        record.request_id = request_id_var.get()
+        record.update_id = update_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Navbat to'lsa kutmaydi — yozuv tashlanadi va keyingi yozuv bilan soni xabar qilinadi."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Matn va traceback shu yerda (argumentlar keyin o'zgarishi mumkin); JSON — listener threadida
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(self._dropped_record())
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        record = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            f"Log navbati to'lgan: {self._unreported} ta yozuv tashlandi", None, None,
+        )
+        record.event = "log.dropped"
+        record.dropped = self._unreported
+        return record
+
+
+# ─── Setup ───────────────────────────────────────────────────────────────────
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_filter: Optional[ContextFilter] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """Root logger ni sozlash (bir marta; takroriy chaqiruv hech narsa qilmaydi)."""
+    global _handler, _filter, _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _filter = ContextFilter(LOG_SAMPLE_RATES)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    for name, level in QUIET_LOGGERS.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    for warning in CONFIG_WARNINGS:
+        logging.getLogger("config").warning(warning, extra={"event": "config.invalid"})
+
+
+def shutdown_logging():
+    """Navbatdagi yozuvlarni yozib, listener threadni to'xtatish."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_stats() -> dict:
+    return {
+        "queued": 0 if _handler is None else _handler.queue.qsize(),
+        "dropped": 0 if _handler is None else _handler.dropped,
+        "sampled_out": 0 if _filter is None else _filter.sampled_out,
+    }
+
+
+# ─── Correlation ─────────────────────────────────────────────────────────────
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class RequestLogMiddleware:
+    """
+    ASGI middleware: har bir HTTP so'rovga request_id (mijozning X-Request-ID si
+    yoki yangi), javob sarlavhasida qaytariladi va http.request hodisasi yoziladi.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                request_id = candidate if REQUEST_ID_RE.match(candidate) else None
+                break
+        request_id = request_id or new_request_id()
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            access_logger.log(
+                logging.ERROR if status >= 500 else logging.INFO,
+                "%s %s %d", scope["method"], scope["path"], status,
+                extra={
+                    "event": "http.request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": duration_ms,
+                    # Xato va sekin javoblar sampling siz
+                    "sample": 1 if status >= 400 or duration_ms >= LOG_SLOW_MS else None,
+                },
+            )
+            request_id_var.reset(token)
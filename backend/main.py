@@ -4,6 +4,11 @@ ToyMix Backend — FastAPI server + Telegram Bot.
 Ishga tushirish:
     python main.py
 
+Rejimlar (RUN_MODE):
+    all — API + bot + fon xizmatlari (default)
+    api — faqat HTTP API, Telegram kutubxonalari umuman import qilinmaydi
+    bot — bot va fon xizmatlari (scheduler, backup, snapshot, maintenance)
+
 Yoki alohida:
     uvicorn main:app --host 0.0.0.0 --port 8000
 
@@ -12,137 +17,63 @@ Yoki alohida:
     SUPER_ADMIN_IDS=123456789
 """
 
-import asyncio
+# config, loglar va profiler birinchi — qolgan importlar vaqti ham o'lchanadi
+from config import (
+    API_HOST,
+    API_PORT,
+    CORS_ORIGINS,
+    DEFAULT_LOCALE,
+    RUN_MODE,
+    SHUTDOWN_BOT_TIMEOUT,
+    SHUTDOWN_CHECKPOINT_TIMEOUT,
+    SHUTDOWN_CLOSE_TIMEOUT,
+    SHUTDOWN_FLUSH_TIMEOUT,
+    SHUTDOWN_HTTP_TIMEOUT,
+    SNAPSHOT_AUTO_PUBLISH,
+)
+from logs import RequestLogMiddleware, setup_logging
+from startup_profiler import startup_profiler
+
+setup_logging()
+
+import logging
 import uvicorn
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from telegram.ext import ApplicationBuilder, CommandHandler
+from fastapi.responses import JSONResponse
 
-from config import BOT_TOKEN, API_HOST, API_PORT, CORS_ORIGINS
 from database import init_db
+from storage import storage
+from content_cache import set_content_version
+from content_events import content_events
+from content_watcher import content_watcher
+from health import check_analytics, check_cache, check_queues, health_monitor
 
 # API routes
-from api.content_routes import router as content_router
-
-# Bot handlers
-from bot.handlers_admin import (
-    myid_command,
-    add_admin_command,
-    remove_admin_command,
-    list_admins_command,
-)
-from bot.handlers_content import (
-    view_settings_command,
-    edit_settings_command,
-    edit_promo_command,
-    view_about_command,
-    edit_about_command,
-    view_delivery_command,
-    edit_delivery_command,
-    list_blogs_command,
-    edit_blog_command,
-    delete_blog_command,
-    admin_help_command,
-    get_blog_conversation_handler,
-)
-
-
-# ─── Telegram Bot Setup ─────────────────────────────────────────────────────
-
-bot_app = None
-
-
-def create_bot():
-    """Telegram bot ni yaratish va handlerlarni ro'yxatdan o'tkazish."""
-    global bot_app
-
-    if not BOT_TOKEN:
-        print("⚠️  BOT_TOKEN topilmadi. Bot ishga tushmaydi.")
-        print("   .env faylga BOT_TOKEN=your_token qo'shing.")
-        return None
-
-    builder = ApplicationBuilder().token(BOT_TOKEN)
-    bot_app = builder.build()
-
-    # ── Umumiy komandalar (hammaga ochiq) ──
-    bot_app.add_handler(CommandHandler("myid", myid_command))
-    bot_app.add_handler(CommandHandler("start", start_command))
-    bot_app.add_handler(CommandHandler("help", help_command))
-
-    # ── Admin boshqaruv komandlari (super admin only) ──
-    bot_app.add_handler(CommandHandler("add_admin", add_admin_command))
-    bot_app.add_handler(CommandHandler("remove_admin", remove_admin_command))
-
-    # ── Admin komandalar (admin only) ──
-    bot_app.add_handler(CommandHandler("admins", list_admins_command))
-    bot_app.add_handler(CommandHandler("admin_help", admin_help_command))
-
-    # ── Sayt sozlamalari (admin only) ──
-    bot_app.add_handler(CommandHandler("settings", view_settings_command))
-    bot_app.add_handler(CommandHandler("edit_settings", edit_settings_command))
-    bot_app.add_handler(CommandHandler("edit_promo", edit_promo_command))
-
-    # ── About sahifasi (admin only) ──
-    bot_app.add_handler(CommandHandler("view_about", view_about_command))
-    bot_app.add_handler(CommandHandler("edit_about", edit_about_command))
-
-    # ── Delivery sahifasi (admin only) ──
-    bot_app.add_handler(CommandHandler("view_delivery", view_delivery_command))
-    bot_app.add_handler(CommandHandler("edit_delivery", edit_delivery_command))
-
-    # ── Blog (admin only, conversation handler) ──
-    bot_app.add_handler(get_blog_conversation_handler())
-    bot_app.add_handler(CommandHandler("blogs", list_blogs_command))
-    bot_app.add_handler(CommandHandler("edit_blog", edit_blog_command))
-    bot_app.add_handler(CommandHandler("delete_blog", delete_blog_command))
-
-    return bot_app
-
-
-async def start_command(update, context):
-    """Bot /start komandasi."""
-    user = update.effective_user
-    from database import is_admin as check_admin
-    is_adm = await check_admin(user.id)
-
-    if is_adm:
-        await update.message.reply_text(
-            f"👋 Salom, {user.first_name}!\n\n"
-            f"🔧 Siz <b>admin</b> sifatida kirdingiz.\n"
-            f"Barcha komandalar: /admin_help\n\n"
-            f"Sayt sozlamalari: /settings\n"
-            f"Blog boshqaruvi: /blogs\n"
-            f"Biz haqimizda: /view_about\n"
-            f"Yetkazish: /view_delivery",
-            parse_mode="HTML",
-        )
-    else:
-        await update.message.reply_text(
-            f"👋 Salom, {user.first_name}!\n\n"
-            f"🧸 ToyMix — bolalar o'yinchoqlari do'koni botiga xush kelibsiz!\n\n"
-            f"📱 Saytimiz: toymix-14889.web.app\n"
-            f"📞 Bog'lanish uchun: /myid"
-        )
-
-
-async def help_command(update, context):
-    """Bot /help komandasi."""
-    user = update.effective_user
-    from database import is_admin as check_admin
-    is_adm = await check_admin(user.id)
-
-    text = "🧸 <b>ToyMix Bot</b>\n\n"
-    text += "/start — Botni boshlash\n"
-    text += "/myid — Telegram ID ni ko'rish\n"
-    text += "/help — Yordam\n"
-
-    if is_adm:
-        text += "\n🔧 <b>Admin komandalar:</b>\n"
-        text += "/admin_help — to'liq admin yordam\n"
-
-    await update.message.reply_text(text, parse_mode="HTML")
+from api.advice_routes import router as advice_router
+from api.analytics_routes import router as analytics_router
+from api.content_routes import content_payload, router as content_router
+from api.catalog_routes import router as catalog_router, warm_catalog
+from api.order_routes import router as order_router
+from advice import advice_service
+from analytics import analytics
+from inventory import inventory
+from orders import order_writer
+from rankings import rankings
+
+# Fon xizmatlari (Telegram ga bog'liq emas)
+from scheduler import content_scheduler
+from snapshot_publisher import snapshot_publisher
+from backup import backup_scheduler
+from maintenance import storage_maintenance
+from shutdown import GracefulServer, RequestTracker, shutdown_manager
+
+SERVES_API = RUN_MODE in ("all", "api")
+RUNS_BOT = RUN_MODE in ("all", "bot")
+
+logger = logging.getLogger(__name__)
 
 
 # ─── FastAPI Setup ───────────────────────────────────────────────────────────
@@ -151,37 +82,121 @@ async def help_command(update, context):
 async def lifespan(app: FastAPI):
     """FastAPI lifespan — startup va shutdown."""
     # Startup
-    print("🚀 ToyMix Backend ishga tushmoqda...")
-    await init_db()
-    print("✅ Database tayyor")
+    logger.info("ToyMix Backend ishga tushmoqda... (RUN_MODE=%s)", RUN_MODE, extra={"event": "app.starting", "run_mode": RUN_MODE})
+    with startup_profiler.phase("init_db"):
+        await storage.connect()
+        if storage.name != "sqlite":
+            # Botning mahalliy holati (navbat, obunachilar) doim SQLite da
+            await init_db()
+        set_content_version(await storage.get_content_version())
+    logger.info("Database tayyor (%s)", storage.name, extra={"event": "app.storage_ready", "storage": storage.name})
+
+    if SERVES_API:
+        order_writer.start()
+        # Muddati o'tgan bronlarni qaytarish (bir nechta node da ham xavfsiz)
+        inventory.start()
+        analytics.start()
+        # "Ommabop" ballarini bazadagi statistikadan davriy yangilash
+        rankings.start()
+        health_monitor.add_check("queues", check_queues)
+        health_monitor.add_check("analytics", check_analytics, required=False)
+        health_monitor.add_check("cache", check_cache, required=False)
+
+    # Bitta nusxada ishlashi kerak bo'lgan fon xizmatlari — bot jarayonida
+    if RUNS_BOT:
+        with startup_profiler.phase("background services"):
+            # Rejalashtirilgan nashrlar, backup va texnik xizmat
+            content_scheduler.start()
+            if SNAPSHOT_AUTO_PUBLISH:
+                snapshot_publisher.start()
+            backup_scheduler.start()
+            storage_maintenance.start()
+
+    # Alohida jarayonlarda (yoki umumiy PostgreSQL da) — boshqa jarayon/node
+    # qilgan o'zgarishlarni kuzatamiz
+    if RUN_MODE != "all" or storage.name != "sqlite":
+        content_watcher.start()
 
     # Telegram bot ni ishga tushirish (xato bo'lsa ham API ishlayveradi)
     bot_started = False
-    try:
-        bot = create_bot()
-        if bot:
-            await bot.initialize()
-            await bot.start()
-            await bot.updater.start_polling(drop_pending_updates=True)
-            bot_started = True
-            print("✅ Telegram bot ishga tushdi")
-    except Exception as e:
-        print(f"⚠️  Telegram bot ishga tushmadi: {e}")
-        print("   API server botsiz ishlaydi.")
-
-    yield
-
-    # Shutdown
-    if bot_started and bot_app:
+    if RUNS_BOT:
         try:
-            print("⏹ Telegram bot to'xtatilmoqda...")
-            await bot_app.updater.stop()
-            await bot_app.stop()
-            await bot_app.shutdown()
+            with startup_profiler.phase("bot import"):
+                from bot.app import start_bot
+            with startup_profiler.phase("bot start"):
+                bot_started = await start_bot()
+            if bot_started:
+                from bot.app import bot_health
+                health_monitor.add_check("bot", bot_health)
+                logger.info("Telegram bot ishga tushdi", extra={"event": "bot.started"})
         except Exception as e:
-            print(f"⚠️  Bot to'xtatishda xato: {e}")
+            logger.exception("Telegram bot ishga tushmadi: %s. API server botsiz ishlaydi", e, extra={"event": "bot.start_failed"})
+
+    if SERVES_API:
+        # Birinchi so'rovlar sovuq keshga tushmasin — readiness dan oldin isitiladi
+        with startup_profiler.phase("cache warmup"):
+            try:
+                await content_payload(DEFAULT_LOCALE)
+                await warm_catalog()
+            except Exception as e:
+                logger.warning("Keshni isitishda xato: %s", e, extra={"event": "app.warmup_failed"})
+
+    # Birinchi natija tayyor bo'lgach probe lar shu natijani qaytaradi, keyin — fon taskda
+    await health_monitor.check_now()
+    health_monitor.start()
+
+    startup_profiler.mark_ready()
+    startup_profiler.report()
 
-    print("👋 ToyMix Backend to'xtatildi")
+    yield
+
+    # Shutdown — bosqichlar tartib bilan, har biri o'z muddati bilan (shutdown.py)
+    async def stop_traffic():
+        shutdown_manager.begin_draining()
+        await health_monitor.stop()
+
+    async def drain_bot():
+        if bot_started:
+            logger.info("Telegram bot to'xtatilmoqda...", extra={"event": "bot.stopping"})
+            from bot.app import drain_bot
+            await drain_bot()
+
+    async def stop_bot():
+        if bot_started:
+            from bot.app import stop_bot
+            await stop_bot()
+
+    async def stop_services():
+        # Yangi ish boshlaydigan fon xizmatlari — buferlar yozilishidan oldin
+        await content_scheduler.stop()
+        await snapshot_publisher.stop()
+        await backup_scheduler.stop()
+        await storage_maintenance.stop()
+        await content_watcher.stop()
+        await rankings.stop()
+        await inventory.stop()
+        await advice_service.close()
+
+    async def flush_writes():
+        # Navbatdagi buyurtmalar va xotiradagi ko'rishlar statistikasi yozib bo'linadi
+        await order_writer.stop()
+        await analytics.stop()
+
+    async def checkpoint():
+        # WAL asosiy faylga o'tkazilib, qisqartiriladi (mahalliy SQLite doim bor)
+        await storage_maintenance.checkpoint(truncate=True)
+
+    await shutdown_manager.run([
+        ("traffic", SHUTDOWN_CLOSE_TIMEOUT, stop_traffic),
+        ("http", SHUTDOWN_HTTP_TIMEOUT, shutdown_manager.wait_for_requests),
+        ("bot", SHUTDOWN_BOT_TIMEOUT, drain_bot),
+        ("bot_stop", SHUTDOWN_CLOSE_TIMEOUT, stop_bot),
+        ("services", SHUTDOWN_FLUSH_TIMEOUT, stop_services),
+        ("writes", SHUTDOWN_FLUSH_TIMEOUT, flush_writes),
+        ("checkpoint", SHUTDOWN_CHECKPOINT_TIMEOUT, checkpoint),
+        ("storage", SHUTDOWN_CLOSE_TIMEOUT, storage.close),
+    ])
+    logger.info("ToyMix Backend to'xtatildi", extra={"event": "app.stopped"})
 
 
 app = FastAPI(
@@ -198,29 +213,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# request_id va http.request logi (CORS javoblari ham)
+app.add_middleware(RequestLogMiddleware)
+# Eng tashqi qatlam: bajarilayotgan so'rovlar soni — to'xtashda shular kutiladi
+app.add_middleware(RequestTracker)
+
+# To'xtash boshlanganda: readiness 503, SSE oqimlari yopiladi
+shutdown_manager.on_drain(health_monitor.set_draining)
+shutdown_manager.on_drain(content_events.close_all)
 
-# API routerlarni qo'shish
-app.include_router(content_router)
+# API routerlarni qo'shish (RUN_MODE=bot da faqat / va /health)
+if SERVES_API:
+    app.include_router(content_router)
+    app.include_router(catalog_router)
+    app.include_router(order_router)
+    app.include_router(advice_router)
+    app.include_router(analytics_router)
 
 
 @app.get("/")
 async def root():
-    return {"status": "ok", "service": "ToyMix API", "version": "1.0.0"}
+    return {"status": "ok", "service": "ToyMix API", "version": "1.0.0", "mode": RUN_MODE}
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness: jarayon va event loop tirikmi (qayta ishga tushirish uchun)."""
+    alive, report = health_monitor.liveness()
+    return JSONResponse(report, status_code=200 if alive else 503)
 
 
 @app.get("/health")
-async def health():
-    return {"status": "healthy"}
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: fon tekshiruvlarining oxirgi natijasi (load balancer uchun). /health — eski nom."""
+    ready, report = health_monitor.readiness()
+    return JSONResponse(report, status_code=200 if ready else 503)
 
 
 # ─── Entry Point ─────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    uvicorn.run(
+    # SIGTERM: readiness darhol 503, ulanishlar SHUTDOWN_DRAIN_DELAY dan keyin yopiladi
+    GracefulServer(uvicorn.Config(
         "main:app",
         host=API_HOST,
         port=API_PORT,
         reload=False,
-        log_level="info",
-    )
+        # uvicorn loglari root logger ga (JSON, navbat orqali); kirish logi — RequestLogMiddleware
+        log_config=None,
+        access_log=False,
+        # uvicorn lifespan dan oldin ochiq ulanishlarni shuncha kutadi
+        timeout_graceful_shutdown=SHUTDOWN_HTTP_TIMEOUT,
+    )).run()
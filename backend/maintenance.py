@@ -0,0 +1,238 @@
+"""
+Storage Maintenance — SQLite bazasiga fon rejimida texnik xizmat.
+
+database.get_db() har bir ulanishga sozlamalar profilini qo'llaydi
+(synchronous, cache_size, mmap_size, temp_store, busy_timeout). Bu modul esa
+vaqt o'tishi bilan yig'iladigan muammolarni bartaraf qiladi:
+
+  - WAL checkpoint: har SQLITE_CHECKPOINT_INTERVAL soniyada PASSIVE
+    (yozuvchilarni kutmaydi); WAL SQLITE_WAL_TRUNCATE_MB dan oshsa — TRUNCATE.
+    Katta WAL har bir o'qishni sekinlashtiradi.
+  - PRAGMA optimize: so'rov rejalashtiruvchisi uchun statistika (kerak bo'lsa
+    ANALYZE). Statistika umuman bo'lmasa — ishga tushganda to'liq ANALYZE.
+  - incremental_vacuum: o'chirilgan ma'lumotdan qolgan bo'sh sahifalar ulushi
+    SQLITE_VACUUM_FREE_RATIO dan oshsa, SQLITE_VACUUM_PAGES tadan qaytariladi.
+
+Yakuniy TRUNCATE checkpoint — to'xtashning checkpoint bosqichida (main.py,
+shutdown.py), API jarayonida ham.
+
+Holat /db_stats bot komandasi orqali ko'rinadi (get_storage_metrics).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from config import (
+    SQLITE_AUTO_VACUUM_MIGRATE_MAX_MB,
+    SQLITE_CHECKPOINT_INTERVAL,
+    SQLITE_OPTIMIZE_INTERVAL_HOURS,
+    SQLITE_VACUUM_FREE_RATIO,
+    SQLITE_VACUUM_PAGES,
+    SQLITE_WAL_TRUNCATE_MB,
+)
+from database import DB_PATH, get_db
+
+logger = logging.getLogger(__name__)
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+async def _pragma_value(db, name: str):
+    cursor = await db.execute(f"PRAGMA {name}")
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def get_storage_metrics() -> dict:
+    """Baza hajmi, WAL hajmi va fragmentatsiya."""
+    db = await get_db()
+    try:
+        page_size = await _pragma_value(db, "page_size")
+        page_count = await _pragma_value(db, "page_count")
+        freelist_count = await _pragma_value(db, "freelist_count")
+        auto_vacuum = await _pragma_value(db, "auto_vacuum")
+    finally:
+        await db.close()
+
+    metrics = {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "free_ratio": freelist_count / page_count if page_count else 0.0,
+        "auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}.get(auto_vacuum, str(auto_vacuum)),
+        "db_size": _file_size(DB_PATH),
+        "wal_size": _file_size(f"{DB_PATH}-wal"),
+    }
+    metrics.update(storage_maintenance.stats())
+    return metrics
+
+
+class StorageMaintenance:
+    """Checkpoint, optimize va vacuum ni jadval bo'yicha bajaradigan fon task."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._last_optimize = 0.0
+        self.last_checkpoint: Optional[dict] = None
+        self.last_optimize_at: Optional[float] = None
+        self.last_vacuum: Optional[dict] = None
+        self.runs = 0
+        self.errors = 0
+
+    def stats(self) -> dict:
+        return {
+            "last_checkpoint": self.last_checkpoint,
+            "last_optimize_at": self.last_optimize_at,
+            "last_vacuum": self.last_vacuum,
+            "maintenance_runs": self.runs,
+            "maintenance_errors": self.errors,
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def checkpoint(self, truncate: bool = False) -> dict:
+        mode = "TRUNCATE" if truncate else "PASSIVE"
+        started = time.monotonic()
+        db = await get_db()
+        try:
+            cursor = await db.execute(f"PRAGMA wal_checkpoint({mode})")
+            busy, log_frames, checkpointed = await cursor.fetchone()
+        finally:
+            await db.close()
+        self.last_checkpoint = {
+            "mode": mode,
+            "busy": bool(busy),
+            "log_frames": log_frames,
+            "checkpointed": checkpointed,
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "at": time.time(),
+        }
+        return self.last_checkpoint
+
+    async def optimize(self, full: bool = False):
+        """PRAGMA optimize (yoki statistika yo'q bo'lsa to'liq ANALYZE)."""
+        db = await get_db()
+        try:
+            if full:
+                await db.execute("ANALYZE")
+            else:
+                await db.execute("PRAGMA optimize")
+            await db.commit()
+        finally:
+            await db.close()
+        self._last_optimize = time.monotonic()
+        self.last_optimize_at = time.time()
+
+    async def incremental_vacuum(self, force: bool = False) -> "dict | None":
+        """Bo'sh sahifalar ko'p bo'lsa, ularni fayldan qaytarish (kichik bo'laklarda)."""
+        db = await get_db()
+        try:
+            if await _pragma_value(db, "auto_vacuum") != AUTO_VACUUM_INCREMENTAL:
+                return None
+            page_count = await _pragma_value(db, "page_count")
+            freelist = await _pragma_value(db, "freelist_count")
+            if not freelist or (not force and freelist < page_count * SQLITE_VACUUM_FREE_RATIO):
+                return None
+            started = time.monotonic()
+            # executescript — sqlite3_exec pragma ni oxirigacha bajaradi
+            # (oddiy execute faqat bitta qadam, ya'ni bitta sahifa qaytaradi)
+            await db.executescript(f"PRAGMA incremental_vacuum({SQLITE_VACUUM_PAGES});")
+            remaining = await _pragma_value(db, "freelist_count")
+        finally:
+            await db.close()
+
+        self.last_vacuum = {
+            "freed_pages": freelist - remaining,
+            "remaining_free": remaining,
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+            "at": time.time(),
+        }
+        return self.last_vacuum
+
+    async def _prepare(self):
+        """Ishga tushgandagi bir martalik ishlar."""
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            has_stats = await cursor.fetchone() is not None
+            auto_vacuum = await _pragma_value(db, "auto_vacuum")
+            size_mb = (await _pragma_value(db, "page_count")) * (await _pragma_value(db, "page_size")) / 1024 / 1024
+
+            if auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+                # Mavjud bazada auto_vacuum faqat VACUUM dan keyin o'zgaradi (bazani qayta yozadi)
+                if size_mb <= SQLITE_AUTO_VACUUM_MIGRATE_MAX_MB:
+                    await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    await db.execute("VACUUM")
+                    logger.info(
+                        "Baza auto_vacuum=INCREMENTAL ga o'tkazildi (%.1f MB)", size_mb,
+                        extra={"event": "maintenance.auto_vacuum", "size_mb": round(size_mb, 1)},
+                    )
+                else:
+                    logger.warning(
+                        "auto_vacuum=INCREMENTAL yoqilmadi: baza %.0f MB (chegara %.0f MB) — VACUUM ni qo'lda bajaring",
+                        size_mb, SQLITE_AUTO_VACUUM_MIGRATE_MAX_MB,
+                        extra={"event": "maintenance.auto_vacuum_skipped", "size_mb": round(size_mb, 1)},
+                    )
+        finally:
+            await db.close()
+
+        await self.optimize(full=not has_stats)
+
+    async def run_once(self):
+        """Bitta xizmat sikli: checkpoint, kerak bo'lsa optimize va vacuum."""
+        async with self._lock:
+            wal_mb = _file_size(f"{DB_PATH}-wal") / 1024 / 1024
+            await self.checkpoint(truncate=wal_mb >= SQLITE_WAL_TRUNCATE_MB)
+
+            if time.monotonic() - self._last_optimize >= SQLITE_OPTIMIZE_INTERVAL_HOURS * 3600:
+                await self.optimize()
+
+            await self.incremental_vacuum()
+            self.runs += 1
+
+    async def _run(self):
+        try:
+            await self._prepare()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            logger.exception("Baza texnik xizmatini tayyorlashda xato: %s", e, extra={"event": "maintenance.error"})
+
+        while True:
+            await asyncio.sleep(SQLITE_CHECKPOINT_INTERVAL)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.exception("Baza texnik xizmati xatosi: %s", e, extra={"event": "maintenance.error"})
+
+
+storage_maintenance = StorageMaintenance()
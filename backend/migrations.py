@@ -0,0 +1,483 @@
+"""
+Migrations — baza sxemasini versiyalar bo'yicha yangilash.
+
+Sxema versiyasi PRAGMA user_version da saqlanadi. init_db() har ishga
+tushganda apply_migrations() ni chaqiradi:
+
+  - baza oxirgi versiyada bo'lsa — bitta PRAGMA o'qiladi va hech qanday
+    DDL yoki seed bajarilmaydi (tez restart)
+  - aks holda yangi migratsiyalar tartib bilan, har biri o'z tranzaksiyasida
+    (BEGIN IMMEDIATE) bajariladi va user_version shu tranzaksiyada yoziladi
+
+Yangi migratsiya qo'shish — ro'yxat oxiriga yangi raqam bilan:
+
+    @migration(7, "mahsulotlarga sku ustuni")
+    async def _add_product_sku(db):
+        await ensure_column(db, "products", "sku", "TEXT")
+
+Katta jadvallarni to'ldirish (backfill) uchun backfill= funksiyasi beriladi:
+u sxema tranzaksiyasidan keyin backfill_in_batches() bilan kichik
+tranzaksiyalarda ishlaydi (o'quvchilar uzoq bloklanmaydi), user_version esa
+faqat backfill tugagach yoziladi. Shuning uchun bunday migratsiyaning sxema
+qismi qayta ishga tushirilsa ham xavfsiz bo'lishi kerak (IF NOT EXISTS,
+ensure_column).
+
+Versiya 1 dan oldingi bazalar (user_version = 0) ham shu yo'l bilan
+yangilanadi — barcha DDL IF NOT EXISTS bilan yozilgan.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Awaitable, Callable, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# backfill_in_batches: bitta tranzaksiyada shuncha qator, orasida pauza (soniya)
+BACKFILL_BATCH_SIZE = 1000
+BACKFILL_PAUSE = 0.01
+
+MigrationFunc = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+class Migration:
+    def __init__(self, version: int, name: str, upgrade: MigrationFunc, backfill: Optional[MigrationFunc] = None):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.backfill = backfill
+
+
+MIGRATIONS: "list[Migration]" = []
+
+
+def migration(version: int, name: str, backfill: Optional[MigrationFunc] = None):
+    """Dekorator: migratsiyani ro'yxatga qo'shish."""
+    def decorator(func: MigrationFunc) -> MigrationFunc:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migratsiya versiyalari o'sish tartibida bo'lishi kerak: {version}")
+        MIGRATIONS.append(Migration(version, name, func, backfill))
+        return func
+    return decorator
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+# ─── Yordamchi funksiyalar ───────────────────────────────────────────────────
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    cursor = await db.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    return row[0]
+
+
+async def execute_script(db: aiosqlite.Connection, script: str):
+    """
+    SQL skriptni statement larga bo'lib bajarish.
+    executescript() dan farqi — ochiq tranzaksiyani commit qilmaydi.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            await db.execute(statement)
+            statement = ""
+    if statement.strip():
+        await db.execute(statement)
+
+
+async def ensure_column(db: aiosqlite.Connection, table: str, column: str, decl: str):
+    """Jadvalda ustun bo'lmasa qo'shish (CREATE TABLE IF NOT EXISTS eski jadvalni o'zgartirmaydi)."""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    columns = {row[1] for row in await cursor.fetchall()}
+    if column not in columns:
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+async def backfill_in_batches(
+    db: aiosqlite.Connection,
+    table: str,
+    set_clause: str,
+    where: str,
+    params: tuple = (),
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> int:
+    """
+    UPDATE ni kichik bo'laklarda bajarish, har bo'lak — alohida tranzaksiya.
+    where yangilangan qatorlar uchun false bo'lishi kerak (aks holda tugamaydi),
+    masalan: set_clause="slug = lower(title)", where="slug IS NULL".
+    """
+    sql = (
+        f"UPDATE {table} SET {set_clause} "
+        f"WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)"
+    )
+    total = 0
+    while True:
+        cursor = await db.execute(sql, (*params, batch_size))
+        await db.commit()
+        total += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return total
+        # Boshqa ulanishlar (API, bot) ham yozib olsin
+        await asyncio.sleep(BACKFILL_PAUSE)
+
+
+async def _set_version(db: aiosqlite.Connection, version: int):
+    # PRAGMA parametr qabul qilmaydi — version faqat ichki int
+    await db.execute(f"PRAGMA user_version = {int(version)}")
+
+
+# ─── Engine ──────────────────────────────────────────────────────────────────
+
+async def apply_migrations(db: aiosqlite.Connection) -> "list[int]":
+    """
+    Yangi migratsiyalarni bajarish. Bajarilgan versiyalar ro'yxatini qaytaradi
+    (baza allaqachon oxirgi versiyada bo'lsa — bo'sh ro'yxat).
+    """
+    current = await get_schema_version(db)
+    if current >= latest_version():
+        return []
+
+    applied = []
+    for item in MIGRATIONS:
+        if item.version <= current:
+            continue
+
+        started = time.monotonic()
+        # IMMEDIATE — bir vaqtda ishga tushgan ikkinchi jarayon (api + bot) shu yerda kutadi
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            current = await get_schema_version(db)
+            if item.version <= current:
+                await db.rollback()
+                continue
+            await item.upgrade(db)
+            if item.backfill is None:
+                await _set_version(db, item.version)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+
+        if item.backfill is not None:
+            await item.backfill(db)
+            await _set_version(db, item.version)
+            await db.commit()
+
+        current = item.version
+        applied.append(item.version)
+        duration_ms = round((time.monotonic() - started) * 1000)
+        logger.info(
+            "Migratsiya %d bajarildi: %s (%d ms)", item.version, item.name, duration_ms,
+            extra={"event": "migration.applied", "version": item.version, "duration_ms": duration_ms},
+        )
+    return applied
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MIGRATSIYALAR (faqat oxiriga qo'shiladi, mavjudlari o'zgartirilmaydi)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_SITE_SETTINGS = {
+    "phone": "+998 90 123 45 67",
+    "email": "info@toymix.uz",
+    "address": "Toshkent sh., Chilonzor t.",
+    "working_hours": "Har kuni 9:00 - 21:00",
+    "instagram_url": "https://instagram.com/toymix.uz",
+    "telegram_url": "https://t.me/toymix_uz",
+    "whatsapp_url": "https://wa.me/998901234567",
+    "promo_banner_text": "300,000 so'mdan yuqori xaridlar uchun yetkazib berish bepul! 🚚",
+    "free_delivery_threshold": "300000",
+    "site_description": "ToyMix — O'zbekistondagi eng yaxshi bolalar o'yinchoqlari onlayn do'koni.",
+}
+
+
+@migration(1, "asosiy jadvallar va default sozlamalar")
+async def _base_schema(db):
+    await execute_script(db, """
+        -- Admin foydalanuvchilari
+        CREATE TABLE IF NOT EXISTS admins (
+            telegram_id INTEGER PRIMARY KEY,
+            username TEXT,
+            full_name TEXT,
+            added_by INTEGER,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1
+        );
+
+        -- Kategoriyalar
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Mahsulotlar
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            price TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Mahsulot rasmlari
+        CREATE TABLE IF NOT EXISTS product_media (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            file_id TEXT NOT NULL,
+            media_type TEXT DEFAULT 'photo',
+            sort_order INTEGER DEFAULT 0
+        );
+
+        -- Blog maqolalari
+        CREATE TABLE IF NOT EXISTS blog_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            excerpt TEXT DEFAULT '',
+            content TEXT DEFAULT '',
+            image TEXT DEFAULT '',
+            author TEXT DEFAULT '',
+            is_published INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Sayt sozlamalari (key-value)
+        CREATE TABLE IF NOT EXISTS site_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+
+        -- "Biz haqimizda" sahifasi kontenti (bitta qator, JSON formatda)
+        CREATE TABLE IF NOT EXISTS page_content (
+            page_name TEXT PRIMARY KEY,
+            content_json TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    # Default sozlamalarni qo'shish (agar mavjud bo'lmasa)
+    await db.executemany(
+        "INSERT OR IGNORE INTO site_settings (key, value) VALUES (?, ?)",
+        list(DEFAULT_SITE_SETTINGS.items()),
+    )
+
+
+@migration(2, "broadcast navbati va obunachilar")
+async def _broadcast_tables(db):
+    await execute_script(db, """
+        -- Bot yuboradigan xabarlar navbati (restartdan keyin ham saqlanadi)
+        CREATE TABLE IF NOT EXISTS outbound_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            parse_mode TEXT,
+            broadcast_id TEXT,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            not_before REAL DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbound_pending
+            ON outbound_messages (status, not_before, id);
+
+        -- Bot foydalanuvchilari (har bir murojaatda yangilanadi)
+        CREATE TABLE IF NOT EXISTS subscribers (
+            telegram_id INTEGER PRIMARY KEY,
+            username TEXT,
+            full_name TEXT,
+            language_code TEXT,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            interactions INTEGER DEFAULT 0,
+            is_blocked INTEGER DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_subscribers_last_seen
+            ON subscribers (last_seen);
+    """)
+
+
+@migration(3, "blog postlar sanasi bo'yicha indeks")
+async def _blog_created_index(db):
+    await execute_script(db, """
+        CREATE INDEX IF NOT EXISTS idx_blog_posts_created
+            ON blog_posts (created_at);
+    """)
+
+
+@migration(4, "bot persistence")
+async def _bot_persistence(db):
+    await execute_script(db, """
+        -- Bot holati (JSON): kind = user_data / chat_data / conversation:<name>
+        CREATE TABLE IF NOT EXISTS bot_persistence (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            data TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (kind, key)
+        );
+    """)
+
+
+@migration(5, "rejalashtirilgan nashr va sozlamalar")
+async def _scheduling(db):
+    await execute_script(db, """
+        -- Vaqtga belgilangan sozlama o'zgarishlari (applied_at NULL — hali bajarilmagan)
+        CREATE TABLE IF NOT EXISTS scheduled_settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            run_at TIMESTAMP NOT NULL,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            applied_at TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_scheduled_settings_due
+            ON scheduled_settings (run_at) WHERE applied_at IS NULL;
+    """)
+    await ensure_column(db, "blog_posts", "publish_at", "TIMESTAMP")
+    await ensure_column(db, "blog_posts", "unpublish_at", "TIMESTAMP")
+    await execute_script(db, """
+        CREATE INDEX IF NOT EXISTS idx_blog_posts_publish_at
+            ON blog_posts (publish_at) WHERE publish_at IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_blog_posts_unpublish_at
+            ON blog_posts (unpublish_at) WHERE unpublish_at IS NOT NULL;
+    """)
+
+
+@migration(6, "kontent versiyalari (delta sync)")
+async def _content_versions(db):
+    await execute_script(db, """
+        -- Kontent o'zgarishlari versiyasi (delta sync va tombstone lar uchun)
+        -- section: settings / pages / blog_posts, item_key: kalit / sahifa nomi / post ID
+        CREATE TABLE IF NOT EXISTS content_versions (
+            section TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            deleted INTEGER DEFAULT 0,
+            PRIMARY KEY (section, item_key)
+        );
+        CREATE INDEX IF NOT EXISTS idx_content_versions_version
+            ON content_versions (version);
+    """)
+
+
+@migration(7, "buyurtmalar")
+async def _orders(db):
+    await execute_script(db, """
+        -- Sayt orqali berilgan buyurtmalar
+        -- idempotency_key: mijoz yuborgan Idempotency-Key (qayta yuborilgan so'rov yangi buyurtma ochmaydi)
+        -- request_hash: shu kalit bilan kelgan so'rov tanasi (boshqa tanali qayta so'rov — 409)
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT UNIQUE,
+            request_hash TEXT,
+            customer_name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            city TEXT DEFAULT '',
+            address TEXT NOT NULL,
+            payment_method TEXT DEFAULT 'cash',
+            comment TEXT DEFAULT '',
+            subtotal INTEGER NOT NULL,
+            delivery_fee INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at);
+
+        -- Buyurtma qatorlari (nom va narx buyurtma paytidagi holatda saqlanadi)
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            product_id INTEGER REFERENCES products(id) ON DELETE SET NULL,
+            title TEXT NOT NULL,
+            unit_price INTEGER NOT NULL,
+            quantity INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id);
+    """)
+
+
+@migration(8, "ombor qoldig'i va savat bronlari")
+async def _inventory(db):
+    # stock NULL — qoldiq kuzatilmaydi (cheklanmagan), eski mahsulotlar shunday qoladi
+    # reserved — faol bronlar yig'indisi; sotuvga tayyor = stock - reserved
+    await ensure_column(db, "products", "stock", "INTEGER")
+    await ensure_column(db, "products", "reserved", "INTEGER NOT NULL DEFAULT 0")
+    await execute_script(db, """
+        -- Checkout paytida vaqtinchalik bron (muddati o'tganini fon sweeper qaytaradi)
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            token TEXT NOT NULL,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (token, product_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_stock_reservations_expires
+            ON stock_reservations (expires_at);
+    """)
+
+
+@migration(9, "LLM maslahat keshi")
+async def _advice_cache(db):
+    await execute_script(db, """
+        -- Aqlli Yordamchi javoblari: normallangan so'rov kaliti bo'yicha (TTL + LRU)
+        CREATE TABLE IF NOT EXISTS advice_cache (
+            key TEXT PRIMARY KEY,
+            request TEXT NOT NULL,
+            advice TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_advice_cache_last_used ON advice_cache (last_used_at);
+    """)
+
+
+@migration(10, "ko'rishlar va bosishlar statistikasi")
+async def _analytics(db):
+    await execute_script(db, """
+        -- Kunlik agregatlar (API xotirada yig'adi va davriy ravishda bitta tranzaksiyada yozadi)
+        -- visitors — noyob tashrif buyuruvchilar HyperLogLog sketchi (hyperloglog.py)
+        CREATE TABLE IF NOT EXISTS analytics_daily (
+            entity_type TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            views INTEGER NOT NULL DEFAULT 0,
+            clicks INTEGER NOT NULL DEFAULT 0,
+            visitors BLOB,
+            PRIMARY KEY (entity_type, entity_id, day)
+        );
+        CREATE INDEX IF NOT EXISTS idx_analytics_daily_day ON analytics_daily (day);
+    """)
+
+
+@migration(11, "kontent tarjimalari")
+async def _translations(db):
+    await execute_script(db, """
+        -- Asosiy tildan boshqa tillar: har bir maydon alohida qator (locales.py)
+        -- entity_type: settings | pages | blog_posts | products
+        CREATE TABLE IF NOT EXISTS content_translations (
+            entity_type TEXT NOT NULL,
+            entity_key TEXT NOT NULL,
+            locale TEXT NOT NULL,
+            field TEXT NOT NULL,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (entity_type, locale, entity_key, field)
+        );
+    """)
@@ -0,0 +1,188 @@
+"""
+Order Writer — buyurtmalarni group commit bilan yozish.
+
+Aksiya paytida bir vaqtda ko'p buyurtma keladi. Har biri alohida
+tranzaksiya bo'lsa, SQLite ning yagona yozuvchisi navbatga turadi va har
+bir commit alohida fsync qiladi. Shuning uchun:
+
+  - /api/orders buyurtmani order_writer.submit() ga beradi va natijani kutadi
+  - bitta fon task navbatdagi barcha buyurtmalarni (ORDER_BATCH_MAX tagacha)
+    olib, storage.insert_orders() orqali bitta tranzaksiyada yozadi
+  - oldingi commit davomida kelgan buyurtmalar keyingi batchga tushadi —
+    yuklama qancha ko'p bo'lsa, batch shuncha katta
+
+Adminlarga xabar commit dan keyin alohida task da navbatga qo'yiladi
+(outbound_messages) — HTTP javob Telegram ni kutmaydi. Xabarni bot
+jarayonidagi send queue yuboradi.
+"""
+
+import asyncio
+import html
+import logging
+from typing import Optional
+
+from config import ORDER_BATCH_LINGER_MS, ORDER_BATCH_MAX, ORDER_NOTIFY_ADMINS
+from database import enqueue_outbound_messages
+from inventory import inventory
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_LABELS = {"cash": "Naqd pul", "card": "Karta", "online": "Click / Payme"}
+
+
+def parse_price(price) -> int:
+    """Mahsulot narxi satrini ("350 000", "350,000 so'm") songa aylantirish."""
+    digits = "".join(ch for ch in str(price) if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+def format_sum(amount: int) -> str:
+    return f"{amount:,}".replace(",", " ") + " so'm"
+
+
+def format_order_message(order: dict) -> str:
+    """Admin uchun buyurtma xabari (HTML)."""
+    lines = [
+        f"🛒 <b>Yangi buyurtma #{order['id']}</b>",
+        "",
+        f"👤 {html.escape(order['customer_name'])}",
+        f"📞 {html.escape(order['phone'])}",
+        f"📍 {html.escape(order['city'])}, {html.escape(order['address'])}",
+        f"💳 {PAYMENT_LABELS.get(order['payment_method'], order['payment_method'])}",
+        "",
+    ]
+    lines.extend(
+        f"• {html.escape(item['title'])} × {item['quantity']} — {format_sum(item['unit_price'] * item['quantity'])}"
+        for item in order["items"]
+    )
+    lines.append("")
+    if order["delivery_fee"]:
+        lines.append(f"🚚 Yetkazish: {format_sum(order['delivery_fee'])}")
+    lines.append(f"💰 <b>Jami: {format_sum(order['total'])}</b>")
+    if order.get("comment"):
+        lines.append(f"\n💬 {html.escape(order['comment'])}")
+    return "\n".join(lines)
+
+
+async def notify_admins(orders: "list[dict]"):
+    """Yangi buyurtmalar haqida barcha adminlarga xabar (navbat orqali)."""
+    try:
+        chat_ids = [admin["telegram_id"] for admin in await storage.get_all_admins()]
+        for order in orders:
+            await enqueue_outbound_messages(chat_ids, format_order_message(order), "HTML")
+    except Exception as e:
+        logger.exception("Buyurtma xabarini navbatga qo'yishda xato: %s", e, extra={"event": "orders.notify_error"})
+
+
+class OrderWriter:
+    """Buyurtmalar navbati va uni batch larda yozadigan yagona fon task."""
+
+    def __init__(self, max_batch: int = ORDER_BATCH_MAX, linger: float = ORDER_BATCH_LINGER_MS / 1000):
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queue: "asyncio.Queue[Optional[tuple[dict, asyncio.Future]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._notify_tasks: "set[asyncio.Task]" = set()
+        self.batches = 0
+        self.orders_written = 0
+        self.largest_batch = 0
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "orders": self.orders_written,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.orders_written / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Navbatdagi buyurtmalarni yozib bo'lgach to'xtash."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._notify_tasks:
+            await asyncio.gather(*self._notify_tasks, return_exceptions=True)
+
+    async def submit(self, order: dict) -> dict:
+        """Buyurtmani navbatga qo'yish va u yozilgan batch commit bo'lishini kutish."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((order, future))
+        return await future
+
+    async def _next_batch(self) -> "tuple[list, bool]":
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.linger
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._commit(batch)
+
+    async def _commit(self, batch: "list[tuple[dict, asyncio.Future]]"):
+        orders = [order for order, _ in batch]
+        try:
+            results = await storage.insert_orders(orders)
+        except Exception as e:
+            logger.exception(
+                "Buyurtmalarni yozishda xato (%d ta): %s", len(batch), e,
+                extra={"event": "orders.write_error", "batch": len(batch)},
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Qoldiq yechildi (yoki bronlar buyurtmaga o'tdi)
+        inventory.invalidate()
+        self.batches += 1
+        self.orders_written += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        created = []
+        for (order, future), result in zip(batch, results):
+            if result["created"]:
+                created.append({**order, "id": result["id"]})
+            if not future.done():
+                future.set_result(result)
+
+        if created and ORDER_NOTIFY_ADMINS:
+            task = asyncio.create_task(notify_admins(created))
+            self._notify_tasks.add(task)
+            task.add_done_callback(self._notify_tasks.discard)
+
+
+order_writer = OrderWriter()
@@ -0,0 +1,295 @@
+"""
+Rankings — katalogning "ommabop" va "yangi" tartiblari (xotirada).
+
+Bosh sahifa karusellari har tashrifda so'raladi, shuning uchun har
+so'rovda saralash o'rniga:
+
+  - ommabop: har bir mahsulot balli = ko'rishlar + RANKING_CLICK_WEIGHT x
+    bosishlar, RANKING_HALF_LIFE_DAYS yarim yemirilish bilan. Ball
+    "epoch" ga nisbatan 2^(t/yarim_davr) ko'paytma bilan saqlanadi —
+    vaqt o'tishi bilan tartib o'zgarmaydi, qayta hisoblash kerak emas,
+    yangi ko'rishlar shunchaki qo'shiladi
+  - umumiy va har bir kategoriya uchun RANKING_TOP_K o'lchamli heap:
+    analytics flush dan keyin faqat o'zgargan mahsulotlar heapga
+    taklif qilinadi (O(K)). Birinchi sahifalar shu heapdan beriladi
+  - to'liq tartib faqat heapdan chuqurroq sahifa so'ralganda quriladi
+    va keyingi o'zgarishgacha keshlanadi
+  - yangi: katalog allaqachon created_at DESC tartibida — kategoriya
+    bo'yicha ro'yxatlar katalog o'zgarguncha keshlanadi
+
+Ballar har RANKING_RELOAD_INTERVAL soniyada bazadan qayta o'qiladi (boshqa
+API node lar yozgan ko'rishlar ham kirsin).
+
+Sahifalash cursor bilan (keyset): cursor oxirgi elementning tartib kaliti,
+keyingi sahifa undan keyingi elementlardan boshlanadi — ro'yxat o'zgarsa
+ham takrorlanish yoki tushib qolish bo'lmaydi (ommabopda ball oshgan
+mahsulot bundan mustasno).
+"""
+
+import asyncio
+import base64
+import binascii
+import heapq
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from config import RANKING_CLICK_WEIGHT, RANKING_HALF_LIFE_DAYS, RANKING_RELOAD_INTERVAL, RANKING_TOP_K
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+# Shundan eski kunlarning og'irligi ~1.5% dan kam — o'qilmaydi
+RELOAD_HALF_LIVES = 6
+
+# Cursor dagi butun sonlar chegarasi (id lar bazada BIGINT)
+MAX_CURSOR_INT = 2**63 - 1
+
+
+def encode_cursor(sort: str, category_id: "int | None", key: list) -> str:
+    payload = json.dumps([sort, category_id, key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, category_id: "int | None") -> tuple:
+    """Cursor dan tartib kaliti. Noto'g'ri yoki boshqa so'rovniki bo'lsa ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_category, key = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Noto'g'ri cursor")
+    if cursor_sort != sort or cursor_category != category_id or not isinstance(key, list) or len(key) != 2:
+        raise ValueError("Cursor boshqa tartib yoki kategoriya uchun berilgan")
+    primary, product_id = key
+    if not _is_int(product_id):
+        raise ValueError("Noto'g'ri cursor")
+    if sort == "new":
+        # [created_at satri, id]; created_at bo'lmagan mahsulotlarda ""
+        if not isinstance(primary, str):
+            raise ValueError("Noto'g'ri cursor")
+        if primary:
+            try:
+                datetime.fromisoformat(primary)
+            except ValueError:
+                raise ValueError("Noto'g'ri cursor")
+    elif not (_is_int(primary) or isinstance(primary, float) and math.isfinite(primary)):
+        # [ball yoki narx, id]
+        raise ValueError("Noto'g'ri cursor")
+    return primary, product_id
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and abs(value) <= MAX_CURSOR_INT
+
+
+def _after(entries: "list[tuple]", key: tuple) -> int:
+    """Kamayish tartibidagi ro'yxatda key dan keyingi birinchi element o'rni."""
+    low, high = 0, len(entries)
+    while low < high:
+        middle = (low + high) // 2
+        if entries[middle] < key:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _offer(heap: "list[tuple[float, int]]", product_id: int, score: float, k: int):
+    """Bounded min-heap: mahsulot allaqachon bo'lsa — balini yangilash, aks holda eng kichigini siqib chiqarish."""
+    for index, (_, existing) in enumerate(heap):
+        if existing == product_id:
+            heap[index] = (score, product_id)
+            heapq.heapify(heap)
+            return
+    if len(heap) < k:
+        heapq.heappush(heap, (score, product_id))
+    elif (score, product_id) > heap[0]:
+        heapq.heapreplace(heap, (score, product_id))
+
+
+class Rankings:
+    def __init__(self, half_life_days: float = RANKING_HALF_LIFE_DAYS, top_k: int = RANKING_TOP_K):
+        self.half_life = half_life_days * 86400
+        self.top_k = top_k
+        self._epoch = time.time()
+        self._scores: "dict[int, float]" = {}
+        self._source: Optional[list] = None
+        self._products: "dict[int, dict]" = {}
+        self._category_counts: "dict[int | None, int]" = {}
+        # kategoriya (None — hammasi) → bounded min-heap [(ball, id)]
+        self._top: "dict[int | None, list[tuple[float, int]]]" = {}
+        # (sort, kategoriya) → kamayish tartibidagi [(kalit, id)] — o'zgarguncha kesh
+        self._orders: "dict[tuple[str, int | None], list[tuple]]" = {}
+        self._task: Optional[asyncio.Task] = None
+        self.full_sorts = 0
+
+    def _weight(self, timestamp: float) -> float:
+        return 2 ** ((timestamp - self._epoch) / self.half_life)
+
+    # ── Updates ──
+
+    def sync_catalog(self, products: list):
+        """Katalog ro'yxati o'zgargan bo'lsa (yangi obyekt) — mahsulotlar va heaplarni yangilash."""
+        if products is self._source:
+            return
+        self._products = {product["id"]: product for product in products}
+        # None — butun katalog; kategoriyasiz mahsulotlar faqat unda
+        counts: "dict[int | None, int]" = {None: len(products)}
+        for product in products:
+            if product["category_id"] is not None:
+                counts[product["category_id"]] = counts.get(product["category_id"], 0) + 1
+        self._category_counts = counts
+        self._rebuild_tops()
+        self._orders.clear()
+        self._source = products
+
+    def _rebuild_tops(self):
+        scored: "dict[int | None, list[tuple[float, int]]]" = {None: []}
+        for product_id, score in self._scores.items():
+            product = self._products.get(product_id)
+            if product is None:
+                continue
+            scored[None].append((score, product_id))
+            if product["category_id"] is not None:
+                scored.setdefault(product["category_id"], []).append((score, product_id))
+        tops = {}
+        for category_id, entries in scored.items():
+            heap = heapq.nlargest(self.top_k, entries)
+            heapq.heapify(heap)
+            tops[category_id] = heap
+        self._top = tops
+
+    def record(self, rows: "list[dict]"):
+        """Analytics flush dan keyin: shu jarayonda yozilgan ko'rish/bosishlarni qo'shish."""
+        weight = self._weight(time.time())
+        changed = False
+        for row in rows:
+            if row["entity_type"] != "product":
+                continue
+            product_id = row["entity_id"]
+            score = self._scores.get(product_id, 0.0) + (row["views"] + RANKING_CLICK_WEIGHT * row["clicks"]) * weight
+            self._scores[product_id] = score
+            product = self._products.get(product_id)
+            if product is None or score <= 0:
+                continue
+            _offer(self._top.setdefault(None, []), product_id, score, self.top_k)
+            if product["category_id"] is not None:
+                _offer(self._top.setdefault(product["category_id"], []), product_id, score, self.top_k)
+            changed = True
+        if changed:
+            self._drop_orders("popular")
+
+    async def reload(self):
+        """Ballarni bazadagi kunlik statistikadan qayta hisoblash."""
+        days = int(RELOAD_HALF_LIVES * self.half_life / 86400) + 1
+        rows = await storage.get_daily_counts("product", days)
+        scores: "dict[int, float]" = {}
+        for row in rows:
+            # Kun o'rtasi — kunlik agregatning o'rtacha vaqti
+            midday = datetime.fromisoformat(row["day"]).replace(hour=12, tzinfo=timezone.utc).timestamp()
+            value = (row["views"] + RANKING_CLICK_WEIGHT * row["clicks"]) * self._weight(midday)
+            scores[row["entity_id"]] = scores.get(row["entity_id"], 0.0) + value
+        self._scores = scores
+        self._rebuild_tops()
+        self._drop_orders("popular")
+
+    def _drop_orders(self, sort: str):
+        for key in [key for key in self._orders if key[0] == sort]:
+            del self._orders[key]
+
+    # ── Reads ──
+
+    def _full_order(self, sort: str, category_id: "int | None") -> "list[tuple]":
+        order = self._orders.get((sort, category_id))
+        if order is not None:
+            return order
+        products = self._source or []
+        if category_id is not None:
+            products = [p for p in products if p["category_id"] == category_id]
+        if sort == "new":
+            # Katalog allaqachon created_at DESC, id DESC tartibida
+            order = [(p["created_at"] or "", p["id"]) for p in products]
+        else:
+            order = sorted(((self._scores.get(p["id"], 0.0), p["id"]) for p in products), reverse=True)
+            self.full_sorts += 1
+        self._orders[(sort, category_id)] = order
+        return order
+
+    def page(
+        self,
+        sort: str,
+        category_id: "int | None",
+        limit: int,
+        after: "tuple | None" = None,
+        offset: int = 0,
+    ) -> "tuple[list[dict], str | None]":
+        """Tartiblangan sahifa va keyingi sahifa cursori (oxirgi sahifada None)."""
+        total = self.count(category_id)
+        entries = None
+        if sort == "popular":
+            # Karusel va birinchi sahifalar — heapdan (K ta elementni saralash)
+            top = sorted(self._top.get(category_id, []), reverse=True)
+            start = _after(top, after) if after is not None else offset
+            if start + limit <= len(top):
+                entries = top
+        if entries is None:
+            entries = self._full_order(sort, category_id)
+            start = _after(entries, after) if after is not None else offset
+
+        chosen = entries[start:start + limit]
+        products = [self._products[product_id] for _, product_id in chosen]
+        has_more = start + len(chosen) < total
+        next_cursor = encode_cursor(sort, category_id, list(chosen[-1])) if chosen and has_more else None
+        return products, next_cursor
+
+    def score(self, product_id: int) -> float:
+        return self._scores.get(product_id, 0.0)
+
+    def scores_for(self, ids: np.ndarray) -> np.ndarray:
+        """Ustunli katalog (catalog_columns.py) uchun ballar massivi."""
+        return np.fromiter((self._scores.get(i, 0.0) for i in ids.tolist()), dtype=np.float64, count=len(ids))
+
+    def count(self, category_id: "int | None" = None) -> int:
+        return self._category_counts.get(category_id, 0)
+
+    def stats(self) -> dict:
+        return {
+            "scored_products": len(self._scores),
+            "top_lists": len(self._top),
+            "cached_orders": len(self._orders),
+            "full_sorts": self.full_sorts,
+        }
+
+    # ── Reload loop ──
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Reytinglarni yangilashda xato: %s", e, extra={"event": "rankings.error"})
+            await asyncio.sleep(RANKING_RELOAD_INTERVAL)
+
+
+rankings = Rankings()
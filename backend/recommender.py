@@ -0,0 +1,292 @@
+"""
+Recommender — Aqlli Yordamchi (AIAdvisor) uchun mahsulot tavsiyalari.
+
+Har bir savol uchun LLM chaqirish o'rniga katalog bo'yicha oldindan
+hisoblangan matritsa ishlatiladi:
+
+  - matn: sarlavha (x2), kategoriya (x2) va tavsif so'zlaridan TF-IDF,
+    qatorlar L2 normallangan. Matritsa siyrak (ustunlar bo'yicha: so'z →
+    shu so'z bor mahsulotlar) — xotira faqat nolmas qiymatlarga
+    proporsional; savol bilan o'xshashlik faqat savol so'zlari ustunlaridan
+    yig'iladi
+  - yosh: matndagi "3-5 yosh", "8+" kabi oraliqlar (noma'lum — NaN)
+  - narx: so'mda; budjetdan oshganlar chiqarib tashlanadi, budjetga
+    yaqinlari biroz yuqoriroq turadi
+  - qoldiq: sotuvda yo'qlari (available == 0) chiqarib tashlanadi
+
+Katalog o'zgarganda faqat o'zgargan mahsulotlar qayta tokenlanadi
+((updated_at, matn, narx) bo'yicha), matritsa esa shu hisoblardan
+vektorli yig'iladi. Qurish alohida threadda — event loop bloklanmaydi.
+"""
+
+import asyncio
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from orders import parse_price
+
+TEXT_WEIGHT = 0.6
+AGE_WEIGHT = 0.25
+PRICE_WEIGHT = 0.15
+# Budjetdan shuncha ko'proq narx ham qabul qilinadi ("100 ming" — taxminiy)
+BUDGET_SLACK = 0.1
+# O'zbek tilida qo'shimchalar ko'p: "mashinalar", "mashinani" — umumiy boshlanish ham belgi
+PREFIX_LENGTH = 5
+
+APOSTROPHES = str.maketrans({"ʻ": "'", "ʼ": "'", "’": "'", "‘": "'", "`": "'"})
+TOKEN_RE = re.compile(r"[a-z0-9а-яёўқғҳ']+")
+STOPWORDS = {
+    "va", "bilan", "uchun", "ham", "yoki", "bu", "shu", "juda", "eng", "ta", "dan", "ga",
+    "yosh", "yoshli", "yoshgacha", "the", "and", "for", "with",
+}
+# Tavsifdagi "30-40 sm" yosh emas — faqat "yosh" so'zi yoki "+" bilan
+AGE_UNIT = r"\s*(?:yosh|years?|лет)"
+AGE_RANGE_RE = re.compile(r"(\d{1,2})\s*[-–]\s*(\d{1,2})" + AGE_UNIT)
+AGE_PLUS_RE = re.compile(r"(\d{1,2})\s*\+")
+# Kategoriya nomida ("0-3", "8+") birlik yozilmasligi mumkin
+CATEGORY_AGE_RE = re.compile(r"(\d{1,2})\s*[-–]\s*(\d{1,2})")
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def tokenize(text: str) -> "list[str]":
+    """So'zlar va ularning PREFIX_LENGTH harfli boshlanishi (qo'shimchalarsiz moslik uchun)."""
+    tokens = []
+    for word in TOKEN_RE.findall(text.lower().translate(APOSTROPHES)):
+        word = word.strip("'")
+        if len(word) < 2 or word in STOPWORDS or word.isdigit():
+            continue
+        tokens.append(word)
+        if len(word) > PREFIX_LENGTH:
+            tokens.append(f"{word[:PREFIX_LENGTH]}~")
+    return tokens
+
+
+def parse_age_range(text: str, category: str = "") -> "tuple[float, float]":
+    """Mahsulot matnidan (yoki kategoriya nomidan) yosh oralig'i. Topilmasa (nan, nan)."""
+    text = text.lower()
+    match = AGE_RANGE_RE.search(text) or CATEGORY_AGE_RE.search(category)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        return float(low), float(high)
+    match = AGE_PLUS_RE.search(text) or AGE_PLUS_RE.search(category)
+    if match:
+        return float(match.group(1)), math.inf
+    return math.nan, math.nan
+
+
+def parse_age(text: str) -> Optional[float]:
+    """Savoldagi yosh: "3 yosh" → 3, "18 oylik" → 1.5. Topilmasa None."""
+    match = NUMBER_RE.search(text or "")
+    if not match:
+        return None
+    age = float(match.group().replace(",", "."))
+    if re.search(r"\boy|month|мес", text.lower()):
+        age /= 12
+    return age
+
+
+def parse_budget(text: str) -> Optional[int]:
+    """Savoldagi budjet: "100 000 uzs", "150 ming", "1.5 mln". Topilmasa None."""
+    text = (text or "").lower()
+    match = NUMBER_RE.search(text.replace(" ", ""))
+    if not match:
+        return None
+    amount = float(match.group().replace(",", "."))
+    if re.search(r"mln|million|млн", text):
+        amount *= 1_000_000
+    elif re.search(r"ming|\dk\b|тыс", text.replace(" ", "")):
+        amount *= 1_000
+    return int(amount) or None
+
+
+@dataclass
+class Query:
+    age: Optional[float]
+    budget: Optional[int]
+    tokens: "list[str]"
+
+
+@dataclass
+class _Index:
+    ids: np.ndarray            # (n,) mahsulot ID lari
+    prices: np.ndarray         # (n,) so'm
+    age_low: np.ndarray        # (n,) nan — noma'lum
+    age_high: np.ndarray
+    # (n, V) L2 normallangan TF-IDF, siyrak ustunlar: col_ptr[c]:col_ptr[c + 1]
+    # oralig'ida c so'zi bor qatorlar (col_rows) va qiymatlar (col_values)
+    col_ptr: np.ndarray        # (V + 1,) int64
+    col_rows: np.ndarray       # (nnz,) int32
+    col_values: np.ndarray     # (nnz,) float32
+    vocabulary: "dict[str, int]"
+    idf: np.ndarray            # (V,)
+
+
+class Recommender:
+    def __init__(self):
+        self._index: Optional[_Index] = None
+        self._source: Optional[list] = None
+        # product_id -> (belgi, so'zlar hisobi); belgi o'zgarmasa qayta tokenlanmaydi
+        self._documents: "dict[int, tuple[tuple, Counter]]" = {}
+        self._lock = asyncio.Lock()
+        self.builds = 0
+        self.tokenized = 0
+
+    async def ensure_index(self, products: list):
+        """Katalog ro'yxati o'zgargan bo'lsa (yangi obyekt) — indeksni yangilash."""
+        if products is self._source:
+            return
+        async with self._lock:
+            if products is self._source:
+                return
+            self._index = await asyncio.to_thread(self._build, products)
+            self._source = products
+
+    def _build(self, products: list) -> _Index:
+        documents = {}
+        for product in products:
+            stamp = (
+                product.get("updated_at"), product["title"], product.get("description") or "",
+                product.get("category_name") or "", product["price"],
+            )
+            cached = self._documents.get(product["id"])
+            if cached is None or cached[0] != stamp:
+                text_counts = Counter(tokenize(product["title"]) * 2)
+                text_counts.update(tokenize(product.get("category_name") or "") * 2)
+                text_counts.update(tokenize(product.get("description") or ""))
+                cached = (stamp, text_counts)
+                self.tokenized += 1
+            documents[product["id"]] = cached
+        self._documents = documents
+        self.builds += 1
+
+        vocabulary: "dict[str, int]" = {}
+        rows, cols, counts = [], [], []
+        for row, product in enumerate(products):
+            for token, count in documents[product["id"]][1].items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+                counts.append(count)
+
+        n = len(products)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        document_frequency = np.bincount(cols, minlength=len(vocabulary))
+        idf = (np.log((1 + n) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        values = (1 + np.log(np.asarray(counts, dtype=np.float32))) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n)).astype(np.float32)
+        values /= np.where(norms > 0, norms, 1)[rows]
+        # Ustunlar bo'yicha tartiblash (CSC) — savol so'zi bo'yicha mahsulotlar ketma-ket
+        order = np.argsort(cols, kind="stable")
+        col_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=col_ptr[1:])
+
+        ages = [
+            parse_age_range(f"{p['title']} {p.get('description') or ''}", p.get("category_name") or "")
+            for p in products
+        ]
+        return _Index(
+            ids=np.asarray([p["id"] for p in products], dtype=np.int64),
+            prices=np.asarray([parse_price(p["price"]) for p in products], dtype=np.float64),
+            age_low=np.asarray([low for low, _ in ages], dtype=np.float64),
+            age_high=np.asarray([high for _, high in ages], dtype=np.float64),
+            col_ptr=col_ptr,
+            col_rows=rows[order].astype(np.int32),
+            col_values=values[order],
+            vocabulary=vocabulary,
+            idf=idf,
+        )
+
+    def _similarity(self, index: _Index, queries: "list[Query]") -> np.ndarray:
+        """(q, n) kosinus o'xshashlik — faqat savol so'zlari ustunlari o'qiladi."""
+        n = len(index.ids)
+        similarity = np.zeros((len(queries), n), dtype=np.float32)
+        for row, query in enumerate(queries):
+            cols, weights = [], []
+            for token, count in Counter(query.tokens).items():
+                col = index.vocabulary.get(token)
+                if col is not None:
+                    cols.append(col)
+                    weights.append((1 + math.log(count)) * index.idf[col])
+            if not cols:
+                continue
+            weights = np.asarray(weights, dtype=np.float32)
+            weights /= np.linalg.norm(weights)
+            starts, ends = index.col_ptr[cols], index.col_ptr[np.asarray(cols) + 1]
+            lengths = ends - starts
+            # Tanlangan ustunlar qiymatlari bitta massivga (har ustun oralig'i ketma-ket)
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            similarity[row] = np.bincount(
+                index.col_rows[positions],
+                weights=index.col_values[positions] * np.repeat(weights, lengths),
+                minlength=n,
+            )
+        return similarity
+
+    def recommend(
+        self,
+        queries: "list[Query]",
+        limit: int,
+        availability: "dict[int, int | None] | None" = None,
+    ) -> "list[list[tuple[int, float, bool]]]":
+        """
+        Har bir savol uchun [(product_id, ball, matn_mos), ...] — eng moslari birinchi.
+        Yosh va narx mosligi barcha savollar uchun bitta vektorli hisobda.
+        """
+        index = self._index
+        if index is None or not len(index.ids):
+            return [[] for _ in queries]
+
+        similarity = self._similarity(index, queries)                          # (q, n)
+
+        ages = np.asarray([np.nan if q.age is None else q.age for q in queries])[:, None]
+        known = ~np.isnan(index.age_low)
+        distance = np.maximum(index.age_low - ages, 0) + np.maximum(ages - index.age_high, 0)
+        age_fit = np.where(known, np.clip(1 - distance / 3, 0, 1), 0.5)
+        age_fit = np.where(np.isnan(ages), 0.5, age_fit)
+
+        budgets = np.asarray([np.nan if not q.budget else q.budget for q in queries], dtype=np.float64)[:, None]
+        prices = np.maximum(index.prices, 1)
+        price_fit = np.clip(1 - np.abs(np.log(prices / budgets)) / math.log(10), 0, 1)
+        price_fit = np.where(np.isnan(budgets), 0.5, price_fit)
+        allowed = np.isnan(budgets) | (index.prices <= budgets * (1 + BUDGET_SLACK))
+
+        if availability is not None:
+            sold_out = np.asarray([availability.get(int(pid)) == 0 for pid in index.ids])
+            allowed &= ~sold_out
+
+        scores = TEXT_WEIGHT * similarity + AGE_WEIGHT * age_fit + PRICE_WEIGHT * price_fit
+        scores = np.where(allowed, scores, -np.inf)
+
+        results = []
+        k = min(limit, scores.shape[1])
+        for row in range(len(queries)):
+            top = np.argpartition(-scores[row], k - 1)[:k]
+            top = top[np.argsort(-scores[row, top], kind="stable")]
+            results.append([
+                (int(index.ids[i]), round(float(scores[row, i]), 4), bool(similarity[row, i] > 0))
+                for i in top if np.isfinite(scores[row, i])
+            ])
+        return results
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            "products": 0 if index is None else len(index.ids),
+            "vocabulary": 0 if index is None else len(index.vocabulary),
+            "nonzero": 0 if index is None else len(index.col_values),
+            "builds": self.builds,
+            "tokenized": self.tokenized,
+        }
+
+
+def make_query(age: str = "", interest: str = "", budget: str = "") -> Query:
+    return Query(age=parse_age(age), budget=parse_budget(budget), tokens=tokenize(interest))
+
+
+recommender = Recommender()
@@ -0,0 +1,103 @@
+"""
+Content Scheduler — vaqtga belgilangan nashr va sozlama o'zgarishlarini bajarish.
+
+Bot ishlayotgan jarayonda bitta fon task:
+  1. storage.get_next_scheduled_time() — eng yaqin job vaqti (partial index orqali)
+  2. shu vaqtgacha uxlaydi (yoki yangi job qo'shilganda uyg'onadi)
+  3. storage.run_due_scheduled_jobs() — vaqti kelganlarni bitta tranzaksiyada bajaradi,
+     kontent keshi notify_content_changed() orqali tozalanadi
+
+Jadvallar polling qilinmaydi — job bo'lmasa task faqat wakeup() ni kutadi.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from config import TIMEZONE_OFFSET_HOURS
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+DB_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOCAL_TZ = timezone(timedelta(hours=TIMEZONE_OFFSET_HOURS))
+
+# Soat o'zgarishi yoki boshqa jarayon qo'shgan joblar uchun xavfsizlik chegarasi
+MAX_SLEEP_SECONDS = 300
+
+
+def parse_local_time(date_str: str, time_str: str) -> str:
+    """Admin kiritgan mahalliy vaqtni ("2026-11-01", "00:00") bazadagi UTC formatiga o'girish."""
+    local = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M").replace(tzinfo=LOCAL_TZ)
+    return local.astimezone(timezone.utc).strftime(DB_TIME_FORMAT)
+
+
+def format_local_time(db_time: str) -> str:
+    """Bazadagi UTC vaqtni admin uchun mahalliy vaqtga o'girish."""
+    utc = datetime.strptime(db_time, DB_TIME_FORMAT).replace(tzinfo=timezone.utc)
+    return utc.astimezone(LOCAL_TZ).strftime("%Y-%m-%d %H:%M")
+
+
+class ContentScheduler:
+    """Eng yaqin job gacha uxlaydigan fon runner."""
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wakeup(self):
+        """Yangi job qo'shilganda yoki o'zgarganda keyingi vaqtni qayta hisoblash."""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                delay = await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Scheduler xatosi: %s", e, extra={"event": "scheduler.error"})
+                delay = 30
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _tick(self) -> float:
+        """Vaqti kelgan joblarni bajarish va keyingisigacha qancha kutishni qaytarish."""
+        next_time = await storage.get_next_scheduled_time()
+        if next_time is None:
+            return MAX_SLEEP_SECONDS
+
+        due = datetime.strptime(next_time, DB_TIME_FORMAT).replace(tzinfo=timezone.utc)
+        delay = (due - datetime.now(timezone.utc)).total_seconds()
+        if delay > 0:
+            return min(delay, MAX_SLEEP_SECONDS)
+
+        changed = await storage.run_due_scheduled_jobs()
+        if changed:
+            logger.info(
+                "Rejalashtirilgan joblar bajarildi: %s", ", ".join(sorted(changed)),
+                extra={"event": "scheduler.jobs_done", "sections": sorted(changed)},
+            )
+        return 0
+
+
+content_scheduler = ContentScheduler()
@@ -0,0 +1,168 @@
+"""
+Shutdown — deploy paytida so'rov va admin tahrirlari yo'qolmasligi uchun tartibli to'xtash.
+
+main.py lifespan to'xtashda bosqichlarni shu tartibda bajaradi:
+
+  1. traffic    — readiness 503 ("draining"), SSE oqimlari yopiladi (mijozlar
+                  boshqa instance ga qayta ulanadi)
+  2. http       — bajarilayotgan HTTP so'rovlar tugashini kutish
+  3. bot        — polling to'xtaydi, navbatdagi va bajarilayotgan updatelar tugaydi
+  4. bot_stop   — application (persistence flush), send queue, obunachilar
+  5. services   — rejalashtiruvchi, backup, watcher va boshqa fon xizmatlari
+  6. writes     — buyurtmalar navbati va ko'rishlar statistikasi buferi yoziladi
+  7. checkpoint — SQLite WAL ni asosiy faylga o'tkazish (TRUNCATE)
+  8. storage    — storage (PostgreSQL pool) yopiladi
+
+Har bir bosqichning muddati bor (SHUTDOWN_*_TIMEOUT): oshsa bosqich bekor
+qilinadi va keyingisiga o'tiladi — bitta osilgan xizmat qolganlarini
+to'xtatib qo'ymaydi. Har bosqich vaqti shutdown.phase, yakuni shutdown.done
+log hodisasi sifatida yoziladi.
+
+`python main.py` da GracefulServer SIGTERM ni ushlaydi: readiness darhol
+503 bo'ladi, uvicorn esa SHUTDOWN_DRAIN_DELAY soniyadan keyin yangi
+ulanishlarni qabul qilishni to'xtatadi — load balancer instance ni
+ro'yxatdan chiqarib ulguradi. Ikkinchi signal — darhol to'xtash.
+"""
+
+import asyncio
+import contextlib
+import logging
+import signal
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+import uvicorn
+
+from config import SHUTDOWN_DRAIN_DELAY
+from logs import shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+# In-flight so'rovlar va bot navbatini tekshirish oralig'i (soniya)
+DRAIN_POLL_INTERVAL = 0.05
+
+# (nom, muddat soniyada, bosqich)
+Phase = Tuple[str, float, Callable[[], Awaitable[None]]]
+
+
+class ShutdownManager:
+    def __init__(self):
+        self.draining = False
+        self.in_flight = 0
+        self._drain_listeners: "list[Callable[[], None]]" = []
+        self.last_report: "list[dict]" = []
+
+    def on_drain(self, listener: "Callable[[], None]"):
+        """To'xtash boshlanganda chaqiriladigan funksiya (sinxron, tez)."""
+        self._drain_listeners.append(listener)
+
+    def begin_draining(self):
+        """Trafik qabul qilishni to'xtatish signali (takroriy chaqiruv hech narsa qilmaydi)."""
+        if self.draining:
+            return
+        self.draining = True
+        logger.info(
+            "To'xtash boshlandi: yangi trafik qabul qilinmaydi (%d ta so'rov bajarilmoqda)", self.in_flight,
+            extra={"event": "shutdown.draining", "in_flight": self.in_flight},
+        )
+        for listener in self._drain_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.exception("Drain listener xatosi: %s", e, extra={"event": "shutdown.error"})
+
+    async def wait_for_requests(self):
+        while self.in_flight:
+            await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+    async def run(self, phases: "list[Phase]") -> "list[dict]":
+        """Bosqichlarni tartib bilan, har birini o'z muddati bilan bajarish."""
+        started = time.perf_counter()
+        report = []
+        for name, timeout, step in phases:
+            phase_started = time.perf_counter()
+            status, error, exc = "ok", None, None
+            try:
+                await asyncio.wait_for(step(), timeout)
+            except asyncio.TimeoutError:
+                status = "timeout"
+            except Exception as e:
+                status, error, exc = "error", str(e) or type(e).__name__, e
+            duration_ms = round((time.perf_counter() - phase_started) * 1000, 1)
+            report.append({"phase": name, "status": status, "duration_ms": duration_ms})
+            logger.log(
+                logging.INFO if status == "ok" else logging.WARNING,
+                "To'xtash bosqichi %s: %s (%.0f ms)%s", name, status, duration_ms, f" — {error}" if error else "",
+                extra={
+                    "event": "shutdown.phase",
+                    "phase": name,
+                    "status": status,
+                    "duration_ms": duration_ms,
+                    "timeout_s": timeout,
+                    "error": error,
+                },
+                exc_info=exc,
+            )
+
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            "To'xtash tugadi (%.0f ms): %s", total_ms, ", ".join(f"{p['phase']} {p['status']}" for p in report),
+            extra={"event": "shutdown.done", "total_ms": total_ms, "phases": report},
+        )
+        self.last_report = report
+        # Shu jarayonda lifespan qayta ishga tushsa (testlar) — yangidan
+        self.draining = False
+        return report
+
+
+shutdown_manager = ShutdownManager()
+
+
+class RequestTracker:
+    """ASGI middleware: bajarilayotgan HTTP so'rovlar soni (http bosqichi shuni kutadi)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        shutdown_manager.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            shutdown_manager.in_flight -= 1
+
+
+class GracefulServer(uvicorn.Server):
+    """SIGTERM: readiness darhol 503, ulanishlarni yopish SHUTDOWN_DRAIN_DELAY dan keyin."""
+
+    def __init__(self, config: uvicorn.Config, drain_delay: float = SHUTDOWN_DRAIN_DELAY):
+        super().__init__(config)
+        self.drain_delay = drain_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._delayed_exit = False
+
+    async def startup(self, sockets=None):
+        self._loop = asyncio.get_running_loop()
+        await super().startup(sockets)
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        with super().capture_signals():
+            yield
+            # uvicorn signalni default handler bilan qayta ko'taradi — atexit ishlamaydi,
+            # navbatdagi loglar (to'xtash hisoboti) undan oldin yoziladi
+            shutdown_logging()
+
+    def handle_exit(self, sig, frame):
+        # Signal handler — event loop tashqarisida; loop ga faqat call_soon_threadsafe orqali
+        if sig != signal.SIGTERM or self._delayed_exit or self._loop is None or self.drain_delay <= 0:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(shutdown_manager.begin_draining)
+            super().handle_exit(sig, frame)
+            return
+        self._delayed_exit = True
+        self._loop.call_soon_threadsafe(shutdown_manager.begin_draining)
+        self._loop.call_soon_threadsafe(self._loop.call_later, self.drain_delay, super().handle_exit, sig, frame)
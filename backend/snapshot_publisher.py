@@ -0,0 +1,212 @@
+"""
+Snapshot Publisher — sayt kontentini statik JSON fayllarga oldindan render qilish.
+
+Sayt Firebase Hosting (CDN) da, lekin har bir tashrif kontentni Railway dagi
+API dan yuklaydi. Publisher API javoblarini fayllarga yozadi, ular esa CDN
+orqali beriladi — o'qish yo'lida origin server umuman qatnashmaydi.
+
+Papka tuzilishi (SNAPSHOT_DIR):
+    manifest.json                   — joriy versiya va fayllar (qisqa kesh)
+    data/content.3f2a9c1b04de.json  — /api/content javobi
+    data/settings.<hash>.json       — /api/settings
+    data/about.<hash>.json          — /api/content/about
+    data/delivery.<hash>.json       — /api/content/delivery
+    data/blog.<hash>.json           — /api/blog
+    data/products.<hash>.json       — mahsulotlar katalogi
+    data/categories.<hash>.json     — kategoriyalar
+
+Fayl nomida kontent hash i bor — o'zgarmagan bo'lim qayta yozilmaydi va
+CDN da "immutable" keshlanadi. Mijoz avval manifest.json ni o'qiydi.
+
+Nashr qilish:
+  - kontent o'zgarganda avtomatik (SNAPSHOT_DEBOUNCE soniya ichidagi
+    o'zgarishlar bitta nashrga birlashadi)
+  - /publish_snapshot bot komandasi orqali qo'lda
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from api.catalog_routes import format_product
+from api.content_routes import content_payload
+from config import (
+    DEFAULT_LOCALE,
+    SNAPSHOT_AUTO_PUBLISH,
+    SNAPSHOT_DEBOUNCE,
+    SNAPSHOT_DIR,
+    SNAPSHOT_KEEP_SECONDS,
+)
+from content_cache import add_change_listener, content_version
+from storage import storage
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+DATA_DIR = "data"
+HASH_LENGTH = 12
+
+
+async def render_payloads() -> "dict[str, object]":
+    """Barcha bo'limlarni API bilan bir xil formatda tayyorlash."""
+    # Snapshot asosiy tilda; boshqa tillar API dan (?lang=)
+    content = await content_payload(DEFAULT_LOCALE)
+    # Qoldiq snapshotga kirmaydi — u har buyurtmada o'zgaradi (available: null)
+    products = [format_product(product) for product in await storage.get_catalog_products()]
+    categories = await storage.get_categories_with_counts()
+
+    return {
+        "content": content,
+        "settings": content["settings"],
+        "about": content["about"],
+        "delivery": content["delivery"],
+        "blog": {"posts": content["blog_posts"]},
+        "products": {
+            "products": products,
+            "total": len(products),
+            "page": 1,
+            "page_size": len(products),
+            "total_pages": 1,
+        },
+        "categories": {"categories": categories},
+    }
+
+
+def _serialize(payload) -> bytes:
+    # sort_keys — bir xil kontent har doim bir xil hash beradi
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(payloads: "dict[str, object]", version: int, output_dir: str = SNAPSHOT_DIR) -> dict:
+    """
+    Fayllarni yozish (sinxron — thread da chaqiriladi).
+    Avval data fayllar, oxirida manifest — mijoz hech qachon yo'q faylga ishora ko'rmaydi.
+    """
+    data_dir = os.path.join(output_dir, DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+
+    files = {}
+    written = 0
+    for name, payload in payloads.items():
+        data = _serialize(payload)
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        filename = f"{name}.{digest}.json"
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+            written += 1
+        files[name] = {"path": f"{DATA_DIR}/{filename}", "hash": digest, "size": len(data)}
+
+    manifest = {
+        "version": version,
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "files": files,
+    }
+    _write_atomic(
+        os.path.join(output_dir, MANIFEST_NAME),
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+    )
+
+    removed = _prune_old_files(data_dir, {entry["path"].split("/")[-1] for entry in files.values()})
+    return {"manifest": manifest, "written": written, "removed": removed}
+
+
+def _prune_old_files(data_dir: str, current: "set[str]") -> int:
+    """Manifestda yo'q va SNAPSHOT_KEEP_SECONDS dan eski fayllarni o'chirish."""
+    cutoff = time.time() - SNAPSHOT_KEEP_SECONDS
+    removed = 0
+    for filename in os.listdir(data_dir):
+        if filename in current:
+            continue
+        path = os.path.join(data_dir, filename)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class SnapshotPublisher:
+    """Debounce qilingan avtomatik nashr va qo'lda nashr."""
+
+    def __init__(self, output_dir: str = SNAPSHOT_DIR, debounce: float = SNAPSHOT_DEBOUNCE):
+        self.output_dir = output_dir
+        self.debounce = debounce
+        self._lock = asyncio.Lock()
+        self._requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.last_result: Optional[dict] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            # Ishga tushganda ham bir marta nashr (deploydan keyin papka bo'sh bo'lishi mumkin)
+            self._requested.set()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def request(self, sections: "set[str] | None" = None):
+        """Kontent o'zgardi — debounce dan keyin nashr qilinadi (change listener)."""
+        # Faqat tarjimalar ("about:ru") o'zgargan bo'lsa — snapshot (asosiy til) o'zgarmaydi
+        if sections and all(":" in section for section in sections):
+            return
+        if self._task is not None:
+            self._requested.set()
+
+    async def publish(self) -> dict:
+        """Hoziroq nashr qilish. Bir vaqtda faqat bitta nashr ishlaydi."""
+        async with self._lock:
+            started = time.monotonic()
+            version = content_version()
+            payloads = await render_payloads()
+            result = await asyncio.to_thread(write_snapshot, payloads, version, self.output_dir)
+            result["duration_ms"] = round((time.monotonic() - started) * 1000)
+            self.last_result = result
+            return result
+
+    async def _run(self):
+        while True:
+            await self._requested.wait()
+            # Ketma-ket tahrirlar (masalan, bir nechta /edit_settings) bitta nashrga
+            await asyncio.sleep(self.debounce)
+            self._requested.clear()
+            try:
+                result = await self.publish()
+                if result["written"]:
+                    logger.info(
+                        "Snapshot nashr qilindi: v%s, %d ta yangi fayl", result["manifest"]["version"], result["written"],
+                        extra={"event": "snapshot.published", "version": result["manifest"]["version"], "written": result["written"]},
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Snapshot nashr xatosi: %s", e, extra={"event": "snapshot.error"})
+
+
+snapshot_publisher = SnapshotPublisher()
+if SNAPSHOT_AUTO_PUBLISH:
+    add_change_listener(snapshot_publisher.request)
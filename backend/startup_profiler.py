@@ -0,0 +1,146 @@
+"""
+Startup Profiler — ishga tushish vaqtini o'lchash.
+
+Ikki xil o'lchov:
+  - lifespan bosqichlari (init_db, bot import, bot start, ...) — har doim
+    yoziladi, arzon: with startup_profiler.phase("init_db"): ...
+  - modullar import vaqti — faqat STARTUP_PROFILE=true bo'lsa. sys.meta_path
+    ga finder qo'shiladi, u har bir modulning exec_module vaqtini o'lchaydi
+    (o'z vaqti — ichki importlarsiz, va umumiy vaqt)
+
+Natija ishga tushish tugaganda konsolga chiqariladi (report()) va
+startup_profiler.summary() orqali olinadi.
+"""
+
+import importlib.abc
+import logging
+import sys
+import time
+from contextlib import contextmanager
+
+from config import STARTUP_PROFILE, STARTUP_PROFILE_TOP
+
+logger = logging.getLogger(__name__)
+
+# main.py birinchi bo'lib config va shu modulni import qiladi — shu nuqta "jarayon boshi"
+_PROCESS_START = time.perf_counter()
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """Asl loader ni o'rab, exec_module vaqtini o'lchaydi."""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Modul ichida (va keyin) faqat asl loader ko'rinsin (importlib.resources va h.k.)
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(module.__name__, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimingLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.phases: "list[tuple[str, float]]" = []
+        # name -> (umumiy, o'z vaqti)
+        self.imports: "dict[str, tuple[float, float]]" = {}
+        self._child_time: "list[float]" = []
+        self._finder = None
+        self.ready_at = None
+
+    # ── Import vaqti ──
+
+    def install_import_hook(self):
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _enter(self):
+        self._child_time.append(0.0)
+
+    def _exit(self, name: str, elapsed: float):
+        children = self._child_time.pop()
+        self.imports[name] = (elapsed, elapsed - children)
+        if self._child_time:
+            self._child_time[-1] += elapsed
+
+    # ── Bosqichlar ──
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def mark_ready(self):
+        """Lifespan startup tugadi — so'rovlar qabul qilinadi."""
+        self.ready_at = time.perf_counter() - _PROCESS_START
+        self.remove_import_hook()
+
+    def summary(self) -> dict:
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "ready_after_ms": round(self.ready_at * 1000, 1) if self.ready_at is not None else None,
+            "phases_ms": {name: round(elapsed * 1000, 1) for name, elapsed in self.phases},
+            "imports_profiled": STARTUP_PROFILE,
+            "modules_imported": len(self.imports),
+            "slowest_imports_ms": {
+                name: {"self": round(own * 1000, 1), "total": round(total * 1000, 1)}
+                for name, (total, own) in slowest[:STARTUP_PROFILE_TOP]
+            },
+        }
+
+    def report(self):
+        summary = self.summary()
+        phases = ", ".join(f"{name} {ms:.0f} ms" for name, ms in summary["phases_ms"].items())
+        logger.info(
+            "Ishga tushish: %.0f ms (%s)", summary["ready_after_ms"], phases,
+            extra={"event": "startup.ready", "ready_after_ms": summary["ready_after_ms"], "phases_ms": summary["phases_ms"]},
+        )
+        if summary["imports_profiled"]:
+            slowest = ", ".join(f"{name} {ms['self']:.1f}/{ms['total']:.1f} ms" for name, ms in summary["slowest_imports_ms"].items())
+            logger.info(
+                "Import: %d ta modul, eng sekinlari (o'z / umumiy): %s", summary["modules_imported"], slowest,
+                extra={"event": "startup.imports", "slowest_imports_ms": summary["slowest_imports_ms"]},
+            )
+
+
+startup_profiler = StartupProfiler()
+if STARTUP_PROFILE:
+    startup_profiler.install_import_hook()
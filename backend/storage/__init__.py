@@ -0,0 +1,26 @@
+"""
+Kontent ombori — STORAGE_BACKEND bo'yicha tanlanadi.
+
+    from storage import storage
+    settings = await storage.get_site_settings()
+
+sqlite (default) — database.py; postgres — storage/postgres.py (asyncpg pool).
+Ulanish lifespan da: await storage.connect() / await storage.close().
+"""
+
+from config import STORAGE_BACKEND
+from storage.base import Storage
+
+
+def create_storage(backend: str = STORAGE_BACKEND, **kwargs) -> Storage:
+    if backend == "postgres":
+        from storage.postgres import PostgresStorage
+        return PostgresStorage(**kwargs)
+
+    from storage.sqlite import SQLiteStorage
+    return SQLiteStorage()
+
+
+storage = create_storage()
+
+__all__ = ["Storage", "create_storage", "storage"]
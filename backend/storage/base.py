@@ -0,0 +1,223 @@
+"""
+Storage interfeysi — sayt kontenti va katalog uchun ombor.
+
+Qamrab oladi: adminlar, sayt sozlamalari, sahifa kontenti, blog, katalog,
+kontent tarjimalari, buyurtmalar, ombor qoldig'i, ko'rishlar statistikasi,
+rejalashtirilgan nashrlar va kontent versiyalari (delta sync).
+
+Botning mahalliy holati (xabarlar navbati, obunachilar, bot persistence)
+bu yerga kirmaydi — u faqat bot jarayonida kerak va doim SQLite da
+(database.py) qoladi. LLM maslahat keshi ham shunday: har bir node ning
+o'z SQLite keshi (yo'qolsa — qayta hisoblanadi).
+
+Qoidalar (ikkala backend uchun bir xil, storage/conformance.py tekshiradi):
+  - vaqtlar UTC, "YYYY-MM-DD HH:MM:SS" satr ko'rinishida qaytariladi
+  - kontent yozuvlari commit dan keyin notify_content_changed() ni chaqiradi
+    va content_versions da yangi versiya oladi (o'chirish — tombstone)
+  - qatorlar oddiy dict ko'rinishida qaytariladi
+"""
+
+from abc import ABC, abstractmethod
+
+from config import SUPER_ADMIN_IDS
+
+
+def super_admin_entry(telegram_id: int) -> dict:
+    """.env dagi, lekin bazada yo'q super admin uchun ro'yxat yozuvi."""
+    return {
+        "telegram_id": telegram_id,
+        "username": None,
+        "full_name": "Super Admin",
+        "added_at": None,
+        "is_super": True,
+    }
+
+
+def admin_entry(row) -> dict:
+    return {
+        "telegram_id": row["telegram_id"],
+        "username": row["username"],
+        "full_name": row["full_name"],
+        "added_at": row["added_at"],
+        "is_super": row["telegram_id"] in SUPER_ADMIN_IDS,
+    }
+
+
+BLOG_POST_FIELDS = {"title", "excerpt", "content", "image", "author", "is_published"}
+
+
+class Storage(ABC):
+    """Kontent ombori. Barcha metodlar async."""
+
+    name = "base"
+
+    async def connect(self):
+        """Ulanish (pool) va sxemani tayyorlash."""
+
+    async def close(self):
+        """Ulanishlarni yopish."""
+
+    @abstractmethod
+    async def ping(self) -> dict:
+        """
+        Sog'liq tekshiruvi (health.py): bazaga yengil so'rov. Qaytaradi — pool
+        holati ({"size", "idle", "max"}) yoki {} (pool yo'q). Xato — exception.
+        """
+
+    # ─── Admin operations ───
+
+    @abstractmethod
+    async def is_admin(self, telegram_id: int) -> bool: ...
+
+    @abstractmethod
+    async def add_admin(self, telegram_id: int, username: str, full_name: str, added_by: int) -> bool: ...
+
+    @abstractmethod
+    async def remove_admin(self, telegram_id: int) -> bool: ...
+
+    @abstractmethod
+    async def get_all_admins(self) -> "list[dict]": ...
+
+    @abstractmethod
+    async def count_admins(self) -> int: ...
+
+    @abstractmethod
+    async def get_admins_page(self, limit: int, offset: int) -> "list[dict]": ...
+
+    # ─── Site Settings operations ───
+
+    @abstractmethod
+    async def get_site_settings(self) -> dict: ...
+
+    @abstractmethod
+    async def get_site_settings_for_keys(self, keys: "list[str]") -> dict: ...
+
+    @abstractmethod
+    async def update_site_setting(self, key: str, value: str) -> bool: ...
+
+    # ─── Page Content operations ───
+
+    @abstractmethod
+    async def get_page_content(self, page_name: str): ...
+
+    @abstractmethod
+    async def update_page_content(self, page_name: str, content: dict) -> bool: ...
+
+    # ─── Blog Post operations ───
+
+    @abstractmethod
+    async def get_blog_posts(self, published_only: bool = True) -> "list[dict]": ...
+
+    @abstractmethod
+    async def count_blog_posts(self, published_only: bool = False) -> int: ...
+
+    @abstractmethod
+    async def get_blog_post_summaries(self, limit: int, offset: int = 0, published_only: bool = False) -> "list[dict]": ...
+
+    @abstractmethod
+    async def add_blog_post(self, title: str, excerpt: str, content: str, image: str, author: str): ...
+
+    @abstractmethod
+    async def update_blog_post(self, post_id: int, **kwargs) -> bool: ...
+
+    @abstractmethod
+    async def delete_blog_post(self, post_id: int) -> bool: ...
+
+    @abstractmethod
+    async def get_blog_posts_by_ids(self, post_ids: "list[int]", published_only: bool = True) -> "list[dict]": ...
+
+    # ─── Catalog operations ───
+
+    @abstractmethod
+    async def get_catalog_products(self) -> "list[dict]": ...
+
+    @abstractmethod
+    async def get_categories_with_counts(self) -> "list[dict]": ...
+
+    # ─── Order operations ───
+
+    @abstractmethod
+    async def get_products_by_ids(self, product_ids: "list[int]") -> "list[dict]": ...
+
+    @abstractmethod
+    async def get_order(self, order_id: int): ...
+
+    @abstractmethod
+    async def get_order_by_idempotency_key(self, key: str): ...
+
+    @abstractmethod
+    async def insert_orders(self, orders: "list[dict]") -> "list[dict]": ...
+
+    # ─── Inventory operations ───
+
+    @abstractmethod
+    async def get_stock_levels(self) -> "list[dict]": ...
+
+    @abstractmethod
+    async def get_stock_report(self, limit: int) -> "list[dict]": ...
+
+    @abstractmethod
+    async def apply_stock_changes(self, changes: "list[tuple[int, int | None, bool]]") -> "list[int]": ...
+
+    @abstractmethod
+    async def reserve_stock(self, token: str, lines: "list[tuple[int, int]]", ttl_seconds: int) -> "list[int]": ...
+
+    @abstractmethod
+    async def release_reservation(self, token: str) -> bool: ...
+
+    @abstractmethod
+    async def expire_reservations(self) -> int: ...
+
+    # ─── Analytics operations ───
+
+    @abstractmethod
+    async def flush_analytics(self, rows: "list[dict]", retain_days: int): ...
+
+    @abstractmethod
+    async def get_top_entities(self, entity_type: str, days: int, limit: int) -> "list[dict]": ...
+
+    @abstractmethod
+    async def get_daily_counts(self, entity_type: str, days: int) -> "list[dict]": ...
+
+    # ─── Translation operations ───
+
+    @abstractmethod
+    async def get_translations(
+        self, entity_type: str, locales: "list[str]", entity_keys: "list | None" = None,
+    ) -> "dict[str, dict[str, dict[str, str]]]": ...
+
+    @abstractmethod
+    async def set_translations(self, entity_type: str, entity_key, locale: str, fields: "dict[str, str | None]") -> bool: ...
+
+    # ─── Content version operations ───
+
+    @abstractmethod
+    async def get_content_version(self) -> int: ...
+
+    @abstractmethod
+    async def get_section_versions(self) -> "dict[str, int]": ...
+
+    @abstractmethod
+    async def get_content_changes(self, since: int) -> "list[dict]": ...
+
+    # ─── Scheduled publishing operations ───
+
+    @abstractmethod
+    async def schedule_blog_post(
+        self, post_id: int, publish_at: "str | None" = None, unpublish_at: "str | None" = None, clear: bool = False,
+    ) -> bool: ...
+
+    @abstractmethod
+    async def schedule_site_setting(self, key: str, value: str, run_at: str, created_by: "int | None" = None): ...
+
+    @abstractmethod
+    async def cancel_scheduled_setting(self, job_id: int) -> bool: ...
+
+    @abstractmethod
+    async def get_scheduled_jobs(self) -> "list[dict]": ...
+
+    @abstractmethod
+    async def get_next_scheduled_time(self) -> "str | None": ...
+
+    @abstractmethod
+    async def run_due_scheduled_jobs(self) -> "set[str]": ...
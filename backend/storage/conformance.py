@@ -0,0 +1,482 @@
+"""
+Storage conformance va benchmark — ikkala backend bir xil ishlashini tekshirish.
+
+    python -m storage.conformance --backend sqlite
+    python -m storage.conformance --backend postgres --dsn postgresql://localhost/toymix_test
+    python -m storage.conformance --backend postgres --bench 2000
+
+SQLite — vaqtinchalik faylda. PostgreSQL — vaqtinchalik sxemada
+(toymix_conformance_<pid>), oxirida DROP SCHEMA ... CASCADE. Haqiqiy
+ma'lumotlarga tegmaydi, lekin DSN dagi foydalanuvchiga CREATE SCHEMA huquqi kerak.
+
+Tekshiruvlar oddiy assert lar: birinchi nomuvofiqlikda to'xtaydi.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import POSTGRES_DSN
+from content_cache import add_change_listener
+from hyperloglog import add as hll_add, new_sketch
+from storage import create_storage
+from storage.base import Storage
+
+TIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+
+_notified: "list[set[str]]" = []
+add_change_listener(_notified.append)
+
+
+def _utc(offset_seconds: int) -> str:
+    moment = datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+async def _seed_catalog(storage: Storage):
+    """Katalog yozish interfeysda yo'q (bot hali mahsulot qo'shmaydi) — to'g'ridan-to'g'ri SQL."""
+    if storage.name == "postgres":
+        async with storage.pool.acquire() as conn:
+            toys = await conn.fetchval("INSERT INTO categories (name, sort_order) VALUES ('Konstruktor', 1) RETURNING id")
+            await conn.execute("INSERT INTO categories (name, sort_order) VALUES ('Bo''sh', 2)")
+            first = await conn.fetchval(
+                "INSERT INTO products (title, price, category_id) VALUES ('Lego', '120000', $1) RETURNING id", toys
+            )
+            await conn.fetchval(
+                "INSERT INTO products (title, price, category_id, is_active) VALUES ('Eski', '1', $1, 0) RETURNING id", toys
+            )
+            await conn.executemany(
+                "INSERT INTO product_media (product_id, file_id, sort_order) VALUES ($1, $2, $3)",
+                [(first, "file-b", 2), (first, "file-a", 1)],
+            )
+        return
+
+    from database import get_db
+
+    db = await get_db()
+    try:
+        cursor = await db.execute("INSERT INTO categories (name, sort_order) VALUES ('Konstruktor', 1)")
+        toys = cursor.lastrowid
+        await db.execute("INSERT INTO categories (name, sort_order) VALUES ('Bo''sh', 2)")
+        cursor = await db.execute("INSERT INTO products (title, price, category_id) VALUES ('Lego', '120000', ?)", (toys,))
+        first = cursor.lastrowid
+        await db.execute("INSERT INTO products (title, price, category_id, is_active) VALUES ('Eski', '1', ?, 0)", (toys,))
+        await db.executemany(
+            "INSERT INTO product_media (product_id, file_id, sort_order) VALUES (?, ?, ?)",
+            [(first, "file-b", 2), (first, "file-a", 1)],
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def check_admins(storage: Storage):
+    pool = (await storage.ping()).get("pool")
+    assert pool is None or pool["idle"] <= pool["size"] <= pool["max"]
+
+    base_count = await storage.count_admins()
+    assert await storage.add_admin(111, "ali", "Ali Valiyev", 1)
+    assert await storage.is_admin(111)
+    assert not await storage.is_admin(222)
+    assert await storage.count_admins() == base_count + 1
+
+    admins = await storage.get_all_admins()
+    assert len(admins) == base_count + 1
+    ali = next(admin for admin in admins if admin["telegram_id"] == 111)
+    assert ali["full_name"] == "Ali Valiyev" and ali["is_super"] is False
+    assert TIME_RE.match(ali["added_at"])
+
+    # Qayta qo'shish — yangilaydi, dublikat emas
+    assert await storage.add_admin(111, "ali2", "Ali", 1)
+    assert await storage.count_admins() == base_count + 1
+
+    page = await storage.get_admins_page(limit=50, offset=0)
+    assert [a["telegram_id"] for a in page] == [a["telegram_id"] for a in await storage.get_all_admins()]
+
+    assert await storage.remove_admin(111)
+    assert not await storage.is_admin(111)
+    assert await storage.count_admins() == base_count
+
+
+async def check_settings(storage: Storage):
+    settings = await storage.get_site_settings()
+    assert isinstance(settings.get("free_delivery_threshold"), int)
+
+    _notified.clear()
+    assert await storage.update_site_setting("phone", "+998 90 000 00 00")
+    assert await storage.update_site_setting("free_delivery_threshold", "oops")
+    assert {"settings"} in _notified
+
+    assert (await storage.get_site_settings_for_keys(["phone", "missing"])) == {"phone": "+998 90 000 00 00"}
+    assert (await storage.get_site_settings_for_keys([])) == {}
+    # Noto'g'ri son — default qiymat
+    assert (await storage.get_site_settings())["free_delivery_threshold"] == 300000
+
+
+async def check_pages(storage: Storage):
+    assert await storage.get_page_content("missing") is None
+    content = {"title": "Biz haqimizda", "items": [1, 2], "nested": {"o'yinchoq": "ха"}}
+    _notified.clear()
+    assert await storage.update_page_content("about", content)
+    assert await storage.get_page_content("about") == content
+    assert {"about"} in _notified
+
+
+async def check_blog(storage: Storage):
+    since = await storage.get_content_version()
+    first = await storage.add_blog_post("Birinchi", "qisqa", "matn", "", "Admin")
+    second = await storage.add_blog_post("Ikkinchi", "", "", "", "Admin")
+    assert isinstance(first, int) and second > first
+
+    assert await storage.update_blog_post(second, is_published=0, title="Ikkinchi (qoralama)")
+    assert not await storage.update_blog_post(second, unknown_field="x")
+
+    published = await storage.get_blog_posts(published_only=True)
+    assert [post["id"] for post in published if post["id"] in (first, second)] == [first]
+    everything = await storage.get_blog_posts(published_only=False)
+    assert {first, second} <= {post["id"] for post in everything}
+    assert TIME_RE.match(everything[0]["created_at"])
+
+    assert await storage.count_blog_posts() >= 2
+    assert await storage.count_blog_posts(published_only=True) == len(published)
+    summaries = await storage.get_blog_post_summaries(limit=1, offset=0)
+    assert len(summaries) == 1 and set(summaries[0]) == {"id", "title", "author", "is_published", "created_at"}
+
+    by_ids = await storage.get_blog_posts_by_ids([first, second, 999999], published_only=False)
+    assert {post["id"] for post in by_ids} == {first, second}
+    assert [post["id"] for post in await storage.get_blog_posts_by_ids([first, second])] == [first]
+    assert await storage.get_blog_posts_by_ids([]) == []
+
+    assert await storage.delete_blog_post(second)
+    changes = await storage.get_content_changes(since)
+    versions = [change["version"] for change in changes]
+    assert versions == sorted(versions) and len(set(versions)) == len(versions)
+    tombstone = next(c for c in changes if c["section"] == "blog_posts" and c["item_key"] == str(second))
+    assert tombstone["deleted"] == 1
+    return first
+
+
+async def check_versions(storage: Storage):
+    before = await storage.get_content_version()
+    assert await storage.update_site_setting("phone", "+998 90 111 11 11")
+    after = await storage.get_content_version()
+    assert after == before + 1
+
+    sections = await storage.get_section_versions()
+    assert sections["settings"] == after
+    assert await storage.get_content_changes(after) == []
+    assert [(c["section"], c["item_key"]) for c in await storage.get_content_changes(before)] == [("settings", "phone")]
+
+    # Mavjud bo'lmagan post — versiya ham, tombstone ham yo'q
+    assert not await storage.update_blog_post(999999, title="x")
+    assert not await storage.delete_blog_post(999999)
+    assert await storage.get_content_version() == after
+
+
+async def check_scheduling(storage: Storage, post_id: int):
+    future = _utc(3600)
+    assert await storage.schedule_blog_post(post_id, publish_at=future)
+    assert post_id not in [post["id"] for post in await storage.get_blog_posts()]
+    assert not await storage.schedule_blog_post(999999, publish_at=future)
+    # Ikkinchi vaqt birinchisini o'chirmaydi
+    assert await storage.schedule_blog_post(post_id, unpublish_at=_utc(86400))
+    assert sorted(job["kind"] for job in await storage.get_scheduled_jobs()) == ["publish", "unpublish"]
+    assert await storage.schedule_blog_post(post_id, clear=True)
+    assert await storage.get_scheduled_jobs() == []
+    assert await storage.schedule_blog_post(post_id, publish_at=future)
+
+    job_id = await storage.schedule_site_setting("promo_banner_text", "Chegirma!", _utc(-5), created_by=1)
+    kept_id = await storage.schedule_site_setting("phone", "+998 90 222 22 22", _utc(7200))
+    jobs = await storage.get_scheduled_jobs()
+    assert [job["kind"] for job in jobs] == ["setting", "publish", "setting"]
+    assert all(TIME_RE.match(job["run_at"]) for job in jobs)
+    assert await storage.get_next_scheduled_time() == jobs[0]["run_at"]
+
+    # Vaqti o'tgan nashr + sozlama bitta chaqiruvda bajariladi
+    assert await storage.schedule_blog_post(post_id, publish_at=_utc(-1))
+    _notified.clear()
+    changed = await storage.run_due_scheduled_jobs()
+    assert changed == {"blog", "settings"}
+    assert _notified == [{"blog", "settings"}]
+    assert post_id in [post["id"] for post in await storage.get_blog_posts()]
+    assert (await storage.get_site_settings_for_keys(["promo_banner_text"]))["promo_banner_text"] == "Chegirma!"
+    assert await storage.run_due_scheduled_jobs() == set()
+
+    assert not await storage.cancel_scheduled_setting(job_id)  # allaqachon bajarilgan
+    assert await storage.cancel_scheduled_setting(kept_id)
+    assert await storage.get_scheduled_jobs() == []
+    assert await storage.get_next_scheduled_time() is None
+
+
+async def check_catalog(storage: Storage):
+    await _seed_catalog(storage)
+    products = await storage.get_catalog_products()
+    assert [product["title"] for product in products] == ["Lego"]
+    assert products[0]["category_name"] == "Konstruktor"
+    assert [media["file_id"] for media in products[0]["media"]] == ["file-a", "file-b"]
+
+    categories = await storage.get_categories_with_counts()
+    assert [(c["name"], c["toy_count"]) for c in categories] == [("Konstruktor", 1), ("Bo'sh", 0)]
+
+
+async def check_orders(storage: Storage):
+    products = await storage.get_products_by_ids([1, 2, 999])
+    assert [(p["id"], p["title"], p["price"]) for p in products] == [(1, "Lego", "120000")]
+    assert await storage.get_products_by_ids([]) == []
+
+    def order(key, total):
+        return {
+            "idempotency_key": key, "request_hash": f"hash-{key}",
+            "customer_name": "Ali", "phone": "+998901234567", "city": "tashkent",
+            "address": "Chilonzor", "payment_method": "cash", "comment": "",
+            "subtotal": total, "delivery_fee": 0, "total": total,
+            "items": [{"product_id": 1, "title": "Lego", "unit_price": total, "quantity": 1}],
+        }
+
+    # Bitta batch ichida ham, keyingi batchda ham bir xil kalit — bitta buyurtma
+    first, duplicate, anonymous = await storage.insert_orders([order("k1", 100), order("k1", 100), order(None, 5)])
+    assert first["created"] and not duplicate["created"] and anonymous["created"]
+    assert duplicate["id"] == first["id"] and duplicate["request_hash"] == "hash-k1"
+    (again,) = await storage.insert_orders([order("k1", 999)])
+    assert not again["created"] and again["id"] == first["id"]
+
+    saved = await storage.get_order_by_idempotency_key("k1")
+    assert saved["total"] == 100 and saved["status"] == "pending" and TIME_RE.match(saved["created_at"])
+    assert saved["items"] == [{"product_id": 1, "title": "Lego", "unit_price": 100, "quantity": 1}]
+    assert (await storage.get_order(anonymous["id"]))["items"][0]["unit_price"] == 5
+    assert await storage.get_order(999999) is None
+
+
+async def check_inventory(storage: Storage):
+    def order(quantity, reservation_id=None):
+        return {
+            "idempotency_key": None, "request_hash": None, "customer_name": "Vali", "phone": "0",
+            "city": "", "address": "-", "payment_method": "cash", "comment": "",
+            "subtotal": quantity, "delivery_fee": 0, "total": quantity, "reservation_id": reservation_id,
+            "items": [{"product_id": 1, "title": "Lego", "unit_price": 1, "quantity": quantity}],
+        }
+
+    def levels(rows):
+        return {row["id"]: (row["stock"], row["reserved"]) for row in rows}
+
+    # Qoldiq kuzatilmaydi — cheklanmagan
+    assert levels(await storage.get_stock_levels())[1] == (None, 0)
+    assert await storage.get_stock_report(10) == []
+    assert await storage.apply_stock_changes([(1, 5, False), (999, 1, False)]) == [1]
+    assert await storage.apply_stock_changes([(1, 2, True), (1, -3, True)]) == [1, 1]
+    assert [(r["id"], r["stock"]) for r in await storage.get_stock_report(10)] == [(1, 4)]
+
+    # Bron: yetmasa hech narsa bron qilinmaydi
+    assert await storage.reserve_stock("cart-a", [(1, 5)], 600) == [1]
+    assert await storage.reserve_stock("cart-a", [(1, 3)], 600) == []
+    assert await storage.reserve_stock("cart-b", [(1, 2)], 600) == [1]
+    assert levels(await storage.get_stock_levels())[1] == (4, 3)
+
+    # Bronsiz buyurtma faqat bron qilinmagan qismni oladi
+    (short,) = await storage.insert_orders([order(2)])
+    assert short["out_of_stock"] == [1] and not short["created"]
+    # Bron bilan — bron qilingan miqdor buyurtmaga o'tadi, bron o'chadi
+    taken, rest, over = await storage.insert_orders([order(3, "cart-a"), order(1), order(1)])
+    assert taken["created"] and rest["created"] and over["out_of_stock"] == [1]
+    assert levels(await storage.get_stock_levels())[1] == (0, 0)
+    assert not await storage.release_reservation("cart-a")
+
+    # Muddati o'tgan bron qaytariladi
+    assert await storage.apply_stock_changes([(1, 2, False)]) == [1]
+    assert await storage.reserve_stock("cart-c", [(1, 2)], 0) == []
+    assert await storage.expire_reservations() == 1
+    assert await storage.expire_reservations() == 0
+    assert levels(await storage.get_stock_levels())[1] == (2, 0)
+    assert await storage.reserve_stock("cart-d", [(1, 1)], 600) == []
+    assert await storage.release_reservation("cart-d")
+    assert levels(await storage.get_stock_levels())[1] == (2, 0)
+
+    assert await storage.apply_stock_changes([(1, None, False)]) == [1]
+
+
+async def check_analytics(storage: Storage, post_id: int):
+    today = datetime.now(timezone.utc).date()
+
+    def row(entity_type, entity_id, day, views, clicks, visitors):
+        sketch = new_sketch()
+        for visitor in visitors:
+            hll_add(sketch, visitor)
+        return {
+            "entity_type": entity_type, "entity_id": entity_id, "day": day.isoformat(),
+            "views": views, "clicks": clicks, "visitors": bytes(sketch),
+        }
+
+    assert await storage.get_top_entities("product", 7, 10) == []
+    old_day = today - timedelta(days=200)
+    await storage.flush_analytics([
+        row("product", 1, today, 3, 1, ["a", "b"]),
+        row("product", 1, today - timedelta(days=3), 2, 0, ["b", "c"]),
+        row("product", 999, today, 50, 0, ["x"]),          # mahsulot yo'q — ro'yxatga kirmaydi
+        row("post", post_id, today, 1, 0, ["a"]),
+        row("post", post_id, old_day, 9, 0, ["z"]),        # retain_days dan eski — o'chadi
+    ], 90)
+    # Ikkinchi flush shu kunga qo'shiladi, sketchlar birlashadi
+    await storage.flush_analytics([row("product", 1, today, 1, 1, ["a", "d"])], 90)
+
+    (lego,) = await storage.get_top_entities("product", 7, 10)
+    assert (lego["entity_id"], lego["title"], lego["views"], lego["clicks"], lego["visitors"]) == (1, "Lego", 6, 2, 4)
+    (today_only,) = await storage.get_top_entities("product", 1, 10)
+    assert (today_only["views"], today_only["visitors"]) == (4, 3)
+    (post,) = await storage.get_top_entities("post", 365, 10)
+    assert post["views"] == 1
+
+    counts = sorted((r["entity_id"], r["day"], r["views"], r["clicks"]) for r in await storage.get_daily_counts("product", 7))
+    assert counts == [
+        (1, (today - timedelta(days=3)).isoformat(), 2, 0), (1, today.isoformat(), 4, 2), (999, today.isoformat(), 50, 0),
+    ]
+
+
+async def check_translations(storage: Storage, post_id: int):
+    assert await storage.get_translations("pages", []) == {}
+    assert await storage.get_translations("pages", ["ru"], []) == {}
+
+    since = await storage.get_content_version()
+    _notified.clear()
+    assert await storage.set_translations("pages", "about", "ru", {"title": '"О нас"', "items": "[1, 2]"})
+    assert {"about:ru"} in _notified
+    assert [(c["section"], c["item_key"]) for c in await storage.get_content_changes(since)] == [("pages", "about@ru")]
+
+    assert await storage.set_translations("blog_posts", post_id, "ru", {"title": "Первый", "excerpt": "кратко"})
+    assert await storage.set_translations("products", 1, "ru", {"title": "Лего"})
+    # Bo'sh qiymat — maydon tarjimasi o'chadi
+    assert await storage.set_translations("blog_posts", post_id, "ru", {"excerpt": None, "title": "Первый!"})
+
+    assert await storage.get_translations("pages", ["ru"]) == {"about": {"ru": {"title": '"О нас"', "items": "[1, 2]"}}}
+    assert await storage.get_translations("blog_posts", ["ru"], [post_id]) == {str(post_id): {"ru": {"title": "Первый!"}}}
+    assert await storage.get_translations("products", ["ru"], [2, 3]) == {}
+    assert await storage.get_translations("products", ["uz"]) == {}
+
+    for entity_type, locale, fields in (("pages", "uz", {"title": "x"}), ("products", "ru", {"price": "1"})):
+        try:
+            await storage.set_translations(entity_type, 1, locale, fields)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"set_translations({entity_type}, {locale}) ValueError bermadi")
+
+    assert await storage.delete_blog_post(post_id)
+    assert await storage.get_translations("blog_posts", ["ru"]) == {}
+
+
+CHECKS = [
+    "admins", "settings", "pages", "blog", "versions", "scheduling", "catalog", "orders", "inventory", "analytics",
+    "translations",
+]
+
+
+async def run_conformance(storage: Storage):
+    await check_admins(storage)
+    await check_settings(storage)
+    await check_pages(storage)
+    post_id = await check_blog(storage)
+    await check_versions(storage)
+    await check_scheduling(storage, post_id)
+    await check_catalog(storage)
+    await check_orders(storage)
+    await check_inventory(storage)
+    await check_analytics(storage, post_id)
+    await check_translations(storage, post_id)
+    print(f"✅ {storage.name}: {len(CHECKS)} ta tekshiruv o'tdi ({', '.join(CHECKS)})")
+
+
+async def _timed(label: str, n: int, call, concurrency: int = 1, per_call: int = 1):
+    async def worker(count: int):
+        for _ in range(count):
+            await call()
+
+    started = time.perf_counter()
+    share, rest = divmod(n, concurrency)
+    await asyncio.gather(*(worker(share + (1 if i < rest else 0)) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"   {label:<34} {n * per_call / elapsed:9.0f} op/s  "
+        f"({elapsed * 1000 / n:.3f} ms/chaqiruv, x{concurrency})"
+    )
+
+
+async def _reserve_and_release(storage: Storage, token: str):
+    await storage.reserve_stock(token, [(1, 1)], 600)
+    await storage.release_reservation(token)
+
+
+async def run_benchmark(storage: Storage, n: int):
+    """Sayt va bot eng ko'p chaqiradigan so'rovlar."""
+    print(f"⏱ {storage.name} benchmark, {n} ta so'rov:")
+    post_ids = [await storage.add_blog_post(f"Post {i}", "", "matn " * 50, "", "Bench") for i in range(50)]
+    for concurrency in (1, 8):
+        await _timed("get_site_settings", n, storage.get_site_settings, concurrency)
+        await _timed("get_page_content", n, lambda: storage.get_page_content("about"), concurrency)
+        await _timed("get_blog_posts", n, storage.get_blog_posts, concurrency)
+        await _timed("get_blog_posts_by_ids (10)", n, lambda: storage.get_blog_posts_by_ids(post_ids[:10]), concurrency)
+        await _timed("get_content_changes", n, lambda: storage.get_content_changes(0), concurrency)
+        await _timed("is_admin", n, lambda: storage.is_admin(111), concurrency)
+        await _timed("update_site_setting", max(1, n // 10), lambda: storage.update_site_setting("phone", "1"), concurrency)
+
+    order = {
+        "idempotency_key": None, "request_hash": None, "customer_name": "Bench", "phone": "0",
+        "city": "", "address": "-", "payment_method": "cash", "comment": "",
+        "subtotal": 1, "delivery_fee": 0, "total": 1,
+        "items": [{"product_id": 1, "title": "Lego", "unit_price": 1, "quantity": 1}],
+    }
+    # Bitta mahsulotga parallel bronlar (aksiya paytidagi talash)
+    await storage.apply_stock_changes([(1, 10**6, False)])
+    tokens = iter(range(10**9))
+    await _timed(
+        "reserve_stock + release", n,
+        lambda: _reserve_and_release(storage, f"bench-{next(tokens)}"), concurrency=8,
+    )
+
+    for batch in (1, 32):
+        await _timed(
+            f"insert_orders ({batch} ta/tranzaksiya)", max(1, n // batch),
+            lambda: storage.insert_orders([order] * batch), per_call=batch,
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--dsn", default=POSTGRES_DSN, help="PostgreSQL DSN (default: POSTGRES_DSN)")
+    parser.add_argument("--bench", type=int, default=0, help="benchmark so'rovlari soni (0 — o'tkazib yuborish)")
+    args = parser.parse_args()
+
+    if args.backend == "postgres":
+        schema = f"toymix_conformance_{os.getpid()}"
+        storage = create_storage("postgres", dsn=args.dsn, schema=schema)
+        import asyncpg
+
+        admin_conn = await asyncpg.connect(args.dsn)
+        await admin_conn.execute(f"CREATE SCHEMA {schema}")
+        try:
+            await storage.connect()
+            await run_conformance(storage)
+            if args.bench:
+                await run_benchmark(storage, args.bench)
+        finally:
+            await storage.close()
+            await admin_conn.execute(f"DROP SCHEMA {schema} CASCADE")
+            await admin_conn.close()
+        return
+
+    import database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "conformance.db")
+        storage = create_storage("sqlite")
+        await storage.connect()
+        await run_conformance(storage)
+        if args.bench:
+            await run_benchmark(storage, args.bench)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,1008 @@
+"""
+PostgreSQL backend — asyncpg connection pool ustida.
+
+Bir nechta API server bitta bazadan foydalanishi uchun (SQLite da bitta
+fayl va bitta yozuvchi). Xususiyatlari:
+
+  - asyncpg pool (POSTGRES_POOL_MIN..POSTGRES_POOL_MAX ulanish)
+  - barcha so'rovlar parametrli va o'zgarmas matnli — asyncpg ularni har
+    bir ulanishda bir marta prepare qiladi va keshlaydi
+    (POSTGRES_STATEMENT_CACHE), keyingi chaqiruvlar faqat bind + execute
+  - kontent versiyalari transaction-level advisory lock ostida beriladi:
+    versiya N ko'ringan bo'lsa, N dan kichik barcha versiyalar allaqachon
+    commit bo'lgan (delta sync hech narsani o'tkazib yubormaydi)
+  - sxema birinchi ulanishda yaratiladi (storage_meta.schema_version),
+    keyingi ishga tushishlarda bitta SELECT
+
+asyncpg faqat STORAGE_BACKEND=postgres bo'lganda import qilinadi.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+
+from config import (
+    POSTGRES_DSN,
+    POSTGRES_POOL_MAX,
+    POSTGRES_POOL_MIN,
+    POSTGRES_STATEMENT_CACHE,
+    SUPER_ADMIN_IDS,
+)
+from content_cache import notify_content_changed
+from database import ANALYTICS_TABLES, ORDER_COLUMNS, normalize_site_settings
+from hyperloglog import estimate as hll_estimate, merge as hll_merge
+from locales import entity_cache_section, validate_translation, version_key
+from migrations import DEFAULT_SITE_SETTINGS
+from storage.base import BLOG_POST_FIELDS, Storage, admin_entry, super_admin_entry
+
+logger = logging.getLogger(__name__)
+
+DB_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+NOW_UTC = "(now() AT TIME ZONE 'utc')"
+
+SCHEMA_VERSION = 5
+# pg_advisory_xact_lock kalitlari (ixtiyoriy, lekin ilovada yagona raqamlar)
+SCHEMA_LOCK_KEY = 72_600_001
+CONTENT_LOCK_KEY = 72_600_002
+ANALYTICS_LOCK_KEY = 72_600_003
+
+SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS storage_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS admins (
+        telegram_id BIGINT PRIMARY KEY,
+        username TEXT,
+        full_name TEXT,
+        added_by BIGINT,
+        added_at TIMESTAMP DEFAULT {NOW_UTC},
+        is_active INTEGER DEFAULT 1
+    );
+
+    CREATE TABLE IF NOT EXISTS categories (
+        id BIGSERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        sort_order INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT {NOW_UTC}
+    );
+
+    CREATE TABLE IF NOT EXISTS products (
+        id BIGSERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        price TEXT NOT NULL,
+        description TEXT DEFAULT '',
+        category_id BIGINT REFERENCES categories(id) ON DELETE SET NULL,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {NOW_UTC},
+        updated_at TIMESTAMP DEFAULT {NOW_UTC}
+    );
+    CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id);
+
+    CREATE TABLE IF NOT EXISTS product_media (
+        id BIGSERIAL PRIMARY KEY,
+        product_id BIGINT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        file_id TEXT NOT NULL,
+        media_type TEXT DEFAULT 'photo',
+        sort_order INTEGER DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_product_media_product
+        ON product_media (product_id, sort_order, id);
+
+    CREATE TABLE IF NOT EXISTS blog_posts (
+        id BIGSERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        excerpt TEXT DEFAULT '',
+        content TEXT DEFAULT '',
+        image TEXT DEFAULT '',
+        author TEXT DEFAULT '',
+        is_published INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {NOW_UTC},
+        updated_at TIMESTAMP DEFAULT {NOW_UTC},
+        publish_at TIMESTAMP,
+        unpublish_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_blog_posts_created ON blog_posts (created_at);
+    CREATE INDEX IF NOT EXISTS idx_blog_posts_publish_at
+        ON blog_posts (publish_at) WHERE publish_at IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_blog_posts_unpublish_at
+        ON blog_posts (unpublish_at) WHERE unpublish_at IS NOT NULL;
+
+    CREATE TABLE IF NOT EXISTS site_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS page_content (
+        page_name TEXT PRIMARY KEY,
+        content_json JSONB NOT NULL,
+        updated_at TIMESTAMP DEFAULT {NOW_UTC}
+    );
+
+    CREATE TABLE IF NOT EXISTS scheduled_settings (
+        id BIGSERIAL PRIMARY KEY,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        run_at TIMESTAMP NOT NULL,
+        created_by BIGINT,
+        created_at TIMESTAMP DEFAULT {NOW_UTC},
+        applied_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_scheduled_settings_due
+        ON scheduled_settings (run_at) WHERE applied_at IS NULL;
+
+    CREATE TABLE IF NOT EXISTS content_versions (
+        section TEXT NOT NULL,
+        item_key TEXT NOT NULL,
+        version BIGINT NOT NULL,
+        deleted INTEGER DEFAULT 0,
+        PRIMARY KEY (section, item_key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_content_versions_version ON content_versions (version);
+
+    CREATE TABLE IF NOT EXISTS orders (
+        id BIGSERIAL PRIMARY KEY,
+        idempotency_key TEXT UNIQUE,
+        request_hash TEXT,
+        customer_name TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        city TEXT DEFAULT '',
+        address TEXT NOT NULL,
+        payment_method TEXT DEFAULT 'cash',
+        comment TEXT DEFAULT '',
+        subtotal BIGINT NOT NULL,
+        delivery_fee BIGINT NOT NULL,
+        total BIGINT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT {NOW_UTC}
+    );
+    CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at);
+
+    CREATE TABLE IF NOT EXISTS order_items (
+        id BIGSERIAL PRIMARY KEY,
+        order_id BIGINT NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+        product_id BIGINT REFERENCES products(id) ON DELETE SET NULL,
+        title TEXT NOT NULL,
+        unit_price BIGINT NOT NULL,
+        quantity INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id);
+
+    -- stock NULL — qoldiq kuzatilmaydi; sotuvga tayyor = stock - reserved
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS stock INTEGER;
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS reserved INTEGER NOT NULL DEFAULT 0;
+
+    CREATE TABLE IF NOT EXISTS stock_reservations (
+        token TEXT NOT NULL,
+        product_id BIGINT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        quantity INTEGER NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (token, product_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_stock_reservations_expires ON stock_reservations (expires_at);
+
+    CREATE TABLE IF NOT EXISTS analytics_daily (
+        entity_type TEXT NOT NULL,
+        entity_id BIGINT NOT NULL,
+        day DATE NOT NULL,
+        views BIGINT NOT NULL DEFAULT 0,
+        clicks BIGINT NOT NULL DEFAULT 0,
+        visitors BYTEA,
+        PRIMARY KEY (entity_type, entity_id, day)
+    );
+    CREATE INDEX IF NOT EXISTS idx_analytics_daily_day ON analytics_daily (day);
+
+    CREATE TABLE IF NOT EXISTS content_translations (
+        entity_type TEXT NOT NULL,
+        entity_key TEXT NOT NULL,
+        locale TEXT NOT NULL,
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT {NOW_UTC},
+        PRIMARY KEY (entity_type, locale, entity_key, field)
+    );
+"""
+
+# Bitta so'rovda tekshirish va yechish (qator lock dan keyin WHERE qayta tekshiriladi)
+STOCK_TAKE_SQL = """
+    UPDATE products SET stock = stock - $1, reserved = GREATEST(reserved - $2, 0)
+    WHERE id = $3 AND (stock IS NULL OR stock - reserved + $2 >= $1)
+    RETURNING id
+"""
+
+
+class _OutOfStock(Exception):
+    """Buyurtma SAVEPOINT ini orqaga qaytarish uchun."""
+
+    def __init__(self, product_ids: "list[int]"):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+def _to_db_time(value: "str | None") -> "datetime | None":
+    return datetime.strptime(value, DB_TIME_FORMAT) if value else None
+
+
+def _from_db_time(value):
+    return value.strftime(DB_TIME_FORMAT) if isinstance(value, datetime) else value
+
+
+def _row(record) -> dict:
+    """asyncpg Record → dict (vaqtlar SQLite bilan bir xil satr formatida)."""
+    return {key: _from_db_time(value) for key, value in record.items()}
+
+
+async def _bump_content_version(conn, section: str, item_key, deleted: bool = False) -> int:
+    """Tranzaksiya ichida: kontent yozuvchilari shu lock da navbatga turadi."""
+    await conn.execute("SELECT pg_advisory_xact_lock($1)", CONTENT_LOCK_KEY)
+    return await conn.fetchval(
+        """INSERT INTO content_versions (section, item_key, version, deleted)
+           VALUES ($1, $2, (SELECT COALESCE(MAX(version), 0) + 1 FROM content_versions), $3)
+           ON CONFLICT (section, item_key) DO UPDATE SET
+               version = EXCLUDED.version,
+               deleted = EXCLUDED.deleted
+           RETURNING version""",
+        section, str(item_key), 1 if deleted else 0,
+    )
+
+
+class PostgresStorage(Storage):
+    name = "postgres"
+
+    def __init__(self, dsn: str = POSTGRES_DSN, schema: "str | None" = None):
+        self.dsn = dsn
+        self.schema = schema
+        self.pool = None
+
+    async def connect(self):
+        import asyncpg
+
+        if not self.dsn:
+            raise RuntimeError("STORAGE_BACKEND=postgres, lekin POSTGRES_DSN berilmagan")
+
+        server_settings = {"application_name": "toymix"}
+        if self.schema:
+            server_settings["search_path"] = self.schema
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=POSTGRES_POOL_MIN,
+            max_size=POSTGRES_POOL_MAX,
+            statement_cache_size=POSTGRES_STATEMENT_CACHE,
+            server_settings=server_settings,
+        )
+        await self._init_schema()
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def ping(self) -> dict:
+        # Pool holati probe ulanishni olishdan oldin — aks holda u ham band hisoblanadi
+        pool = {"size": self.pool.get_size(), "idle": self.pool.get_idle_size(), "max": self.pool.get_max_size()}
+        await self.pool.fetchval("SELECT 1")
+        return {"pool": pool}
+
+    async def _init_schema(self):
+        async with self.pool.acquire() as conn:
+            if await self._schema_version(conn) >= SCHEMA_VERSION:
+                return
+            async with conn.transaction():
+                # Bir vaqtda ishga tushgan API nodelar sxemani bitta-bitta tekshiradi
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", SCHEMA_LOCK_KEY)
+                if await self._schema_version(conn) >= SCHEMA_VERSION:
+                    return
+                await conn.execute(SCHEMA)
+                await conn.executemany(
+                    "INSERT INTO site_settings (key, value) VALUES ($1, $2) ON CONFLICT (key) DO NOTHING",
+                    list(DEFAULT_SITE_SETTINGS.items()),
+                )
+                await conn.execute(
+                    """INSERT INTO storage_meta (key, value) VALUES ('schema_version', $1)
+                       ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value""",
+                    SCHEMA_VERSION,
+                )
+        logger.info("PostgreSQL sxemasi tayyor (v%d)", SCHEMA_VERSION, extra={"event": "storage.schema_ready"})
+
+    @staticmethod
+    async def _schema_version(conn) -> int:
+        if await conn.fetchval("SELECT to_regclass('storage_meta')") is None:
+            return 0
+        return await conn.fetchval("SELECT value FROM storage_meta WHERE key = 'schema_version'") or 0
+
+    # ─── Admin operations ───
+
+    async def is_admin(self, telegram_id: int) -> bool:
+        row = await self.pool.fetchval(
+            "SELECT 1 FROM admins WHERE telegram_id = $1 AND is_active = 1", telegram_id
+        )
+        return row is not None
+
+    async def add_admin(self, telegram_id: int, username: str, full_name: str, added_by: int) -> bool:
+        try:
+            await self.pool.execute(
+                f"""INSERT INTO admins (telegram_id, username, full_name, added_by, is_active)
+                    VALUES ($1, $2, $3, $4, 1)
+                    ON CONFLICT (telegram_id) DO UPDATE SET
+                        username = EXCLUDED.username,
+                        full_name = EXCLUDED.full_name,
+                        added_by = EXCLUDED.added_by,
+                        added_at = {NOW_UTC},
+                        is_active = 1""",
+                telegram_id, username, full_name, added_by,
+            )
+            return True
+        except Exception:
+            return False
+
+    async def remove_admin(self, telegram_id: int) -> bool:
+        if telegram_id in SUPER_ADMIN_IDS:
+            return False
+        await self.pool.execute("UPDATE admins SET is_active = 0 WHERE telegram_id = $1", telegram_id)
+        return True
+
+    async def _super_admins_missing(self, conn) -> "list[int]":
+        if not SUPER_ADMIN_IDS:
+            return []
+        rows = await conn.fetch(
+            "SELECT telegram_id FROM admins WHERE is_active = 1 AND telegram_id = ANY($1::bigint[])",
+            list(SUPER_ADMIN_IDS),
+        )
+        return sorted(SUPER_ADMIN_IDS - {row["telegram_id"] for row in rows})
+
+    async def get_all_admins(self) -> "list[dict]":
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT telegram_id, username, full_name, added_at FROM admins WHERE is_active = 1"
+            )
+            admins = [admin_entry(_row(row)) for row in rows]
+            admins.extend(super_admin_entry(sid) for sid in await self._super_admins_missing(conn))
+            return admins
+
+    async def count_admins(self) -> int:
+        async with self.pool.acquire() as conn:
+            count = await conn.fetchval("SELECT COUNT(*) FROM admins WHERE is_active = 1")
+            return count + len(await self._super_admins_missing(conn))
+
+    async def get_admins_page(self, limit: int, offset: int) -> "list[dict]":
+        async with self.pool.acquire() as conn:
+            extra = await self._super_admins_missing(conn)
+            admins = [super_admin_entry(sid) for sid in extra[offset:offset + limit]]
+
+            db_limit = limit - len(admins)
+            if db_limit > 0:
+                rows = await conn.fetch(
+                    """SELECT telegram_id, username, full_name, added_at FROM admins
+                       WHERE is_active = 1 ORDER BY added_at, telegram_id
+                       LIMIT $1 OFFSET $2""",
+                    db_limit, max(0, offset - len(extra)),
+                )
+                admins.extend(admin_entry(_row(row)) for row in rows)
+            return admins
+
+    # ─── Site Settings operations ───
+
+    async def get_site_settings(self) -> dict:
+        rows = await self.pool.fetch("SELECT key, value FROM site_settings")
+        return normalize_site_settings({row["key"]: row["value"] for row in rows})
+
+    async def get_site_settings_for_keys(self, keys: "list[str]") -> dict:
+        if not keys:
+            return {}
+        rows = await self.pool.fetch(
+            "SELECT key, value FROM site_settings WHERE key = ANY($1::text[])", list(keys)
+        )
+        return {row["key"]: row["value"] for row in rows}
+
+    async def update_site_setting(self, key: str, value: str) -> bool:
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        """INSERT INTO site_settings (key, value) VALUES ($1, $2)
+                           ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value""",
+                        key, value,
+                    )
+                    version = await _bump_content_version(conn, "settings", key)
+        except Exception:
+            return False
+        notify_content_changed("settings", version=version)
+        return True
+
+    # ─── Page Content operations ───
+
+    async def get_page_content(self, page_name: str):
+        content = await self.pool.fetchval(
+            "SELECT content_json FROM page_content WHERE page_name = $1", page_name
+        )
+        return json.loads(content) if content else None
+
+    async def update_page_content(self, page_name: str, content: dict) -> bool:
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        f"""INSERT INTO page_content (page_name, content_json, updated_at)
+                            VALUES ($1, $2::jsonb, {NOW_UTC})
+                            ON CONFLICT (page_name) DO UPDATE SET
+                                content_json = EXCLUDED.content_json,
+                                updated_at = EXCLUDED.updated_at""",
+                        page_name, json.dumps(content, ensure_ascii=False),
+                    )
+                    version = await _bump_content_version(conn, "pages", page_name)
+        except Exception:
+            return False
+        notify_content_changed(page_name, version=version)
+        return True
+
+    # ─── Blog Post operations ───
+
+    async def get_blog_posts(self, published_only: bool = True) -> "list[dict]":
+        if published_only:
+            rows = await self.pool.fetch(
+                "SELECT * FROM blog_posts WHERE is_published = 1 ORDER BY created_at DESC"
+            )
+        else:
+            rows = await self.pool.fetch("SELECT * FROM blog_posts ORDER BY created_at DESC")
+        return [_row(row) for row in rows]
+
+    async def count_blog_posts(self, published_only: bool = False) -> int:
+        if published_only:
+            return await self.pool.fetchval("SELECT COUNT(*) FROM blog_posts WHERE is_published = 1")
+        return await self.pool.fetchval("SELECT COUNT(*) FROM blog_posts")
+
+    async def get_blog_post_summaries(self, limit: int, offset: int = 0, published_only: bool = False) -> "list[dict]":
+        rows = await self.pool.fetch(
+            """SELECT id, title, author, is_published, created_at FROM blog_posts
+               WHERE ($3::boolean IS FALSE OR is_published = 1)
+               ORDER BY created_at DESC, id DESC LIMIT $1 OFFSET $2""",
+            limit, offset, published_only,
+        )
+        return [_row(row) for row in rows]
+
+    async def add_blog_post(self, title: str, excerpt: str, content: str, image: str, author: str):
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    post_id = await conn.fetchval(
+                        """INSERT INTO blog_posts (title, excerpt, content, image, author)
+                           VALUES ($1, $2, $3, $4, $5) RETURNING id""",
+                        title, excerpt, content, image, author,
+                    )
+                    version = await _bump_content_version(conn, "blog_posts", post_id)
+        except Exception:
+            return None
+        notify_content_changed("blog", version=version)
+        return post_id
+
+    async def update_blog_post(self, post_id: int, **kwargs) -> bool:
+        updates = {k: v for k, v in kwargs.items() if k in BLOG_POST_FIELDS}
+        if not updates:
+            return False
+
+        # Ustun nomlari faqat BLOG_POST_FIELDS dan — SQL ga xavfsiz
+        columns = sorted(updates)
+        set_clause = ", ".join(f"{column} = ${i}" for i, column in enumerate(columns, start=2))
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    updated = await conn.fetchval(
+                        f"UPDATE blog_posts SET {set_clause}, updated_at = {NOW_UTC} WHERE id = $1 RETURNING id",
+                        post_id, *(updates[column] for column in columns),
+                    )
+                    if updated is None:
+                        # Noto'g'ri ID — versiya oshirilmaydi (mijozlarga soxta o'zgarish bormasin)
+                        return False
+                    version = await _bump_content_version(conn, "blog_posts", post_id)
+        except Exception:
+            return False
+        notify_content_changed("blog", version=version)
+        return True
+
+    async def delete_blog_post(self, post_id: int) -> bool:
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    deleted = await conn.fetchval("DELETE FROM blog_posts WHERE id = $1 RETURNING id", post_id)
+                    if deleted is None:
+                        # Post yo'q — tombstone yozilmaydi
+                        return False
+                    await conn.execute(
+                        "DELETE FROM content_translations WHERE entity_type = 'blog_posts' AND entity_key = $1",
+                        str(post_id),
+                    )
+                    # Tombstone — keshi bor mijozlar postni o'chirishi uchun
+                    version = await _bump_content_version(conn, "blog_posts", post_id, deleted=True)
+        except Exception:
+            return False
+        notify_content_changed("blog", version=version)
+        return True
+
+    async def get_blog_posts_by_ids(self, post_ids: "list[int]", published_only: bool = True) -> "list[dict]":
+        if not post_ids:
+            return []
+        rows = await self.pool.fetch(
+            """SELECT * FROM blog_posts
+               WHERE id = ANY($1::bigint[]) AND ($2::boolean IS FALSE OR is_published = 1)
+               ORDER BY created_at DESC, id DESC""",
+            list(post_ids), published_only,
+        )
+        return [_row(row) for row in rows]
+
+    # ─── Catalog operations ───
+
+    async def get_catalog_products(self) -> "list[dict]":
+        async with self.pool.acquire() as conn:
+            products = [
+                _row(row)
+                for row in await conn.fetch(
+                    """SELECT p.*, c.name AS category_name
+                       FROM products p
+                       LEFT JOIN categories c ON c.id = p.category_id
+                       WHERE p.is_active = 1
+                       ORDER BY p.created_at DESC, p.id DESC"""
+                )
+            ]
+            media_by_product: "dict[int, list[dict]]" = {}
+            for row in await conn.fetch(
+                """SELECT m.id, m.product_id, m.file_id, m.media_type, m.sort_order
+                   FROM product_media m
+                   JOIN products p ON p.id = m.product_id
+                   WHERE p.is_active = 1
+                   ORDER BY m.product_id, m.sort_order, m.id"""
+            ):
+                media_by_product.setdefault(row["product_id"], []).append(dict(row))
+
+        for product in products:
+            product["media"] = media_by_product.get(product["id"], [])
+        return products
+
+    async def get_categories_with_counts(self) -> "list[dict]":
+        rows = await self.pool.fetch(
+            """SELECT c.id, c.name, COUNT(p.id) AS toy_count
+               FROM categories c
+               LEFT JOIN products p ON p.category_id = c.id AND p.is_active = 1
+               GROUP BY c.id
+               ORDER BY c.sort_order, c.name"""
+        )
+        return [dict(row) for row in rows]
+
+    # ─── Order operations ───
+
+    async def get_products_by_ids(self, product_ids: "list[int]") -> "list[dict]":
+        if not product_ids:
+            return []
+        rows = await self.pool.fetch(
+            "SELECT id, title, price FROM products WHERE is_active = 1 AND id = ANY($1::bigint[])",
+            list(product_ids),
+        )
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def _fetch_order(conn, column: str, value):
+        row = await conn.fetchrow(f"SELECT * FROM orders WHERE {column} = $1", value)
+        if row is None:
+            return None
+        order = _row(row)
+        items = await conn.fetch(
+            """SELECT product_id, title, unit_price, quantity FROM order_items
+               WHERE order_id = $1 ORDER BY id""",
+            order["id"],
+        )
+        order["items"] = [dict(item) for item in items]
+        return order
+
+    async def get_order(self, order_id: int):
+        async with self.pool.acquire() as conn:
+            return await self._fetch_order(conn, "id", order_id)
+
+    async def get_order_by_idempotency_key(self, key: str):
+        async with self.pool.acquire() as conn:
+            return await self._fetch_order(conn, "idempotency_key", key)
+
+    @staticmethod
+    async def _take_stock(conn, order: dict) -> "list[int]":
+        held: "dict[int, int]" = {}
+        token = order.get("reservation_id")
+        if token:
+            rows = await conn.fetch(
+                "SELECT product_id, quantity FROM stock_reservations WHERE token = $1", token
+            )
+            held = {row["product_id"]: row["quantity"] for row in rows}
+
+        short = []
+        for item in order["items"]:
+            own = held.pop(item["product_id"], 0)
+            if await conn.fetchval(STOCK_TAKE_SQL, item["quantity"], own, item["product_id"]) is None:
+                short.append(item["product_id"])
+
+        if held:
+            await conn.executemany(
+                "UPDATE products SET reserved = GREATEST(reserved - $1, 0) WHERE id = $2",
+                [(quantity, product_id) for product_id, quantity in held.items()],
+            )
+        if token:
+            await conn.execute("DELETE FROM stock_reservations WHERE token = $1", token)
+        return short
+
+    async def insert_orders(self, orders: "list[dict]") -> "list[dict]":
+        results = []
+        items = []
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for order in orders:
+                    try:
+                        # Ichki transaction — SAVEPOINT: rad etilgan buyurtma batchni buzmaydi
+                        async with conn.transaction():
+                            order_id = await conn.fetchval(
+                                f"""INSERT INTO orders ({", ".join(ORDER_COLUMNS)})
+                                    VALUES ({", ".join(f"${i}" for i in range(1, len(ORDER_COLUMNS) + 1))})
+                                    ON CONFLICT (idempotency_key) DO NOTHING
+                                    RETURNING id""",
+                                *(order.get(column) for column in ORDER_COLUMNS),
+                            )
+                            if order_id is not None:
+                                short = await self._take_stock(conn, order)
+                                if short:
+                                    raise _OutOfStock(short)
+                    except _OutOfStock as e:
+                        results.append({
+                            "id": None, "created": False,
+                            "request_hash": order.get("request_hash"), "out_of_stock": e.product_ids,
+                        })
+                        continue
+
+                    if order_id is None:
+                        existing = await conn.fetchrow(
+                            "SELECT id, request_hash FROM orders WHERE idempotency_key = $1",
+                            order["idempotency_key"],
+                        )
+                        results.append({
+                            "id": existing["id"], "created": False,
+                            "request_hash": existing["request_hash"], "out_of_stock": [],
+                        })
+                        continue
+
+                    items.extend(
+                        (order_id, item["product_id"], item["title"], item["unit_price"], item["quantity"])
+                        for item in order["items"]
+                    )
+                    results.append({
+                        "id": order_id, "created": True,
+                        "request_hash": order.get("request_hash"), "out_of_stock": [],
+                    })
+
+                await conn.executemany(
+                    """INSERT INTO order_items (order_id, product_id, title, unit_price, quantity)
+                       VALUES ($1, $2, $3, $4, $5)""",
+                    items,
+                )
+        return results
+
+    # ─── Inventory operations ───
+
+    async def get_stock_levels(self) -> "list[dict]":
+        rows = await self.pool.fetch("SELECT id, stock, reserved FROM products WHERE is_active = 1")
+        return [dict(row) for row in rows]
+
+    async def get_stock_report(self, limit: int) -> "list[dict]":
+        rows = await self.pool.fetch(
+            """SELECT id, title, stock, reserved FROM products
+               WHERE is_active = 1 AND stock IS NOT NULL
+               ORDER BY stock - reserved, id LIMIT $1""",
+            limit,
+        )
+        return [dict(row) for row in rows]
+
+    async def apply_stock_changes(self, changes: "list[tuple[int, int | None, bool]]") -> "list[int]":
+        updated = []
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for product_id, value, relative in changes:
+                    if relative:
+                        found = await conn.fetchval(
+                            """UPDATE products SET stock = GREATEST(COALESCE(stock, 0) + $1, 0)
+                               WHERE id = $2 RETURNING id""",
+                            value, product_id,
+                        )
+                    else:
+                        found = await conn.fetchval(
+                            "UPDATE products SET stock = $1 WHERE id = $2 RETURNING id", value, product_id
+                        )
+                    if found is not None:
+                        updated.append(product_id)
+        return updated
+
+    @staticmethod
+    async def _release_reservation(conn, token: str) -> bool:
+        rows = await conn.fetch(
+            "DELETE FROM stock_reservations WHERE token = $1 RETURNING product_id, quantity", token
+        )
+        if rows:
+            await conn.executemany(
+                "UPDATE products SET reserved = GREATEST(reserved - $1, 0) WHERE id = $2",
+                [(row["quantity"], row["product_id"]) for row in rows],
+            )
+        return bool(rows)
+
+    async def reserve_stock(self, token: str, lines: "list[tuple[int, int]]", ttl_seconds: int) -> "list[int]":
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await self._release_reservation(conn, token)
+                    short = []
+                    for product_id, quantity in lines:
+                        found = await conn.fetchval(
+                            """UPDATE products SET reserved = reserved + $1
+                               WHERE id = $2 AND is_active = 1 AND (stock IS NULL OR stock - reserved >= $1)
+                               RETURNING id""",
+                            quantity, product_id,
+                        )
+                        if found is None:
+                            short.append(product_id)
+                    if short:
+                        raise _OutOfStock(short)
+                    await conn.executemany(
+                        f"""INSERT INTO stock_reservations (token, product_id, quantity, expires_at)
+                            VALUES ($1, $2, $3, {NOW_UTC} + make_interval(secs => $4))""",
+                        [(token, product_id, quantity, float(ttl_seconds)) for product_id, quantity in lines],
+                    )
+            except _OutOfStock as e:
+                return e.product_ids
+        return []
+
+    async def release_reservation(self, token: str) -> bool:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                return await self._release_reservation(conn, token)
+
+    async def expire_reservations(self) -> int:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(
+                    f"""DELETE FROM stock_reservations WHERE expires_at <= {NOW_UTC}
+                        RETURNING product_id, quantity"""
+                )
+                released: "dict[int, int]" = {}
+                for row in rows:
+                    released[row["product_id"]] = released.get(row["product_id"], 0) + row["quantity"]
+                if released:
+                    await conn.executemany(
+                        "UPDATE products SET reserved = GREATEST(reserved - $1, 0) WHERE id = $2",
+                        [(quantity, product_id) for product_id, quantity in released.items()],
+                    )
+        return len(rows)
+
+    # ─── Analytics operations ───
+
+    async def flush_analytics(self, rows: "list[dict]", retain_days: int):
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                # Bir nechta API node bir vaqtda flush qilsa, sketchlar yo'qolmasin
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", ANALYTICS_LOCK_KEY)
+                keys = [(row["entity_type"], row["entity_id"], date.fromisoformat(row["day"])) for row in rows]
+                found = await conn.fetch(
+                    """SELECT a.entity_type, a.entity_id, a.day, a.visitors
+                       FROM analytics_daily a
+                       JOIN unnest($1::text[], $2::bigint[], $3::date[]) AS k(entity_type, entity_id, day)
+                         USING (entity_type, entity_id, day)""",
+                    [key[0] for key in keys], [key[1] for key in keys], [key[2] for key in keys],
+                )
+                existing = {(r["entity_type"], r["entity_id"], r["day"]): r["visitors"] for r in found}
+                await conn.executemany(
+                    """INSERT INTO analytics_daily (entity_type, entity_id, day, views, clicks, visitors)
+                       VALUES ($1, $2, $3, $4, $5, $6)
+                       ON CONFLICT (entity_type, entity_id, day) DO UPDATE SET
+                           views = analytics_daily.views + EXCLUDED.views,
+                           clicks = analytics_daily.clicks + EXCLUDED.clicks,
+                           visitors = EXCLUDED.visitors""",
+                    [
+                        (*key, row["views"], row["clicks"], hll_merge(existing.get(key), row["visitors"]))
+                        for key, row in zip(keys, rows)
+                    ],
+                )
+                await conn.execute(
+                    f"DELETE FROM analytics_daily WHERE day < ({NOW_UTC})::date - $1::int",
+                    retain_days,
+                )
+
+    async def get_top_entities(self, entity_type: str, days: int, limit: int) -> "list[dict]":
+        table = ANALYTICS_TABLES[entity_type]
+        since = max(days - 1, 0)
+        rows = await self.pool.fetch(
+            f"""SELECT a.entity_id, t.title, SUM(a.views)::bigint AS views, SUM(a.clicks)::bigint AS clicks,
+                       array_agg(a.visitors) AS sketches
+                FROM analytics_daily a
+                JOIN {table} t ON t.id = a.entity_id
+                WHERE a.entity_type = $1 AND a.day >= ({NOW_UTC})::date - $2::int
+                GROUP BY a.entity_id, t.title
+                ORDER BY views DESC, clicks DESC, a.entity_id
+                LIMIT $3""",
+            entity_type, since, limit,
+        )
+        return [
+            {
+                "entity_id": row["entity_id"],
+                "title": row["title"],
+                "views": row["views"],
+                "clicks": row["clicks"],
+                "visitors": hll_estimate(hll_merge(*row["sketches"])),
+            }
+            for row in rows
+        ]
+
+    async def get_daily_counts(self, entity_type: str, days: int) -> "list[dict]":
+        rows = await self.pool.fetch(
+            f"""SELECT entity_id, day::text AS day, views, clicks FROM analytics_daily
+                WHERE entity_type = $1 AND day >= ({NOW_UTC})::date - $2::int""",
+            entity_type, max(days - 1, 0),
+        )
+        return [dict(row) for row in rows]
+
+    # ─── Translation operations ───
+
+    async def get_translations(
+        self, entity_type: str, locales: "list[str]", entity_keys: "list | None" = None,
+    ) -> "dict[str, dict[str, dict[str, str]]]":
+        if not locales or entity_keys == []:
+            return {}
+        rows = await self.pool.fetch(
+            """SELECT entity_key, locale, field, value FROM content_translations
+               WHERE entity_type = $1 AND locale = ANY($2::text[])
+                 AND ($3::text[] IS NULL OR entity_key = ANY($3::text[]))""",
+            entity_type, list(locales), None if entity_keys is None else [str(key) for key in entity_keys],
+        )
+        translations: "dict[str, dict[str, dict[str, str]]]" = {}
+        for row in rows:
+            translations.setdefault(row["entity_key"], {}).setdefault(row["locale"], {})[row["field"]] = row["value"]
+        return translations
+
+    async def set_translations(self, entity_type: str, entity_key, locale: str, fields: "dict[str, str | None]") -> bool:
+        validate_translation(entity_type, locale, fields)
+        entity_key = str(entity_key)
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.executemany(
+                        f"""INSERT INTO content_translations (entity_type, entity_key, locale, field, value)
+                            VALUES ($1, $2, $3, $4, $5)
+                            ON CONFLICT (entity_type, locale, entity_key, field) DO UPDATE SET
+                                value = EXCLUDED.value,
+                                updated_at = {NOW_UTC}""",
+                        [(entity_type, entity_key, locale, field, value) for field, value in fields.items() if value],
+                    )
+                    await conn.executemany(
+                        """DELETE FROM content_translations
+                           WHERE entity_type = $1 AND entity_key = $2 AND locale = $3 AND field = $4""",
+                        [(entity_type, entity_key, locale, field) for field, value in fields.items() if not value],
+                    )
+                    version = await _bump_content_version(conn, entity_type, version_key(entity_key, locale))
+        except Exception:
+            return False
+        notify_content_changed(f"{entity_cache_section(entity_type, entity_key)}:{locale}", version=version)
+        return True
+
+    # ─── Content version operations ───
+
+    async def get_content_version(self) -> int:
+        return await self.pool.fetchval("SELECT COALESCE(MAX(version), 0) FROM content_versions")
+
+    async def get_section_versions(self) -> "dict[str, int]":
+        rows = await self.pool.fetch(
+            "SELECT section, MAX(version) AS version FROM content_versions GROUP BY section"
+        )
+        return {row["section"]: row["version"] for row in rows}
+
+    async def get_content_changes(self, since: int) -> "list[dict]":
+        rows = await self.pool.fetch(
+            """SELECT section, item_key, version, deleted FROM content_versions
+               WHERE version > $1 ORDER BY version""",
+            since,
+        )
+        return [dict(row) for row in rows]
+
+    # ─── Scheduled publishing operations ───
+
+    async def schedule_blog_post(
+        self, post_id: int, publish_at: "str | None" = None, unpublish_at: "str | None" = None, clear: bool = False,
+    ) -> bool:
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                updated = await conn.fetchval(
+                    f"""UPDATE blog_posts
+                        SET publish_at = CASE WHEN $4 THEN NULL ELSE COALESCE($2::timestamp, publish_at) END,
+                            unpublish_at = CASE WHEN $4 THEN NULL ELSE COALESCE($3::timestamp, unpublish_at) END,
+                            is_published = CASE
+                                WHEN $2::timestamp IS NOT NULL AND $2::timestamp > {NOW_UTC} THEN 0
+                                ELSE is_published
+                            END,
+                            updated_at = {NOW_UTC}
+                        WHERE id = $1
+                        RETURNING id""",
+                    post_id, _to_db_time(publish_at), _to_db_time(unpublish_at), clear,
+                )
+                if updated is None:
+                    return False
+                version = await _bump_content_version(conn, "blog_posts", post_id)
+        notify_content_changed("blog", version=version)
+        return True
+
+    async def schedule_site_setting(self, key: str, value: str, run_at: str, created_by: "int | None" = None):
+        return await self.pool.fetchval(
+            """INSERT INTO scheduled_settings (key, value, run_at, created_by)
+               VALUES ($1, $2, $3, $4) RETURNING id""",
+            key, value, _to_db_time(run_at), created_by,
+        )
+
+    async def cancel_scheduled_setting(self, job_id: int) -> bool:
+        deleted = await self.pool.fetchval(
+            "DELETE FROM scheduled_settings WHERE id = $1 AND applied_at IS NULL RETURNING id", job_id
+        )
+        return deleted is not None
+
+    async def get_scheduled_jobs(self) -> "list[dict]":
+        rows = await self.pool.fetch(
+            """SELECT 'publish' AS kind, id, title AS label, publish_at AS run_at
+                   FROM blog_posts WHERE publish_at IS NOT NULL
+               UNION ALL
+               SELECT 'unpublish', id, title, unpublish_at
+                   FROM blog_posts WHERE unpublish_at IS NOT NULL
+               UNION ALL
+               SELECT 'setting', id, key || ' = ' || value, run_at
+                   FROM scheduled_settings WHERE applied_at IS NULL
+               ORDER BY run_at"""
+        )
+        return [_row(row) for row in rows]
+
+    async def get_next_scheduled_time(self) -> "str | None":
+        value = await self.pool.fetchval(
+            """SELECT MIN(t) FROM (
+                   SELECT MIN(publish_at) AS t FROM blog_posts WHERE publish_at IS NOT NULL
+                   UNION ALL
+                   SELECT MIN(unpublish_at) FROM blog_posts WHERE unpublish_at IS NOT NULL
+                   UNION ALL
+                   SELECT MIN(run_at) FROM scheduled_settings WHERE applied_at IS NULL
+               ) AS due"""
+        )
+        return _from_db_time(value)
+
+    async def run_due_scheduled_jobs(self) -> "set[str]":
+        changed = set()
+        version = None
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for column, published in (("publish_at", 1), ("unpublish_at", 0)):
+                    post_ids = await conn.fetch(
+                        f"""UPDATE blog_posts
+                            SET is_published = $1, {column} = NULL, updated_at = {NOW_UTC}
+                            WHERE {column} IS NOT NULL AND {column} <= {NOW_UTC}
+                            RETURNING id""",
+                        published,
+                    )
+                    for row in post_ids:
+                        version = await _bump_content_version(conn, "blog_posts", row["id"])
+                        changed.add("blog")
+
+                # SKIP LOCKED — bir nechta node bir jobni ikki marta bajarmaydi
+                jobs = await conn.fetch(
+                    f"""SELECT id, key, value FROM scheduled_settings
+                        WHERE applied_at IS NULL AND run_at <= {NOW_UTC}
+                        ORDER BY run_at, id
+                        FOR UPDATE SKIP LOCKED"""
+                )
+                for job in jobs:
+                    await conn.execute(
+                        """INSERT INTO site_settings (key, value) VALUES ($1, $2)
+                           ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value""",
+                        job["key"], job["value"],
+                    )
+                    await conn.execute(
+                        f"UPDATE scheduled_settings SET applied_at = {NOW_UTC} WHERE id = $1", job["id"]
+                    )
+                    version = await _bump_content_version(conn, "settings", job["key"])
+                    changed.add("settings")
+
+        if changed:
+            notify_content_changed(*changed, version=version)
+        return changed
@@ -0,0 +1,84 @@
+"""
+SQLite backend — database.py dagi mavjud funksiyalar ustidan yupqa qatlam.
+
+Bitta fayl, bitta yozuvchi: bitta server uchun eng tez va eng oddiy variant.
+"""
+
+import database
+from storage.base import Storage
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    async def connect(self):
+        # Sxema database.init_db() da (migrations.py) tayyorlanadi
+        await database.init_db()
+
+    ping = staticmethod(database.ping_db)
+
+    # Admin operations
+    is_admin = staticmethod(database.is_admin)
+    add_admin = staticmethod(database.add_admin)
+    remove_admin = staticmethod(database.remove_admin)
+    get_all_admins = staticmethod(database.get_all_admins)
+    count_admins = staticmethod(database.count_admins)
+    get_admins_page = staticmethod(database.get_admins_page)
+
+    # Site Settings operations
+    get_site_settings = staticmethod(database.get_site_settings)
+    get_site_settings_for_keys = staticmethod(database.get_site_settings_for_keys)
+    update_site_setting = staticmethod(database.update_site_setting)
+
+    # Page Content operations
+    get_page_content = staticmethod(database.get_page_content)
+    update_page_content = staticmethod(database.update_page_content)
+
+    # Blog Post operations
+    get_blog_posts = staticmethod(database.get_blog_posts)
+    count_blog_posts = staticmethod(database.count_blog_posts)
+    get_blog_post_summaries = staticmethod(database.get_blog_post_summaries)
+    add_blog_post = staticmethod(database.add_blog_post)
+    update_blog_post = staticmethod(database.update_blog_post)
+    delete_blog_post = staticmethod(database.delete_blog_post)
+    get_blog_posts_by_ids = staticmethod(database.get_blog_posts_by_ids)
+
+    # Catalog operations
+    get_catalog_products = staticmethod(database.get_catalog_products)
+    get_categories_with_counts = staticmethod(database.get_categories_with_counts)
+
+    # Order operations
+    get_products_by_ids = staticmethod(database.get_products_by_ids)
+    get_order = staticmethod(database.get_order)
+    get_order_by_idempotency_key = staticmethod(database.get_order_by_idempotency_key)
+    insert_orders = staticmethod(database.insert_orders)
+
+    # Inventory operations
+    get_stock_levels = staticmethod(database.get_stock_levels)
+    get_stock_report = staticmethod(database.get_stock_report)
+    apply_stock_changes = staticmethod(database.apply_stock_changes)
+    reserve_stock = staticmethod(database.reserve_stock)
+    release_reservation = staticmethod(database.release_reservation)
+    expire_reservations = staticmethod(database.expire_reservations)
+
+    # Analytics operations
+    flush_analytics = staticmethod(database.flush_analytics)
+    get_top_entities = staticmethod(database.get_top_entities)
+    get_daily_counts = staticmethod(database.get_daily_counts)
+
+    # Translation operations
+    get_translations = staticmethod(database.get_translations)
+    set_translations = staticmethod(database.set_translations)
+
+    # Content version operations
+    get_content_version = staticmethod(database.get_content_version)
+    get_section_versions = staticmethod(database.get_section_versions)
+    get_content_changes = staticmethod(database.get_content_changes)
+
+    # Scheduled publishing operations
+    schedule_blog_post = staticmethod(database.schedule_blog_post)
+    schedule_site_setting = staticmethod(database.schedule_site_setting)
+    cancel_scheduled_setting = staticmethod(database.cancel_scheduled_setting)
+    get_scheduled_jobs = staticmethod(database.get_scheduled_jobs)
+    get_next_scheduled_time = staticmethod(database.get_next_scheduled_time)
+    run_due_scheduled_jobs = staticmethod(database.run_due_scheduled_jobs)
@@ -2,12 +2,14 @@
 import React, { useState } from 'react';
 import { Sparkles, Send, Loader2, X, Bot, Wand2 } from 'lucide-react';
 import { getToyAdvice } from '../services/geminiService';
-import { AIAdviceRequest } from '../types';
+import { fetchRecommendations } from '../services/productService';
+import { AIAdviceRequest, Toy } from '../types';
 
 const AIAdvisor: React.FC = () => {
   const [isOpen, setIsOpen] = useState(false);
   const [loading, setLoading] = useState(false);
   const [response, setResponse] = useState<string | null>(null);
+  const [suggestions, setSuggestions] = useState<Toy[]>([]);
   const [form, setForm] = useState<AIAdviceRequest>({
     age: '',
     interest: '',
@@ -18,7 +20,15 @@ const AIAdvisor: React.FC = () => {
     e.preventDefault();
     setLoading(true);
     setResponse(null);
+    setSuggestions([]);
     try {
+      // Real catalog first (instant, no LLM); the LLM only when nothing matched
+      const local = await fetchRecommendations(form);
+      if (local && local.matched && local.toys.length > 0) {
+        setSuggestions(local.toys);
+        setResponse("Do'konimizdagi mavjud o'yinchoqlardan farzandingizga eng moslari:");
+        return;
+      }
       const advice = await getToyAdvice(form);
       setResponse(advice);
     } catch (err) {
@@ -142,8 +152,24 @@ const AIAdvisor: React.FC = () => {
                     {response}
                   </div>
                 </div>
+                {suggestions.length > 0 && (
+                  <div className="space-y-3">
+                    {suggestions.map(toy => (
+                      <div key={toy.id} className="flex items-center gap-4 bg-white p-3 rounded-2xl border border-gray-100">
+                        {toy.image && (
+                          <img src={toy.image} alt={toy.name} className="w-16 h-16 rounded-xl object-cover bg-gray-50" />
+                        )}
+                        <div className="flex-1 min-w-0">
+                          <p className="font-black text-sm text-gray-900 truncate">{toy.name}</p>
+                          <p className="text-[10px] font-bold text-gray-400 uppercase tracking-widest">{toy.ageRange}</p>
+                          <p className="font-black text-sm text-[#6C5CE7]">{toy.price.toLocaleString()} so'm</p>
+                        </div>
+                      </div>
+                    ))}
+                  </div>
+                )}
                 <button 
-                  onClick={() => setResponse(null)}
+                  onClick={() => { setResponse(null); setSuggestions([]); }}
                   className="w-full py-4 text-[#6C5CE7] font-black text-sm border-4 border-gray-50 rounded-2xl hover:bg-gray-50 transition-colors"
                 >
                   Yana so'rash
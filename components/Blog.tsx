@@ -1,12 +1,18 @@
-import React from 'react';
+import React, { useEffect } from 'react';
 import { Calendar, User, ArrowRight } from 'lucide-react';
 import { BlogPost } from '../types';
+import { trackEvent } from '../services/analyticsService';
 
 interface BlogProps {
   posts: BlogPost[];
 }
 
 const Blog: React.FC<BlogProps> = ({ posts }) => {
+  // One view per post each time the blog page is opened
+  useEffect(() => {
+    posts.forEach(post => trackEvent('view', 'post', post.id));
+  }, [posts]);
+
   return (
     <section className="container mx-auto px-4 py-10" aria-label="ToyMix blog - bolalar o'yinchoqlari haqida foydali maqolalar">
       <div className="mb-10">
@@ -38,7 +44,10 @@ const Blog: React.FC<BlogProps> = ({ posts }) => {
                 </div>
                 <h2 className="text-xl font-black text-gray-900 mb-3 leading-tight">{post.title}</h2>
                 <p className="text-gray-500 font-medium text-sm leading-relaxed mb-6">{post.excerpt}</p>
-                <button className="text-[#4D96FF] font-black text-sm flex items-center gap-2 hover:gap-3 transition-all">
+                <button
+                  onClick={() => trackEvent('click', 'post', post.id)}
+                  className="text-[#4D96FF] font-black text-sm flex items-center gap-2 hover:gap-3 transition-all"
+                >
                   Batafsil o'qish <ArrowRight size={16} />
                 </button>
               </div>
@@ -1,7 +1,14 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { ChevronRight, MapPin, Phone, User, CreditCard, Truck, CheckCircle2, ShoppingBag } from 'lucide-react';
 import { CartItem, View } from '../types';
 import { useToast } from './Toast';
+import {
+  newIdempotencyKey,
+  OrderError,
+  placeOrder,
+  releaseReservation,
+  reserveCart,
+} from '../services/orderService';
 
 interface CheckoutProps {
   items: CartItem[];
@@ -20,6 +27,31 @@ const Checkout: React.FC<CheckoutProps> = ({ items, onNavigate, onOrderComplete
     comment: '',
   });
   const [orderPlaced, setOrderPlaced] = useState(false);
+  const [orderId, setOrderId] = useState<number | null>(null);
+  const [submitting, setSubmitting] = useState(false);
+  // One key per checkout: retries and double clicks resolve to the same order
+  const [idempotencyKey] = useState(newIdempotencyKey);
+  // Cart reservation: held while the form is open, turned into the order on submit
+  const reservationRef = useRef<string | null>(null);
+  const orderPlacedRef = useRef(false);
+  const cartSignature = items.map(item => `${item.id}:${item.quantity}`).join(',');
+
+  useEffect(() => {
+    if (items.length === 0 || orderPlacedRef.current) return;
+    let cancelled = false;
+    reserveCart(items, reservationRef.current)
+      .then(reservation => {
+        if (reservation && !cancelled) reservationRef.current = reservation.reservation_id;
+      })
+      .catch(error => {
+        if (!cancelled && error instanceof OrderError) showToast(error.message, "error");
+      });
+    return () => { cancelled = true; };
+  }, [cartSignature]);
+
+  useEffect(() => () => {
+    if (reservationRef.current && !orderPlacedRef.current) releaseReservation(reservationRef.current);
+  }, []);
 
   const subtotal = items.reduce((sum, item) => sum + item.price * item.quantity, 0);
   const deliveryFee = subtotal >= 300000 ? 0 : 25000;
@@ -29,12 +61,22 @@ const Checkout: React.FC<CheckoutProps> = ({ items, onNavigate, onOrderComplete
     setFormData(prev => ({ ...prev, [e.target.name]: e.target.value }));
   };
 
-  const handleSubmit = (e: React.FormEvent) => {
+  const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
-    // In future this would save to Firestore
-    console.log('Order placed:', { items, formData, total });
-    setOrderPlaced(true);
-    showToast("Buyurtma muvaffaqiyatli qabul qilindi!", "success");
+    if (submitting) return;
+    setSubmitting(true);
+    try {
+      const order = await placeOrder(items, formData, idempotencyKey, reservationRef.current);
+      orderPlacedRef.current = true;
+      setOrderId(order.id);
+      setOrderPlaced(true);
+      showToast("Buyurtma muvaffaqiyatli qabul qilindi!", "success");
+    } catch (error) {
+      const message = error instanceof OrderError ? error.message : "Buyurtmani yuborib bo'lmadi";
+      showToast(message, "error");
+    } finally {
+      setSubmitting(false);
+    }
   };
 
   if (orderPlaced) {
@@ -46,7 +88,7 @@ const Checkout: React.FC<CheckoutProps> = ({ items, onNavigate, onOrderComplete
           </div>
           <h1 className="text-3xl font-black text-gray-900 mb-4">Buyurtma qabul qilindi!</h1>
           <p className="text-gray-500 font-medium mb-2">
-            Buyurtma raqami: <span className="font-black text-gray-900">#{Date.now().toString().slice(-6)}</span>
+            Buyurtma raqami: <span className="font-black text-gray-900">#{orderId}</span>
           </p>
           <p className="text-gray-400 font-medium mb-8">
             Tez orada operatorimiz siz bilan bog'lanadi va buyurtmani tasdiqlaydi.
@@ -213,7 +255,8 @@ const Checkout: React.FC<CheckoutProps> = ({ items, onNavigate, onOrderComplete
 
             <button
               type="submit"
-              className="toy-bounce w-full bg-[#FF6B6B] hover:bg-[#FF8E8E] text-white font-black py-5 rounded-2xl shadow-xl shadow-red-100 text-lg transition-all lg:hidden"
+              disabled={submitting}
+              className="toy-bounce w-full disabled:opacity-60 bg-[#FF6B6B] hover:bg-[#FF8E8E] text-white font-black py-5 rounded-2xl shadow-xl shadow-red-100 text-lg transition-all lg:hidden"
             >
               Buyurtmani tasdiqlash — {total.toLocaleString()} so'm
             </button>
@@ -261,7 +304,8 @@ const Checkout: React.FC<CheckoutProps> = ({ items, onNavigate, onOrderComplete
               type="submit"
               form="checkout-form"
               onClick={handleSubmit}
-              className="toy-bounce w-full bg-[#FF6B6B] hover:bg-[#FF8E8E] text-white font-black py-4 rounded-2xl shadow-xl shadow-red-100 mt-6 transition-all hidden lg:block"
+              disabled={submitting}
+              className="toy-bounce w-full disabled:opacity-60 bg-[#FF6B6B] hover:bg-[#FF8E8E] text-white font-black py-4 rounded-2xl shadow-xl shadow-red-100 mt-6 transition-all hidden lg:block"
             >
               Buyurtmani tasdiqlash
             </button>
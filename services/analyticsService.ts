@@ -0,0 +1,74 @@
+/**
+ * Analytics Service — product and blog post view/click counters.
+ *
+ * Events are queued in memory and sent in one request every few seconds
+ * (and when the page is hidden) with navigator.sendBeacon, so tracking
+ * never delays the UI. The server aggregates them in memory as well.
+ */
+
+import { API_BASE_URL } from './productService';
+
+type EventType = 'view' | 'click';
+type EntityType = 'product' | 'post';
+
+interface AnalyticsEvent {
+  type: EventType;
+  entity: EntityType;
+  id: number;
+}
+
+const FLUSH_INTERVAL_MS = 5000;
+const MAX_BATCH = 50;
+const VISITOR_KEY = 'toymix_visitor_id';
+
+let queue: AnalyticsEvent[] = [];
+let timer: ReturnType<typeof setTimeout> | null = null;
+
+function visitorId(): string | null {
+  try {
+    let id = localStorage.getItem(VISITOR_KEY);
+    if (!id) {
+      id = typeof crypto !== 'undefined' && 'randomUUID' in crypto
+        ? crypto.randomUUID()
+        : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+      localStorage.setItem(VISITOR_KEY, id);
+    }
+    return id;
+  } catch {
+    return null; // storage disabled — the server falls back to IP + User-Agent
+  }
+}
+
+function flush(): void {
+  if (timer) {
+    clearTimeout(timer);
+    timer = null;
+  }
+  while (queue.length > 0) {
+    const events = queue.slice(0, MAX_BATCH);
+    queue = queue.slice(MAX_BATCH);
+    // text/plain keeps the beacon a "simple" cross-origin request (no preflight)
+    const body = JSON.stringify({ visitor_id: visitorId(), events });
+    const url = `${API_BASE_URL}/api/analytics/events`;
+    if (!navigator.sendBeacon?.(url, body)) {
+      fetch(url, { method: 'POST', body, keepalive: true }).catch(() => undefined);
+    }
+  }
+}
+
+/**
+ * Record a view or click. Non-numeric ids (offline fallback products) are ignored.
+ */
+export function trackEvent(type: EventType, entity: EntityType, id: string | number): void {
+  const numericId = Number(id);
+  if (!Number.isInteger(numericId) || numericId < 1) return;
+  queue.push({ type, entity, id: numericId });
+  if (queue.length >= MAX_BATCH) flush();
+  else if (!timer) timer = setTimeout(flush, FLUSH_INTERVAL_MS);
+}
+
+if (typeof document !== 'undefined') {
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flush();
+  });
+}
@@ -27,17 +27,29 @@ import { API_BASE_URL } from './productService';
 // Simple in-memory cache to avoid re-fetching on every navigation
 let cachedContent: SiteContent | null = null;
 let cacheTimestamp = 0;
+// Server content version of cachedContent (used for /api/content/changes?since=)
+let contentVersion = 0;
 const CACHE_TTL = 5 * 60 * 1000; // 5 minutes
 
+// Static content snapshot published by the backend (e.g. '/snapshot' on Firebase Hosting).
+// When set, content is read from the CDN first and the API is only a fallback.
+const SNAPSHOT_BASE_URL = import.meta.env.VITE_SNAPSHOT_BASE_URL || '';
+
+interface SnapshotManifest {
+  version: number;
+  generated_at: string;
+  files: Record<string, { path: string; hash: string; size: number }>;
+}
+
 function isCacheValid(): boolean {
   return cachedContent !== null && (Date.now() - cacheTimestamp) < CACHE_TTL;
 }
 
 // ─── Fetch Helpers ──────────────────────────────────────────────────────────
 
-async function fetchJSON<T>(endpoint: string, timeoutMs = 8000): Promise<T | null> {
+async function fetchJSON<T>(endpoint: string, timeoutMs = 8000, baseUrl = API_BASE_URL): Promise<T | null> {
   try {
-    const url = `${API_BASE_URL}${endpoint}`;
+    const url = `${baseUrl}${endpoint}`;
     const response = await fetch(url, {
       signal: AbortSignal.timeout(timeoutMs),
     });
@@ -53,6 +65,20 @@ async function fetchJSON<T>(endpoint: string, timeoutMs = 8000): Promise<T | nul
   }
 }
 
+/**
+ * Load /api/content from the static snapshot: the short-lived manifest points
+ * at an immutable, content-hashed JSON file.
+ */
+async function fetchSnapshotContent(): Promise<(SiteContent & { version?: number }) | null> {
+  if (!SNAPSHOT_BASE_URL) return null;
+
+  const manifest = await fetchJSON<SnapshotManifest>(`${SNAPSHOT_BASE_URL}/manifest.json`, 4000, '');
+  const entry = manifest?.files?.content;
+  if (!entry) return null;
+
+  return fetchJSON<SiteContent & { version?: number }>(`${SNAPSHOT_BASE_URL}/${entry.path}`, 8000, '');
+}
+
 // ─── Public API ─────────────────────────────────────────────────────────────
 
 /**
@@ -66,9 +92,11 @@ export async function fetchSiteContent(): Promise<SiteContent> {
     return cachedContent!;
   }
 
-  // Try fetching all content from a single endpoint first
-  const allContent = await fetchJSON<SiteContent>('/api/content');
+  // Try the static snapshot first, then the single API endpoint
+  const allContent = (await fetchSnapshotContent())
+    ?? await fetchJSON<SiteContent & { version?: number }>('/api/content');
   if (allContent) {
+    contentVersion = allContent.version ?? 0;
     cachedContent = {
       settings: allContent.settings || DEFAULT_SITE_SETTINGS,
       about: allContent.about || DEFAULT_ABOUT_CONTENT,
@@ -167,4 +195,79 @@ export async function fetchBlogPosts(): Promise<BlogPost[]> {
 export function invalidateContentCache(): void {
   cachedContent = null;
   cacheTimestamp = 0;
+  contentVersion = 0;
+}
+
+interface ContentChanges {
+  version: number;
+  full: boolean;
+  settings?: Partial<SiteSettings>;
+  pages?: { about?: AboutPageContent; delivery?: DeliveryPageContent };
+  blog_posts?: BlogPost[];
+  deleted?: { blog_posts?: string[] };
+}
+
+/**
+ * Apply only what changed since the cached version instead of re-downloading
+ * everything. Falls back to a full fetch when there is nothing to merge into.
+ */
+export async function refreshSiteContent(): Promise<SiteContent> {
+  if (!cachedContent || contentVersion === 0) {
+    invalidateContentCache();
+    return fetchSiteContent();
+  }
+
+  const changes = await fetchJSON<ContentChanges>(`/api/content/changes?since=${contentVersion}`);
+  if (!changes) {
+    return cachedContent;
+  }
+
+  if (changes.full) {
+    invalidateContentCache();
+    return fetchSiteContent();
+  }
+
+  const deleted = new Set(changes.deleted?.blog_posts ?? []);
+  const updated = changes.blog_posts ?? [];
+  const updatedIds = new Set(updated.map((post) => post.id));
+  const kept = cachedContent.blog_posts.filter(
+    (post) => !deleted.has(post.id) && !updatedIds.has(post.id),
+  );
+
+  cachedContent = {
+    settings: { ...cachedContent.settings, ...changes.settings },
+    about: changes.pages?.about ?? cachedContent.about,
+    delivery: changes.pages?.delivery ?? cachedContent.delivery,
+    blog_posts: [...updated, ...kept].sort((a, b) => b.date.localeCompare(a.date)),
+  };
+  contentVersion = changes.version;
+  cacheTimestamp = Date.now();
+  return cachedContent;
+}
+
+// ─── Live Updates (SSE) ─────────────────────────────────────────────────────
+
+/**
+ * Subscribe to content change events from the bot API.
+ * The server pushes a small event only when an admin edits something, so the
+ * site pulls just the changed sections immediately instead of waiting for the cache TTL.
+ * Returns an unsubscribe function.
+ */
+export function subscribeToContentUpdates(onChange: (content: SiteContent) => void): () => void {
+  if (typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  const source = new EventSource(`${API_BASE_URL}/api/content/stream`);
+
+  source.addEventListener('content', async () => {
+    onChange(await refreshSiteContent());
+  });
+
+  source.onerror = () => {
+    // EventSource reconnects by itself (server sends retry: 5000)
+    console.warn('Content update stream disconnected, retrying...');
+  };
+
+  return () => source.close();
 }
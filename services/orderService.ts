@@ -0,0 +1,153 @@
+/**
+ * Order Service — sends checkout orders to the ToyMix bot API server.
+ *
+ * Every checkout gets one idempotency key. Network errors and 5xx responses
+ * are retried with the same key, so a retry can never create a second order.
+ *
+ * Opening checkout reserves the cart for a few minutes (reserveCart), so
+ * stock cannot run out while the customer is filling in the form. The
+ * reservation is turned into the order, or released when checkout closes.
+ */
+
+import { CartItem } from '../types';
+import { API_BASE_URL } from './productService';
+
+// ─── Types ─────────────────────────────────────────────────────────────────
+export interface OrderFormData {
+  fullName: string;
+  phone: string;
+  address: string;
+  city: string;
+  paymentMethod: string;
+  comment: string;
+}
+
+export interface PlacedOrder {
+  id: number;
+  status: string;
+  subtotal: number;
+  delivery_fee: number;
+  total: number;
+  items: { product_id: number; title: string; unit_price: number; quantity: number }[];
+}
+
+export class OrderError extends Error {
+  constructor(message: string, public status: number, public productIds: number[] = []) {
+    super(message);
+    this.name = 'OrderError';
+  }
+}
+
+export interface CartReservation {
+  reservation_id: string;
+  expires_at: string;
+}
+
+const MAX_ATTEMPTS = 3;
+
+function cartLines(items: CartItem[]) {
+  return items.map(item => ({ product_id: Number(item.id), quantity: item.quantity }));
+}
+
+async function rejection(response: Response): Promise<OrderError> {
+  const data = await response.json().catch(() => null);
+  const detail = data?.detail;
+  return new OrderError(
+    typeof detail === 'string' ? detail : detail?.message || `API returned ${response.status}`,
+    response.status,
+    detail?.product_ids || [],
+  );
+}
+
+export function newIdempotencyKey(): string {
+  if (typeof crypto !== 'undefined' && 'randomUUID' in crypto) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+}
+
+// ─── Public API ─────────────────────────────────────────────────────────────
+
+/**
+ * Place an order. Prices and delivery fee are calculated by the server.
+ * Throws OrderError for rejected orders (unknown products, validation).
+ */
+export async function placeOrder(
+  items: CartItem[],
+  form: OrderFormData,
+  idempotencyKey: string,
+  reservationId: string | null = null,
+): Promise<PlacedOrder> {
+  const body = JSON.stringify({
+    full_name: form.fullName,
+    phone: form.phone,
+    city: form.city,
+    address: form.address,
+    payment_method: form.paymentMethod,
+    comment: form.comment,
+    items: cartLines(items),
+    reservation_id: reservationId,
+  });
+
+  let lastError: unknown = null;
+  for (let attempt = 0; attempt < MAX_ATTEMPTS; attempt++) {
+    if (attempt > 0) await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt));
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/orders`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Idempotency-Key': idempotencyKey },
+        body,
+        signal: AbortSignal.timeout(10000),
+      });
+
+      if (response.ok) {
+        const data = await response.json();
+        return data.order as PlacedOrder;
+      }
+      if (response.status < 500) throw await rejection(response);
+      lastError = new Error(`API returned ${response.status} for /api/orders`);
+    } catch (error) {
+      if (error instanceof OrderError) throw error;
+      lastError = error;
+    }
+  }
+
+  console.warn('Failed to place order:', lastError);
+  throw new OrderError("Buyurtmani yuborib bo'lmadi. Internet aloqasini tekshirib, qayta urinib ko'ring.", 0);
+}
+
+/**
+ * Reserve the cart while the customer fills in the checkout form.
+ * Passing an existing reservationId replaces that reservation (cart changed).
+ * Throws OrderError (409, productIds) when some products are out of stock;
+ * returns null when the API is unreachable — checkout still works without it.
+ */
+export async function reserveCart(
+  items: CartItem[],
+  reservationId: string | null = null,
+): Promise<CartReservation | null> {
+  const query = reservationId ? `?reservation_id=${encodeURIComponent(reservationId)}` : '';
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/reservations${query}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ items: cartLines(items) }),
+      signal: AbortSignal.timeout(5000),
+    });
+    if (response.ok) return (await response.json()) as CartReservation;
+    if (response.status < 500) throw await rejection(response);
+  } catch (error) {
+    if (error instanceof OrderError) throw error;
+    console.warn('Failed to reserve cart:', error);
+  }
+  return null;
+}
+
+/**
+ * Release a cart reservation (checkout closed without an order).
+ * Best effort — unreleased reservations expire on the server anyway.
+ */
+export function releaseReservation(reservationId: string): void {
+  fetch(`${API_BASE_URL}/api/reservations/${encodeURIComponent(reservationId)}`, {
+    method: 'DELETE',
+    keepalive: true,
+  }).catch(() => undefined);
+}
@@ -3,7 +3,7 @@
  * Falls back to hardcoded constants if the API is unavailable.
  */
 
-import { Toy, Category } from '../types';
+import { AIAdviceRequest, Toy, Category } from '../types';
 import { TOYS } from '../constants';
 
 // ─── Configuration ─────────────────────────────────────────────────────────
@@ -33,6 +33,8 @@ interface ApiProduct {
   image: string;
   images: string[];
   media: ApiMediaItem[];
+  available: number | null; // null — stock is not tracked for this product
+  in_stock: boolean;
 }
 
 interface ApiProductListResponse {
@@ -41,6 +43,14 @@ interface ApiProductListResponse {
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor: string | null;
+}
+
+interface ApiRecommendationResponse {
+  products: ApiProduct[];
+  matched: boolean;
+  age: number | null;
+  budget: number | null;
 }
 
 interface ApiCategory {
@@ -112,7 +122,7 @@ function apiProductToToy(product: ApiProduct): Toy {
     images: product.images.length > 0 ? product.images : undefined,
     rating: 4.5 + Math.random() * 0.5, // Default rating (bot doesn't track this)
     ageRange: guessAgeRange(product.title, product.description, category),
-    inventoryCount: 50, // Default — bot doesn't track inventory
+    inventoryCount: product.available ?? 50, // Untracked stock — treat as plenty
     isNew: isRecentProduct(product.created_at),
     isPopular: false, // Will be set below based on position
     reviewsCount: Math.floor(Math.random() * 100) + 10,
@@ -163,6 +173,25 @@ function isRecentProduct(createdAt: string | null): boolean {
 
 // ─── Public API ────────────────────────────────────────────────────────────
 
+const POPULAR_COUNT = 4;
+
+/**
+ * IDs of the most viewed products (precomputed ranking on the backend).
+ * Empty on failure — the caller falls back to the newest products.
+ */
+async function fetchPopularIds(): Promise<Set<string>> {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/products?sort=popular&page_size=${POPULAR_COUNT}`, {
+      signal: AbortSignal.timeout(5000),
+    });
+    if (!response.ok) return new Set();
+    const data: ApiProductListResponse = await response.json();
+    return new Set((data.products || []).map(p => String(p.id)));
+  } catch {
+    return new Set();
+  }
+}
+
 /**
  * Fetch all products from the API. Falls back to hardcoded data on failure.
  */
@@ -171,9 +200,12 @@ export async function fetchProducts(): Promise<Toy[]> {
     const apiBaseUrl = getApiImageBaseUrl();
     const url = `${API_BASE_URL}/api/products?page=1&page_size=200&base_url=${encodeURIComponent(apiBaseUrl)}`;
 
-    const response = await fetch(url, {
-      signal: AbortSignal.timeout(10000), // 10s timeout
-    });
+    const [response, popularIds] = await Promise.all([
+      fetch(url, {
+        signal: AbortSignal.timeout(10000), // 10s timeout
+      }),
+      fetchPopularIds(),
+    ]);
 
     if (!response.ok) {
       throw new Error(`API returned ${response.status}`);
@@ -188,8 +220,9 @@ export async function fetchProducts(): Promise<Toy[]> {
 
     const toys = data.products.map(apiProductToToy);
 
-    // Mark first few as popular
-    toys.slice(0, Math.min(4, toys.length)).forEach(t => {
+    // Most viewed products; until there are views — the newest ones
+    const popular = toys.filter(t => popularIds.has(t.id));
+    (popular.length > 0 ? popular : toys.slice(0, POPULAR_COUNT)).forEach(t => {
       t.isPopular = true;
     });
 
@@ -245,6 +278,39 @@ export async function fetchProductById(productId: string): Promise<Toy | null> {
   }
 }
 
+/**
+ * Recommend in-stock products for the AI advisor form (age, interest, budget).
+ * Answered by the backend from the real catalog — no LLM call.
+ * `matched` is false when the interest words matched no product; returns
+ * null when the API is unavailable.
+ */
+export async function fetchRecommendations(
+  request: AIAdviceRequest,
+  limit = 4,
+): Promise<{ toys: Toy[]; matched: boolean } | null> {
+  try {
+    const params = new URLSearchParams({
+      age: request.age,
+      interest: request.interest,
+      budget: request.budget,
+      limit: String(limit),
+      base_url: getApiImageBaseUrl(),
+    });
+    const response = await fetch(`${API_BASE_URL}/api/recommendations?${params}`, {
+      signal: AbortSignal.timeout(5000),
+    });
+
+    if (!response.ok) throw new Error(`API returned ${response.status}`);
+
+    const data: ApiRecommendationResponse = await response.json();
+    return { toys: data.products.map(apiProductToToy), matched: data.matched };
+
+  } catch (error) {
+    console.warn('Failed to fetch recommendations:', error);
+    return null;
+  }
+}
+
 /**
  * Determine the base URL used for image links in API responses.
  */